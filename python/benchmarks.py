@@ -0,0 +1,486 @@
+"""
+Benchmarks de desempenho do gerador_xml.
+
+Uso:
+  python benchmarks.py leitura [planilha.xlsx ...] [--campos N] [--repeticoes R] [--processos P]
+  python benchmarks.py colunas [--linhas N] [--repeticoes R]
+  python benchmarks.py memoria [--campos N]
+  python benchmarks.py geracao [--campos N] [--repeticoes R]
+  python benchmarks.py incremental [--campos N]
+  python benchmarks.py compilado [--campos N] [--repeticoes R]
+  python benchmarks.py validacao [--campos N] [--repeticoes R]
+
+Sem planilhas informadas, gera uma planilha sintética de layout (aba
+"Campos Entrada" com N campos + abas auxiliares) em um diretório temporário.
+Cada benchmark confere que todas as variantes produzem exatamente a mesma saída
+antes de reportar os tempos.
+"""
+
+import argparse
+import html
+import os
+import re
+import sys
+import pickle
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from xml.dom import minidom
+
+import openpyxl
+
+import gerador_xml as g
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Planilha sintética
+# ─────────────────────────────────────────────────────────────────────────────
+
+_HEADERS_CAMPOS = [
+    "Entrada", "Persistência", "Enriquecimento", "MapaAtributo", "Saida", "CampoConcatenado",
+    "IdentificadorCampo", "NomeCampo", "DescricaoCampo", "TipoCampo", "TamanhoCampo",
+    "PosicaoInicial", "PosicaoFinal", "ValorPadrao", "AlinhamentoCampo", "CampoObrigatorio",
+    "NomeColuna",
+]
+
+
+def _linha_sintetica(i, pos):
+    """Linha de dados do campo i (mesma ordem de _HEADERS_CAMPOS) e a próxima posição livre."""
+    tam = 1 + i % 20
+    tipo = ("TEXTO", "INTEIRO", "DATA", "DECIMAL")[i % 4]
+    linha = (
+        "S", "S" if i % 3 == 0 else "N", "N", "S" if i % 5 == 0 else "N", "N", None,
+        i + 1, f"CAMPO_{i}", f"Descrição do campo {i}", tipo, tam,
+        pos, pos + tam - 1, None, "ZERO_ESQUERDA" if tipo != "TEXTO" else "BRANCO_ESQUERDA",
+        "S" if i % 2 else "N", f"COL_{i}",
+    )
+    return linha, pos + tam
+
+
+def linhas_sinteticas(n_campos):
+    """Linhas de dados (tuplas de valores) de n_campos campos contíguos."""
+    linhas, pos = [], 1
+    for i in range(n_campos):
+        linha, pos = _linha_sintetica(i, pos)
+        linhas.append(linha)
+    return linhas
+
+
+def gerar_planilha_sintetica(path, n_campos):
+    """Grava em `path` um layout com n_campos campos contíguos (write-only, rápido)."""
+    wb = openpyxl.Workbook(write_only=True)
+
+    ws = wb.create_sheet("Identificação Evento")
+    ws.append(["Identificação"])
+    ws.append(["Identificador", "IdentificadorEvento", "TamanhoLayout", "NomeTabela"])
+    ws.append([1, "BENCH", None, "TAB_BENCH"])
+
+    ws = wb.create_sheet("Campos Entrada")
+    ws.append(["Layouts", None, None, None, None, None, "Campos"])
+    ws.append(_HEADERS_CAMPOS)
+    for _ in range(3):
+        ws.append([])
+    for linha in linhas_sinteticas(n_campos):
+        ws.append(linha)
+
+    ws = wb.create_sheet("Rule Attribute Valor Padrão")
+    ws.append(["dataType", "pattern", "value"])
+    ws.append(["STRING", None, None])
+
+    ws = wb.create_sheet("ComandosSQL")
+    ws.append(["cabecalho", "delete from COLUMN_CONFIGURATION;"])
+
+    wb.save(path)
+
+
+def _planilhas(args, tmpdir):
+    if args.planilhas:
+        return args.planilhas
+    path = os.path.join(tmpdir, f"sintetica_{args.campos}.xlsx")
+    print(f"Gerando planilha sintética com {args.campos} campos...")
+    gerar_planilha_sintetica(path, args.campos)
+    return [path]
+
+
+def _cronometrar(fn, repeticoes):
+    """Retorna (melhor tempo em segundos, resultado da última execução)."""
+    melhor, resultado = None, None
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        resultado = fn()
+        dt = time.perf_counter() - t0
+        melhor = dt if melhor is None else min(melhor, dt)
+    return melhor, resultado
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Benchmarks
+# ─────────────────────────────────────────────────────────────────────────────
+
+def bench_leitura(args):
+    """ler_todas_abas: engine nativo × streaming × openpyxl (modo completo), sequencial e paralelo."""
+    engines = args.engines or list(g.ENGINES_LEITURA)
+    variantes = [(e, None) for e in engines]
+    if args.processos is not None:
+        variantes += [(e, args.processos) for e in engines if e != "openpyxl"]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for path in _planilhas(args, tmpdir):
+            print(f"\n{os.path.basename(path)}  ({os.path.getsize(path) / 1024:.0f} KB)")
+            tempos, saidas = {}, {}
+            for engine, processos in variantes:
+                tempos[engine, processos], saidas[engine, processos] = _cronometrar(
+                    lambda e=engine, p=processos: g.ler_todas_abas(path, engine=e, processos=p),
+                    args.repeticoes,
+                )
+            ref = ("openpyxl", None) if "openpyxl" in engines else variantes[0]
+            for engine, processos in variantes:
+                nome = engine if processos is None else f"{engine}/p{processos}"
+                igual = "ok" if saidas[engine, processos] == saidas[ref] else "DIFERENTE"
+                print(f"  {nome:<14} {tempos[engine, processos]:9.3f} s  "
+                      f"{tempos[ref] / tempos[engine, processos]:6.1f}x  [{igual} vs {ref[0]}]")
+            if any(saidas[v] != saidas[ref] for v in variantes):
+                return 1
+    return 0
+
+
+def _get_col_por_linha(row, col_map, *chaves, default=""):
+    """Resolução de coluna anterior ao _PlanoColunas: normaliza cada alias a cada linha."""
+    for chave in chaves:
+        col = col_map.get(g._normalizar_chave(chave))
+        if col:
+            val = g._cell_str(row[col - 1] if col <= len(row) else None, default)
+            if val != default or default != "":
+                return val
+    return default
+
+
+def _campos_por_linha(linhas, primeira_linha, col_map, col_para_header):
+    """Referência: conversão linha a linha sem plano compilado (comportamento anterior)."""
+    gc = _get_col_por_linha
+    campos = []
+    for row_idx, row in enumerate(linhas, primeira_linha):
+        nome = gc(row, col_map, "NomeCampo", "Nome", "Campo")
+        if not nome:
+            continue
+        tamanho = g._cell_int(gc(row, col_map, "TamanhoCampo", "Tamanho"))
+        pos_ini = g._cell_int(gc(row, col_map, "PosicaoInicial", "PosInicial", "PosIni"))
+        pos_fin_lido = g._cell_int(gc(row, col_map, "PosicaoFinal", "PosFinal", "PosFin"))
+        pos_fin = (pos_ini + tamanho - 1) if (pos_ini and tamanho) else pos_fin_lido
+        raw = {}
+        for col, h in col_para_header.items():
+            raw[h] = g._cell_str(row[col - 1] if col <= len(row) else None)
+        campos.append({
+            "linha":      row_idx,
+            "entrada":    gc(row, col_map, "Entrada", default="S"),
+            "id":         gc(row, col_map, "IdentificadorCampo", "ID", "Id"),
+            "nome":       nome,
+            "descricao":  gc(row, col_map, "DescricaoCampo", "Descricao"),
+            "tipo":       gc(row, col_map, "TipoCampo", "Tipo", default="TEXTO"),
+            "tamanho":    tamanho,
+            "pos_ini":    pos_ini,
+            "pos_fin":    pos_fin,
+            "valor_padrao": gc(row, col_map, "ValorPadrao", "Valor_Padrao"),
+            "alinhamento":  gc(row, col_map, "AlinhamentoCampo", "Alinhamento"),
+            "obrigatorio":  gc(row, col_map, "CampoObrigatorio", "Obrigatorio"),
+            "coluna_db":    gc(row, col_map, "NomeColuna", "Coluna_DB", "ColunaDB"),
+            "oracle_type":  gc(row, col_map, "OracleDataType", "OracleType"),
+            "valor":        gc(row, col_map, "ValorPadrao", "Valor_Padrao"),
+            "_raw":         raw,
+        })
+    return campos
+
+
+def bench_colunas(args):
+    """Custo por linha da conversão em campos: plano de colunas compilado × resolução por linha."""
+    col_map, _, col_para_header = g._mapear_cabecalho_valores(_HEADERS_CAMPOS)
+    linhas = linhas_sinteticas(args.linhas)
+    print(f"{len(linhas)} linhas × {len(_HEADERS_CAMPOS)} colunas (em memória, sem leitura de arquivo)")
+
+    t_ref, ref = _cronometrar(
+        lambda: _campos_por_linha(linhas, 2, col_map, col_para_header), args.repeticoes
+    )
+    t_plano, plano = _cronometrar(
+        lambda: g._campos_de_linhas(linhas, 2, col_map, col_para_header), args.repeticoes
+    )
+    igual = plano == ref
+    for nome, t in (("por linha", t_ref), ("plano", t_plano)):
+        print(f"  {nome:<10} {t:9.3f} s  {t * 1e6 / len(linhas):8.1f} µs/linha  "
+              f"{t_ref / t:6.1f}x")
+    print(f"  saída {'idêntica' if igual else 'DIFERENTE'}")
+    return 0 if igual else 1
+
+
+def _medir_memoria(fn):
+    """Retorna (bytes retidos pelo resultado de fn(), resultado), via tracemalloc."""
+    tracemalloc.start()
+    try:
+        antes = tracemalloc.get_traced_memory()[0]
+        resultado = fn()
+        depois = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return depois - antes, resultado
+
+
+def bench_memoria(args):
+    """Memória de um catálogo de campos: dict por linha × Campo/RawCampo com __slots__."""
+    col_map, _, col_para_header = g._mapear_cabecalho_valores(_HEADERS_CAMPOS)
+    linhas = linhas_sinteticas(args.campos)
+    print(f"Catálogo sintético: {len(linhas)} campos × {len(_HEADERS_CAMPOS)} colunas")
+
+    modelos = (
+        ("dict", lambda: _campos_por_linha(linhas, 2, col_map, col_para_header)),
+        ("Campo", lambda: g._campos_de_linhas(linhas, 2, col_map, col_para_header)),
+    )
+    medidas = {}
+    for nome, fn in modelos:
+        memoria, campos = _medir_memoria(fn)
+        medidas[nome] = (memoria, len(pickle.dumps(campos, pickle.HIGHEST_PROTOCOL)), campos)
+
+    ref = medidas["dict"]
+    for nome, (memoria, tam_pickle, _) in medidas.items():
+        print(f"  {nome:<6} {memoria / 2**20:8.1f} MB  {memoria / len(linhas):7.0f} B/campo  "
+              f"pickle {tam_pickle / 2**20:6.1f} MB  {ref[0] / memoria:5.1f}x")
+    igual = medidas["Campo"][2] == ref[2]
+    print(f"  conteúdo {'idêntico' if igual else 'DIFERENTE'}")
+    return 0 if igual else 1
+
+
+def _medir_pico(fn):
+    """Retorna (pico de memória em bytes durante fn(), resultado), via tracemalloc."""
+    tracemalloc.start()
+    try:
+        resultado = fn()
+        pico = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return pico, resultado
+
+
+def _pretty_minidom(xml):
+    """Referência: caminho anterior ao EscritorXML (árvore ET → tostring → minidom)."""
+    raiz = ET.fromstring(xml)
+    for el in raiz.iter():      # descarta a indentação para remontar a árvore original
+        el.tail = None
+        if len(el):
+            el.text = None
+    return minidom.parseString(ET.tostring(raiz, encoding="unicode")).toprettyxml(indent="\t")
+
+
+def _pretty_minidom_cdata(xml, tags=("ComandoSQL", "SQLChave")):
+    """Referência do DadoExterno: minidom + regex/html.unescape para envolver as tags em CDATA."""
+    pretty = _pretty_minidom(xml).replace(
+        '<?xml version="1.0" ?>', '<?xml version="1.0" encoding="UTF-8"?>'
+    )
+    for tag in tags:
+        pretty = re.sub(
+            rf"<{tag}>(.*?)</{tag}>",
+            lambda m, t=tag: f"<{t}><![CDATA[{html.unescape(m.group(1))}]]></{t}>",
+            pretty, flags=re.DOTALL,
+        )
+    return pretty
+
+
+def dados_enriquecimento_sinteticos(n_acessos, chaves=3, retornados=5):
+    """Abas Enriquecimento/Enr_ChaveAcesso/Enr_CampoRetornado com SQLs longos."""
+    def aba(linhas):
+        return {"campos": [{"nome": str(i), "_raw": raw} for i, raw in enumerate(linhas)]}
+
+    colunas = ", ".join(f"C{j} AS \"A<{j}>\"" for j in range(40))
+    enr, ch, cr = [], [], []
+    for i in range(n_acessos):
+        enr.append({
+            "IdentificadorEnriquecimento": str(i), "Nome": f"ENR_{i}",
+            "ComandoSQL": f"SELECT {colunas}\nFROM T_{i}\nWHERE X = ? AND Y < 3 && Z > '{i}'",
+            "SQLChave": f"SELECT 1 FROM DUAL WHERE A<B AND C = '{i}'", "DataSource": "DS",
+        })
+        ch += [{"IdentificadorEnriquecimento": str(i), "Identificador": f"K{k}",
+                "PosInicial": str(k), "PosFinal": str(k + 1)} for k in range(chaves)]
+        cr += [{"IdentificadorEnriquecimento": str(i), "AliasCampo": f"A<{k}>",
+                "NomeCampo": f"CAMPO_{k}", "TipoCampo": "TEXTO"} for k in range(retornados)]
+    return {"Enriquecimento": aba(enr), "Enr_ChaveAcesso": aba(ch), "Enr_CampoRetornado": aba(cr)}
+
+
+def bench_geracao(args):
+    """Geração dos XML de layout: EscritorXML (streaming) × árvore ET + minidom (+ CDATA por regex)."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, f"sintetica_{args.campos}.xlsx")
+        gerar_planilha_sintetica(path, args.campos)
+        sessao = g.SessaoPlanilha(path)
+    dados = sessao.dados_por_aba
+    aba = dados["Campos Entrada"]
+    dados_enr = dict(dados, **dados_enriquecimento_sinteticos(args.campos // 10))
+    geradores = (
+        ("entrada", _pretty_minidom, lambda: g.construir_xml(
+            aba["campos"], aba["headers"], "Campos Entrada", aba["sections"])),
+        ("persistencia", _pretty_minidom,
+         lambda: g.construir_xml_persistencia(dados, sessao=sessao)),
+        ("enriquecimento", _pretty_minidom_cdata,
+         lambda: g.construir_xml_enriquecimento(dados_enr)),
+    )
+    print(f"Layout sintético: {args.campos} campos, {args.campos // 10} acessos de enriquecimento")
+    falhas = 0
+    for nome, referencia, fn in geradores:
+        t_novo, xml = _cronometrar(fn, args.repeticoes)
+        t_ref, ref = _cronometrar(lambda: referencia(xml), args.repeticoes)
+        pico_novo, _ = _medir_pico(fn)
+        pico_ref, _ = _medir_pico(lambda: referencia(xml))
+        igual = ref == xml
+        falhas += not igual
+        print(f"  {nome:<15} streaming {t_novo * 1000:8.1f} ms {pico_novo / 2**20:6.1f} MB   "
+              f"minidom {t_ref * 1000:8.1f} ms {pico_ref / 2**20:6.1f} MB   "
+              f"{t_ref / t_novo:5.1f}x  [{'idêntico' if igual else 'DIFERENTE'}]")
+    return 1 if falhas else 0
+
+
+def bench_incremental(args):
+    """Preview após editar uma flag de Persistência: CacheArtefatos × regerar todos os artefatos."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, f"sintetica_{args.campos}.xlsx")
+        gerar_planilha_sintetica(path, args.campos)
+        sessao = g.SessaoPlanilha(path)
+    dados = sessao.dados_por_aba
+    aba = dados["Campos Entrada"]
+    parametros = lambda chave: (chave, dados, path, sessao, aba["campos"], aba["headers"], aba["sections"])
+    chaves = list(g.DEPENDENCIAS_ARTEFATOS)
+    cache = g.CacheArtefatos()
+
+    def todos():
+        return {chave: g.construir_artefato(*parametros(chave)) for chave in chaves}
+
+    def incremental():
+        return {chave: cache.construir(*parametros(chave)) for chave in chaves}
+
+    print(f"Layout sintético: {args.campos} campos, {len(chaves)} artefatos")
+    t_todos, _ = _cronometrar(todos, 1)
+    t_frio, _ = _cronometrar(incremental, 1)
+    t_quente, _ = _cronometrar(incremental, 1)
+    raw = aba["campos"][len(aba["campos"]) // 2]["_raw"]
+    raw["Persistência"] = "N" if raw["Persistência"] == "S" else "S"
+    t_edicao, resultado = _cronometrar(incremental, 1)
+    regenerados = [chave for chave, (_, regenerado) in resultado.items() if regenerado]
+    igual = {chave: conteudo for chave, (conteudo, _) in resultado.items()} == todos()
+    for nome, t in (("regerar todos", t_todos), ("cache (1ª vez)", t_frio),
+                    ("sem alterações", t_quente), ("após edição", t_edicao)):
+        print(f"  {nome:<15} {t * 1000:8.1f} ms  {t_todos / t:6.1f}x")
+    print(f"  regenerados após a edição: {', '.join(regenerados) or 'nenhum'}")
+    print(f"  saída {'idêntica' if igual else 'DIFERENTE'}")
+    return 0 if igual else 1
+
+
+def bench_compilado(args):
+    """Validação + os cinco artefatos: um LayoutCompilado compartilhado × cada gerador compilando o seu."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, f"sintetica_{args.campos}.xlsx")
+        gerar_planilha_sintetica(path, args.campos)
+        sessao = g.SessaoPlanilha(path)
+    dados = dict(sessao.dados_por_aba, **dados_enriquecimento_sinteticos(args.campos // 10))
+    aba = dados["Campos Entrada"]
+    chaves = list(g.DEPENDENCIAS_ARTEFATOS)
+
+    def gerar(compartilhar):
+        # Sem layout, validar_campos e cada gerador compilam o modelo por conta própria
+        layout = g.LayoutCompilado(dados, path, sessao) if compartilhar else None
+        resultado = {"validacao": g.validar_campos(aba["campos"], layout)}
+        for chave in chaves:
+            resultado[chave] = g.construir_artefato(
+                chave, dados, path, sessao, aba["campos"], aba["headers"], aba["sections"], layout
+            )
+        return resultado
+
+    print(f"Layout sintético: {args.campos} campos, validação + {len(chaves)} artefatos")
+    t_sep, ref = _cronometrar(lambda: gerar(False), args.repeticoes)
+    t_comp, res = _cronometrar(lambda: gerar(True), args.repeticoes)
+    igual = ref == res
+    print(f"  {'um por gerador':<15} {t_sep * 1000:8.1f} ms")
+    print(f"  {'compartilhado':<15} {t_comp * 1000:8.1f} ms  {t_sep / t_comp:5.1f}x")
+    print(f"  saída {'idêntica' if igual else 'DIFERENTE'}")
+    return 0 if igual else 1
+
+
+def campos_posicionais_sinteticos(n_campos):
+    """
+    n_campos campos de linhas_sinteticas com defeitos espalhados: a cada 50 um
+    campo recua 3 bytes (sobreposições), a cada 70 avança 5 (lacuna) e a cada
+    90 a PosicaoFinal não bate com a fórmula.
+    """
+    campos, pos = [], 1
+    for i in range(n_campos):
+        linha, _ = _linha_sintetica(i, pos)
+        tam = linha[10]
+        ini = pos - 3 if i % 50 == 49 else pos + 5 if i % 70 == 69 else pos
+        fin = ini + tam if i % 90 == 89 else ini + tam - 1
+        campos.append({"entrada": "S", "nome": linha[7], "tamanho": tam,
+                       "pos_ini": ini, "pos_fin": fin, "_raw": {}})
+        pos = ini + tam
+    return campos
+
+
+def bench_validacao(args):
+    """validar_campos em layouts grandes: AnalisePosicoes com backend "python" × "numpy"."""
+    if g.np is None:
+        print("NumPy não instalado: só o backend python está disponível.")
+        return 1
+    campos = campos_posicionais_sinteticos(args.campos)
+    layout = g.LayoutCompilado({"Campos Entrada": {"campos": campos, "headers": []}})
+    layout.campos(campos).posicionados      # compilação fora da medição
+
+    print(f"Layout sintético: {args.campos} campos")
+    t_py, ref = _cronometrar(lambda: g.validar_campos(campos, layout, "python"), args.repeticoes)
+    t_np, res = _cronometrar(lambda: g.validar_campos(campos, layout, "numpy"), args.repeticoes)
+    igual = ref == res
+    print(f"  {len(ref[0])} erro(s), {len(ref[1])} aviso(s)")
+    print(f"  {'python':<15} {t_py * 1000:8.1f} ms")
+    print(f"  {'numpy':<15} {t_np * 1000:8.1f} ms  {t_py / t_np:5.1f}x")
+    print(f"  mensagens {'idênticas' if igual else 'DIFERENTES'}")
+    return 0 if igual else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest="benchmark", required=True)
+
+    p = sub.add_parser("leitura", help=bench_leitura.__doc__)
+    p.add_argument("planilhas", nargs="*", help="arquivos .xlsx (padrão: planilha sintética)")
+    p.add_argument("--campos", type=int, default=2000, help="campos da planilha sintética")
+    p.add_argument("--repeticoes", type=int, default=3)
+    p.add_argument("--engines", nargs="+", choices=g.ENGINES_LEITURA)
+    p.add_argument("--processos", type=int,
+                   help="também mede a leitura paralela com P processos (0: todos os núcleos)")
+    p.set_defaults(func=bench_leitura)
+
+    p = sub.add_parser("colunas", help=bench_colunas.__doc__)
+    p.add_argument("--linhas", type=int, default=10000)
+    p.add_argument("--repeticoes", type=int, default=5)
+    p.set_defaults(func=bench_colunas)
+
+    p = sub.add_parser("memoria", help=bench_memoria.__doc__)
+    p.add_argument("--campos", type=int, default=50000)
+    p.set_defaults(func=bench_memoria)
+
+    p = sub.add_parser("geracao", help=bench_geracao.__doc__)
+    p.add_argument("--campos", type=int, default=5000)
+    p.add_argument("--repeticoes", type=int, default=3)
+    p.set_defaults(func=bench_geracao)
+
+    p = sub.add_parser("incremental", help=bench_incremental.__doc__)
+    p.add_argument("--campos", type=int, default=5000)
+    p.set_defaults(func=bench_incremental)
+
+    p = sub.add_parser("compilado", help=bench_compilado.__doc__)
+    p.add_argument("--campos", type=int, default=5000)
+    p.add_argument("--repeticoes", type=int, default=3)
+    p.set_defaults(func=bench_compilado)
+
+    p = sub.add_parser("validacao", help=bench_validacao.__doc__)
+    p.add_argument("--campos", type=int, default=50000)
+    p.add_argument("--repeticoes", type=int, default=3)
+    p.set_defaults(func=bench_validacao)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
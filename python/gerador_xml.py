@@ -1,48 +1,44 @@
 """
 Gerador de XML a partir de Planilhas Excel/CSV
-Interface Tkinter completa - Python 3.8+
-
-Funcionalidades:
-  - Carregar planilha principal (aba "Campos Entrada")
-  - Carregar planilha origem e copiar campos para a principal
-  - Tabela editável com Campo/PosIni/PosFin/Tamanho/Tipo/Alinhamento/Valor
-  - Validação da soma de tamanhos x posições
-  - Geração de XML com atributos posicionados corretamente
-  - Salvar planilha atualizada de volta em .xlsx ou .csv
+Python 3.8+
+
+Leitura de planilhas, validação e geradores de XML/SQL, sem interface (não
+importa tkinter). Ponto de entrada (main):
+  - sem argumentos: interface Tkinter (interface.py)
+  - com subcomando (gerar, validar, observar): modo lote (lote.py)
 """
 
-import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
 import xml.etree.ElementTree as ET
-from xml.dom import minidom
 import openpyxl
 import csv
+import json
 import os
 import re
+import sys
 import threading
-import time
+from concurrent.futures import ProcessPoolExecutor
 import shutil
-import html
+import hashlib
+import pickle
+import zlib
 from openpyxl.utils import get_column_letter
 import unicodedata
-
-
-# ─────────────────────────────────────────────────────────────────────────────
-# Constantes de cor / estilo
-# ─────────────────────────────────────────────────────────────────────────────
-COR_BG          = "#f4f6f8"
-COR_TOOLBAR     = "#eceff1"
-COR_BTN_VERDE   = "#43a047"
-COR_BTN_AZUL    = "#1e88e5"
-COR_BTN_LARANJA = "#fb8c00"
-COR_BTN_ROXO    = "#8e24aa"
-COR_BTN_CINZA   = "#546e7a"
-COR_BTN_TEAL    = "#00897b"
-COR_BTN_VERM    = "#e53935"
-COR_BRANCO      = "#ffffff"
-FONT_NORMAL     = ("Segoe UI", 9)
-FONT_BOLD       = ("Segoe UI", 9, "bold")
-FONT_MONO       = ("Consolas", 9)
+import itertools
+import heapq
+import bisect
+import collections
+import functools
+import operator
+from collections.abc import MutableMapping
+import posixpath
+import zipfile
+from openpyxl.styles.numbers import builtin_format_code, is_date_format, is_timedelta_format
+from openpyxl.utils.datetime import from_excel, from_ISO8601, WINDOWS_EPOCH, MAC_EPOCH
+
+try:
+    import numpy as np              # opcional: backend vetorizado de AnalisePosicoes
+except ImportError:
+    np = None
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -90,15 +86,296 @@ def _mapear_colunas(sheet, header_row):
     return mapa
 
 
-def _get_col(row_cells, col_map, *chaves, default=""):
-    """Lê célula pelo nome normalizado da coluna."""
-    for chave in chaves:
-        col = col_map.get(_normalizar_chave(chave))
-        if col:
-            val = _cell_str(row_cells[col - 1].value, default)
+# ─────────────────────────────────────────────────────────────────────────────
+# Modelo compacto de campo (Campo / RawCampo)
+# ─────────────────────────────────────────────────────────────────────────────
+
+_AUSENTE = object()     # coluna de RawCampo removida com del
+
+# Carimbos de alteração de Campo/RawCampo (_versao): cada __setitem__/__delitem__
+# recebe um valor novo, o que permite detectar campos alterados sem compará-los
+# (ver assinatura_artefato).
+_VERSOES_CAMPO = itertools.count(1)
+
+
+class RawCampo(MutableMapping):
+    """
+    Valores originais de uma linha (campo["_raw"]) por nome de header.
+    O mapeamento {header: posição} é único por aba e compartilhado por todas as
+    linhas; cada linha guarda só a lista de valores. Chaves fora do cabeçalho
+    (ex.: mescladas da origem por copiar_campo) vão para um dict criado sob demanda.
+    Iteração na ordem do cabeçalho, seguida das chaves extras — como o dict anterior.
+    """
+
+    __slots__ = ("_posicoes", "_valores", "_extras", "_normalizado", "_versao")
+
+    def __init__(self, posicoes, valores, extras=None):
+        self._posicoes = posicoes
+        self._valores = valores
+        self._extras = extras
+        self._normalizado = None
+        self._versao = 0
+
+    def __getitem__(self, chave):
+        p = self._posicoes.get(chave)
+        if p is not None:
+            v = self._valores[p]
+            if v is _AUSENTE:
+                raise KeyError(chave)
+            return v
+        if self._extras is None:
+            raise KeyError(chave)
+        return self._extras[chave]
+
+    def get(self, chave, default=None):
+        p = self._posicoes.get(chave)
+        if p is not None:
+            v = self._valores[p]
+            return default if v is _AUSENTE else v
+        if self._extras is None:
+            return default
+        return self._extras.get(chave, default)
+
+    def __contains__(self, chave):
+        return self.get(chave, _AUSENTE) is not _AUSENTE
+
+    def __setitem__(self, chave, valor):
+        self._normalizado = None
+        self._versao = next(_VERSOES_CAMPO)
+        p = self._posicoes.get(chave)
+        if p is not None:
+            self._valores[p] = valor
+        else:
+            if self._extras is None:
+                self._extras = {}
+            self._extras[chave] = valor
+
+    def __delitem__(self, chave):
+        self._normalizado = None
+        self._versao = next(_VERSOES_CAMPO)
+        p = self._posicoes.get(chave)
+        if p is not None and self._valores[p] is not _AUSENTE:
+            self._valores[p] = _AUSENTE
+        elif self._extras is not None and chave in self._extras:
+            del self._extras[chave]
+        else:
+            raise KeyError(chave)
+
+    def __iter__(self):
+        valores = self._valores
+        for h, p in self._posicoes.items():
+            if valores[p] is not _AUSENTE:
+                yield h
+        if self._extras:
+            yield from self._extras
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def normalizado(self):
+        """
+        Visão {_norm_aba(header): valor}, calculada uma vez e refeita só depois de
+        uma alteração (__setitem__/__delitem__). Compartilhada: não alterar.
+        """
+        if self._normalizado is None:
+            self._normalizado = {_norm_aba(k): v for k, v in self.items()}
+        return self._normalizado
+
+    def __repr__(self):
+        return f"RawCampo({dict(self)!r})"
+
+    def __reduce__(self):
+        # O pickle memoriza _posicoes: o cabeçalho é gravado uma vez por aba
+        return RawCampo, (self._posicoes, self._valores, self._extras)
+
+
+# Chaves padrão do campo, na ordem do dict lido de planilha
+_CHAVES_CAMPO = (
+    "linha", "entrada", "id", "nome", "descricao", "tipo", "tamanho", "pos_ini", "pos_fin",
+    "valor_padrao", "alinhamento", "obrigatorio", "coluna_db", "oracle_type", "valor", "_raw",
+)
+_CHAVES_CAMPO_SET = frozenset(_CHAVES_CAMPO)
+
+
+class Campo(MutableMapping):
+    """
+    Campo de layout lido de planilha, com __slots__ no lugar do dict por linha.
+    Mantém o acesso de dict usado no restante do código (c.get("nome"),
+    c["_raw"], c["pos_ini"] = ..., dict(c), ==) — inclusive chaves fora das
+    padrão, guardadas em um dict extra criado sob demanda. Chaves padrão nunca
+    atribuídas não existem, como no dict.
+    """
+
+    __slots__ = _CHAVES_CAMPO + ("_extras", "_versao")
+
+    def __init__(self, *args, **kwargs):
+        self._extras = None
+        self._versao = 0
+        for chave, valor in dict(*args, **kwargs).items():
+            self[chave] = valor
+
+    def __getitem__(self, chave):
+        if chave in _CHAVES_CAMPO_SET:
+            try:
+                return getattr(self, chave)
+            except AttributeError:
+                raise KeyError(chave) from None
+        if self._extras is None:
+            raise KeyError(chave)
+        return self._extras[chave]
+
+    def get(self, chave, default=None):
+        if chave in _CHAVES_CAMPO_SET:
+            return getattr(self, chave, default)
+        if self._extras is None:
+            return default
+        return self._extras.get(chave, default)
+
+    def __contains__(self, chave):
+        return self.get(chave, _AUSENTE) is not _AUSENTE
+
+    def __setitem__(self, chave, valor):
+        self._versao = next(_VERSOES_CAMPO)
+        if chave in _CHAVES_CAMPO_SET:
+            setattr(self, chave, valor)
+        else:
+            if self._extras is None:
+                self._extras = {}
+            self._extras[chave] = valor
+
+    def __delitem__(self, chave):
+        self._versao = next(_VERSOES_CAMPO)
+        if chave in _CHAVES_CAMPO_SET:
+            try:
+                delattr(self, chave)
+            except AttributeError:
+                raise KeyError(chave) from None
+        elif self._extras is not None and chave in self._extras:
+            del self._extras[chave]
+        else:
+            raise KeyError(chave)
+
+    def __iter__(self):
+        for chave in _CHAVES_CAMPO:
+            if getattr(self, chave, _AUSENTE) is not _AUSENTE:
+                yield chave
+        if self._extras:
+            yield from self._extras
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"Campo({dict(self)!r})"
+
+    def __reduce__(self):
+        estado = tuple(getattr(self, chave, _AUSENTE) for chave in _CHAVES_CAMPO)
+        if _AUSENTE in estado:
+            return Campo, (dict(self),)
+        return _campo_de_estado, (estado, self._extras)
+
+
+def _campo_de_estado(estado, extras=None):
+    """Reconstrói um Campo a partir da tupla de valores em _CHAVES_CAMPO (pickle)."""
+    c = Campo.__new__(Campo)
+    for chave, valor in zip(_CHAVES_CAMPO, estado):
+        setattr(c, chave, valor)
+    c._extras = extras
+    c._versao = 0
+    return c
+
+
+# Campos padrão lidos de cada linha: chave → (aliases de coluna em ordem de preferência, default)
+_COLUNAS_PADRAO = {
+    "nome":         (("NomeCampo", "Nome", "Campo"), ""),
+    "tamanho":      (("TamanhoCampo", "Tamanho"), ""),
+    "pos_ini":      (("PosicaoInicial", "PosInicial", "PosIni"), ""),
+    "pos_fin":      (("PosicaoFinal", "PosFinal", "PosFin"), ""),
+    "entrada":      (("Entrada",), "S"),
+    "id":           (("IdentificadorCampo", "ID", "Id"), ""),
+    "descricao":    (("DescricaoCampo", "Descricao"), ""),
+    "tipo":         (("TipoCampo", "Tipo"), "TEXTO"),
+    "valor_padrao": (("ValorPadrao", "Valor_Padrao"), ""),
+    "alinhamento":  (("AlinhamentoCampo", "Alinhamento"), ""),
+    "obrigatorio":  (("CampoObrigatorio", "Obrigatorio"), ""),
+    "coluna_db":    (("NomeColuna", "Coluna_DB", "ColunaDB"), ""),
+    "oracle_type":  (("OracleDataType", "OracleType"), ""),
+}
+
+
+class _PlanoColunas:
+    """
+    Resolução de colunas compilada para uma aba, montada uma vez após a detecção
+    do cabeçalho: cada campo padrão vira a tupla de índices (0-based) das colunas
+    candidatas, na ordem de preferência dos aliases, e o _raw vira a lista de
+    índices das colunas com header. campo() monta o Campo a partir de uma tupla
+    de valores sem normalizar nenhum nome por linha.
+    Os textos são internados por aba: "S"/"N", "TEXTO", alinhamentos etc. — e o
+    mesmo valor no campo padrão e no _raw — ficam em um único objeto.
+    """
+
+    __slots__ = ("colunas", "indices_raw", "posicoes_raw", "_internar")
+
+    def __init__(self, col_map, col_para_header):
+        self.colunas = {}
+        for chave, (aliases, default) in _COLUNAS_PADRAO.items():
+            normalizados = dict.fromkeys(_normalizar_chave(a) for a in aliases)
+            cols = tuple(col_map[n] - 1 for n in normalizados if n in col_map)
+            self.colunas[chave] = (cols, default)
+        self.indices_raw = tuple(col - 1 for col in col_para_header)
+        # Header repetido: vale a última coluna (como no dict), na posição da primeira
+        self.posicoes_raw = {}
+        for p, h in enumerate(col_para_header.values()):
+            self.posicoes_raw[h] = p
+        self._internar = {}.setdefault
+
+    def valor(self, row, chave):
+        """Mesma regra do antigo _get_col: com default "", a 1ª coluna candidata não vazia."""
+        cols, default = self.colunas[chave]
+        for i in cols:
+            val = _cell_str(row[i] if i < len(row) else None, default)
             if val != default or default != "":
-                return val
-    return default
+                return self._internar(val, val)
+        return default
+
+    def campo(self, row, row_idx):
+        """Campo da linha `row` (tupla de valores), ou None se não tem nome."""
+        valor = self.valor
+        nome = valor(row, "nome")
+        if not nome:
+            return None
+
+        tamanho = _cell_int(valor(row, "tamanho"))
+        pos_ini = _cell_int(valor(row, "pos_ini"))
+        pos_fin_lido = _cell_int(valor(row, "pos_fin"))
+        pos_fin = (pos_ini + tamanho - 1) if (pos_ini and tamanho) else pos_fin_lido
+
+        n = len(row)
+        internar = self._internar
+        textos = []
+        for i in self.indices_raw:
+            t = _cell_str(row[i] if i < n else None)
+            textos.append(internar(t, t))
+
+        valor_padrao = valor(row, "valor_padrao")
+        return _campo_de_estado((
+            row_idx,
+            valor(row, "entrada"),
+            valor(row, "id"),
+            nome,
+            valor(row, "descricao"),
+            valor(row, "tipo"),
+            tamanho,
+            pos_ini,
+            pos_fin,
+            valor_padrao,
+            valor(row, "alinhamento"),
+            valor(row, "obrigatorio"),
+            valor(row, "coluna_db"),
+            valor(row, "oracle_type"),
+            valor_padrao,
+            RawCampo(self.posicoes_raw, textos),
+        ))
 
 
 def ler_campos_entrada(filepath):
@@ -169,47 +446,110 @@ def _ler_campos_de_sheet(sheet):
             headers.append(h)
             col_para_header[cell.column] = h
 
+    linhas = sheet.iter_rows(min_row=header_row + 1, max_row=sheet.max_row, values_only=True)
+    campos = _campos_de_linhas(linhas, header_row + 1, col_map, col_para_header)
+
+    # Detecta seções da linha de metadados acima do cabeçalho (se existir)
+    sections = _detectar_secoes(sheet, header_row - 1) if header_row > 1 else {}
+
+    return campos, headers, sections
+
+
+def _detectar_linha_cabecalho_valores(linhas):
+    """Equivalente a _detectar_linha_cabecalho sobre tuplas de valores (linha 1 = índice 0)."""
+    alvo = {"nomecampo", "nome", "campo", "fieldname"}
+    for row_idx, valores in enumerate(linhas[:10], 1):
+        for v in valores:
+            if _normalizar_chave(v) in alvo:
+                return row_idx
+    return 2  # padrão: linha 2
+
+
+def _detectar_secoes_valores(linhas, meta_row_idx):
+    """Equivalente a _detectar_secoes sobre tuplas de valores (linha 1 = índice 0)."""
+    def _linha(idx):
+        return linhas[idx - 1] if 0 < idx <= len(linhas) else ()
+
+    meta_cells = [
+        (col, str(v).strip())
+        for col, v in enumerate(_linha(meta_row_idx), 1)
+        if v and str(v).strip()
+    ]
+    if not meta_cells:
+        return {}
+
+    col_to_header = {
+        col: str(v).strip()
+        for col, v in enumerate(_linha(meta_row_idx + 1), 1)
+        if v
+    }
+
+    sections = {}
+    for i, (sec_col, sec_name) in enumerate(meta_cells):
+        next_col = meta_cells[i + 1][0] if i + 1 < len(meta_cells) else float("inf")
+        sections[sec_name] = [
+            col_to_header[c]
+            for c in sorted(col_to_header)
+            if sec_col <= c < next_col
+        ]
+    return sections
+
+
+def _mapear_cabecalho_valores(valores_header):
+    """
+    Interpreta a tupla do cabeçalho. Retorna (col_map, headers, col_para_header):
+      - col_map: {chave_normalizada: índice_coluna_1based}
+      - headers: nomes originais na ordem da planilha
+      - col_para_header: {índice_coluna_1based: nome original}
+    """
+    col_map = {}
+    headers = []
+    col_para_header = {}
+    for col, v in enumerate(valores_header, 1):
+        if v:
+            col_map[_normalizar_chave(v)] = col
+            h = str(v).strip()
+            headers.append(h)
+            col_para_header[col] = h
+    return col_map, headers, col_para_header
+
+
+def _campos_de_linhas(linhas, primeira_linha, col_map, col_para_header):
+    """Converte as linhas de dados (tuplas) em campos; `primeira_linha` = nº da 1ª tupla."""
+    campo = _PlanoColunas(col_map, col_para_header).campo
     campos = []
-    for row_idx in range(header_row + 1, sheet.max_row + 1):
-        row = sheet[row_idx]
+    for row_idx, row in enumerate(linhas, primeira_linha):
+        c = campo(row, row_idx)
+        if c is not None:
+            campos.append(c)
+    return campos
 
-        nome = _get_col(row, col_map, "NomeCampo", "Nome", "Campo")
-        if not nome:
-            continue
 
-        tamanho = _cell_int(_get_col(row, col_map, "TamanhoCampo", "Tamanho"))
-        pos_ini = _cell_int(_get_col(row, col_map, "PosicaoInicial", "PosInicial", "PosIni"))
-        pos_fin_lido = _cell_int(_get_col(row, col_map, "PosicaoFinal", "PosFinal", "PosFin"))
-        pos_fin = (pos_ini + tamanho - 1) if (pos_ini and tamanho) else pos_fin_lido
+def _ler_cabecalho_valores(buffer):
+    """
+    Detecta cabeçalho e seções nas primeiras linhas (até 10) de uma aba.
+    Retorna (header_row, col_map, headers, col_para_header, sections).
+    """
+    header_row = _detectar_linha_cabecalho_valores(buffer)
+    valores_header = buffer[header_row - 1] if header_row <= len(buffer) else ()
+    col_map, headers, col_para_header = _mapear_cabecalho_valores(valores_header)
+    sections = _detectar_secoes_valores(buffer, header_row - 1) if header_row > 1 else {}
+    return header_row, col_map, headers, col_para_header, sections
 
-        # Todos os valores da linha pelo nome original do cabeçalho
-        raw = {}
-        for cell in row:
-            if cell.column in col_para_header:
-                raw[col_para_header[cell.column]] = _cell_str(cell.value)
-
-        campo = {
-            "linha":      row_idx,
-            "entrada":    _get_col(row, col_map, "Entrada", default="S"),
-            "id":         _get_col(row, col_map, "IdentificadorCampo", "ID", "Id"),
-            "nome":       nome,
-            "descricao":  _get_col(row, col_map, "DescricaoCampo", "Descricao"),
-            "tipo":       _get_col(row, col_map, "TipoCampo", "Tipo", default="TEXTO"),
-            "tamanho":    tamanho,
-            "pos_ini":    pos_ini,
-            "pos_fin":    pos_fin,
-            "valor_padrao": _get_col(row, col_map, "ValorPadrao", "Valor_Padrao"),
-            "alinhamento":  _get_col(row, col_map, "AlinhamentoCampo", "Alinhamento"),
-            "obrigatorio":  _get_col(row, col_map, "CampoObrigatorio", "Obrigatorio"),
-            "coluna_db":    _get_col(row, col_map, "NomeColuna", "Coluna_DB", "ColunaDB"),
-            "oracle_type":  _get_col(row, col_map, "OracleDataType", "OracleType"),
-            "valor":        _get_col(row, col_map, "ValorPadrao", "Valor_Padrao"),
-            "_raw":         raw,
-        }
-        campos.append(campo)
 
-    # Detecta seções da linha de metadados acima do cabeçalho (se existir)
-    sections = _detectar_secoes(sheet, header_row - 1) if header_row > 1 else {}
+def _ler_campos_de_valores(linhas):
+    """
+    Versão streaming de _ler_campos_de_sheet: consome um iterável de tuplas de valores
+    (ex.: ws.iter_rows(values_only=True)) e retorna o mesmo (campos, headers, sections).
+    Apenas as 10 primeiras linhas ficam em buffer (detecção de cabeçalho/seções);
+    as demais são processadas à medida que são lidas.
+    """
+    linhas = iter(linhas)
+    buffer = list(itertools.islice(linhas, 10))
+    header_row, col_map, headers, col_para_header, sections = _ler_cabecalho_valores(buffer)
+
+    restantes = itertools.chain(buffer[header_row:], linhas)
+    campos = _campos_de_linhas(restantes, header_row + 1, col_map, col_para_header)
 
     return campos, headers, sections
 
@@ -233,6 +573,25 @@ def _ler_xlsx_campos_entrada(filepath):
     return campos
 
 
+def _ler_xlsx_generico(path):
+    """Lê a primeira aba como lista de campos, usando a 1ª linha como cabeçalho."""
+    wb = openpyxl.load_workbook(path, data_only=True)
+    ws = wb.active
+    headers = [_cell_str(c.value, f"Col{i}") for i, c in enumerate(ws[1])]
+    campos = []
+    for row in ws.iter_rows(min_row=2, values_only=True):
+        if not any(row):
+            continue
+        nome = _cell_str(row[0]) if row else ""
+        if not nome:
+            continue
+        c = {"nome": nome, "entrada": "S", "tipo": "TEXTO"}
+        for h, v in zip(headers[1:], row[1:]):
+            c[_normalizar_chave(h)] = _cell_str(v)
+        campos.append(c)
+    return campos
+
+
 def _ler_csv_campos_entrada(filepath):
     campos = []
     with open(filepath, "r", encoding="utf-8-sig") as f:
@@ -268,11 +627,56 @@ def _ler_csv_campos_entrada(filepath):
     return campos
 
 
-def ler_todas_abas(filepath):
+# Engines de leitura de xlsx disponíveis em ler_todas_abas:
+#   "streaming" → openpyxl read-only, linhas como tuplas (iter_rows(values_only=True))
+#   "nativo"    → zip + iterparse direto dos XMLs da planilha (sem openpyxl)
+#   "openpyxl"  → openpyxl em modo completo, célula a célula (comportamento original)
+ENGINES_LEITURA = ("streaming", "nativo", "openpyxl")
+ENGINE_LEITURA_PADRAO = "streaming"
+
+
+def _tipo_aba_auxiliar(nome_aba):
+    """
+    Classifica abas auxiliares lidas pelos geradores (fora de dados_por_aba):
+    'identificacao', 'rule_attribute_valores' ou 'comandos_sql'; None para as demais.
+    """
+    n = _norm_aba(nome_aba)
+    if "identificacaoevento" in n or "identificaevento" in n:
+        return "identificacao"
+    if "ruleattribute" in n and "valor" in n:
+        return "rule_attribute_valores"
+    if n == "comandossql":
+        return "comandos_sql"
+    return None
+
+
+# Abas de dados por modelo cujas linhas casam com campos de 'Campos Entrada' por
+# NomeCampo (nome normalizado começando com um dos prefixos): usadas ao copiar
+# campos de outra planilha e na validação entre abas (validar_referencias).
+PREFIXOS_ABA_PERSISTENCIA = ("persistenc",)
+PREFIXOS_ABA_MAPA_ATRIBUTO = ("ruleattribute", "mapaatributo", "attributemap")
+
+
+def ler_todas_abas(filepath, engine=None, abas_auxiliares=None, processos=None, progresso=None,
+                   cache=None, sob_demanda=False):
     """
     Lê todas as abas de um .xlsx como dicionário {nome_aba: {"campos": list, "headers": list}}.
     Para CSV, retorna uma única entrada 'Campos Entrada'.
     Abas sem campos reconhecidos são ignoradas.
+    `engine` seleciona o leitor (ver ENGINES_LEITURA); padrão: ENGINE_LEITURA_PADRAO.
+    `abas_auxiliares`, se informado, recebe {tipo: [tuplas de valores]} das abas
+    classificadas por _tipo_aba_auxiliar (primeira ocorrência de cada tipo),
+    aproveitando a mesma abertura do arquivo.
+    `processos` (opt-in) distribui as abas — e blocos de linhas de abas muito
+    altas — entre processos (ver _ler_todas_abas_paralelo); <= 0 usa todos os
+    núcleos. Não se aplica à engine "openpyxl".
+    `progresso`, se informado, é chamado antes de cada aba como
+    progresso(abas_concluidas, total_abas, nome_aba).
+    `cache` (CacheLeitura) reaproveita a leitura de um arquivo com o mesmo conteúdo.
+    `sob_demanda` (engines "streaming" e "nativo") lê de cada aba só cabeçalho e
+    dimensão; os campos são lidos no primeiro acesso a dados[aba]["campos"]
+    (ver AbaPlanilha). Abas cujos campos sejam todos sem nome aparecem vazias
+    em vez de omitidas. `processos` não se aplica.
     """
     ext = os.path.splitext(filepath)[1].lower()
 
@@ -280,12 +684,44 @@ def ler_todas_abas(filepath):
         campos = _ler_csv_campos_entrada(filepath)
         return {"Campos Entrada": {"campos": campos, "headers": []}}
 
+    engine = engine or ENGINE_LEITURA_PADRAO
+    if engine not in ENGINES_LEITURA:
+        raise ValueError(
+            f"Engine de leitura desconhecida: {engine}\n"
+            f"Disponíveis: {', '.join(ENGINES_LEITURA)}"
+        )
+    if cache is not None:
+        return cache.ler_todas_abas(
+            filepath, engine, abas_auxiliares, processos, progresso, sob_demanda
+        )
+    if sob_demanda and engine != "openpyxl":
+        assinatura = _assinatura_arquivo(filepath)
+        indice = _indice_abas(filepath, engine, abas_auxiliares, progresso)
+        return _abas_sob_demanda(indice, filepath, engine, assinatura=assinatura)
+    if engine == "openpyxl":
+        return _ler_todas_abas_openpyxl(filepath, abas_auxiliares, progresso)
+    if processos is not None and processos != 1:
+        return _ler_todas_abas_paralelo(filepath, engine, abas_auxiliares, processos, progresso)
+    return _ler_todas_abas_fonte(
+        _FONTES_LINHAS[engine](filepath), filepath, abas_auxiliares, progresso
+    )
+
+
+def _ler_todas_abas_openpyxl(filepath, abas_auxiliares=None, progresso=None):
+    """Leitura em modo completo: materializa todas as células de todas as abas."""
     wb = openpyxl.load_workbook(filepath, data_only=True)
     resultado = {}
 
-    for nome_aba in wb.sheetnames:
+    for i, nome_aba in enumerate(wb.sheetnames):
+        if progresso:
+            progresso(i, len(wb.sheetnames), nome_aba)
         ws = wb[nome_aba]
         try:
+            tipo = _tipo_aba_auxiliar(nome_aba) if abas_auxiliares is not None else None
+            if tipo and tipo not in abas_auxiliares:
+                abas_auxiliares[tipo] = [
+                    tuple(c.value for c in row) for row in ws.iter_rows()
+                ]
             campos, headers, sections = _ler_campos_de_sheet(ws)
             if campos:
                 resultado[nome_aba] = {"campos": campos, "headers": headers, "sections": sections}
@@ -295,144 +731,1239 @@ def ler_todas_abas(filepath):
     return resultado
 
 
-def _nome_xml_para_aba(nome_aba):
-    """Converte nome de aba em nome do elemento XML raiz. Ex: 'Campos Entrada' → 'LayoutEntrada'."""
-    secao = re.sub(r"^[Cc]ampos\s+", "", nome_aba).strip()
-    pascal = "".join(p.capitalize() for p in re.split(r"[\s_\-]+", secao) if p)
-    return f"Layout{pascal}" if pascal else "Layout"
+class _FonteStreaming:
+    """
+    Fonte de linhas da engine "streaming": openpyxl read-only, sem objetos de célula.
+    Mesma interface de _LeitorXlsxNativo: abas, linhas(), total_linhas(), close().
+    """
 
+    def __init__(self, filepath):
+        self._wb = openpyxl.load_workbook(filepath, read_only=True, data_only=True)
+        self.abas = [(nome, nome) for nome in self._wb.sheetnames]
 
-def _item_xml_para_aba(nome_aba):
-    """Converte nome de aba em nome do elemento XML de campo. Ex: 'Campos Entrada' → 'CampoEntrada'."""
-    secao = re.sub(r"^[Cc]ampos\s+", "", nome_aba).strip()
-    pascal = "".join(p.capitalize() for p in re.split(r"[\s_\-]+", secao) if p)
-    return f"Campo{pascal}" if pascal else "Campo"
+    def close(self):
+        self._wb.close()
 
+    def total_linhas(self, ref):
+        """Nº de linhas segundo a dimensão gravada no arquivo (None se ausente)."""
+        return self._wb[ref].max_row
 
-def salvar_xlsx(filepath, campos, nome_aba="Campos Entrada"):
-    """Salva lista de campos na aba indicada do arquivo Excel."""
+    def linhas(self, ref, ini=None, fim=None):
+        """Tuplas de valores da aba, a partir da linha `ini` (padrão 1) até `fim` (inclusive)."""
+        ws = self._wb[ref]
+        # Ignora a dimensão gravada no arquivo (pode estar desatualizada)
+        ws.reset_dimensions()
+        return ws.iter_rows(min_row=ini, max_row=fim, values_only=True)
+
+
+def _ler_aba_fonte(fonte, filepath, nome_aba, ref, auxiliar=False, completo=None):
+    """
+    Lê uma aba de uma fonte de linhas. Retorna (campos, headers, sections, linhas),
+    onde `linhas` é a lista de tuplas materializada quando `auxiliar` (senão None).
+    Se a fonte não conseguir percorrer a aba, relê no modo completo do openpyxl
+    (_ler_campos_de_sheet); `completo` guarda esse workbook entre chamadas.
+    """
     try:
-        wb = openpyxl.load_workbook(filepath)
+        linhas = fonte.linhas(ref)
+        if auxiliar:
+            # Abas auxiliares são pequenas: materializa para reaproveitar
+            linhas = list(linhas)
+        campos, headers, sections = _ler_campos_de_valores(linhas)
+        return campos, headers, sections, (linhas if auxiliar else None)
     except Exception:
-        wb = openpyxl.Workbook()
-        wb.active.title = nome_aba
+        completo = {} if completo is None else completo
+        if "wb" not in completo:
+            completo["wb"] = openpyxl.load_workbook(filepath, data_only=True)
+        campos, headers, sections = _ler_campos_de_sheet(completo["wb"][nome_aba])
+        return campos, headers, sections, None
 
-    sheet_name = nome_aba
-    if sheet_name not in wb.sheetnames:
-        ws = wb.create_sheet(sheet_name)
-    else:
-        ws = wb[sheet_name]
 
-    # Cabeçalho na linha 2 (padrão do template)
-    headers = [
-        "Entrada", "Persistencia", "Enriquecimento", "MapaAtributo", "Saida", "CampoConcatenado",
-        "IdentificadorCampo", "NomeCampo", "DescricaoCampo", "TipoCampo", "TamanhoCampo",
-        "PosicaoInicial", "PosicaoFinal", "ValorPadrao", "AlinhamentoCampo", "CampoObrigatorio",
-    ]
-    for col_idx, header in enumerate(headers, 1):
-        ws.cell(row=2, column=col_idx, value=header)
+def _ler_todas_abas_fonte(fonte, filepath, abas_auxiliares=None, progresso=None):
+    """
+    Percorre todas as abas de uma fonte de linhas (streaming ou nativo), uma única
+    vez cada, sem criar objetos de célula. Fecha a fonte ao final.
+    """
+    completo = {}
+    resultado = {}
 
-    # Dados a partir da linha 6
-    for i, campo in enumerate(campos):
-        r = 6 + i
-        ws.cell(r, 1,  campo.get("entrada", "S"))
-        ws.cell(r, 7,  campo.get("id") or i + 1)
-        ws.cell(r, 8,  campo.get("nome", ""))
-        ws.cell(r, 9,  campo.get("descricao", ""))
-        ws.cell(r, 10, campo.get("tipo", "TEXTO"))
-        ws.cell(r, 11, campo.get("tamanho"))
-        ws.cell(r, 12, campo.get("pos_ini"))
-        if campo.get("pos_ini") and campo.get("tamanho"):
-            ws.cell(r, 13).value = f"=L{r}+K{r}-1"
-        ws.cell(r, 14, campo.get("valor_padrao", ""))
-        ws.cell(r, 15, campo.get("alinhamento", ""))
-        ws.cell(r, 16, campo.get("obrigatorio", ""))
+    try:
+        for i, (nome_aba, ref) in enumerate(fonte.abas):
+            if progresso:
+                progresso(i, len(fonte.abas), nome_aba)
+            if ref is None:
+                continue  # chartsheet / dialogsheet: sem células
+            tipo = _tipo_aba_auxiliar(nome_aba) if abas_auxiliares is not None else None
+            auxiliar = bool(tipo) and tipo not in abas_auxiliares
+            try:
+                campos, headers, sections, linhas = _ler_aba_fonte(
+                    fonte, filepath, nome_aba, ref, auxiliar, completo
+                )
+            except Exception:
+                continue
+            if auxiliar and linhas is not None:
+                abas_auxiliares[tipo] = linhas
+            if campos:
+                resultado[nome_aba] = {"campos": campos, "headers": headers, "sections": sections}
+    finally:
+        fonte.close()
 
-    wb.save(filepath)
+    return resultado
 
 
-def salvar_csv(filepath, campos):
-    """Salva lista de campos em CSV."""
-    fieldnames = ["entrada", "id", "nome", "descricao", "tipo", "tamanho",
-                  "pos_ini", "pos_fin", "valor_padrao", "alinhamento",
-                  "obrigatorio", "coluna_db", "valor"]
-    with open(filepath, "w", newline="", encoding="utf-8-sig") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
-        writer.writeheader()
-        writer.writerows(campos)
+# ─────────────────────────────────────────────────────────────────────────────
+# Leitor nativo de xlsx (zip + iterparse, apenas valores)
+# ─────────────────────────────────────────────────────────────────────────────
 
+_NS_MAIN    = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_NS_REL     = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
 
-def _to_cell_value(v):
-    """Converte string de _raw para o tipo adequado para escrita em célula xlsx."""
-    if v is None:
-        return None
-    s = str(v).strip()
-    if not s:
-        return None
-    try:
-        return int(s)
-    except (ValueError, TypeError):
-        pass
-    try:
-        return float(s)
-    except (ValueError, TypeError):
-        pass
-    return s
+_TAG_ROW = _NS_MAIN + "row"
+_TAG_C   = _NS_MAIN + "c"
+_TAG_V   = _NS_MAIN + "v"
+_TAG_T   = _NS_MAIN + "t"
+_TAG_R   = _NS_MAIN + "r"
+_TAG_IS  = _NS_MAIN + "is"
+_TAG_SI  = _NS_MAIN + "si"
 
 
-def salvar_xlsx_estruturado(path_original, path_destino, dados_por_aba):
-    """
-    Persiste as alterações de dados_por_aba no xlsx preservando toda a estrutura original.
+def _texto_rico(node):
+    """Texto de um <si>/<is>: <t> direto + <r><t> dos trechos formatados (ignora <rPh>)."""
+    partes = []
+    t = node.find(_TAG_T)
+    if t is not None and t.text:
+        partes.append(t.text)
+    for r in node.findall(_TAG_R):
+        rt = r.find(_TAG_T)
+        if rt is not None and rt.text:
+            partes.append(rt.text)
+    return "".join(partes)
 
-    Estratégia:
-      1. Copia o arquivo original para path_destino (todos os tabs, formatação, imagens, etc.)
-      2. Para cada aba presente em dados_por_aba:
-           - Detecta a linha de cabeçalho e a primeira linha de dados no original
-           - Limpa apenas as células de dados (preserva linhas de título/seção acima)
-           - Reescreve todos os campos usando _raw (header original → número da coluna)
-           - PosicaoFinal é escrita como fórmula Excel (=PosIni+Tam-1)
-      3. Abas não presentes em dados_por_aba são intocadas.
-      4. O arquivo original NUNCA é modificado.
-    """
-    shutil.copy2(path_original, path_destino)
-    wb = openpyxl.load_workbook(path_destino)
 
-    for nome_aba, info in dados_por_aba.items():
-        if nome_aba not in wb.sheetnames:
-            continue
+_COLUNAS_REF = {}   # cache 'AB' → 28
 
-        campos = info.get("campos", [])
-        ws = wb[nome_aba]
 
-        # ── Detectar cabeçalho ──────────────────────────────────────────────
-        header_row = _detectar_linha_cabecalho(ws)
+def _coluna_ref(ref):
+    """Converte referência de célula ('AB12') no índice 1-based da coluna (28)."""
+    letras = ref.rstrip("0123456789")
+    col = _COLUNAS_REF.get(letras)
+    if col is None:
+        col = 0
+        for ch in letras:
+            col = col * 26 + (ord(ch.upper()) - 64)
+        _COLUNAS_REF[letras] = col
+    return col
 
-        # Mapa: header_name_original → col_number
-        col_map = {}
-        for cell in ws[header_row]:
-            if cell.value:
-                col_map[str(cell.value).strip()] = cell.column
 
-        if not col_map:
-            continue
+class _LeitorXlsxNativo:
+    """
+    Lê apenas os valores de um .xlsx abrindo o pacote zip diretamente:
+    sharedStrings.xml decodificado uma única vez e cada xl/worksheets/sheetN.xml
+    percorrido com ElementTree.iterparse, linha a linha.
+    Conversões de tipo (números, booleanos, datas pelo numFmt do estilo)
+    seguem as mesmas regras do openpyxl com data_only=True.
+    """
 
-        # ── Detectar primeira linha de dados reais ──────────────────────────
-        # Percorre até 20 linhas após o cabeçalho procurando a primeira com dado
-        primeira_linha = header_row + 1
-        for r in range(header_row + 1, min(header_row + 21, ws.max_row + 1)):
-            if any(ws.cell(r, c).value is not None for c in col_map.values()):
-                primeira_linha = r
+    def __init__(self, filepath):
+        self._zip = zipfile.ZipFile(filepath)
+        try:
+            self._ler_estrutura()
+        except Exception:
+            self._zip.close()
+            raise
+        self._strings = None
+
+    def close(self):
+        self._zip.close()
+
+    def _rels(self, caminho_xml):
+        """{rId: (tipo, caminho_absoluto_no_zip)} do arquivo .rels associado."""
+        base, nome = posixpath.split(caminho_xml)
+        caminho_rels = posixpath.join(base, "_rels", nome + ".rels")
+        if caminho_rels not in self._zip.namelist():
+            return {}
+        rels = {}
+        root = ET.fromstring(self._zip.read(caminho_rels))
+        for rel in root.iter(_NS_PKG_REL + "Relationship"):
+            alvo = rel.get("Target", "")
+            if alvo.startswith("/"):
+                alvo = alvo[1:]
+            else:
+                alvo = posixpath.normpath(posixpath.join(base, alvo))
+            rels[rel.get("Id")] = (rel.get("Type", ""), alvo)
+        return rels
+
+    def _ler_estrutura(self):
+        caminho_wb = "xl/workbook.xml"
+        for tipo, alvo in self._rels("").values():
+            if tipo.endswith("/officeDocument"):
+                caminho_wb = alvo
                 break
 
-        # ── Colunas especiais para fórmula PosicaoFinal ─────────────────────
-        col_posini = col_map.get("PosicaoInicial") or col_map.get("PosInicial")
-        col_tam    = col_map.get("TamanhoCampo")   or col_map.get("Tamanho")
-        col_posfin = col_map.get("PosicaoFinal")   or col_map.get("PosFinal")
+        rels_wb = self._rels(caminho_wb)
+        root = ET.fromstring(self._zip.read(caminho_wb))
+
+        pr = root.find(_NS_MAIN + "workbookPr")
+        date1904 = pr is not None and pr.get("date1904", "").lower() in ("1", "true")
+        self._epoch = MAC_EPOCH if date1904 else WINDOWS_EPOCH
+
+        # (nome_aba, caminho da worksheet | None para chartsheets e afins)
+        self.abas = []
+        for sh in root.iter(_NS_MAIN + "sheet"):
+            tipo, alvo = rels_wb.get(sh.get(_NS_REL + "id"), ("", None))
+            self.abas.append((sh.get("name"), alvo if tipo.endswith("/worksheet") else None))
+
+        self._caminho_strings = None
+        caminho_estilos = None
+        for tipo, alvo in rels_wb.values():
+            if tipo.endswith("/sharedStrings"):
+                self._caminho_strings = alvo
+            elif tipo.endswith("/styles"):
+                caminho_estilos = alvo
+        self._estilos_data, self._estilos_duracao = self._ler_formatos_data(caminho_estilos)
+        self.caminho_workbook = caminho_wb
+        self.caminho_estilos = caminho_estilos
+
+    def _ler_formatos_data(self, caminho):
+        """Índices de cellXfs cujo numFmt é de data (e de duração), como no openpyxl."""
+        datas, duracoes = set(), set()
+        if not caminho or caminho not in self._zip.namelist():
+            return datas, duracoes
+        root = ET.fromstring(self._zip.read(caminho))
+        custom = {
+            int(nf.get("numFmtId")): nf.get("formatCode")
+            for nf in root.iter(_NS_MAIN + "numFmt")
+        }
+        xfs = root.find(_NS_MAIN + "cellXfs")
+        for idx, xf in enumerate(xfs if xfs is not None else []):
+            num_fmt_id = int(xf.get("numFmtId", 0))
+            fmt = custom.get(num_fmt_id) or builtin_format_code(num_fmt_id)
+            if is_date_format(fmt):
+                datas.add(idx)
+            if is_timedelta_format(fmt):
+                duracoes.add(idx)
+        return datas, duracoes
+
+    def _shared_strings(self):
+        """Decodifica sharedStrings.xml uma única vez (sob demanda)."""
+        if self._strings is None:
+            self._strings = []
+            if self._caminho_strings and self._caminho_strings in self._zip.namelist():
+                with self._zip.open(self._caminho_strings) as fonte:
+                    for _, node in ET.iterparse(fonte):
+                        if node.tag == _TAG_SI:
+                            self._strings.append(_texto_rico(node).replace("x005F_", ""))
+                            node.clear()
+        return self._strings
+
+    def _valor(self, c, strings):
+        tipo = c.get("t", "n")
+        if tipo == "inlineStr":
+            is_el = c.find(_TAG_IS)
+            return _texto_rico(is_el) if is_el is not None else None
+        v = c.findtext(_TAG_V) or None
+        if v is None:
+            return None
+        if tipo == "n":
+            num = float(v) if ("." in v or "E" in v or "e" in v) else int(v)
+            estilo = int(c.get("s") or 0)
+            if estilo in self._estilos_data:
+                try:
+                    return from_excel(num, self._epoch,
+                                      timedelta=estilo in self._estilos_duracao)
+                except (OverflowError, ValueError):
+                    return "#VALUE!"
+            return num
+        if tipo == "s":
+            return strings[int(v)]
+        if tipo == "b":
+            return bool(int(v))
+        if tipo == "d":
+            return from_ISO8601(v)
+        return v    # "str" (fórmula texto) e "e" (erro: '#N/A', ...)
+
+    def total_linhas(self, caminho):
+        """Nº de linhas segundo o <dimension> da worksheet (None se ausente)."""
+        with self._zip.open(caminho) as fonte:
+            for _, el in ET.iterparse(fonte, events=("start",)):
+                if el.tag == _NS_MAIN + "dimension":
+                    ultima = el.get("ref", "").split(":")[-1].lstrip("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+                    return int(ultima) if ultima.isdigit() else None
+                if el.tag == _NS_MAIN + "sheetData":
+                    return None
+        return None
 
-        # ── Limpar linhas de dados (só as colunas mapeadas) ─────────────────
-        for r in range(primeira_linha, ws.max_row + 1):
-            for col_num in col_map.values():
-                ws.cell(r, col_num).value = None
+    def linhas(self, caminho, ini=None, fim=None):
+        """
+        Gera uma tupla de valores por linha da worksheet, da linha `ini` (padrão 1)
+        até `fim` (inclusive; padrão: última). Linhas ausentes no XML são geradas
+        como tuplas vazias; linhas antes de `ini` são puladas sem decodificar valores.
+        """
+        strings = self._shared_strings()
+        lida = 0                    # última linha encontrada no XML
+        atual = (ini or 1) - 1      # última linha já gerada
+        with self._zip.open(caminho) as fonte:
+            for _, el in ET.iterparse(fonte):
+                if el.tag != _TAG_ROW:
+                    continue
+                r = el.get("r")
+                idx = lida = int(float(r)) if r else lida + 1
+                if idx <= atual:
+                    el.clear()
+                    continue
+                if fim is not None and idx > fim:
+                    break
+                while atual + 1 < idx:
+                    atual += 1
+                    yield ()
+                valores = []
+                col = 0
+                for c in el:
+                    if c.tag != _TAG_C:
+                        continue
+                    ref = c.get("r")
+                    col = _coluna_ref(ref) if ref else col + 1
+                    if col > len(valores):
+                        valores.extend([None] * (col - len(valores)))
+                    valores[col - 1] = self._valor(c, strings)
+                el.clear()
+                atual = idx
+                yield tuple(valores)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Leitura paralela de abas (ProcessPoolExecutor)
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Fontes de linhas por engine (ler_todas_abas / leitura paralela)
+_FONTES_LINHAS = {"streaming": _FonteStreaming, "nativo": _LeitorXlsxNativo}
+
+# Abas com mais de 2× este nº de linhas são divididas em blocos entre os processos
+LINHAS_POR_BLOCO_PARALELO = 20000
+
+_FONTES_WORKER = {}     # (filepath, engine) → fonte aberta, reaproveitada pelo processo worker
+
+
+def _fonte_worker(filepath, engine):
+    """Abre (uma vez por processo worker) a fonte de linhas do arquivo."""
+    chave = (filepath, engine)
+    fonte = _FONTES_WORKER.get(chave)
+    if fonte is None:
+        fonte = _FONTES_WORKER[chave] = _FONTES_LINHAS[engine](filepath)
+    return fonte
+
+
+def _ler_aba_worker(filepath, engine, nome_aba, ref, auxiliar):
+    """Tarefa do pool: lê uma aba inteira (com fallback para o modo completo)."""
+    return _ler_aba_fonte(_fonte_worker(filepath, engine), filepath, nome_aba, ref, auxiliar)
+
+
+def _ler_bloco_worker(filepath, engine, ref, ini, fim, col_map, col_para_header):
+    """Tarefa do pool: converte em campos as linhas ini..fim de uma aba com cabeçalho já detectado."""
+    linhas = _fonte_worker(filepath, engine).linhas(ref, ini, fim)
+    return _campos_de_linhas(linhas, ini, col_map, col_para_header)
+
+
+def _ler_todas_abas_paralelo(filepath, engine, abas_auxiliares, processos, progresso=None):
+    """
+    Lê as abas distribuindo-as entre `processos` processos (<= 0: todos os núcleos).
+    Abas com mais de 2 × LINHAS_POR_BLOCO_PARALELO linhas (segundo a dimensão gravada)
+    são divididas em blocos; cabeçalho e seções são detectados antes, no processo
+    principal, que lê só as 10 primeiras linhas. O último bloco vai até o fim da aba,
+    mesmo que a dimensão esteja desatualizada.
+    O resultado segue a ordem original das abas e, como na leitura sequencial,
+    omite abas que falham ou não têm campos.
+    """
+    if processos is None or processos <= 0:
+        processos = os.cpu_count() or 1
+
+    # ── Planejamento (processo principal) ───────────────────────────────────
+    planos = []             # (nome_aba, ref, tipo_auxiliar | None, cabecalho | None, faixas)
+    reservados = set()
+    fonte = _FONTES_LINHAS[engine](filepath)
+    try:
+        for nome_aba, ref in fonte.abas:
+            if ref is None:
+                continue
+            tipo = _tipo_aba_auxiliar(nome_aba) if abas_auxiliares is not None else None
+            if tipo in reservados or (tipo and tipo in abas_auxiliares):
+                tipo = None
+            if tipo:
+                reservados.add(tipo)
+
+            cabecalho, faixas = None, []
+            try:
+                total = None if tipo else fonte.total_linhas(ref)
+                if total and total > 2 * LINHAS_POR_BLOCO_PARALELO:
+                    cabecalho = _ler_cabecalho_valores(list(fonte.linhas(ref, 1, 10)))
+                    inicios = range(cabecalho[0] + 1, total + 1, LINHAS_POR_BLOCO_PARALELO)
+                    faixas = [(ini, ini + LINHAS_POR_BLOCO_PARALELO - 1) for ini in inicios]
+                    faixas[-1] = (faixas[-1][0], None)
+            except Exception:
+                cabecalho, faixas = None, []
+            planos.append((nome_aba, ref, tipo, cabecalho, faixas))
+    finally:
+        fonte.close()
+
+    if not planos:
+        return {}
+
+    # ── Execução ────────────────────────────────────────────────────────────
+    n_tarefas = sum(len(faixas) or 1 for *_, faixas in planos)
+    resultado = {}
+    with ProcessPoolExecutor(max_workers=max(1, min(processos, n_tarefas))) as pool:
+        futuros = []
+        for nome_aba, ref, tipo, cabecalho, faixas in planos:
+            if cabecalho is None:
+                futuros.append(pool.submit(
+                    _ler_aba_worker, filepath, engine, nome_aba, ref, bool(tipo)
+                ))
+            else:
+                _, col_map, _, col_para_header, _ = cabecalho
+                futuros.append([
+                    pool.submit(_ler_bloco_worker, filepath, engine, ref,
+                                ini, fim, col_map, col_para_header)
+                    for ini, fim in faixas
+                ])
+
+        for i, ((nome_aba, ref, tipo, cabecalho, _), futuro) in enumerate(zip(planos, futuros)):
+            if progresso:
+                progresso(i, len(planos), nome_aba)
+            try:
+                if cabecalho is None:
+                    campos, headers, sections, linhas = futuro.result()
+                    if tipo and linhas is not None:
+                        abas_auxiliares[tipo] = linhas
+                else:
+                    _, _, headers, _, sections = cabecalho
+                    try:
+                        campos = [c for f in futuro for c in f.result()]
+                    except Exception:
+                        # Algum bloco falhou: relê a aba inteira (com fallback)
+                        campos, headers, sections, _ = pool.submit(
+                            _ler_aba_worker, filepath, engine, nome_aba, ref, False
+                        ).result()
+            except Exception:
+                continue
+            if campos:
+                resultado[nome_aba] = {"campos": campos, "headers": headers, "sections": sections}
+
+    return resultado
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Leitura sob demanda (abas materializadas quando acessadas)
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _indice_abas(filepath, engine, abas_auxiliares=None, progresso=None):
+    """
+    Varredura rápida para a leitura sob demanda: de cada aba lê só as 10 primeiras
+    linhas (cabeçalho e seções) e a dimensão gravada. Abas auxiliares, pequenas,
+    são lidas por inteiro — preenchem `abas_auxiliares` e já saem com os campos.
+    Retorna [(nome_aba, ref, headers, sections, linhas_estimadas, campos | None)];
+    campos None = aba ainda não lida. Omite abas que certamente não têm campos
+    (sem coluna de nome, ou terminadas nas 10 linhas lidas sem linhas abaixo do
+    cabeçalho); a dimensão gravada só estima as linhas, não exclui abas.
+    """
+    nomes_coluna = {_normalizar_chave(a) for a in _COLUNAS_PADRAO["nome"][0]}
+    indice = []
+    fonte = _FONTES_LINHAS[engine](filepath)
+    try:
+        for i, (nome_aba, ref) in enumerate(fonte.abas):
+            if progresso:
+                progresso(i, len(fonte.abas), nome_aba)
+            if ref is None:
+                continue
+            tipo = _tipo_aba_auxiliar(nome_aba) if abas_auxiliares is not None else None
+            auxiliar = bool(tipo) and tipo not in abas_auxiliares
+            try:
+                if auxiliar:
+                    campos, headers, sections, linhas = _ler_aba_fonte(
+                        fonte, filepath, nome_aba, ref, auxiliar=True
+                    )
+                    if linhas is not None:
+                        abas_auxiliares[tipo] = linhas
+                    if campos:
+                        indice.append((nome_aba, ref, headers, sections, len(campos), campos))
+                    continue
+                total = fonte.total_linhas(ref)
+                buffer = list(fonte.linhas(ref, 1, 10))
+                header_row, col_map, headers, _, sections = _ler_cabecalho_valores(buffer)
+            except Exception:
+                # Cabeçalho ilegível pela fonte: lê a aba agora (com fallback completo)
+                try:
+                    campos, headers, sections, _ = _ler_aba_fonte(fonte, filepath, nome_aba, ref)
+                except Exception:
+                    continue
+                if campos:
+                    indice.append((nome_aba, ref, headers, sections, len(campos), campos))
+                continue
+            if not nomes_coluna & col_map.keys():
+                continue
+            # A dimensão gravada pode estar desatualizada (ex.: "A1"): só a varredura
+            # decide que a aba não tem linhas abaixo do cabeçalho
+            vistas = sum(1 for linha in buffer[header_row:]
+                         if any(v is not None and v != "" for v in linha))
+            if not vistas and len(buffer) < 10:
+                continue
+            estimadas = None if total is None else max(total - header_row, vistas)
+            indice.append((nome_aba, ref, headers, sections, estimadas, None))
+    finally:
+        fonte.close()
+    return indice
+
+
+class PlanilhaAlteradaError(RuntimeError):
+    """A planilha mudou em disco entre a varredura inicial e a leitura de uma aba sob demanda."""
+
+
+class AbaPlanilha(MutableMapping):
+    """
+    Aba de dados_por_aba na leitura sob demanda: "headers" e "sections" vêm da
+    varredura inicial; "campos" só é lido da planilha no primeiro acesso (uma vez,
+    protegido por lock — geradores podem acessar de outras threads).
+    Com `cache`, os campos da aba também são guardados/reaproveitados no
+    CacheLeitura sob `chave` (o conteúdo da varredura). `assinatura` é a de
+    _assinatura_arquivo antes da varredura: se o arquivo mudou desde então, a
+    leitura levanta PlanilhaAlteradaError em vez de misturar linhas novas com o
+    cabeçalho e as demais abas da varredura (e de gravá-las no cache sob a chave
+    do conteúdo antigo) — a planilha deve ser lida de novo.
+    Demais chaves se comportam como em um dict.
+    """
+
+    def __init__(self, filepath, engine, nome_aba, ref, headers, sections,
+                 linhas_estimadas=None, campos=None, cache=None, chave=None, assinatura=None):
+        self.filepath = filepath
+        self.engine = engine
+        self.nome_aba = nome_aba
+        self.ref = ref
+        self.linhas_estimadas = linhas_estimadas
+        self.cache = cache
+        self.chave = chave
+        self.assinatura = assinatura
+        self._dados = {"headers": headers, "sections": sections}
+        self._campos = campos
+        self._lock = threading.Lock()
+
+    @property
+    def carregada(self):
+        return self._campos is not None
+
+    @property
+    def campos(self):
+        if self._campos is None:
+            with self._lock:
+                if self._campos is None:
+                    self._campos = self._ler_campos()
+        return self._campos
+
+    def _verificar_assinatura(self):
+        if self.assinatura is None:
+            return
+        try:
+            atual = _assinatura_arquivo(self.filepath)
+        except OSError:
+            atual = None
+        if atual != self.assinatura:
+            raise PlanilhaAlteradaError(
+                f"{os.path.basename(self.filepath)} foi alterada depois da leitura inicial; "
+                f"abra a planilha de novo para ler a aba '{self.nome_aba}'."
+            )
+
+    def _ler_campos(self):
+        campos = self.cache.obter(self.chave) if self.cache and self.chave else None
+        if campos is not None:
+            return campos
+        # Antes e depois: uma gravação durante a leitura também invalida o resultado
+        self._verificar_assinatura()
+        fonte = _FONTES_LINHAS[self.engine](self.filepath)
+        try:
+            campos, headers, sections, _ = _ler_aba_fonte(
+                fonte, self.filepath, self.nome_aba, self.ref
+            )
+        finally:
+            fonte.close()
+        self._verificar_assinatura()
+        self._dados.update(headers=headers, sections=sections)
+        if self.cache and self.chave:
+            self.cache.gravar(self.chave, campos)
+        return campos
+
+    def __getitem__(self, chave):
+        if chave == "campos":
+            return self.campos
+        return self._dados[chave]
+
+    def __setitem__(self, chave, valor):
+        if chave == "campos":
+            self._campos = valor
+        else:
+            self._dados[chave] = valor
+
+    def __delitem__(self, chave):
+        if chave == "campos":
+            raise KeyError("'campos' não pode ser removido de AbaPlanilha")
+        del self._dados[chave]
+
+    def __iter__(self):
+        yield "campos"
+        yield from self._dados
+
+    def __len__(self):
+        return 1 + len(self._dados)
+
+    def __repr__(self):
+        estado = f"{len(self._campos)} campos" if self.carregada else "não carregada"
+        return f"AbaPlanilha({self.nome_aba!r}, {estado})"
+
+    def __getstate__(self):
+        estado = self.__dict__.copy()
+        del estado["_lock"]
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._lock = threading.Lock()
+
+
+def _abas_sob_demanda(indice, filepath, engine, cache=None, chave=None, assinatura=None):
+    """
+    Monta {nome_aba: AbaPlanilha} a partir do resultado de _indice_abas;
+    `assinatura`: _assinatura_arquivo tomada antes da varredura (ou de `chave`).
+    """
+    return {
+        nome_aba: AbaPlanilha(
+            filepath, engine, nome_aba, ref, headers, sections, estimadas, campos,
+            cache=cache, chave=f"{chave}-{i}" if chave else None, assinatura=assinatura,
+        )
+        for i, (nome_aba, ref, headers, sections, estimadas, campos) in enumerate(indice)
+    }
+
+
+def _total_campos(dados_por_aba):
+    """
+    Retorna (total, aproximado): soma dos campos das abas sem forçar a leitura
+    das abas sob demanda ainda não lidas (para essas, usa as linhas estimadas).
+    """
+    total, aproximado = 0, False
+    for info in dados_por_aba.values():
+        if isinstance(info, AbaPlanilha) and not info.carregada:
+            total += info.linhas_estimadas or 0
+            aproximado = True
+        else:
+            total += len(info.get("campos", []))
+    return total, aproximado
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Cache persistente de leitura (ler_todas_abas + abas auxiliares)
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Incrementar sempre que a saída de ler_todas_abas ou das abas auxiliares mudar:
+# entradas gravadas por outra versão deixam de ser encontradas.
+VERSAO_LEITURA = 2
+
+CACHE_LEITURA_LIMITE_PADRAO = 256 * 1024 * 1024     # bytes
+
+
+def _diretorio_cache_padrao():
+    """GERADOR_XML_CACHE, ou %LOCALAPPDATA% / ~/.cache + gerador_xml/leitura."""
+    diretorio = os.environ.get("GERADOR_XML_CACHE")
+    if diretorio:
+        return diretorio
+    base = (os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME")
+            or os.path.join(os.path.expanduser("~"), ".cache"))
+    return os.path.join(base, "gerador_xml", "leitura")
+
+
+class CacheLeitura:
+    """
+    Cache em disco do resultado de ler_todas_abas junto com as linhas das abas
+    auxiliares (Identificação Evento, Rule Attribute Valor Padrão, ComandosSQL).
+
+    A chave é o SHA-256 do conteúdo do arquivo + VERSAO_LEITURA + engine, então
+    uma planilha inalterada é reaproveitada mesmo se copiada ou renomeada.
+    Cada entrada é um pickle comprimido com zlib; o total é limitado a
+    `limite_bytes`, descartando primeiro as entradas usadas há mais tempo (o
+    mtime do arquivo é atualizado a cada acerto).
+    Falhas do cache (disco cheio, permissão, entrada corrompida) nunca impedem
+    a leitura: a planilha é simplesmente lida de novo.
+    """
+
+    EXTENSAO = ".bin"
+    _MAGICO = b"GXL1"
+
+    def __init__(self, diretorio=None, limite_bytes=CACHE_LEITURA_LIMITE_PADRAO):
+        self.diretorio = diretorio or _diretorio_cache_padrao()
+        self.limite_bytes = limite_bytes
+
+    def chave(self, filepath, engine):
+        h = hashlib.sha256()
+        with open(filepath, "rb") as f:
+            for bloco in iter(lambda: f.read(1 << 20), b""):
+                h.update(bloco)
+        h.update(f"|{VERSAO_LEITURA}|{engine}".encode())
+        return h.hexdigest()
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, chave + self.EXTENSAO)
+
+    def obter(self, chave):
+        """Retorna o objeto gravado sob `chave`, ou None se ausente/inválido."""
+        caminho = self._caminho(chave)
+        try:
+            with open(caminho, "rb") as f:
+                conteudo = f.read()
+        except OSError:
+            return None
+        try:
+            if not conteudo.startswith(self._MAGICO):
+                raise ValueError("cabeçalho inválido")
+            obj = pickle.loads(zlib.decompress(conteudo[len(self._MAGICO):]))
+        except Exception:
+            self._remover(caminho)
+            return None
+        try:
+            os.utime(caminho)   # marca como usado recentemente (LRU)
+        except OSError:
+            pass
+        return obj
+
+    def gravar(self, chave, obj):
+        """Grava `obj` sob `chave` (escrita atômica) e aplica o limite de tamanho."""
+        caminho = self._caminho(chave)
+        tmp = f"{caminho}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.diretorio, exist_ok=True)
+            dados = zlib.compress(pickle.dumps(obj, pickle.HIGHEST_PROTOCOL), 1)
+            with open(tmp, "wb") as f:
+                f.write(self._MAGICO)
+                f.write(dados)
+            os.replace(tmp, caminho)
+        except Exception:
+            self._remover(tmp)
+            return
+        self._aplicar_limite()
+
+    def _entradas(self):
+        """Lista [(mtime, tamanho, caminho)] das entradas do cache."""
+        entradas = []
+        try:
+            nomes = os.listdir(self.diretorio)
+        except OSError:
+            return entradas
+        for nome in nomes:
+            if not nome.endswith(self.EXTENSAO):
+                continue
+            caminho = os.path.join(self.diretorio, nome)
+            try:
+                st = os.stat(caminho)
+            except OSError:
+                continue
+            entradas.append((st.st_mtime, st.st_size, caminho))
+        return entradas
+
+    def _aplicar_limite(self):
+        entradas = sorted(self._entradas())
+        total = sum(tam for _, tam, _ in entradas)
+        for _, tam, caminho in entradas:
+            if total <= self.limite_bytes:
+                break
+            self._remover(caminho)
+            total -= tam
+
+    @staticmethod
+    def _remover(caminho):
+        try:
+            os.remove(caminho)
+        except OSError:
+            pass
+
+    def tamanho(self):
+        """Retorna (nº de entradas, bytes ocupados)."""
+        entradas = self._entradas()
+        return len(entradas), sum(tam for _, tam, _ in entradas)
+
+    def limpar(self):
+        """Remove todas as entradas. Retorna (nº de entradas, bytes liberados)."""
+        entradas = self._entradas()
+        for _, _, caminho in entradas:
+            self._remover(caminho)
+        return len(entradas), sum(tam for _, tam, _ in entradas)
+
+    def ler_todas_abas(self, filepath, engine=None, abas_auxiliares=None,
+                       processos=None, progresso=None, sob_demanda=False):
+        """
+        ler_todas_abas com cache: só lê a planilha se o conteúdo não estiver em cache.
+        Uma leitura completa em cache atende também o modo sob demanda. Nesse modo,
+        o índice das abas fica sob "<chave>-indice" e os campos de cada aba sob
+        "<chave>-<n>", gravados à medida que as abas são lidas.
+        A chave é calculada antes da leitura, que reabre o arquivo: o resultado só é
+        gravado se a assinatura do arquivo não mudou entre as duas (um salvamento no
+        meio ficaria sob a chave do conteúdo antigo).
+        """
+        engine = engine or ENGINE_LEITURA_PADRAO
+        try:
+            assinatura = _assinatura_arquivo(filepath)     # do conteúdo que gera `chave`
+            chave = self.chave(filepath, engine)
+        except OSError:
+            assinatura = chave = None
+        entrada = self.obter(chave) if chave else None
+        if entrada is not None:
+            dados, auxiliares = entrada
+        elif sob_demanda and engine != "openpyxl":
+            entrada = self.obter(f"{chave}-indice") if chave else None
+            if entrada is None:
+                auxiliares = {}
+                indice = _indice_abas(filepath, engine, auxiliares, progresso)
+                if chave and _arquivo_inalterado(filepath, assinatura):
+                    self.gravar(f"{chave}-indice", (indice, auxiliares))
+            else:
+                indice, auxiliares = entrada
+            dados = _abas_sob_demanda(indice, filepath, engine, self, chave, assinatura)
+        else:
+            auxiliares = {}
+            dados = ler_todas_abas(filepath, engine, auxiliares, processos, progresso)
+            if chave and _arquivo_inalterado(filepath, assinatura):
+                self.gravar(chave, (dados, auxiliares))
+        if abas_auxiliares is not None:
+            for tipo, linhas in auxiliares.items():
+                abas_auxiliares.setdefault(tipo, linhas)
+        return dados
+
+
+_CACHE_LEITURA = None
+
+
+def cache_leitura_padrao():
+    """Instância compartilhada de CacheLeitura no diretório padrão."""
+    global _CACHE_LEITURA
+    if _CACHE_LEITURA is None:
+        _CACHE_LEITURA = CacheLeitura()
+    return _CACHE_LEITURA
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Releitura incremental (modo observação)
+# ─────────────────────────────────────────────────────────────────────────────
+
+_RE_REF_STRING = re.compile(rb'<c\b[^>]*?\bt="s"[^>]*>\s*<v>(\d+)</v>')
+
+
+def _indices_strings(xml):
+    """
+    Índices de sharedStrings usados por uma worksheet (bytes do XML), ou None
+    se não for possível determiná-los com segurança (aspas simples, prefixos...).
+    """
+    indices = _RE_REF_STRING.findall(xml)
+    if len(indices) != xml.count(b't="s"') or b"t='s'" in xml:
+        return None
+    return frozenset(map(int, indices))
+
+
+def _mesmos_textos(indices, antigas, novas):
+    """True se os textos de sharedStrings nos `indices` não mudaram."""
+    if indices is None or antigas is None:
+        return False
+    return all(
+        i < len(antigas) and i < len(novas) and antigas[i] == novas[i] for i in indices
+    )
+
+
+class LeituraIncremental:
+    """
+    Leituras repetidas de uma mesma planilha que só releem as abas alteradas.
+
+    Cada worksheet é comparada pelo CRC/tamanho registrados no zip (sem
+    descompactar), assim como workbook.xml e styles.xml (época e formatos de
+    data). Se o sharedStrings.xml mudou, uma aba inalterada continua valendo
+    quando os textos nos índices que ela usa são os mesmos. Abas reaproveitadas
+    mantêm os mesmos objetos de campos — as assinaturas de CacheArtefatos
+    também não os reprocessam. CSV e a engine "openpyxl" são sempre relidos.
+    """
+
+    def __init__(self, filepath, engine=None):
+        self.filepath = filepath
+        self.engine = engine or ENGINE_LEITURA_PADRAO
+        # nome_aba → (impressão, (campos, headers, sections) | None, linhas auxiliares, índices)
+        self._abas = {}
+        self._comuns = None         # impressão de workbook.xml + styles.xml
+        self._impressao_strings = None
+        self._strings = None
+        self.relidas = []           # abas relidas na última leitura
+        self.reaproveitadas = []    # abas reaproveitadas na última leitura
+
+    def ler(self, abas_auxiliares=None):
+        """Mesma saída de ler_todas_abas(filepath, engine, abas_auxiliares)."""
+        if self.engine == "openpyxl" or os.path.splitext(self.filepath)[1].lower() == ".csv":
+            dados = ler_todas_abas(self.filepath, self.engine, abas_auxiliares)
+            self.relidas, self.reaproveitadas = list(dados), []
+            return dados
+
+        estrutura = _LeitorXlsxNativo(self.filepath)
+        try:
+            partes = {i.filename: (i.CRC, i.file_size) for i in estrutura._zip.infolist()}
+            comuns = (partes.get(estrutura.caminho_workbook), partes.get(estrutura.caminho_estilos))
+            if comuns != self._comuns:
+                self._abas.clear()
+            antigas = novas = self._strings
+            impressao_strings = partes.get(estrutura._caminho_strings)
+            if impressao_strings != self._impressao_strings or novas is None:
+                novas = estrutura._shared_strings()
+
+            abas, reler = [], {}
+            for nome_aba, caminho in estrutura.abas:
+                if caminho is None:
+                    continue
+                impressao = partes.get(caminho)
+                anterior = self._abas.get(nome_aba)
+                if anterior is not None and anterior[0] == impressao and (
+                        novas is antigas or _mesmos_textos(anterior[3], antigas, novas)):
+                    abas.append((nome_aba, anterior))
+                else:
+                    indices = _indices_strings(estrutura._zip.read(caminho))
+                    reler[nome_aba] = (impressao, indices)
+                    abas.append((nome_aba, None))
+        finally:
+            estrutura.close()
+
+        lidas = {}
+        if reler:
+            fonte = _FONTES_LINHAS[self.engine](self.filepath)
+            completo = {}
+            try:
+                refs = dict(fonte.abas)
+                for nome_aba, (impressao, indices) in reler.items():
+                    resultado, linhas = None, None
+                    if refs.get(nome_aba) is not None:
+                        try:
+                            campos, headers, sections, linhas = _ler_aba_fonte(
+                                fonte, self.filepath, nome_aba, refs[nome_aba],
+                                bool(_tipo_aba_auxiliar(nome_aba)), completo,
+                            )
+                            resultado = (campos, headers, sections)
+                        except Exception:
+                            pass
+                    lidas[nome_aba] = (impressao, resultado, linhas, indices)
+            finally:
+                fonte.close()
+
+        self._abas = {}
+        dados, auxiliares = {}, {}
+        for nome_aba, item in abas:
+            item = item or lidas[nome_aba]
+            self._abas[nome_aba] = item
+            _, resultado, linhas, _ = item
+            tipo = _tipo_aba_auxiliar(nome_aba)
+            if tipo and tipo not in auxiliares and linhas is not None:
+                auxiliares[tipo] = linhas
+            if resultado and resultado[0]:
+                campos, headers, sections = resultado
+                dados[nome_aba] = {"campos": campos, "headers": headers, "sections": sections}
+        self._comuns = comuns
+        self._impressao_strings = impressao_strings
+        self._strings = novas
+        self.relidas = list(reler)
+        self.reaproveitadas = [nome for nome, item in abas if item is not None]
+        if abas_auxiliares is not None:
+            for tipo, linhas in auxiliares.items():
+                abas_auxiliares.setdefault(tipo, linhas)
+        return dados
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Sessão da planilha principal
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _assinatura_arquivo(filepath):
+    """(mtime_ns, tamanho) do arquivo — usado para invalidar caches de leitura."""
+    st = os.stat(filepath)
+    return st.st_mtime_ns, st.st_size
+
+
+def _arquivo_inalterado(filepath, assinatura):
+    """True se o arquivo ainda tem a `assinatura` (_assinatura_arquivo) tomada antes."""
+    try:
+        return _assinatura_arquivo(filepath) == assinatura
+    except OSError:
+        return False
+
+
+class SessaoPlanilha:
+    """
+    Planilha principal aberta uma única vez.
+
+    Mantém dados_por_aba junto com as abas auxiliares já interpretadas
+    ('Identificação Evento', 'Rule Attribute Valor Padrão' e 'ComandosSQL'),
+    de modo que os geradores (construir_xml_*, gerar_comandos_sql) não precisem
+    reabrir o xlsx. O cache só é invalidado quando mtime ou tamanho do arquivo mudam.
+    Com `cache` (CacheLeitura), as leituras passam pelo cache em disco; com
+    `sob_demanda`, as abas de dados_por_aba são AbaPlanilha (ver ler_todas_abas).
+    Com `incremental`, as releituras só releem as abas alteradas (LeituraIncremental);
+    `cache` e `sob_demanda` não se aplicam.
+    """
+
+    def __init__(self, filepath, engine=None, progresso=None, cache=None, sob_demanda=False,
+                 incremental=False):
+        self.filepath = filepath
+        self.engine = engine
+        self.cache = cache
+        self.sob_demanda = sob_demanda
+        self.leitura_incremental = LeituraIncremental(filepath, engine) if incremental else None
+        self.dados_por_aba = {}
+        self.identificacao = {}             # {header: valor} da aba Identificação Evento
+        self.rule_attribute_valores = []    # linhas da aba Rule Attribute Valor Padrão
+        self.comandos_sql = []              # SQLs fixos da aba ComandosSQL
+        self._assinatura = None
+        self._carregar(recarregar_dados=True, progresso=progresso)
+
+    def _carregar(self, recarregar_dados, progresso=None):
+        assinatura = _assinatura_arquivo(self.filepath)
+        auxiliares = {}
+        if self.leitura_incremental is not None:
+            dados = self.leitura_incremental.ler(auxiliares)
+        else:
+            # Sem recarregar os dados, só as abas auxiliares interessam: basta o índice
+            dados = ler_todas_abas(
+                self.filepath, self.engine, abas_auxiliares=auxiliares, progresso=progresso,
+                cache=self.cache, sob_demanda=self.sob_demanda or not recarregar_dados,
+            )
+        if recarregar_dados:
+            self.dados_por_aba = dados
+        else:
+            # Abas sob demanda nunca abertas não têm edições: passam a ler da nova
+            # varredura (as antigas levantariam PlanilhaAlteradaError)
+            for nome, aba in self.dados_por_aba.items():
+                if isinstance(aba, AbaPlanilha) and not aba.carregada and nome in dados:
+                    self.dados_por_aba[nome] = dados[nome]
+        self.identificacao = _parse_identificacao_evento(auxiliares.get("identificacao", []))
+        self.rule_attribute_valores = _parse_rule_attribute_valores(
+            auxiliares.get("rule_attribute_valores", [])
+        )
+        self.comandos_sql = _parse_comandos_sql(auxiliares.get("comandos_sql", []))
+        self._assinatura = assinatura
+
+    @property
+    def identificacao_norm(self):
+        """Identificação Evento com chaves normalizadas por _norm_aba."""
+        return {_norm_aba(k): v for k, v in self.identificacao.items()}
+
+    def alterada(self):
+        """True se o arquivo em disco mudou (mtime ou tamanho) desde a última leitura."""
+        try:
+            return _assinatura_arquivo(self.filepath) != self._assinatura
+        except OSError:
+            return False
+
+    def revalidar(self, recarregar_dados=True):
+        """
+        Relê o arquivo se ele mudou em disco. Com recarregar_dados=False apenas as
+        abas auxiliares são atualizadas (preserva edições feitas em dados_por_aba).
+        Retorna True se houve releitura.
+        """
+        if not self.alterada():
+            return False
+        self._carregar(recarregar_dados)
+        return True
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Carga de planilhas em processos separados (carregar_planilhas)
+# ─────────────────────────────────────────────────────────────────────────────
+
+_FILA_PROGRESSO_CARGA = None    # multiprocessing.Queue do processo principal (no worker)
+
+
+def _iniciar_worker_carga(fila):
+    """Initializer do pool: guarda a fila por onde o worker reporta progresso."""
+    global _FILA_PROGRESSO_CARGA
+    _FILA_PROGRESSO_CARGA = fila
+
+
+def _carregar_planilha_worker(tipo, path, usar_cache=True):
+    """
+    Tarefa de processo de carregar_planilhas.
+    'principal' → SessaoPlanilha; 'origem' → dados_por_aba (com leitura genérica
+    da primeira aba quando nenhuma aba de layout é reconhecida).
+    Sem `usar_cache`, não usa o cache de leitura em disco (como --sem-cache).
+    O progresso por aba vai para a fila como (tipo, abas_concluidas, total_abas, nome_aba).
+    """
+    def progresso(concluidas, total, nome_aba):
+        if _FILA_PROGRESSO_CARGA is not None:
+            _FILA_PROGRESSO_CARGA.put((tipo, concluidas, total, nome_aba))
+
+    cache = cache_leitura_padrao() if usar_cache else None
+    if tipo == "principal":
+        # Abas lidas sob demanda: a interface fica disponível após a varredura inicial
+        return SessaoPlanilha(path, progresso=progresso, cache=cache, sob_demanda=True)
+
+    dados = ler_todas_abas(path, progresso=progresso, cache=cache)
+    if not dados:
+        campos = _ler_xlsx_generico(path)
+        nome_fb = os.path.splitext(os.path.basename(path))[0]
+        dados = {nome_fb: {"campos": campos, "headers": []}}
+    return dados
+
+
+def _encerrar_pool_processos(pool, espera=2.0):
+    """
+    Encerra um ProcessPoolExecutor sem aguardar as tarefas (cancelamento na interface):
+    descarta as pendentes e termina os processos workers, inclusive o que está no meio
+    de uma tarefa — shutdown(wait=False) sozinho os deixaria rodando até o fim, e a
+    saída do programa esperaria por eles. Os resultados das tarefas são perdidos.
+    """
+    processos = list((getattr(pool, "_processes", None) or {}).values())
+    try:
+        pool.shutdown(wait=False, cancel_futures=True)
+    except TypeError:       # Python 3.8: sem cancel_futures
+        pool.shutdown(wait=False)
+    for processo in processos:
+        if processo.is_alive():
+            processo.terminate()
+    for processo in processos:
+        processo.join(espera)
+
+
+def _nome_xml_para_aba(nome_aba):
+    """Converte nome de aba em nome do elemento XML raiz. Ex: 'Campos Entrada' → 'LayoutEntrada'."""
+    secao = re.sub(r"^[Cc]ampos\s+", "", nome_aba).strip()
+    pascal = "".join(p.capitalize() for p in re.split(r"[\s_\-]+", secao) if p)
+    return f"Layout{pascal}" if pascal else "Layout"
+
+
+def _item_xml_para_aba(nome_aba):
+    """Converte nome de aba em nome do elemento XML de campo. Ex: 'Campos Entrada' → 'CampoEntrada'."""
+    secao = re.sub(r"^[Cc]ampos\s+", "", nome_aba).strip()
+    pascal = "".join(p.capitalize() for p in re.split(r"[\s_\-]+", secao) if p)
+    return f"Campo{pascal}" if pascal else "Campo"
+
+
+def salvar_xlsx(filepath, campos, nome_aba="Campos Entrada"):
+    """Salva lista de campos na aba indicada do arquivo Excel."""
+    try:
+        wb = openpyxl.load_workbook(filepath)
+    except Exception:
+        wb = openpyxl.Workbook()
+        wb.active.title = nome_aba
+
+    sheet_name = nome_aba
+    if sheet_name not in wb.sheetnames:
+        ws = wb.create_sheet(sheet_name)
+    else:
+        ws = wb[sheet_name]
+
+    # Cabeçalho na linha 2 (padrão do template)
+    headers = [
+        "Entrada", "Persistencia", "Enriquecimento", "MapaAtributo", "Saida", "CampoConcatenado",
+        "IdentificadorCampo", "NomeCampo", "DescricaoCampo", "TipoCampo", "TamanhoCampo",
+        "PosicaoInicial", "PosicaoFinal", "ValorPadrao", "AlinhamentoCampo", "CampoObrigatorio",
+    ]
+    for col_idx, header in enumerate(headers, 1):
+        ws.cell(row=2, column=col_idx, value=header)
+
+    # Dados a partir da linha 6
+    for i, campo in enumerate(campos):
+        r = 6 + i
+        ws.cell(r, 1,  campo.get("entrada", "S"))
+        ws.cell(r, 7,  campo.get("id") or i + 1)
+        ws.cell(r, 8,  campo.get("nome", ""))
+        ws.cell(r, 9,  campo.get("descricao", ""))
+        ws.cell(r, 10, campo.get("tipo", "TEXTO"))
+        ws.cell(r, 11, campo.get("tamanho"))
+        ws.cell(r, 12, campo.get("pos_ini"))
+        if campo.get("pos_ini") and campo.get("tamanho"):
+            ws.cell(r, 13).value = f"=L{r}+K{r}-1"
+        ws.cell(r, 14, campo.get("valor_padrao", ""))
+        ws.cell(r, 15, campo.get("alinhamento", ""))
+        ws.cell(r, 16, campo.get("obrigatorio", ""))
+
+    wb.save(filepath)
+
+
+def salvar_csv(filepath, campos):
+    """Salva lista de campos em CSV."""
+    fieldnames = ["entrada", "id", "nome", "descricao", "tipo", "tamanho",
+                  "pos_ini", "pos_fin", "valor_padrao", "alinhamento",
+                  "obrigatorio", "coluna_db", "valor"]
+    with open(filepath, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(campos)
+
+
+def _to_cell_value(v):
+    """Converte string de _raw para o tipo adequado para escrita em célula xlsx."""
+    if v is None:
+        return None
+    s = str(v).strip()
+    if not s:
+        return None
+    try:
+        return int(s)
+    except (ValueError, TypeError):
+        pass
+    try:
+        return float(s)
+    except (ValueError, TypeError):
+        pass
+    return s
+
+
+def salvar_xlsx_estruturado(path_original, path_destino, dados_por_aba):
+    """
+    Persiste as alterações de dados_por_aba no xlsx preservando toda a estrutura original.
+
+    Estratégia:
+      1. Copia o arquivo original para path_destino (todos os tabs, formatação, imagens, etc.)
+      2. Para cada aba presente em dados_por_aba:
+           - Detecta a linha de cabeçalho e a primeira linha de dados no original
+           - Limpa apenas as células de dados (preserva linhas de título/seção acima)
+           - Reescreve todos os campos usando _raw (header original → número da coluna)
+           - PosicaoFinal é escrita como fórmula Excel (=PosIni+Tam-1)
+      3. Abas não presentes em dados_por_aba — ou lidas sob demanda e nunca abertas — são intocadas.
+      4. O arquivo original NUNCA é modificado.
+    """
+    shutil.copy2(path_original, path_destino)
+    wb = openpyxl.load_workbook(path_destino)
+
+    for nome_aba, info in dados_por_aba.items():
+        if nome_aba not in wb.sheetnames:
+            continue
+        if isinstance(info, AbaPlanilha) and not info.carregada:
+            continue  # aba nunca aberta (leitura sob demanda): sem alterações, já está na cópia
+
+        campos = info.get("campos", [])
+        ws = wb[nome_aba]
+
+        # ── Detectar cabeçalho ──────────────────────────────────────────────
+        header_row = _detectar_linha_cabecalho(ws)
+
+        # Mapa: header_name_original → col_number
+        col_map = {}
+        for cell in ws[header_row]:
+            if cell.value:
+                col_map[str(cell.value).strip()] = cell.column
+
+        if not col_map:
+            continue
+
+        # ── Detectar primeira linha de dados reais ──────────────────────────
+        # Percorre até 20 linhas após o cabeçalho procurando a primeira com dado
+        primeira_linha = header_row + 1
+        for r in range(header_row + 1, min(header_row + 21, ws.max_row + 1)):
+            if any(ws.cell(r, c).value is not None for c in col_map.values()):
+                primeira_linha = r
+                break
+
+        # ── Colunas especiais para fórmula PosicaoFinal ─────────────────────
+        col_posini = col_map.get("PosicaoInicial") or col_map.get("PosInicial")
+        col_tam    = col_map.get("TamanhoCampo")   or col_map.get("Tamanho")
+        col_posfin = col_map.get("PosicaoFinal")   or col_map.get("PosFinal")
+
+        # ── Limpar linhas de dados (só as colunas mapeadas) ─────────────────
+        for r in range(primeira_linha, ws.max_row + 1):
+            for col_num in col_map.values():
+                ws.cell(r, col_num).value = None
 
         # ── Reescrever campos usando _raw ────────────────────────────────────
         for i, campo in enumerate(campos):
@@ -457,24 +1988,197 @@ def salvar_xlsx_estruturado(path_original, path_destino, dados_por_aba):
 # XML
 # ─────────────────────────────────────────────────────────────────────────────
 
-def _indent_et(elem, level=0):
-    """
-    Indenta um ElementTree in-place para pretty-print (Python 3.8 compatible).
-    Substitui minidom.toprettyxml para XML com prefixos de namespace,
-    evitando o erro "prefix format reserved for internal use" do expat.
-    """
-    pad = "\n" + "\t" * level
-    if len(elem):
-        if not (elem.text or "").strip():
-            elem.text = pad + "\t"
-        for i, child in enumerate(elem):
-            _indent_et(child, level + 1)
-            is_last = (i == len(elem) - 1)
-            if not (child.tail or "").strip():
-                child.tail = pad if is_last else pad + "\t"
-    else:
-        if not (elem.text or "").strip():
-            elem.text = ""
+DECLARACAO_XML = '<?xml version="1.0" ?>'
+
+# Caracteres fora de Char do XML 1.0 (controles exceto \t \n \r, surrogates, U+FFFE/FFFF)
+_CARACTERES_XML_INVALIDOS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]")
+
+
+def _verificar_texto_xml(texto):
+    """
+    Levanta ValueError se `texto` tem caractere que não pode aparecer em XML 1.0 —
+    nem escapado (ex.: um controle colado de outro sistema numa célula). O
+    documento falharia no parser de quem o ler; antes do escritor incremental a
+    geração falhava aqui (ExpatError no minidom).
+    """
+    m = _CARACTERES_XML_INVALIDOS.search(texto)
+    if m:
+        raise ValueError(
+            f"caractere inválido em XML (U+{ord(m.group()):04X}) no valor {texto!r}"
+        )
+
+
+def _escapar_xml(texto):
+    """Escapa texto/atributo como o minidom (&, <, " e >), preservando o gabarito."""
+    if "&" in texto:
+        texto = texto.replace("&", "&amp;")
+    if "<" in texto:
+        texto = texto.replace("<", "&lt;")
+    if "\"" in texto:
+        texto = texto.replace("\"", "&quot;")
+    if ">" in texto:
+        texto = texto.replace(">", "&gt;")
+    return texto
+
+
+def _escapar_texto_xml(texto):
+    """Como _escapar_xml, normalizando quebras \\r\\n e \\r para \\n (como o parser XML fazia)."""
+    if "\r" in texto:
+        texto = texto.replace("\r\n", "\n").replace("\r", "\n")
+    return _escapar_xml(texto)
+
+
+class EscritorXML:
+    """
+    Escritor XML incremental com a mesma saída de minidom.toprettyxml(indent="\\t").
+
+    Os elementos são escritos à medida que são abertos, sem montar árvore nem
+    reinterpretar o documento. Regras do formato (idênticas ao minidom):
+      - um elemento por linha, indentado com tabs;
+      - elemento só com texto fica em linha única: <Tag>texto</Tag>;
+      - elemento sem filhos nem texto é auto-fechado: <Tag/> (também quando
+        aberto com abrir() e fechado sem filhos);
+      - atributos na ordem informada;
+      - texto ou atributo com caractere inválido em XML 1.0 levanta ValueError
+        (_verificar_texto_xml), em vez de gerar um documento malformado.
+
+    Com `destino` (objeto com write(), ex.: arquivo aberto em modo texto) o
+    conteúdo é despejado em blocos; sem destino, concluir() retorna a string.
+    """
+
+    _PARTES_POR_BLOCO = 4096
+    _VAZIO = "/>"               # fecho de elemento sem filhos nem texto
+    _QUEBRA_FINAL = True        # "\n" após o fechamento do elemento raiz
+    _escapar_texto = staticmethod(_escapar_texto_xml)
+    _escapar_atributo = staticmethod(_escapar_xml)
+
+    def __init__(self, destino=None, declaracao=DECLARACAO_XML):
+        self._destino = destino
+        self._partes = [declaracao, "\n"] if declaracao else []
+        self._pilha = []            # tags abertas
+        self._recuo = ""
+        self._pendente = False      # "<Tag" do topo da pilha ainda sem ">" (pode virar "/>")
+
+    def _atributos(self, atributos):
+        esc = self._escapar_atributo
+        for v in atributos.values():
+            _verificar_texto_xml(v)
+        return "".join(f' {k}="{esc(v)}"' for k, v in atributos.items())
+
+    def _emitir(self, texto):
+        partes = self._partes
+        if self._pendente:
+            partes.append(">\n")
+            self._pendente = False
+        partes.append(texto)
+        if self._destino is not None and len(partes) >= self._PARTES_POR_BLOCO:
+            self._destino.write("".join(partes))
+            partes.clear()
+
+    def abrir(self, tag, atributos=None):
+        """Abre um elemento que terá filhos; fechar() o encerra."""
+        self._emitir(f"{self._recuo}<{tag}{self._atributos(atributos) if atributos else ''}")
+        self._pendente = True
+        self._pilha.append(tag)
+        self._recuo += "\t"
+
+    def fechar(self):
+        """Fecha o último elemento aberto (auto-fechado se não recebeu filhos)."""
+        tag = self._pilha.pop()
+        self._recuo = self._recuo[:-1]
+        fim = "\n" if self._pilha or self._QUEBRA_FINAL else ""
+        if self._pendente:
+            self._pendente = False
+            self._partes.append(self._VAZIO + fim)
+        else:
+            self._emitir(f"{self._recuo}</{tag}>{fim}")
+
+    def elemento(self, tag, texto="", atributos=None):
+        """Escreve um elemento folha; texto vazio gera <Tag/>."""
+        attrs = self._atributos(atributos) if atributos else ""
+        if texto:
+            _verificar_texto_xml(texto)
+            self._emitir(f"{self._recuo}<{tag}{attrs}>{self._escapar_texto(texto)}</{tag}>\n")
+        else:
+            self._emitir(f"{self._recuo}<{tag}{attrs}{self._VAZIO}\n")
+
+    def cdata(self, tag, texto=""):
+        """
+        Escreve um elemento folha com o texto numa seção CDATA (sem escapar);
+        texto vazio gera <Tag/>. Um "]]>" no texto é dividido entre duas seções.
+        """
+        if not texto:
+            self._emitir(f"{self._recuo}<{tag}{self._VAZIO}\n")
+            return
+        _verificar_texto_xml(texto)
+        if "\r" in texto:
+            texto = texto.replace("\r\n", "\n").replace("\r", "\n")
+        if "]]>" in texto:
+            texto = texto.replace("]]>", "]]]]><![CDATA[>")
+        self._emitir(f"{self._recuo}<{tag}><![CDATA[{texto}]]></{tag}>\n")
+
+    def concluir(self):
+        """Fecha os elementos ainda abertos; retorna o XML (ou None, se houver destino)."""
+        while self._pilha:
+            self.fechar()
+        texto = "".join(self._partes)
+        self._partes.clear()
+        if self._destino is None:
+            return texto
+        self._destino.write(texto)
+        return None
+
+
+def _escapar_texto_et(texto):
+    """Escapa texto como ElementTree.tostring (&, < e >)."""
+    if "&" in texto:
+        texto = texto.replace("&", "&amp;")
+    if "<" in texto:
+        texto = texto.replace("<", "&lt;")
+    if ">" in texto:
+        texto = texto.replace(">", "&gt;")
+    return texto
+
+
+def _escapar_atributo_et(texto):
+    """Escapa atributo como ElementTree.tostring (inclui \r, \n e \t como referências)."""
+    texto = _escapar_xml(texto)
+    if "\r" in texto:
+        texto = texto.replace("\r", "&#13;")
+    if "\n" in texto:
+        texto = texto.replace("\n", "&#10;")
+    if "\t" in texto:
+        texto = texto.replace("\t", "&#09;")
+    return texto
+
+
+class EscritorMapaAtributo(EscritorXML):
+    """
+    EscritorXML no formato do gabarito do attributeMap (serialização do ElementTree):
+    vazios como <Tag />, texto só com espaços tratado como vazio, escapes do
+    ElementTree e sem quebra de linha após a raiz.
+
+    A raiz é aberta com o prefixo já resolvido (ns2:attributeMap + xmlns:ns2), sem
+    ET.register_namespace: nenhum estado global é alterado, então várias gerações
+    podem rodar em paralelo.
+    """
+
+    _VAZIO = " />"
+    _QUEBRA_FINAL = False
+    _escapar_texto = staticmethod(_escapar_texto_et)
+    _escapar_atributo = staticmethod(_escapar_atributo_et)
+
+    def __init__(self, namespace, prefixo, destino=None):
+        super().__init__(destino)
+        self.namespace = namespace
+        self.prefixo = prefixo
+
+    def abrir_raiz(self, nome_local):
+        """Abre a raiz prefixo:nome_local declarando xmlns:prefixo."""
+        self.abrir(f"{self.prefixo}:{nome_local}", {f"xmlns:{self.prefixo}": self.namespace})
+
+    def elemento(self, tag, texto="", atributos=None):
+        super().elemento(tag, texto if texto.strip() else "", atributos)
 
 
 def _sanitizar_xml(nome):
@@ -504,40 +2208,11 @@ def _aplicar_alinhamento(valor, tamanho, alinhamento, tipo):
     return valor + " " * diff
 
 
-def construir_xml(campos, headers=None, nome_aba="", sections=None):
+def _colunas_layout(headers, sections, nome_aba):
     """
-    Constrói string XML no formato Layout* (gabarito) a partir dos campos da aba.
-
-    Estrutura gerada:
-      <LayoutEntrada>          ← derivado de nome_aba via _nome_xml_para_aba
-        <Campos>
-          <CampoEntrada>       ← derivado de nome_aba via _item_xml_para_aba
-            <IdentificadorCampo>...
-            ...
-            <Posicao>
-              <PosicaoInicial>...
-              <PosicaoFinal>...
-            </Posicao>
-          </CampoEntrada>
-        </Campos>
-      </LayoutEntrada>
-
-    Parâmetros:
-      headers  - lista de nomes de colunas originais da planilha (ordem natural)
-      nome_aba - nome da aba (determina root/item element names)
-      sections - {nome_secao: [col_names]} lido da linha de metadados da planilha
+    Colunas de _raw emitidas por construir_xml para a aba: (headers_xml, headers_pos),
+    sem as colunas de flag; headers_pos são as de posição (aninhadas em <Posicao>).
     """
-    # ── Nomes dos elementos XML ───────────────────────────────────────────────
-    root_tag = _nome_xml_para_aba(nome_aba) if nome_aba else "Layout"
-    item_tag = _item_xml_para_aba(nome_aba) if nome_aba else "Campo"
-    cont_tag = "Campos"
-
-    # ── Campos ativos (Entrada = S, com posição definida) ─────────────────────
-    ativos = sorted(
-        [c for c in campos if (c.get("entrada", "S") or "S").upper() == "S" and c.get("pos_ini")],
-        key=lambda c: c.get("pos_ini", 0)
-    )
-
     # ── Colunas de posição (vão aninhadas em <Posicao>) ───────────────────────
     _POS = frozenset(["posicaoinicial", "posinicial", "posicaofinal", "posfinal"])
 
@@ -575,37 +2250,79 @@ def construir_xml(campos, headers=None, nome_aba="", sections=None):
 
     headers_pos = [h for h in include_all if _normalizar_chave(h) in _POS]
     headers_xml = [h for h in include_all if _normalizar_chave(h) not in _POS]
+    return headers_xml, headers_pos
+
+
+def construir_xml(campos, headers=None, nome_aba="", sections=None, destino=None, layout=None):
+    """
+    Constrói string XML no formato Layout* (gabarito) a partir dos campos da aba.
+
+    Estrutura gerada:
+      <LayoutEntrada>          ← derivado de nome_aba via _nome_xml_para_aba
+        <Campos>
+          <CampoEntrada>       ← derivado de nome_aba via _item_xml_para_aba
+            <IdentificadorCampo>...
+            ...
+            <Posicao>
+              <PosicaoInicial>...
+              <PosicaoFinal>...
+            </Posicao>
+          </CampoEntrada>
+        </Campos>
+      </LayoutEntrada>
+
+    Parâmetros:
+      headers  - lista de nomes de colunas originais da planilha (ordem natural)
+      nome_aba - nome da aba (determina root/item element names)
+      sections - {nome_secao: [col_names]} lido da linha de metadados da planilha
+      destino  - arquivo/buffer (com write()) que recebe o XML em streaming;
+                 sem destino, retorna a string
+      layout   - LayoutCompilado do modelo: reaproveita a compilação dos campos
+    """
+    # ── Nomes dos elementos XML ───────────────────────────────────────────────
+    root_tag = _nome_xml_para_aba(nome_aba) if nome_aba else "Layout"
+    item_tag = _item_xml_para_aba(nome_aba) if nome_aba else "Campo"
+    cont_tag = "Campos"
+
+    # ── Campos ativos (Entrada = S, com posição definida) ─────────────────────
+    compilados = layout.campos(campos) if layout is not None else CamposCompilados(campos)
+
+    # ── Colunas emitidas (sem flags) e colunas de posição (em <Posicao>) ──────
+    headers_xml, headers_pos = _colunas_layout(headers, sections, nome_aba)
 
     # ── Construção do XML ─────────────────────────────────────────────────────
-    root_el = ET.Element(root_tag)
-    cont_el = ET.SubElement(root_el, cont_tag)
+    xml = EscritorXML(destino)
+    xml.abrir(root_tag)
+    xml.abrir(cont_tag)
+
+    tags_xml = [(h, _sanitizar_xml(h)) for h in headers_xml]
+    tags_pos = [(h, _sanitizar_xml(h)) for h in headers_pos]
 
-    for c in ativos:
-        raw     = c.get("_raw", {})
-        item_el = ET.SubElement(cont_el, item_tag)
+    for item in compilados.ativos:
+        c = item.campo
+        raw = c.get("_raw", {})
+        xml.abrir(item_tag)
 
         if headers_xml or headers_pos:
             # Emite colunas principais (sem flags, sem posição) em ordem
-            for h in headers_xml:
+            for h, tag in tags_xml:
                 val = raw.get(h, "")
                 if val:
-                    e = ET.SubElement(item_el, _sanitizar_xml(h))
-                    e.text = str(val)
+                    xml.elemento(tag, str(val))
 
             # Emite <Posicao> com PosicaoInicial e PosicaoFinal
-            pos_vals = [(h, raw.get(h, "")) for h in headers_pos]
+            pos_vals = [(tag, raw.get(h, "")) for h, tag in tags_pos]
             if any(v for _, v in pos_vals):
-                pos_el = ET.SubElement(item_el, "Posicao")
-                for h, v in pos_vals:
+                xml.abrir("Posicao")
+                for tag, v in pos_vals:
                     if v:
-                        e = ET.SubElement(pos_el, _sanitizar_xml(h))
-                        e.text = str(v)
+                        xml.elemento(tag, str(v))
+                xml.fechar()
         else:
             # Fallback sem headers: usa campos processados
-            def _sub(tag, val, _el=item_el):
+            def _sub(tag, val):
                 if val is not None and str(val).strip():
-                    e = ET.SubElement(_el, tag)
-                    e.text = str(val)
+                    xml.elemento(tag, str(val))
 
             _sub("IdentificadorCampo", c.get("id", ""))
             _sub("NomeCampo",          c.get("nome", ""))
@@ -618,20 +2335,22 @@ def construir_xml(campos, headers=None, nome_aba="", sections=None):
             pos_ini = c.get("pos_ini")
             pos_fin = c.get("pos_fin") or (pos_ini + c["tamanho"] - 1 if pos_ini and c.get("tamanho") else None)
             if pos_ini or pos_fin:
-                pos_el = ET.SubElement(item_el, "Posicao")
+                xml.abrir("Posicao")
                 if pos_ini:
-                    e = ET.SubElement(pos_el, "PosicaoInicial"); e.text = str(pos_ini)
+                    xml.elemento("PosicaoInicial", str(pos_ini))
                 if pos_fin:
-                    e = ET.SubElement(pos_el, "PosicaoFinal");   e.text = str(pos_fin)
+                    xml.elemento("PosicaoFinal", str(pos_fin))
+                xml.fechar()
+        xml.fechar()
 
-    raw_xml = ET.tostring(root_el, encoding="unicode")
-    return minidom.parseString(raw_xml).toprettyxml(indent="\t")
+    return xml.concluir()
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Geradores XML específicos (LayoutPersistencia, MapaAtributo, Enriquecimento)
 # ─────────────────────────────────────────────────────────────────────────────
 
+@functools.lru_cache(maxsize=8192)
 def _norm_aba(nome):
     """Normaliza nome de aba removendo acentos, espaços e convertendo para minúsculas."""
     texto = unicodedata.normalize("NFKD", str(nome or ""))
@@ -639,9 +2358,20 @@ def _norm_aba(nome):
     return re.sub(r"[\s_\-]", "", texto).lower()
 
 
+def _raw_normalizado(raw):
+    """
+    {_norm_aba(chave): valor} de um _raw. Para RawCampo (campos lidos da planilha)
+    a visão fica em cache no próprio campo; dicts comuns são normalizados na hora.
+    O resultado pode ser compartilhado: não alterar.
+    """
+    if isinstance(raw, RawCampo):
+        return raw.normalizado()
+    return {_norm_aba(k): v for k, v in raw.items()}
+
+
 def _raw_flag(raw, *keys):
     """Retorna True se alguma das chaves (tolerando acentos) tiver valor 'S' no dict raw."""
-    raw_norm = {_norm_aba(k): v for k, v in raw.items()}
+    raw_norm = _raw_normalizado(raw)
     for k in keys:
         if str(raw_norm.get(_norm_aba(k), "")).strip().upper() == "S":
             return True
@@ -658,34 +2388,76 @@ def _aba_campos_entrada(dados_por_aba):
     return []
 
 
+def _ler_aba_auxiliar(filepath, tipo):
+    """Lê diretamente do xlsx as linhas (tuplas) da primeira aba auxiliar do tipo indicado."""
+    wb = openpyxl.load_workbook(filepath, read_only=True, data_only=True)
+    try:
+        for name in wb.sheetnames:
+            if _tipo_aba_auxiliar(name) == tipo:
+                ws = wb[name]
+                ws.reset_dimensions()
+                return list(ws.iter_rows(values_only=True))
+    finally:
+        wb.close()
+    return []
+
+
+def _parse_identificacao_evento(linhas):
+    """Interpreta as linhas da aba 'Identificação Evento': {header: valor} da 1ª linha de dados."""
+    if not linhas:
+        return {}
+    header_row = _detectar_linha_cabecalho_valores(linhas)
+    valores_header = linhas[header_row - 1] if header_row <= len(linhas) else ()
+    headers_map = {col: str(v).strip() for col, v in enumerate(valores_header, 1) if v}
+    for row in linhas[header_row:header_row + 4]:
+        result = {}
+        for col, v in enumerate(row, 1):
+            if col in headers_map and v is not None:
+                result[headers_map[col]] = _cell_str(v)
+        if result:
+            return result
+    return {}
+
+
+def _parse_rule_attribute_valores(linhas):
+    """Interpreta as linhas da aba 'Rule Attribute Valor Padrão' (cabeçalho na linha 1)."""
+    if not linhas:
+        return []
+    headers_map = {col: str(v).strip() for col, v in enumerate(linhas[0], 1) if v}
+    result = []
+    for row in linhas[1:]:
+        item = {}
+        for col, v in enumerate(row, 1):
+            if col in headers_map and v is not None:
+                item[headers_map[col]] = _cell_str(v)
+        if item:
+            result.append(item)
+    return result
+
+
+def _parse_comandos_sql(linhas):
+    """
+    Interpreta as linhas da aba 'ComandosSQL': SQL fixo na coluna 2, ignorando
+    linhas cuja coluna 1 = 'insert na tabela column_configuration' (marcador interno).
+    """
+    sqls = []
+    for row in linhas:
+        label = str(row[0]).strip() if row and row[0] is not None else ""
+        sql   = str(row[1]).strip() if len(row) > 1 and row[1] is not None else ""
+        if label.lower() == "insert na tabela column_configuration":
+            continue
+        if sql:
+            sqls.append(sql)
+    return sqls
+
+
 def _ler_identificacao_evento(filepath):
     """
     Lê a aba 'Identificação Evento' diretamente do xlsx.
     Retorna dict {header: valor} da primeira linha de dados.
     """
     try:
-        wb = openpyxl.load_workbook(filepath, data_only=True)
-        sheet = None
-        for name in wb.sheetnames:
-            n = _norm_aba(name)
-            if "identificacaoevento" in n or "identificaevento" in n:
-                sheet = wb[name]
-                break
-        if sheet is None:
-            return {}
-        header_row = _detectar_linha_cabecalho(sheet)
-        headers_map = {}
-        for cell in sheet[header_row]:
-            if cell.value:
-                headers_map[cell.column] = str(cell.value).strip()
-        for row_idx in range(header_row + 1, min(header_row + 5, sheet.max_row + 1)):
-            row = sheet[row_idx]
-            result = {}
-            for cell in row:
-                if cell.column in headers_map and cell.value is not None:
-                    result[headers_map[cell.column]] = _cell_str(cell.value)
-            if result:
-                return result
+        return _parse_identificacao_evento(_ler_aba_auxiliar(filepath, "identificacao"))
     except Exception:
         pass
     return {}
@@ -697,39 +2469,330 @@ def _ler_rule_attribute_valores(filepath):
     Retorna lista de dicts com as colunas da aba (dataType, value, pattern etc.).
     """
     try:
-        wb = openpyxl.load_workbook(filepath, data_only=True)
-        sheet = None
-        for name in wb.sheetnames:
-            n = _norm_aba(name)
-            if "ruleattribute" in n and "valor" in n:
-                sheet = wb[name]
-                break
-        if sheet is None:
-            return []
-        headers_map = {}
-        for cell in sheet[1]:
-            if cell.value:
-                headers_map[cell.column] = str(cell.value).strip()
-        result = []
-        for row_idx in range(2, sheet.max_row + 1):
-            row = sheet[row_idx]
-            item = {}
-            for cell in row:
-                if cell.column in headers_map and cell.value is not None:
-                    item[headers_map[cell.column]] = _cell_str(cell.value)
-            if item:
-                result.append(item)
-        return result
+        return _parse_rule_attribute_valores(
+            _ler_aba_auxiliar(filepath, "rule_attribute_valores")
+        )
     except Exception:
         pass
     return []
 
 
-def construir_xml_persistencia(dados_por_aba, filepath=None):
+def _identificacao_evento(filepath, sessao):
+    """Identificação Evento vinda da sessão (se houver) ou lida do arquivo."""
+    if sessao is not None:
+        return sessao.identificacao
+    return _ler_identificacao_evento(filepath) if filepath else {}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Layout compilado (representação intermediária dos geradores e da validação)
+# ─────────────────────────────────────────────────────────────────────────────
+
+class CampoCompilado:
+    """
+    Campo com o que geradores e validação consultam já resolvido: posições,
+    flags de layout (Entrada, Persistência, MapaAtributo) e _raw normalizado
+    (chaves por _norm_aba). `campo` é o Campo/dict original e `indice`, sua
+    posição na lista de campos da aba (a linha na tabela da interface).
+    """
+
+    __slots__ = ("campo", "indice", "rn", "nome", "pos_ini", "pos_fin", "tamanho",
+                 "entrada", "persistencia", "mapa_atributo")
+
+    def __init__(self, campo, indice=None):
+        rn = _raw_normalizado(campo.get("_raw") or {})
+        self.campo = campo
+        self.indice = indice
+        self.rn = rn
+        self.nome = campo.get("nome")
+        self.pos_ini = campo.get("pos_ini")
+        self.pos_fin = campo.get("pos_fin")
+        self.tamanho = campo.get("tamanho")
+        self.entrada = (campo.get("entrada", "S") or "S").upper() == "S"
+        self.persistencia = _flag_normalizada(rn, "persistencia")
+        self.mapa_atributo = _flag_normalizada(rn, "mapaatributo")
+
+
+def _flag_normalizada(rn, chave):
+    """_raw_flag sobre um _raw já normalizado (chave também normalizada)."""
+    return str(rn.get(chave, "")).strip().upper() == "S"
+
+
+class CamposCompilados:
+    """
+    Campos de uma aba compilados em CampoCompilado, com os recortes usados pelos
+    geradores. Cada recorte é calculado no primeiro acesso e reaproveitado.
+    """
+
+    def __init__(self, campos):
+        self.campos = campos
+
+    @functools.cached_property
+    def itens(self):
+        return [CampoCompilado(c, i) for i, c in enumerate(self.campos)]
+
+    @functools.cached_property
+    def ativos(self):
+        """Entrada = S com PosicaoInicial, ordenados por posição (construir_xml)."""
+        return sorted((i for i in self.itens if i.entrada and i.pos_ini),
+                      key=operator.attrgetter("pos_ini"))
+
+    @functools.cached_property
+    def posicionados(self):
+        """Ativos que também têm tamanho, ordenados por posição (validar_campos)."""
+        return [i for i in self.ativos if i.tamanho]
+
+    @functools.cached_property
+    def posicoes(self):
+        """AnalisePosicoes dos campos posicionados (validar_campos)."""
+        return AnalisePosicoes(self.posicionados)
+
+    @functools.cached_property
+    def persistencia(self):
+        return [i for i in self.itens if i.persistencia]
+
+    @functools.cached_property
+    def mapa_atributo(self):
+        return [i for i in self.itens if i.mapa_atributo]
+
+    @functools.cached_property
+    def tamanho_layout(self):
+        """Maior PosicaoFinal (str), ou None se não houver (TamanhoLayout / TamanhoTransacao)."""
+        try:
+            return str(max(i.pos_fin for i in self.itens if i.pos_fin))
+        except (ValueError, TypeError):
+            return None
+
+
+class EnriquecimentoCompilado:
+    """
+    Abas de enriquecimento: os DadoAcesso (aba 'Enriquecimento') e as linhas de
+    'Enr_ChaveAcesso' / 'Enr_CampoRetornado' (_raw normalizado) indexadas por
+    IdentificadorEnriquecimento. `abas` guarda o nome real de cada uma ('acessos',
+    'chaves', 'retornados'; ausente se a aba não existir) e `chaves` / `retornados`,
+    as linhas na ordem da planilha (validar_referencias).
+    """
+
+    __slots__ = ("abas", "acessos", "chaves", "retornados", "chaves_por_id", "retornados_por_id")
+
+    def __init__(self, dados_por_aba):
+        def _find_aba(patts):
+            # Exact match first, then endswith — evita "Persistencia_enriquecimento"
+            # ser capturado antes de "Enriquecimento"
+            for nome in dados_por_aba:
+                n = _norm_aba(nome)
+                for p in patts:
+                    if n == p:
+                        return nome
+            for nome in dados_por_aba:
+                n = _norm_aba(nome)
+                for p in patts:
+                    if n.endswith(p):
+                        return nome
+            return None
+
+        def _linhas(tipo, patts):
+            # [(campo, _raw normalizado, IdentificadorEnriquecimento)]
+            nome = _find_aba(patts)
+            if nome is None:
+                return []
+            self.abas[tipo] = nome
+            linhas = []
+            for c in dados_por_aba[nome].get("campos", []):
+                rn = _raw_normalizado(c.get("_raw", {}))
+                linhas.append((c, rn, _id_enriquecimento(rn)))
+            return linhas
+
+        def _indexar(linhas):
+            por_id = {}
+            for _, rn, enr_id in linhas:
+                por_id.setdefault(enr_id, []).append(rn)
+            return por_id
+
+        self.abas = {}
+        self.acessos = _linhas("acessos", ["enriquecimento"])
+        self.chaves = _linhas("chaves", ["enrchaveacesso", "chaveacesso"])
+        self.retornados = _linhas("retornados", ["enrcamporetornado", "camporetornado"])
+        self.chaves_por_id = _indexar(self.chaves)
+        self.retornados_por_id = _indexar(self.retornados)
+
+
+def _id_enriquecimento(rn):
+    """Normaliza IdentificadorEnriquecimento para string int (1.0 → '1')."""
+    v = rn.get("identificadorenriquecimento", "")
+    try:
+        return str(int(float(v)))
+    except (ValueError, TypeError):
+        return str(v).strip()
+
+
+class IndicesReferencias:
+    """
+    Índices entre abas de um modelo, montados uma vez por LayoutCompilado e lidos
+    por validar_referencias (cada consulta em O(1) ou O(log n)):
+
+      ids_enriquecimento - IdentificadorEnriquecimento da aba 'Enriquecimento'
+      inicio, fim        - faixa coberta pelos campos posicionados de 'Campos
+                           Entrada' (None se não houver)
+      lacunas            - [(ini, fim)] não cobertas dentro dessa faixa, em ordem
+                           crescente e disjuntas (AnalisePosicoes.lacunas)
+      entrada_por_nome   - CampoCompilado de 'Campos Entrada' por NomeCampo normalizado
+      persistencia       - {aba: {NomeCampo normalizado: [(campo, _raw normalizado)]}}
+                           das abas de persistência (PREFIXOS_ABA_PERSISTENCIA)
+      mapa_atributo      - idem para as abas de RuleAttribute (PREFIXOS_ABA_MAPA_ATRIBUTO)
+    """
+
+    __slots__ = ("ids_enriquecimento", "inicio", "fim", "lacunas", "_fins_lacunas",
+                 "entrada_por_nome", "persistencia", "mapa_atributo")
+
+    def __init__(self, layout):
+        entrada = layout.entrada
+        self.ids_enriquecimento = {enr_id for _, _, enr_id in layout.enriquecimento.acessos}
+
+        posicionados = entrada.posicionados
+        analise = entrada.posicoes
+        self.inicio = posicionados[0].pos_ini if posicionados else None
+        self.fim = analise.fim
+        self.lacunas = [(ini, fim) for ini, fim, _, _ in analise.lacunas]
+        self._fins_lacunas = [fim for _, fim in self.lacunas]
+
+        self.entrada_por_nome = {}
+        for item in entrada.itens:
+            if item.nome:
+                self.entrada_por_nome.setdefault(_norm_aba(item.nome), item)
+
+        self.persistencia = self._indexar_abas(layout.dados_por_aba, PREFIXOS_ABA_PERSISTENCIA)
+        self.mapa_atributo = self._indexar_abas(layout.dados_por_aba, PREFIXOS_ABA_MAPA_ATRIBUTO)
+
+    @staticmethod
+    def _indexar_abas(dados_por_aba, prefixos):
+        abas = {}
+        for nome_aba, info in dados_por_aba.items():
+            n_aba = _norm_aba(nome_aba)
+            if _tipo_aba_auxiliar(nome_aba) or not n_aba.startswith(prefixos):
+                continue
+            por_nome = abas[nome_aba] = {}
+            for c in info.get("campos", []):
+                rn = _raw_normalizado(c.get("_raw", {}))
+                nc = rn.get("nomecampo", "") or c.get("nome", "")
+                if nc:
+                    por_nome.setdefault(_norm_aba(nc), []).append((c, rn))
+        return abas
+
+    def faixa(self, ini, fim):
+        """
+        Situação da faixa [ini, fim] em relação ao layout de 'Campos Entrada':
+        'fora' (passa dos limites), 'lacuna' (inclui bytes sem campo) ou None.
+        """
+        if ini < self.inicio or fim > self.fim:
+            return "fora"
+        # primeira lacuna que termina em ini ou depois; cruza a faixa se começa até fim
+        k = bisect.bisect_left(self._fins_lacunas, ini)
+        if k < len(self.lacunas) and self.lacunas[k][0] <= fim:
+            return "lacuna"
+        return None
+
+
+class LayoutCompilado:
+    """
+    Representação intermediária de um modelo (dados_por_aba + abas auxiliares),
+    compilada uma vez e lida pelos cinco geradores e pela validação: campos
+    de 'Campos Entrada' tipados e ordenados por posição, flags resolvidas, _raw
+    normalizado, Identificação Evento e joins de enriquecimento indexados.
+    Cada parte é compilada no primeiro acesso; quem gera vários artefatos do
+    mesmo modelo (gerar_xml, preview, modo lote) passa a mesma instância a todos.
+    Não acompanha edições feitas depois: para outro estado do modelo, compilar de novo.
+    Auxiliares vêm da SessaoPlanilha, ou do xlsx em filepath.
+    """
+
+    def __init__(self, dados_por_aba, filepath=None, sessao=None):
+        self.dados_por_aba = dados_por_aba
+        self.filepath = filepath
+        self.sessao = sessao
+        self._compilados = {}       # id(lista de campos) → (lista, CamposCompilados)
+        self._lock = threading.Lock()
+
+    def campos(self, campos):
+        """CamposCompilados de uma lista de campos (compilada uma vez por lista)."""
+        with self._lock:
+            item = self._compilados.get(id(campos))
+            if item is None or item[0] is not campos:
+                item = self._compilados[id(campos)] = (campos, CamposCompilados(campos))
+            return item[1]
+
+    @functools.cached_property
+    def entrada(self):
+        """CamposCompilados da aba 'Campos Entrada' (ver _aba_campos_entrada)."""
+        return self.campos(_aba_campos_entrada(self.dados_por_aba))
+
+    @functools.cached_property
+    def identificacao(self):
+        """Identificação Evento com chaves normalizadas por _norm_aba."""
+        return {_norm_aba(k): v for k, v in _identificacao_evento(self.filepath, self.sessao).items()}
+
+    @functools.cached_property
+    def valores_padrao(self):
+        """Atributos (dataType, pattern, value) de cada defaultValueItem, sem os vazios."""
+        if self.sessao is not None:
+            linhas = self.sessao.rule_attribute_valores
+        else:
+            linhas = _ler_rule_attribute_valores(self.filepath) if self.filepath else []
+        valores = []
+        for dv in linhas:
+            dv_n = {_norm_aba(k): v for k, v in dv.items()}
+            attribs = {}
+            for src_key, xml_key in [("datatype", "dataType"), ("pattern", "pattern"), ("value", "value")]:
+                val = dv_n.get(src_key, "")
+                if val:
+                    attribs[xml_key] = val
+            if attribs:
+                valores.append(attribs)
+        return valores
+
+    @functools.cached_property
+    def origens_mapa(self):
+        """Campos com MapaAtributo=S agrupados por Origin (na ordem de aparição)."""
+        origens = {}
+        for i in self.entrada.mapa_atributo:
+            origem = i.rn.get("origin", "") or i.rn.get("origem", "") or "UNKNOWN"
+            origens.setdefault(origem, []).append(i)
+        return origens
+
+    @functools.cached_property
+    def comandos_sql(self):
+        """SQLs fixos da aba 'ComandosSQL'."""
+        if self.sessao is not None:
+            return list(self.sessao.comandos_sql)
+        if self.filepath:
+            try:
+                return _parse_comandos_sql(_ler_aba_auxiliar(self.filepath, "comandos_sql"))
+            except Exception:
+                pass
+        return []
+
+    @functools.cached_property
+    def enriquecimento(self):
+        return EnriquecimentoCompilado(self.dados_por_aba)
+
+    @functools.cached_property
+    def referencias(self):
+        """IndicesReferencias do modelo (validar_referencias)."""
+        return IndicesReferencias(self)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Geradores LayoutPersistencia, MapaAtributo e Enriquecimento
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def construir_xml_persistencia(dados_por_aba, filepath=None, sessao=None, destino=None,
+                               layout=None):
     """
     Gera XML LayoutPersistencia a partir dos campos com Persistência=S.
     Metadados de cabeçalho (Identificador, TamanhoLayout, IdentificadorEvento)
-    lidos da aba 'Identificação Evento' diretamente do xlsx.
+    lidos da aba 'Identificação Evento' (da SessaoPlanilha, ou do xlsx em filepath).
+    Com `destino`, o XML é escrito em streaming nele (ver EscritorXML); com
+    `layout` (LayoutCompilado do mesmo modelo), reaproveita a compilação.
 
     Estrutura:
       <LayoutPersistencia>
@@ -752,61 +2815,53 @@ def construir_xml_persistencia(dados_por_aba, filepath=None):
         </Campos>
       </LayoutPersistencia>
     """
-    campos_entrada = _aba_campos_entrada(dados_por_aba)
-    campos_pers = [
-        c for c in campos_entrada
-        if _raw_flag(c.get("_raw", {}), "Persistência", "Persistencia")
-    ]
+    if layout is None:
+        layout = LayoutCompilado(dados_por_aba, filepath, sessao)
+    id_norm = layout.identificacao
 
-    id_evento = _ler_identificacao_evento(filepath) if filepath else {}
-    id_norm = {_norm_aba(k): v for k, v in id_evento.items()}
-
-    root_el = ET.Element("LayoutPersistencia")
+    xml = EscritorXML(destino)
+    xml.abrir("LayoutPersistencia")
 
     identificador = id_norm.get("identificador", "")
     if identificador:
-        ET.SubElement(root_el, "Identificador").text = identificador
+        xml.elemento("Identificador", identificador)
 
     # TamanhoLayout = PosicaoFinal do último campo de Campos Entrada
-    try:
-        tamanho_layout = str(max(
-            c["pos_fin"] for c in campos_entrada if c.get("pos_fin")
-        ))
-    except (ValueError, TypeError):
+    tamanho_layout = layout.entrada.tamanho_layout
+    if tamanho_layout is None:
         tamanho_layout = id_norm.get("tamanholayout", "")
     if tamanho_layout:
-        ET.SubElement(root_el, "TamanhoLayout").text = tamanho_layout
+        xml.elemento("TamanhoLayout", tamanho_layout)
     id_evento_val = id_norm.get("identificadorevento", "")
     if id_evento_val:
-        ET.SubElement(root_el, "IdentificadorEvento").text = id_evento_val
+        xml.elemento("IdentificadorEvento", id_evento_val)
 
     # NomeTabela global: lida da aba "Identificação Evento" e aplicada a todos os campos
     nome_tabela_global = id_norm.get("nometabela", "")
 
-    campos_el = ET.SubElement(root_el, "Campos")
+    xml.abrir("Campos")
 
-    for c in campos_pers:
-        raw = c.get("_raw", {})
-        rn  = {_norm_aba(k): v for k, v in raw.items()}
-        item = ET.SubElement(campos_el, "CampoPersistencia")
+    for item in layout.entrada.persistencia:
+        c, rn = item.campo, item.rn
+        xml.abrir("CampoPersistencia")
 
         def _add(tag, *keys):
             for k in keys:
                 val = rn.get(_norm_aba(k), "")
                 if val:
-                    ET.SubElement(item, tag).text = str(val)
+                    xml.elemento(tag, str(val))
                     return
 
         # NomeTabela: valor global da aba Identificação Evento (igual para todos os campos)
         nome_tab = nome_tabela_global or rn.get("nometabela", "")
         if nome_tab:
-            ET.SubElement(item, "NomeTabela").text = nome_tab
+            xml.elemento("NomeTabela", nome_tab)
         _add("NomeColuna",       "NomeColuna")
 
         # ValorPadrao apenas se não vazio
         vp = rn.get("valorpadrao", "") or c.get("valor_padrao", "")
         if vp:
-            ET.SubElement(item, "ValorPadrao").text = vp
+            xml.elemento("ValorPadrao", vp)
 
         _add("AlinhamentoCampo", "AlinhamentoCampo", "Alinhamento")
         _add("IdentificadorCampo", "IdentificadorCampo")
@@ -818,16 +2873,20 @@ def construir_xml_persistencia(dados_por_aba, filepath=None):
         # TamanhoCampo apenas se não vazio
         tam = rn.get("tamanhocampo", "") or (str(c["tamanho"]) if c.get("tamanho") else "")
         if tam:
-            ET.SubElement(item, "TamanhoCampo").text = tam
+            xml.elemento("TamanhoCampo", tam)
+        xml.fechar()
 
-    raw_xml = ET.tostring(root_el, encoding="unicode")
-    return minidom.parseString(raw_xml).toprettyxml(indent="\t")
+    return xml.concluir()
 
 
-def construir_xml_mapa_atributo(dados_por_aba, filepath=None):
+def construir_xml_mapa_atributo(dados_por_aba, filepath=None, sessao=None, destino=None,
+                                layout=None):
     """
     Gera XML attributeMap (namespace ns2) a partir dos campos com MapaAtributo=S.
-    defaultValueDefinition lido da aba 'Rule Attribute Valor Padrão'.
+    defaultValueDefinition lido da aba 'Rule Attribute Valor Padrão'
+    (da SessaoPlanilha, ou do xlsx em filepath). Escrito em uma passada por
+    EscritorMapaAtributo; com `destino`, em streaming nele. Com `layout`
+    (LayoutCompilado do mesmo modelo), reaproveita a compilação.
 
     Estrutura:
       <ns2:attributeMap xmlns:ns2="http://rule.saf.cpqd.com.br/">
@@ -847,48 +2906,26 @@ def construir_xml_mapa_atributo(dados_por_aba, filepath=None):
       </ns2:attributeMap>
     """
     NS = "http://rule.saf.cpqd.com.br/"
-    # "ns2" é reservado internamente pelo ElementTree (Python 3.12+).
-    # Usamos um prefixo seguro e renomeamos no resultado final.
-    _NS_PREFIX = "cpqdns"
-    ET.register_namespace(_NS_PREFIX, NS)
-
-    campos_entrada = _aba_campos_entrada(dados_por_aba)
-    campos_mapa = [
-        c for c in campos_entrada
-        if _raw_flag(c.get("_raw", {}), "MapaAtributo")
-    ]
 
-    default_values = _ler_rule_attribute_valores(filepath) if filepath else []
+    if layout is None:
+        layout = LayoutCompilado(dados_por_aba, filepath, sessao)
 
-    root_el = ET.Element(f"{{{NS}}}attributeMap")
+    xml = EscritorMapaAtributo(NS, "ns2", destino)
+    xml.abrir_raiz("attributeMap")
 
     # defaultValueDefinition
-    dv_el = ET.SubElement(root_el, "defaultValueDefinition")
-    for dv in default_values:
-        dv_n = {_norm_aba(k): v for k, v in dv.items()}
-        attribs = {}
-        for src_key, xml_key in [("datatype", "dataType"), ("pattern", "pattern"), ("value", "value")]:
-            val = dv_n.get(src_key, "")
-            if val:
-                attribs[xml_key] = val
-        if attribs:
-            ET.SubElement(dv_el, "defaultValueItem", attribs)
+    xml.abrir("defaultValueDefinition")
+    for attribs in layout.valores_padrao:
+        xml.elemento("defaultValueItem", atributos=attribs)
+    xml.fechar()
 
     # input → agrupado por Origin
-    input_el = ET.SubElement(root_el, "input")
-    origins = {}
-    for c in campos_mapa:
-        raw = c.get("_raw", {})
-        rn  = {_norm_aba(k): v for k, v in raw.items()}
-        origin = rn.get("origin", "") or rn.get("origem", "") or "UNKNOWN"
-        origins.setdefault(origin, []).append(c)
-
-    for origin_name, origin_campos in origins.items():
-        origin_el = ET.SubElement(input_el, "origin", {"name": origin_name})
-        for c in origin_campos:
-            raw = c.get("_raw", {})
-            rn  = {_norm_aba(k): v for k, v in raw.items()}
-            attr_el = ET.SubElement(origin_el, "attribute")
+    xml.abrir("input")
+    for origin_name, origin_campos in layout.origens_mapa.items():
+        xml.abrir("origin", {"name": origin_name})
+        for item in origin_campos:
+            c, rn = item.campo, item.rn
+            xml.abrir("attribute")
 
             event_attr = rn.get("eventattribute", "") or c.get("nome", "")
             rule_attr  = rn.get("ruleattribute",  "") or c.get("nome", "")
@@ -898,29 +2935,25 @@ def construir_xml_mapa_atributo(dados_por_aba, filepath=None):
                           or c.get("descricao", ""))
             doc        = rn.get("documentation", "") or desc
 
-            ea = ET.SubElement(attr_el, "eventAttribute")
-            ea.set("name", event_attr)
-            ea.set("type", type_val)
-            ra = ET.SubElement(attr_el, "ruleAttribute")
-            ra.set("name", rule_attr)
-            ra.set("type", type_val)
-            ET.SubElement(attr_el, "description").text  = desc
-            ET.SubElement(attr_el, "documentation").text = doc
+            xml.elemento("eventAttribute", atributos={"name": event_attr, "type": type_val})
+            xml.elemento("ruleAttribute",  atributos={"name": rule_attr,  "type": type_val})
+            xml.elemento("description",   desc)
+            xml.elemento("documentation", doc)
+            xml.fechar()
+        xml.fechar()
+    xml.fechar()
 
-    # Usa indentador próprio (minidom falha com prefixos de namespace).
-    # Renomeia o prefixo interno → ns2 para corresponder ao gabarito.
-    _indent_et(root_el)
-    raw_xml = ET.tostring(root_el, encoding="unicode")
-    raw_xml = raw_xml.replace(f"{_NS_PREFIX}:", "ns2:")
-    raw_xml = raw_xml.replace(f"xmlns:{_NS_PREFIX}=", "xmlns:ns2=")
-    return '<?xml version="1.0" ?>\n' + raw_xml
+    return xml.concluir()
 
 
-def construir_xml_enriquecimento(dados_por_aba):
+def construir_xml_enriquecimento(dados_por_aba, destino=None, layout=None):
     """
     Gera XML DadoExterno (Enriquecimento) a partir das abas:
-      'Enriquecimento', 'Enr_ChaveAcesso', 'Enr_CampoRetornado'.
-    CDATA é aplicado nos elementos ComandoSQL e SQLChave.
+      'Enriquecimento', 'Enr_ChaveAcesso', 'Enr_CampoRetornado'
+    (ligadas por IdentificadorEnriquecimento, ver EnriquecimentoCompilado).
+    ComandoSQL e SQLChave são escritos como seções CDATA (EscritorXML.cdata).
+    Com `destino`, o XML é escrito em streaming nele (ver EscritorXML); com
+    `layout` (LayoutCompilado do mesmo modelo), reaproveita a compilação.
 
     Estrutura:
       <DadoExterno>
@@ -934,1968 +2967,1475 @@ def construir_xml_enriquecimento(dados_por_aba):
         </DadoAcesso>
       </DadoExterno>
     """
-    def _find_campos(patts):
-        # Exact match first, then endswith — evita "Persistencia_enriquecimento"
-        # ser capturado antes de "Enriquecimento"
-        for nome, info in dados_por_aba.items():
-            n = _norm_aba(nome)
-            for p in patts:
-                if n == p:
-                    return info.get("campos", [])
-        for nome, info in dados_por_aba.items():
-            n = _norm_aba(nome)
-            for p in patts:
-                if n.endswith(p):
-                    return info.get("campos", [])
-        return []
-
-    def _id_enr(rn):
-        """Normaliza IdentificadorEnriquecimento para string int (1.0 → '1')."""
-        v = rn.get("identificadorenriquecimento", "")
-        try:
-            return str(int(float(v)))
-        except (ValueError, TypeError):
-            return str(v).strip()
-
-    enr_campos   = _find_campos(["enriquecimento"])
-    chave_campos = _find_campos(["enrchaveacesso", "chaveacesso"])
-    camp_campos  = _find_campos(["enrcamporetornado", "camporetornado"])
+    if layout is None:
+        layout = LayoutCompilado(dados_por_aba)
+    enriquecimento = layout.enriquecimento
 
     # TamanhoTransacao = PosicaoFinal do último campo de Campos Entrada
-    campos_entrada_enr = _aba_campos_entrada(dados_por_aba)
-    try:
-        tamanho_transacao = str(max(
-            c["pos_fin"] for c in campos_entrada_enr if c.get("pos_fin")
-        ))
-    except (ValueError, TypeError):
-        tamanho_transacao = ""
-
-    # Indexa por IdentificadorEnriquecimento (chave de ligação entre abas)
-    chaves_por_id = {}
-    for c in chave_campos:
-        rn = {_norm_aba(k): v for k, v in c.get("_raw", {}).items()}
-        chaves_por_id.setdefault(_id_enr(rn), []).append(rn)
-
-    retornados_por_id = {}
-    for c in camp_campos:
-        rn = {_norm_aba(k): v for k, v in c.get("_raw", {}).items()}
-        retornados_por_id.setdefault(_id_enr(rn), []).append(rn)
+    tamanho_transacao = layout.entrada.tamanho_layout or ""
 
-    root_el = ET.Element("DadoExterno")
-    ET.SubElement(root_el, "Metrica", {"ligado": "S", "modo": "JMX"})
+    # Gabarito exige encoding="UTF-8" na declaração XML
+    xml = EscritorXML(destino, declaracao='<?xml version="1.0" encoding="UTF-8"?>')
+    xml.abrir("DadoExterno")
+    xml.elemento("Metrica", atributos={"ligado": "S", "modo": "JMX"})
 
-    def _te(parent, tag, val):
+    def _te(tag, val):
         if val:
-            ET.SubElement(parent, tag).text = str(val)
+            xml.elemento(tag, str(val))
 
-    for c in enr_campos:
-        rn   = {_norm_aba(k): v for k, v in c.get("_raw", {}).items()}
+    for c, rn, enr_id in enriquecimento.acessos:
         nome = rn.get("nome", "") or c.get("nome", "")
-        enr_id = _id_enr(rn)
-        da   = ET.SubElement(root_el, "DadoAcesso")
+        xml.abrir("DadoAcesso")
 
-        # ComandoSQL — CDATA aplicado pós-geração
-        ET.SubElement(da, "ComandoSQL").text = rn.get("comandosql", "")
+        xml.cdata("ComandoSQL", rn.get("comandosql", ""))
 
-        _te(da, "Nome",        nome)
-        _te(da, "Descricao",   rn.get("descricao", "") or c.get("descricao", ""))
-        _te(da, "TamanhoTransacao", tamanho_transacao or rn.get("tamanhotransacao", ""))
-        _te(da, "PersistirEnriquecimento",
+        _te("Nome",        nome)
+        _te("Descricao",   rn.get("descricao", "") or c.get("descricao", ""))
+        _te("TamanhoTransacao", tamanho_transacao or rn.get("tamanhotransacao", ""))
+        _te("PersistirEnriquecimento",
             rn.get("persistirenriquecimento", "") or "S")
-        _te(da, "PermiteAtualizarSeExistirCache",
+        _te("PermiteAtualizarSeExistirCache",
             rn.get("permiteatualizarseexistircache", "") or "N")
-        _te(da, "OrigemEnriquecimento",
+        _te("OrigemEnriquecimento",
             rn.get("origemenriquecimento", "") or "BD")
 
-        # SQLChave — CDATA aplicado pós-geração
-        ET.SubElement(da, "SQLChave").text = rn.get("sqlchave", "")
+        xml.cdata("SQLChave", rn.get("sqlchave", ""))
 
         # GrupoChave — ligação por IdentificadorEnriquecimento
-        grupo = ET.SubElement(da, "GrupoChave")
-        for chave_n in chaves_por_id.get(enr_id, []):
-            chave_el = ET.SubElement(grupo, "ChaveAcesso")
-            _te(chave_el, "Identificador",  chave_n.get("identificador", ""))
-            _te(chave_el, "ConversorChave", chave_n.get("conversorchave", ""))
-            _te(chave_el, "PosInicial",
+        xml.abrir("GrupoChave")
+        for chave_n in enriquecimento.chaves_por_id.get(enr_id, []):
+            xml.abrir("ChaveAcesso")
+            _te("Identificador",  chave_n.get("identificador", ""))
+            _te("ConversorChave", chave_n.get("conversorchave", ""))
+            _te("PosInicial",
                 chave_n.get("posinicial", "") or chave_n.get("posicaoinicial", ""))
-            _te(chave_el, "PosFinal",
+            _te("PosFinal",
                 chave_n.get("posfinal", "") or chave_n.get("posicaofinal", ""))
+            xml.fechar()
+        xml.fechar()
 
-        _te(da, "DataSource", rn.get("datasource", ""))
-        _te(da, "PermiteAtualizarCache",
+        _te("DataSource", rn.get("datasource", ""))
+        _te("PermiteAtualizarCache",
             rn.get("permiteatualizarcache", "") or "N")
 
         # CampoRetornado — ligação por IdentificadorEnriquecimento
-        for cr_n in retornados_por_id.get(enr_id, []):
-            cr = ET.SubElement(da, "CampoRetornado")
-            _te(cr, "AliasCampo", cr_n.get("aliascampo", ""))
+        for cr_n in enriquecimento.retornados_por_id.get(enr_id, []):
+            xml.abrir("CampoRetornado")
+            _te("AliasCampo", cr_n.get("aliascampo", ""))
 
             # CampoDestino: sempre presente; auto-fechado se vazio
-            cd = ET.SubElement(cr, "CampoDestino")
-            v = cr_n.get("campodestino", "")
-            if v:
-                cd.text = v
+            xml.elemento("CampoDestino", cr_n.get("campodestino", ""))
 
-            _te(cr, "NomeCampo", cr_n.get("nomecampo", ""))
-            _te(cr, "TipoCampo", cr_n.get("tipocampo", ""))
+            _te("NomeCampo", cr_n.get("nomecampo", ""))
+            _te("TipoCampo", cr_n.get("tipocampo", ""))
 
             # MascaraCampo: sempre presente; auto-fechado se vazio
-            mc = ET.SubElement(cr, "MascaraCampo")
-            v = cr_n.get("mascaracampo", "")
-            if v:
-                mc.text = v
+            xml.elemento("MascaraCampo", cr_n.get("mascaracampo", ""))
 
-            _te(cr, "PosInicial",
+            _te("PosInicial",
                 cr_n.get("posinicial", "") or cr_n.get("posicaoinicial", ""))
-            _te(cr, "PosFinal",
-                cr_n.get("posfinal", "") or cr_n.get("posicaofinal", ""))
-            _te(cr, "MapaDestino", cr_n.get("mapadestino", ""))
-
-        # Campos finais do DadoAcesso — ficam após todos os CampoRetornado
-        _te(da, "QuantidadeThreadsInicializacao",
-            rn.get("quantidadethreadsinicializacao", ""))
-        _te(da, "Prioridade",          rn.get("prioridade", ""))
-        _te(da, "PreencherComBrancos", rn.get("preenchercombrancos", ""))
-
-    raw_xml = ET.tostring(root_el, encoding="unicode")
-    pretty  = minidom.parseString(raw_xml).toprettyxml(indent="\t")
-    # Gabarito exige encoding="UTF-8" na declaração XML
-    pretty  = pretty.replace(
-        '<?xml version="1.0" ?>',
-        '<?xml version="1.0" encoding="UTF-8"?>'
-    )
-
-    # Envolve ComandoSQL e SQLChave em CDATA
-    def _to_cdata(xml_text, tag):
-        def repl(m):
-            content = html.unescape(m.group(1))
-            return f"<{tag}><![CDATA[{content}]]></{tag}>"
-        return re.sub(rf"<{tag}>(.*?)</{tag}>", repl, xml_text, flags=re.DOTALL)
-
-    pretty = _to_cdata(pretty, "ComandoSQL")
-    pretty = _to_cdata(pretty, "SQLChave")
-    return pretty
-
-
-# ─────────────────────────────────────────────────────────────────────────────
-# Geração de Comandos SQL (ComandosSQL → ComandoSQL.sql)
-# ─────────────────────────────────────────────────────────────────────────────
-
-def gerar_comandos_sql(dados_por_aba, filepath=None):
-    """
-    Gera scripts SQL para os campos com Persistência=S.
-
-    Estrutura do resultado:
-      1. Cabeçalhos fixos lidos da aba 'ComandosSQL' do xlsx (linhas onde
-         col1 != 'insert na tabela column_configuration')
-      2. Um INSERT INTO COLUMN_CONFIGURATION por campo com Persistência=S
-
-    Mapeamento TipoCampo → SQL type:
-      TEXTO          → VARCHAR2  (NR_DATA_LENGTH=tamanho, PRECISION=null, SCALE=null)
-      DATA / DATA_HORA → DATE    (all null)
-      INTEIRO / ID / FK / DECIMAL / NUMERO / NUMBER → NUMBER
-                                 (NR_DATA_LENGTH=null, PRECISION=tamanho, SCALE=null)
-      outros         → VARCHAR2  (default)
-    """
-    linhas_sql = []
-
-    # 1. Cabeçalhos fixos do xlsx ─────────────────────────────────────────────
-    if filepath:
-        try:
-            wb = openpyxl.load_workbook(filepath, data_only=True)
-            sheet = None
-            for name in wb.sheetnames:
-                if _norm_aba(name) == "comandossql":
-                    sheet = wb[name]
-                    break
-            if sheet is not None:
-                for row in sheet.iter_rows(min_row=1, values_only=True):
-                    label = str(row[0]).strip() if row[0] is not None else ""
-                    sql   = str(row[1]).strip() if len(row) > 1 and row[1] is not None else ""
-                    if label.lower() == "insert na tabela column_configuration":
-                        continue
-                    if sql:
-                        linhas_sql.append(sql)
-        except Exception:
-            pass
-
-    # 2. INSERTs por campo ────────────────────────────────────────────────────
-    # NomeTabela via aba "Identificação Evento"
-    id_evt = _ler_identificacao_evento(filepath) if filepath else {}
-    id_norm = {_norm_aba(k): v for k, v in id_evt.items()}
-    nome_tabela = id_norm.get("nometabela", "")
-
-    # Campos com Persistência=S
-    campos_entrada = _aba_campos_entrada(dados_por_aba)
-    campos_pers = [
-        c for c in campos_entrada
-        if _raw_flag(c.get("_raw", {}), "Persistência", "Persistencia")
-    ]
-
-    _TIPO_NUMBER = {"inteiro", "id", "fk", "decimal", "numero", "number"}
-    _TIPO_DATE   = {"data", "data_hora"}
-
-    for c in campos_pers:
-        raw  = c.get("_raw", {})
-        rn   = {_norm_aba(k): v for k, v in raw.items()}
-
-        nome_coluna  = (rn.get("nomecampo") or c.get("nome") or "").strip()
-        descricao    = (rn.get("descricaocampo") or rn.get("descricao") or "").strip()
-        # Escapar aspas simples na descrição
-        descricao    = descricao.replace("'", "''")
-
-        tipo_campo   = (rn.get("tipocampo") or rn.get("tipo") or "").strip().lower()
-        tamanho_raw  = rn.get("tamanho") or c.get("tamanho") or ""
-        try:
-            tamanho = int(float(str(tamanho_raw)))
-        except (ValueError, TypeError):
-            tamanho = 0
-
-        nullable_raw = (rn.get("obrigatorio") or rn.get("nullable") or "N").strip().upper()
-        # IN_NULLABLE: se obrigatório=S → 0, se não → 1
-        in_nullable  = 0 if nullable_raw == "S" else 1
-
-        if tipo_campo in _TIPO_DATE:
-            sql_type          = "DATE"
-            nr_data_length    = "null"
-            nr_data_precision = "null"
-            nr_data_scale     = "null"
-        elif tipo_campo in _TIPO_NUMBER:
-            sql_type          = "NUMBER"
-            nr_data_length    = "null"
-            nr_data_precision = str(tamanho) if tamanho else "null"
-            nr_data_scale     = "null"
-        else:
-            # VARCHAR2 (TEXTO e demais)
-            sql_type          = "VARCHAR2"
-            nr_data_length    = str(tamanho) if tamanho else "null"
-            nr_data_precision = "null"
-            nr_data_scale     = "null"
-
-        insert = (
-            f"insert into COLUMN_CONFIGURATION "
-            f"(ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,"
-            f"NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,"
-            f"NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,"
-            f"IN_PK,IN_FK) values (\n"
-            f"  seq_COLUMN_CONFIGURATION.nextval,\n"
-            f"  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION "
-            f"where NM_TABLE_CONFIGURATION='{nome_tabela}'),\n"
-            f"  (select ID_DATA_TYPE from DATA_TYPE "
-            f"where NM_DATA_TYPE='{sql_type}'),\n"
-            f"  '{nome_coluna}','{descricao}',"
-            f"{nr_data_length},{nr_data_precision},{nr_data_scale},"
-            f"{in_nullable},0,0);"
-        )
-        linhas_sql.append(insert)
-
-    return "\n\n".join(linhas_sql)
-
-
-# ─────────────────────────────────────────────────────────────────────────────
-# Validação
-# ─────────────────────────────────────────────────────────────────────────────
-
-def validar_campos(campos):
-    """Retorna (erros, avisos, infos) com os resultados da validação."""
-    erros, avisos, infos = [], [], []
-
-    ativos = [
-        c for c in campos
-        if (c.get("entrada", "S") or "S").upper() == "S"
-        and c.get("pos_ini") and c.get("tamanho")
-    ]
-
-    if not ativos:
-        return erros, ["Nenhum campo ativo com posição definida."], infos
-
-    ordenados = sorted(ativos, key=lambda c: c["pos_ini"])
-    total = sum(c["tamanho"] for c in ordenados)
-
-    # 1. Fórmula PosicaoFinal
-    for c in ordenados:
-        esperado = c["pos_ini"] + c["tamanho"] - 1
-        if c.get("pos_fin") and c["pos_fin"] != esperado:
-            erros.append(
-                f"Campo '{c['nome']}': PosicaoFinal={c['pos_fin']} "
-                f"mas esperado {esperado} (PosIni={c['pos_ini']} + Tam={c['tamanho']} - 1)"
-            )
-
-    # 2. Começa em 1
-    if ordenados[0]["pos_ini"] != 1:
-        avisos.append(
-            f"Layout não começa em 1. Primeiro campo '{ordenados[0]['nome']}' "
-            f"inicia em {ordenados[0]['pos_ini']}."
-        )
-
-    # 3. Continuidade
-    for i in range(1, len(ordenados)):
-        ant, atu = ordenados[i - 1], ordenados[i]
-        prox_esperado = ant["pos_ini"] + ant["tamanho"]
-        if atu["pos_ini"] > prox_esperado:
-            avisos.append(
-                f"GAP entre '{ant['nome']}' (term. {prox_esperado-1}) "
-                f"e '{atu['nome']}' (inicia {atu['pos_ini']}) "
-                f"— {atu['pos_ini'] - prox_esperado} byte(s)."
-            )
-        elif atu["pos_ini"] < prox_esperado:
-            erros.append(
-                f"SOBREPOSIÇÃO: '{ant['nome']}' e '{atu['nome']}' "
-                f"se sobrepõem em pos={atu['pos_ini']}."
-            )
-
-    # 4. Obrigatórios sem valor
-    for c in ordenados:
-        if (c.get("obrigatorio") or "").upper() == "S":
-            v = (c.get("valor") or c.get("valor_padrao") or "").strip()
-            if not v:
-                avisos.append(f"Campo obrigatório '{c['nome']}' sem valor preenchido.")
-
-    infos.append(f"Campos de entrada: {len(ordenados)}")
-    infos.append(f"Soma dos tamanhos: {total} bytes")
-    if ordenados:
-        infos.append(f"Posição final do layout: {ordenados[-1]['pos_ini'] + ordenados[-1]['tamanho'] - 1}")
-
-    return erros, avisos, infos
-
-
-# ─────────────────────────────────────────────────────────────────────────────
-# Janela de carregamento (loading)
-# ─────────────────────────────────────────────────────────────────────────────
-
-class JanelaCarregando(tk.Toplevel):
-    """Diálogo modal com barra de progresso indeterminada exibido durante carregamento."""
-
-    def __init__(self, parent, mensagem="Carregando planilha..."):
-        super().__init__(parent)
-        self.title("Aguarde")
-        self.resizable(False, False)
-        self.transient(parent)
-        self.protocol("WM_DELETE_WINDOW", lambda: None)  # impede fechar
-
-        self._evento_cancel = threading.Event()
-
-        frm = tk.Frame(self, bg=COR_BG, padx=40, pady=28)
-        frm.pack(fill=tk.BOTH, expand=True)
-
-        tk.Label(frm, text="⏳", bg=COR_BG, font=("Segoe UI", 32)).pack()
-        self._lbl_msg = tk.Label(
-            frm, text=mensagem, bg=COR_BG,
-            font=FONT_BOLD, fg="#333333", wraplength=300, justify=tk.CENTER
-        )
-        self._lbl_msg.pack(pady=(10, 10))
-
-        self._bar = ttk.Progressbar(frm, mode="indeterminate", length=280)
-        self._bar.pack()
-        self._bar.start(12)
-
-        self._lbl_timer = tk.Label(
-            frm, text="00:00", bg=COR_BG,
-            font=("Segoe UI", 10), fg="#888888"
-        )
-        self._lbl_timer.pack(pady=(8, 6))
-
-        tk.Button(
-            frm, text="✕  Cancelar",
-            command=self._solicitar_cancelamento,
-            bg="#c62828", fg="white",
-            font=FONT_NORMAL, relief=tk.FLAT,
-            padx=14, pady=5, cursor="hand2"
-        ).pack()
-
-        # Centraliza sobre o parent
-        self.update_idletasks()
-        px = parent.winfo_rootx() + parent.winfo_width() // 2 - self.winfo_width() // 2
-        py = parent.winfo_rooty() + parent.winfo_height() // 2 - self.winfo_height() // 2
-        self.geometry(f"+{px}+{py}")
-
-        self.grab_set()
-
-        self._inicio = time.time()
-        self._timer_id = None
-        self._tick()
-
-    def _tick(self):
-        try:
-            elapsed = int(time.time() - self._inicio)
-            mins, secs = divmod(elapsed, 60)
-            self._lbl_timer.config(text=f"{mins:02d}:{secs:02d}")
-            self._timer_id = self.after(1000, self._tick)
-        except Exception:
-            pass
-
-    def _solicitar_cancelamento(self):
-        self._evento_cancel.set()
-        try:
-            self._lbl_msg.config(text="Cancelando...\nAguarde o passo atual finalizar.")
-        except Exception:
-            pass
-
-    @property
-    def cancelado(self):
-        return self._evento_cancel.is_set()
-
-    def atualizar(self, msg):
-        """Atualiza a mensagem exibida durante o loading."""
-        try:
-            self._lbl_msg.config(text=msg)
-            self.update_idletasks()
-        except Exception:
-            pass
+            _te("PosFinal",
+                cr_n.get("posfinal", "") or cr_n.get("posicaofinal", ""))
+            _te("MapaDestino", cr_n.get("mapadestino", ""))
+            xml.fechar()
 
-    def fechar(self):
-        try:
-            if self._timer_id:
-                self.after_cancel(self._timer_id)
-            self._bar.stop()
-            self.grab_release()
-            self.destroy()
-        except Exception:
-            pass
+        # Campos finais do DadoAcesso — ficam após todos os CampoRetornado
+        _te("QuantidadeThreadsInicializacao",
+            rn.get("quantidadethreadsinicializacao", ""))
+        _te("Prioridade",          rn.get("prioridade", ""))
+        _te("PreencherComBrancos", rn.get("preenchercombrancos", ""))
+        xml.fechar()
+
+    return xml.concluir()
 
 
 # ─────────────────────────────────────────────────────────────────────────────
-# Janela de edição de campo (Toplevel)
+# Geração de Comandos SQL (ComandosSQL → ComandoSQL.sql)
 # ─────────────────────────────────────────────────────────────────────────────
 
-class JanelaEditarCampo(tk.Toplevel):
-    TIPOS = ["TEXTO", "INTEIRO", "INTEIRO_LONGO", "DECIMAL", "DATA", "DATA_HORA", "HORA", "BOOLEANO"]
-    ALINHAMENTOS = ["", "BRANCO_ESQUERDA", "BRANCO_DIREITA", "ZERO_ESQUERDA", "ZERO_DIREITA"]
-    ENTRADAS = ["S", "N"]
-    OBRIGATORIOS = ["", "S", "N"]
-
-    def __init__(self, parent, campo=None, on_confirmar=None):
-        super().__init__(parent)
-        self.title("Editar Campo" if campo else "Novo Campo")
-        self.resizable(False, False)
-        self.grab_set()
-
-        self.on_confirmar = on_confirmar
-        self.resultado = None
-
-        self._vars = {}
-        self._build_ui(campo or {})
-
-        self.transient(parent)
-        self.wait_window(self)
-
-    def _build_ui(self, campo):
-        pad = {"padx": 8, "pady": 3}
-
-        frame = tk.Frame(self, bg=COR_BG, padx=16, pady=12)
-        frame.pack(fill=tk.BOTH, expand=True)
-
-        linhas = [
-            ("Entrada:",     "entrada",    ttk.Combobox, {"values": self.ENTRADAS, "width": 6}),
-            ("Nome:",        "nome",       tk.Entry,     {"width": 32}),
-            ("Descrição:",   "descricao",  tk.Entry,     {"width": 32}),
-            ("Tipo:",        "tipo",       ttk.Combobox, {"values": self.TIPOS, "width": 18}),
-            ("Tamanho:",     "tamanho",    tk.Entry,     {"width": 10}),
-            ("Pos. Inicial:","pos_ini",    tk.Entry,     {"width": 10}),
-            ("Pos. Final:",  "pos_fin",    tk.Entry,     {"width": 10}),
-            ("Alinhamento:", "alinhamento",ttk.Combobox, {"values": self.ALINHAMENTOS, "width": 20}),
-            ("Obrigatório:", "obrigatorio",ttk.Combobox, {"values": self.OBRIGATORIOS, "width": 6}),
-            ("Valor Padrão:","valor_padrao",tk.Entry,    {"width": 24}),
-            ("Valor (XML):", "valor",      tk.Entry,     {"width": 24}),
-            ("Coluna DB:",   "coluna_db",  tk.Entry,     {"width": 24}),
-        ]
+# Tamanho padrão dos lotes do modo agrupado de gerar_comandos_sql (--lote-sql)
+LOTE_SQL_PADRAO = 500
 
-        for i, (label, key, WidgetClass, kw) in enumerate(linhas):
-            tk.Label(frame, text=label, bg=COR_BG, font=FONT_NORMAL,
-                     anchor=tk.W).grid(row=i, column=0, sticky=tk.W, **pad)
+_COLUNAS_COLUMN_CONFIGURATION = (
+    "ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,"
+    "NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,"
+    "NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,"
+    "IN_PK,IN_FK"
+)
 
-            var = tk.StringVar()
-            self._vars[key] = var
+_TIPO_SQL_NUMBER = {"inteiro", "id", "fk", "decimal", "numero", "number"}
+_TIPO_SQL_DATE   = {"data", "data_hora"}
 
-            w_kw = dict(kw)
-            if WidgetClass == ttk.Combobox:
-                w = WidgetClass(frame, textvariable=var, **w_kw)
-                w.configure(state="readonly" if key in ("entrada", "tipo", "alinhamento", "obrigatorio") else "normal")
-            else:
-                w = WidgetClass(frame, textvariable=var, font=FONT_NORMAL, **w_kw)
 
-            # Pos Final read-only (calculado)
-            if key == "pos_fin":
-                w.configure(state="readonly")
+def _coluna_sql(item):
+    """
+    Valores do INSERT em COLUMN_CONFIGURATION de um campo com Persistência=S:
+    (sql_type, nome_coluna, descricao, nr_data_length, nr_data_precision,
+    nr_data_scale, in_nullable), já formatados como literais SQL.
+    """
+    c, rn = item.campo, item.rn
 
-            w.grid(row=i, column=1, sticky=tk.W, **pad)
+    nome_coluna  = (rn.get("nomecampo") or c.get("nome") or "").strip()
+    descricao    = (rn.get("descricaocampo") or rn.get("descricao") or "").strip()
+    # Escapar aspas simples na descrição
+    descricao    = descricao.replace("'", "''")
 
-        frame.columnconfigure(1, weight=1)
+    tipo_campo   = (rn.get("tipocampo") or rn.get("tipo") or "").strip().lower()
+    tamanho_raw  = rn.get("tamanho") or c.get("tamanho") or ""
+    try:
+        tamanho = int(float(str(tamanho_raw)))
+    except (ValueError, TypeError):
+        tamanho = 0
+
+    nullable_raw = (rn.get("obrigatorio") or rn.get("nullable") or "N").strip().upper()
+    # IN_NULLABLE: se obrigatório=S → 0, se não → 1
+    in_nullable  = 0 if nullable_raw == "S" else 1
+
+    if tipo_campo in _TIPO_SQL_DATE:
+        sql_type          = "DATE"
+        nr_data_length    = "null"
+        nr_data_precision = "null"
+        nr_data_scale     = "null"
+    elif tipo_campo in _TIPO_SQL_NUMBER:
+        sql_type          = "NUMBER"
+        nr_data_length    = "null"
+        nr_data_precision = str(tamanho) if tamanho else "null"
+        nr_data_scale     = "null"
+    else:
+        # VARCHAR2 (TEXTO e demais)
+        sql_type          = "VARCHAR2"
+        nr_data_length    = str(tamanho) if tamanho else "null"
+        nr_data_precision = "null"
+        nr_data_scale     = "null"
+
+    return (sql_type, nome_coluna, descricao,
+            nr_data_length, nr_data_precision, nr_data_scale, in_nullable)
+
+
+def _insert_coluna(nome_tabela, coluna):
+    """INSERT de um campo, com os ids de tabela e tipo em subconsultas (formato padrão)."""
+    sql_type, nome_coluna, descricao, nr_data_length, nr_data_precision, nr_data_scale, \
+        in_nullable = coluna
+    return (
+        f"insert into COLUMN_CONFIGURATION "
+        f"({_COLUNAS_COLUMN_CONFIGURATION}) values (\n"
+        f"  seq_COLUMN_CONFIGURATION.nextval,\n"
+        f"  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION "
+        f"where NM_TABLE_CONFIGURATION='{nome_tabela}'),\n"
+        f"  (select ID_DATA_TYPE from DATA_TYPE "
+        f"where NM_DATA_TYPE='{sql_type}'),\n"
+        f"  '{nome_coluna}','{descricao}',"
+        f"{nr_data_length},{nr_data_precision},{nr_data_scale},"
+        f"{in_nullable},0,0);"
+    )
 
-        # Auto-calcular Pos Final
-        for k in ("tamanho", "pos_ini"):
-            self._vars[k].trace_add("write", self._calc_pos_fin)
 
-        # Preenche com valores existentes
-        mapa_default = {"entrada": "S", "tipo": "TEXTO"}
-        for key, var in self._vars.items():
-            val = campo.get(key)
-            if val is not None and str(val).strip():
-                var.set(str(val))
-            elif key in mapa_default:
-                var.set(mapa_default[key])
+def _insert_lote(nome_tabela, colunas):
+    """
+    Um INSERT ... SELECT para um lote de campos. As linhas vêm de um
+    "select ... from dual union all" e os ids de TABLE_CONFIGURATION e DATA_TYPE
+    são resolvidos uma vez por lote, por join, em vez de duas subconsultas por
+    linha. Na primeira linha (que define os tipos do union) os nulos numéricos
+    vão com cast, e a tabela ou tipo não encontrado resulta em id nulo, como no
+    formato padrão. Os dois joins são sobre agregações com min(): um nome
+    repetido em TABLE_CONFIGURATION ou DATA_TYPE não duplica as linhas do lote.
+
+    Os joins ficam numa view ordenada pela posição do campo no lote (NR_ORDEM), e
+    o nextval é tirado só no select externo, sobre essa view: sem isso o Oracle
+    atribuiria a sequência na ordem em que o join devolve as linhas. Mesmo assim
+    o Oracle não garante formalmente essa ordem (ver README).
+    """
+    def numero(v):
+        return "cast(null as number)" if v == "null" else v
+
+    linhas = []
+    for i, (sql_type, nome_coluna, descricao, nr_data_length, nr_data_precision,
+            nr_data_scale, in_nullable) in enumerate(colunas):
+        if i == 0:
+            linhas.append(
+                f"    select {i} NR_ORDEM, '{nome_coluna}' NM_COLUMN_CONFIGURATION, "
+                f"'{descricao}' DS_COLUMN_CONFIGURATION, '{sql_type}' NM_DATA_TYPE, "
+                f"{numero(nr_data_length)} NR_DATA_LENGTH, "
+                f"{numero(nr_data_precision)} NR_DATA_PRECISION, "
+                f"{numero(nr_data_scale)} NR_DATA_SCALE, {in_nullable} IN_NULLABLE from dual"
+            )
+        else:
+            linhas.append(
+                f"    select {i},'{nome_coluna}','{descricao}','{sql_type}',"
+                f"{nr_data_length},{nr_data_precision},{nr_data_scale},{in_nullable} from dual"
+            )
+    return (
+        f"insert into COLUMN_CONFIGURATION ({_COLUNAS_COLUMN_CONFIGURATION})\n"
+        f"select seq_COLUMN_CONFIGURATION.nextval, o.ID_TABLE_CONFIGURATION, o.ID_DATA_TYPE,\n"
+        f"       o.NM_COLUMN_CONFIGURATION, o.DS_COLUMN_CONFIGURATION,\n"
+        f"       o.NR_DATA_LENGTH, o.NR_DATA_PRECISION, o.NR_DATA_SCALE, o.IN_NULLABLE, 0, 0\n"
+        f"  from (\n"
+        f"  select t.ID_TABLE_CONFIGURATION, d.ID_DATA_TYPE, c.*\n"
+        f"    from (\n"
+        + " union all\n".join(linhas) +
+        f"\n    ) c\n"
+        f"    left join (select min(ID_TABLE_CONFIGURATION) ID_TABLE_CONFIGURATION\n"
+        f"                 from TABLE_CONFIGURATION\n"
+        f"                where NM_TABLE_CONFIGURATION='{nome_tabela}') t on 1 = 1\n"
+        f"    left join (select NM_DATA_TYPE, min(ID_DATA_TYPE) ID_DATA_TYPE from DATA_TYPE\n"
+        f"                group by NM_DATA_TYPE) d on d.NM_DATA_TYPE = c.NM_DATA_TYPE\n"
+        f"   order by c.NR_ORDEM\n"
+        f"  ) o;"
+    )
 
-        # Botões
-        btn_frame = tk.Frame(self, bg=COR_BG, pady=8)
-        btn_frame.pack()
 
-        btn_ok = tk.Button(btn_frame, text="Confirmar", font=FONT_BOLD,
-                           bg=COR_BTN_VERDE, fg=COR_BRANCO, relief=tk.FLAT,
-                           padx=12, pady=4, command=self._confirmar)
-        btn_ok.pack(side=tk.LEFT, padx=6)
+def gerar_comandos_sql(dados_por_aba, filepath=None, sessao=None, layout=None,
+                       destino=None, lote=None):
+    """
+    Gera scripts SQL para os campos com Persistência=S. Com `layout`
+    (LayoutCompilado do mesmo modelo), reaproveita a compilação.
 
-        btn_cancel = tk.Button(btn_frame, text="Cancelar", font=FONT_NORMAL,
-                               bg=COR_BTN_CINZA, fg=COR_BRANCO, relief=tk.FLAT,
-                               padx=12, pady=4, command=self.destroy)
-        btn_cancel.pack(side=tk.LEFT, padx=6)
+    Estrutura do resultado:
+      1. Cabeçalhos fixos lidos da aba 'ComandosSQL' (da SessaoPlanilha, ou do
+         xlsx em filepath; linhas onde col1 != 'insert na tabela column_configuration')
+      2. Um INSERT INTO COLUMN_CONFIGURATION por campo com Persistência=S; com
+         `lote` (N > 0), um INSERT ... SELECT a cada N campos (ver _insert_lote),
+         com os ids de tabela e tipo resolvidos uma vez por lote
 
-        self.bind("<Return>", lambda e: self._confirmar())
-        self.bind("<Escape>", lambda e: self.destroy())
+    Comandos separados por uma linha em branco. Com `destino` (objeto com
+    write()), cada comando é escrito à medida que é gerado e retorna None;
+    sem destino, retorna o script.
 
-    def _calc_pos_fin(self, *_):
-        try:
-            pos = int(self._vars["pos_ini"].get())
-            tam = int(self._vars["tamanho"].get())
-            self._vars["pos_fin"].set(str(pos + tam - 1))
-        except ValueError:
-            pass
+    Mapeamento TipoCampo → SQL type:
+      TEXTO          → VARCHAR2  (NR_DATA_LENGTH=tamanho, PRECISION=null, SCALE=null)
+      DATA / DATA_HORA → DATE    (all null)
+      INTEIRO / ID / FK / DECIMAL / NUMERO / NUMBER → NUMBER
+                                 (NR_DATA_LENGTH=null, PRECISION=tamanho, SCALE=null)
+      outros         → VARCHAR2  (default)
+    """
+    if layout is None:
+        layout = LayoutCompilado(dados_por_aba, filepath, sessao)
 
-    def _confirmar(self):
-        nome = self._vars["nome"].get().strip()
-        if not nome:
-            messagebox.showwarning("Aviso", "Nome do campo é obrigatório.", parent=self)
-            return
+    # NomeTabela via aba "Identificação Evento"
+    nome_tabela = layout.identificacao.get("nometabela", "")
 
-        try:
-            tamanho = int(self._vars["tamanho"].get()) if self._vars["tamanho"].get() else None
-            pos_ini = int(self._vars["pos_ini"].get()) if self._vars["pos_ini"].get() else None
-        except ValueError:
-            messagebox.showerror("Erro", "Tamanho e Pos. Inicial devem ser números inteiros.", parent=self)
-            return
+    def comandos():
+        # 1. Cabeçalhos fixos do xlsx ─────────────────────────────────────────
+        yield from layout.comandos_sql
 
-        self.resultado = {
-            "entrada":    self._vars["entrada"].get() or "S",
-            "nome":       nome,
-            "descricao":  self._vars["descricao"].get().strip(),
-            "tipo":       self._vars["tipo"].get() or "TEXTO",
-            "tamanho":    tamanho,
-            "pos_ini":    pos_ini,
-            "pos_fin":    (pos_ini + tamanho - 1) if (pos_ini and tamanho) else None,
-            "alinhamento":  self._vars["alinhamento"].get(),
-            "obrigatorio":  self._vars["obrigatorio"].get(),
-            "valor_padrao": self._vars["valor_padrao"].get().strip(),
-            "valor":        self._vars["valor"].get(),
-            "coluna_db":    self._vars["coluna_db"].get().strip(),
-        }
+        # 2. INSERTs dos campos com Persistência=S ────────────────────────────
+        colunas = map(_coluna_sql, layout.entrada.persistencia)
+        if not lote:
+            for coluna in colunas:
+                yield _insert_coluna(nome_tabela, coluna)
+            return
+        while True:
+            bloco = list(itertools.islice(colunas, lote))
+            if not bloco:
+                break
+            yield _insert_lote(nome_tabela, bloco)
 
-        if self.on_confirmar:
-            self.on_confirmar(self.resultado)
-        self.destroy()
+    if destino is None:
+        return "\n\n".join(comandos())
+    for i, comando in enumerate(comandos()):
+        destino.write("\n\n" + comando if i else comando)
+    return None
 
 
 # ─────────────────────────────────────────────────────────────────────────────
-# Janela de seleção múltipla de campos da origem
+# Validação
 # ─────────────────────────────────────────────────────────────────────────────
 
-class JanelaCopiarCampos(tk.Toplevel):
-    """
-    Diálogo de seleção de campos da planilha origem.
-    Exibe uma aba por sheet (estilo Excel) com Listbox de campos em cada uma.
-    Aceita dados_por_aba: {nome_aba: {"campos": list, "headers": list}}
-    """
-
-    def __init__(self, parent, dados_por_aba, on_confirmar=None):
-        super().__init__(parent)
-        self.title("Copiar Campos da Origem")
-        self.geometry("520x560")
-        self.resizable(True, True)
-        self.minsize(400, 400)
-        self.grab_set()
-        self.transient(parent)
-
-        self._dados_por_aba = dados_por_aba
-        self._aba_ativa = ""
-        self._listboxes: dict = {}          # nome_aba → Listbox
-        self._campos_filtrados: dict = {}   # nome_aba → lista filtrada
-        self.on_confirmar = on_confirmar
-
-        self._build_ui()
-        self.wait_window(self)
-
-    def _build_ui(self):
-        frame = tk.Frame(self, bg=COR_BG, padx=10, pady=10)
-        frame.pack(fill=tk.BOTH, expand=True)
-
-        # Filtro
-        filt_frame = tk.Frame(frame, bg=COR_BG)
-        filt_frame.pack(fill=tk.X, pady=(0, 6))
-        tk.Label(filt_frame, text="🔍 Filtrar:", bg=COR_BG, font=FONT_NORMAL).pack(side=tk.LEFT)
-        self._var_filtro = tk.StringVar()
-        self._var_filtro.trace_add("write", lambda *_: self._filtrar())
-        tk.Entry(filt_frame, textvariable=self._var_filtro, font=FONT_NORMAL, width=28,
-                 relief=tk.FLAT, highlightthickness=1,
-                 highlightbackground="#bbb").pack(side=tk.LEFT, padx=4)
-        tk.Button(filt_frame, text="✕", command=lambda: self._var_filtro.set(""),
-                  bg="#ddd", relief=tk.FLAT, font=FONT_NORMAL).pack(side=tk.LEFT)
-
-        tk.Label(frame, text="Selecione os campos (Ctrl+Click ou Shift+Click para múltiplos):",
-                 bg=COR_BG, font=FONT_NORMAL, anchor=tk.W).pack(fill=tk.X, pady=(0, 4))
-
-        # Notebook com uma aba por sheet
-        self._nb = ttk.Notebook(frame)
-        self._nb.pack(fill=tk.BOTH, expand=True)
-        self._nb.bind("<<NotebookTabChanged>>", self._on_tab_changed)
-
-        for nome_aba, aba_info in self._dados_por_aba.items():
-            tab_frame = tk.Frame(self._nb, bg=COR_BG, padx=4, pady=4)
-            self._nb.add(tab_frame, text=f"  {nome_aba}  ")
-            lb = self._criar_listbox(tab_frame)
-            self._listboxes[nome_aba] = lb
-            self._campos_filtrados[nome_aba] = list(aba_info.get("campos", []))
-
-        # Seleciona a primeira aba
-        nomes = list(self._dados_por_aba.keys())
-        if nomes:
-            self._aba_ativa = nomes[0]
-            self._nb.select(0)
-
-        # Botões de seleção rápida + contador
-        sel_frame = tk.Frame(frame, bg=COR_BG)
-        sel_frame.pack(fill=tk.X, pady=(6, 0))
-        tk.Button(sel_frame, text="Selecionar Todos", command=self._sel_todos,
-                  bg="#eceff1", font=FONT_NORMAL, relief=tk.FLAT).pack(side=tk.LEFT, padx=2)
-        tk.Button(sel_frame, text="Limpar Seleção", command=self._sel_nenhum,
-                  bg="#eceff1", font=FONT_NORMAL, relief=tk.FLAT).pack(side=tk.LEFT, padx=2)
-        self._lbl_sel = tk.Label(sel_frame, text="0 selecionado(s)",
-                                  bg=COR_BG, fg="#555", font=FONT_NORMAL)
-        self._lbl_sel.pack(side=tk.RIGHT)
-
-        # Botões de ação
-        btn_frame = tk.Frame(self, bg=COR_BG, pady=8)
-        btn_frame.pack()
-        self._btn_copiar = tk.Button(btn_frame, text="⬇ Copiar 0 campos", font=FONT_BOLD,
-                                      bg=COR_BTN_LARANJA, fg=COR_BRANCO, relief=tk.FLAT,
-                                      padx=12, pady=4, command=self._confirmar,
-                                      state=tk.DISABLED)
-        self._btn_copiar.pack(side=tk.LEFT, padx=6)
-        tk.Button(btn_frame, text="Cancelar", font=FONT_NORMAL,
-                  bg=COR_BTN_CINZA, fg=COR_BRANCO, relief=tk.FLAT,
-                  padx=12, pady=4, command=self.destroy).pack(side=tk.LEFT, padx=6)
-
-        self.bind("<Escape>", lambda e: self.destroy())
-        self._filtrar()
-
-    def _criar_listbox(self, parent):
-        """Cria e retorna um Listbox com scrollbar dentro do parent."""
-        list_frame = tk.Frame(parent, bg=COR_BG)
-        list_frame.pack(fill=tk.BOTH, expand=True)
-        lb = tk.Listbox(list_frame, selectmode=tk.EXTENDED, font=FONT_NORMAL,
-                        activestyle="dotbox", exportselection=False,
-                        relief=tk.FLAT, highlightthickness=1, highlightbackground="#bbb")
-        vsb = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=lb.yview)
-        lb.configure(yscrollcommand=vsb.set)
-        lb.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        vsb.pack(side=tk.RIGHT, fill=tk.Y)
-        lb.bind("<<ListboxSelect>>", self._on_select)
-        return lb
-
-    def _on_tab_changed(self, _evt=None):
-        """Atualiza aba ativa e reseta o contador de seleção."""
-        nomes = list(self._dados_por_aba.keys())
-        tabs = self._nb.tabs()
-        if not tabs:
-            return
-        idx = self._nb.index("current")
-        if idx < len(nomes):
-            self._aba_ativa = nomes[idx]
-        self._on_select()
-
-    def _get_lb(self):
-        """Retorna o Listbox da aba atualmente selecionada."""
-        return self._listboxes.get(self._aba_ativa)
-
-    def _filtrar(self):
-        """Aplica filtro de texto em todas as abas."""
-        filtro = self._var_filtro.get().lower()
-        for nome_aba, aba_info in self._dados_por_aba.items():
-            campos = aba_info.get("campos", [])
-            filtrados = [
-                c for c in campos
-                if not filtro
-                   or filtro in (c.get("nome") or "").lower()
-                   or filtro in (c.get("descricao") or "").lower()
-            ]
-            self._campos_filtrados[nome_aba] = filtrados
-            lb = self._listboxes.get(nome_aba)
-            if not lb:
-                continue
-            lb.delete(0, tk.END)
-            for c in filtrados:
-                nome   = c.get("nome", "")
-                extras = []
-                if c.get("tipo"):    extras.append(c["tipo"])
-                if c.get("tamanho"): extras.append(f"{c['tamanho']}b")
-                label = f"{nome}  [{', '.join(extras)}]" if extras else nome
-                lb.insert(tk.END, label)
-        self._on_select()
-
-    def _sel_todos(self):
-        lb = self._get_lb()
-        if lb:
-            lb.select_set(0, tk.END)
-        self._on_select()
-
-    def _sel_nenhum(self):
-        lb = self._get_lb()
-        if lb:
-            lb.selection_clear(0, tk.END)
-        self._on_select()
-
-    def _on_select(self, _evt=None):
-        lb = self._get_lb()
-        n = len(lb.curselection()) if lb else 0
-        self._lbl_sel.config(text=f"{n} selecionado(s)")
-        plural = "s" if n != 1 else ""
-        self._btn_copiar.config(
-            text=f"⬇ Copiar {n} campo{plural}",
-            state=tk.NORMAL if n > 0 else tk.DISABLED
-        )
-
-    def _confirmar(self):
-        lb = self._get_lb()
-        if not lb:
-            self.destroy()
-            return
-        indices = lb.curselection()
-        filtrados = self._campos_filtrados.get(self._aba_ativa, [])
-        resultado = [filtrados[i] for i in indices]
-        if self.on_confirmar:
-            self.on_confirmar(resultado)
-        self.destroy()
+# Backends de AnalisePosicoes:
+#   "python" → varredura com heap, campo a campo
+#   "numpy"  → as mesmas listas calculadas sobre arrays (requer NumPy)
+# None escolhe "numpy" a partir de LIMIAR_VALIDACAO_NUMPY campos, se o NumPy
+# estiver instalado; abaixo disso o custo de montar os arrays não compensa.
+BACKENDS_VALIDACAO = ("python", "numpy")
+LIMIAR_VALIDACAO_NUMPY = 2000
 
 
-# ─────────────────────────────────────────────────────────────────────────────
-# Aplicação principal
-# ─────────────────────────────────────────────────────────────────────────────
+class AnalisePosicoes:
+    """
+    Análise posicional de campos (CampoCompilado) já ordenados por PosicaoInicial,
+    por varredura (sweep line) em O(n log n + k), k = pares sobrepostos. Cada
+    campo ocupa [pos_ini, pos_ini + tamanho - 1]; os campos ainda abertos ficam
+    num heap pelo byte final, de modo que cada campo é comparado com todos os
+    anteriores que ainda o alcançam, e não só com o vizinho.
+
+      formulas      - [(campo, esperado)]: PosicaoFinal ≠ PosIni + Tam - 1
+      sobreposicoes - [(a, b, ini, fim)]: cada par de campos que divide bytes,
+                      a antes de b na ordenação; [ini, fim] é a faixa comum
+      lacunas       - [(ini, fim, antes, depois)]: faixa de bytes não coberta
+                      entre o maior byte final até `depois` (campo `antes`) e
+                      o início de `depois`
+      fim           - maior byte final (posição final do layout)
+      total         - soma dos tamanhos
+
+    Os campos são identificados por CampoCompilado.indice (linha da aba) e nome.
+    `backend` (ver BACKENDS_VALIDACAO) só muda o custo: as listas são as mesmas,
+    na mesma ordem. O backend "numpy" volta ao "python" se o NumPy não estiver
+    instalado ou se as posições não forem todas inteiras.
+    """
 
-class GeradorXMLApp:
-
-    # ── Inicialização ────────────────────────────────────────────────────────
-
-    def __init__(self, root):
-        self.root = root
-        self.root.title("Gerador de XML — Planilhas de Eventos")
-        self.root.geometry("1280x820")
-        self.root.configure(bg=COR_BG)
-        self.root.minsize(900, 600)
-
-        self._campos: list = []             # campos da aba ativa
-        self._dados_por_aba: dict = {}      # nome_aba → {"campos": list, "headers": list, "sections": dict}
-        self._aba_ativa: str = ""           # aba atualmente exibida
-        self._headers_ativos: list = []     # headers da aba ativa (ordem original da planilha)
-        self._sections_ativos: dict = {}    # seções de metadados da aba ativa (para construir_xml)
-        self._dados_por_aba_origem: dict = {}  # nome_aba → {"campos": list, "headers": list, "sections": dict}
-        self._arquivo_principal = None
-        self._arquivo_origem = None
-        self._path_principal_pendente = None   # selecionado mas ainda não carregado
-        self._path_origem_pendente    = None
-        self._idx_editando = -1             # índice do campo sendo editado
-
-        # Widgets do notebook de abas (criados em _build_tabela)
-        self._nb_abas = None                # ttk.Notebook da planilha principal
-        self._trees_abas: dict = {}         # nome_aba → Treeview
-        self._tree = None                   # Treeview da aba atualmente ativa
-        self._ignorar_tab_change = False    # evita recursão ao selecionar aba
-
-        # Widgets de preview XML (criados em _build_painel_direito)
-        self._txt_xmls: dict = {}           # key → tk.Text  (LayoutEntrada, LayoutPersistencia, mapaAtributo, DadoExterno)
-        self._txt_xml  = None               # alias para _txt_xmls["LayoutEntrada"] (compatibilidade)
-
-        self._setup_estilos()
-        self._build_ui()
-        self._bind_atalhos()
-
-    def _setup_estilos(self):
-        s = ttk.Style()
-        s.theme_use("clam")
-        s.configure("Treeview", rowheight=24, font=FONT_NORMAL, background=COR_BRANCO)
-        s.configure("Treeview.Heading", font=FONT_BOLD)
-        s.map("Treeview", background=[("selected", "#bbdefb")])
-
-    # ── Construção da UI ─────────────────────────────────────────────────────
-
-    def _build_ui(self):
-        self._build_menubar()
-        self._build_toolbar()
-        self._build_conteudo()
-        self._build_statusbar()
-
-    def _build_menubar(self):
-        mb = tk.Menu(self.root)
-        self.root.config(menu=mb)
-
-        m_arq = tk.Menu(mb, tearoff=0)
-        m_arq.add_command(label="Selecionar Principal...  Ctrl+O", command=self.selecionar_principal)
-        m_arq.add_command(label="Selecionar Origem...",            command=self.selecionar_origem)
-        m_arq.add_command(label="Carregar Planilhas",              command=self.carregar_planilhas)
-        m_arq.add_separator()
-        m_arq.add_command(label="Salvar Planilha  Ctrl+S",        command=self.salvar_planilha)
-        m_arq.add_separator()
-        m_arq.add_command(label="Sair",                           command=self.root.quit)
-        mb.add_cascade(label="Arquivo", menu=m_arq)
-
-        m_fer = tk.Menu(mb, tearoff=0)
-        m_fer.add_command(label="Validar Soma  F5",               command=self.validar)
-        m_fer.add_command(label="Recalcular Posições",            command=self.recalcular_posicoes)
-        m_fer.add_separator()
-        m_fer.add_command(label="Gerar XMLs (todos)  F6",         command=self.gerar_xml)
-        m_fer.add_command(label="Pré-visualizar XML  F7",         command=self.preview_xml)
-        mb.add_cascade(label="Ferramentas", menu=m_fer)
-
-    def _btn(self, parent, text, command, bg, **pack_kw):
-        b = tk.Button(parent, text=text, command=command, bg=bg,
-                      fg=COR_BRANCO, relief=tk.FLAT, font=FONT_NORMAL,
-                      padx=9, pady=4, cursor="hand2",
-                      activebackground=bg, activeforeground=COR_BRANCO)
-        b.pack(**pack_kw)
-        return b
-
-    def _build_toolbar(self):
-        bar = tk.Frame(self.root, bg=COR_TOOLBAR, pady=5)
-        bar.pack(fill=tk.X)
-
-        # ── Planilha principal ───────────────────────────────────────────────
-        frp = tk.LabelFrame(bar, text="Planilha Principal", bg=COR_TOOLBAR,
-                            font=FONT_NORMAL, padx=4, pady=2)
-        frp.pack(side=tk.LEFT, padx=8)
-
-        self._btn(frp, "📂 Selecionar Principal", self.selecionar_principal,
-                  COR_BTN_VERDE, side=tk.LEFT, padx=2)
-        self._lbl_principal = tk.Label(frp, text="—", bg=COR_TOOLBAR,
-                                       fg="#555", font=("Segoe UI", 8))
-        self._lbl_principal.pack(side=tk.LEFT, padx=6)
-
-        # ── Planilha origem ──────────────────────────────────────────────────
-        fro = tk.LabelFrame(bar, text="Planilha Origem", bg=COR_TOOLBAR,
-                            font=FONT_NORMAL, padx=4, pady=2)
-        fro.pack(side=tk.LEFT, padx=4)
-
-        self._btn(fro, "📂 Selecionar Origem", self.selecionar_origem,
-                  COR_BTN_AZUL, side=tk.LEFT, padx=2)
-        self._lbl_origem = tk.Label(fro, text="—", bg=COR_TOOLBAR,
-                                    fg="#555", font=("Segoe UI", 8))
-        self._lbl_origem.pack(side=tk.LEFT, padx=6)
-
-        # ── Carregar (dispara o loading de todas as planilhas selecionadas) ──
-        frl = tk.Frame(bar, bg=COR_TOOLBAR)
-        frl.pack(side=tk.LEFT, padx=6)
-        self._btn_carregar = self._btn(
-            frl, "⬇ Carregar Planilhas", self.carregar_planilhas,
-            COR_BTN_VERDE, side=tk.LEFT, padx=2
-        )
-        self._btn_carregar.configure(state=tk.DISABLED)
-
-        # ── Copiar campos ─────────────────────────────────────────────────────
-        frc = tk.LabelFrame(bar, text="Copiar Campos da Origem", bg=COR_TOOLBAR,
-                            font=FONT_NORMAL, padx=4, pady=2)
-        frc.pack(side=tk.LEFT, padx=4)
-
-        self._btn_copiar_origem = self._btn(frc, "⬇ Copiar Campos...", self.copiar_campo,
-                  COR_BTN_LARANJA, side=tk.LEFT, padx=2)
-        self._btn_copiar_origem.configure(state=tk.DISABLED)
-
-        # ── Ações ────────────────────────────────────────────────────────────
-        fra = tk.Frame(bar, bg=COR_TOOLBAR)
-        fra.pack(side=tk.RIGHT, padx=8)
-
-        self._btn(fra, "📄 Gerar XMLs [F6]",       self.gerar_xml,         COR_BTN_ROXO,  side=tk.RIGHT, padx=2)
-        self._btn(fra, "👁 Preview XML [F7]",      self.preview_xml,       COR_BTN_CINZA, side=tk.RIGHT, padx=2)
-        self._btn(fra, "✔ Validar [F5]",           self.validar,           COR_BTN_CINZA, side=tk.RIGHT, padx=2)
-        self._btn(fra, "💾 Salvar Planilha",        self.salvar_planilha,   COR_BTN_TEAL,  side=tk.RIGHT, padx=2)
-
-    def _build_conteudo(self):
-        paned = tk.PanedWindow(self.root, orient=tk.HORIZONTAL,
-                               sashwidth=6, bg="#cfd8dc")
-        paned.pack(fill=tk.BOTH, expand=True, padx=6, pady=4)
-
-        # ── Esquerda: tabela ─────────────────────────────────────────────────
-        frame_esq = tk.Frame(paned, bg=COR_BG)
-        paned.add(frame_esq, width=810)
-        self._build_tabela(frame_esq)
-
-        # ── Direita: detalhes / validação / XML ──────────────────────────────
-        frame_dir = tk.Frame(paned, bg=COR_BG)
-        paned.add(frame_dir, width=400)
-        self._build_painel_direito(frame_dir)
-
-    def _build_tabela(self, parent):
-        # Barra de filtro
-        filt = tk.Frame(parent, bg=COR_BG)
-        filt.pack(fill=tk.X, pady=(2, 4))
-
-        tk.Label(filt, text="🔍 Filtrar:", bg=COR_BG, font=FONT_NORMAL).pack(side=tk.LEFT)
-        self._var_filtro = tk.StringVar()
-        self._var_filtro.trace_add("write", lambda *_: self._atualizar_tabela())
-        tk.Entry(filt, textvariable=self._var_filtro, font=FONT_NORMAL, width=28,
-                 relief=tk.FLAT, highlightthickness=1,
-                 highlightbackground="#bbb").pack(side=tk.LEFT, padx=4)
-        tk.Button(filt, text="✕", command=lambda: self._var_filtro.set(""),
-                  bg="#ddd", relief=tk.FLAT, font=FONT_NORMAL).pack(side=tk.LEFT)
-
-        # Notebook de abas (uma por planilha)
-        self._nb_abas = ttk.Notebook(parent)
-        self._nb_abas.pack(fill=tk.BOTH, expand=True)
-        self._nb_abas.bind("<<NotebookTabChanged>>", self._on_tab_changed)
-
-        # Barra de ações da tabela
-        bbar = tk.Frame(parent, bg=COR_BG, pady=4)
-        bbar.pack(fill=tk.X)
-
-        self._btn(bbar, "+ Novo",       self.novo_campo,       COR_BTN_VERDE,  side=tk.LEFT, padx=2)
-        self._btn(bbar, "✎ Editar",    self.editar_campo,     COR_BTN_AZUL,   side=tk.LEFT, padx=2)
-        self._btn(bbar, "🗑 Remover",   self.remover_campo,    COR_BTN_VERM,   side=tk.LEFT, padx=2)
-        self._btn(bbar, "⟳ Recalcular",self.recalcular_posicoes, COR_BTN_LARANJA, side=tk.LEFT, padx=2)
-
-        self._lbl_count = tk.Label(bbar, text="0 campos", bg=COR_BG,
-                                   fg="#555", font=FONT_NORMAL)
-        self._lbl_count.pack(side=tk.RIGHT, padx=8)
-
-    def _build_painel_direito(self, parent):
-        nb = ttk.Notebook(parent)
-        nb.pack(fill=tk.BOTH, expand=True)
-
-        # Aba Validação
-        frv = tk.Frame(nb, bg=COR_BG, padx=4, pady=4)
-        nb.add(frv, text="  Validação  ")
-        self._build_aba_validacao(frv)
-
-        # Abas de XML Preview — uma por tipo de XML gerado
-        _XML_ABAS = [
-            ("LayoutEntrada",      "  LayoutEntrada  "),
-            ("LayoutPersistencia", "  LayoutPersistencia  "),
-            ("mapaAtributo",       "  mapaAtributo  "),
-            ("DadoExterno",        "  DadoExterno  "),
-            ("ComandoSQL",         "  ComandoSQL  "),
-        ]
-        for key, label in _XML_ABAS:
-            frx = tk.Frame(nb, bg=COR_BG, padx=4, pady=4)
-            nb.add(frx, text=label)
-            self._txt_xmls[key] = self._build_xml_tab(frx, key)
-
-        # Alias de compatibilidade
-        self._txt_xml = self._txt_xmls["LayoutEntrada"]
-        self._notebook = nb
-
-    def _build_aba_validacao(self, parent):
-        self._btn(parent, "▶ Validar Agora [F5]", self.validar,
-                  COR_BTN_CINZA, anchor=tk.NW, pady=(0, 6))
-
-        self._txt_val = tk.Text(parent, font=FONT_MONO, wrap=tk.WORD,
-                                state=tk.DISABLED, bg="#fafafa",
-                                relief=tk.FLAT, highlightthickness=1,
-                                highlightbackground="#ccc")
-        vsb = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self._txt_val.yview)
-        self._txt_val.configure(yscrollcommand=vsb.set)
-
-        self._txt_val.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        vsb.pack(side=tk.RIGHT, fill=tk.Y)
-
-        # Tags de cor para o texto
-        self._txt_val.tag_configure("ok",     foreground="#2e7d32", font=FONT_BOLD)
-        self._txt_val.tag_configure("erro",   foreground="#c62828", font=FONT_BOLD)
-        self._txt_val.tag_configure("aviso",  foreground="#e65100")
-        self._txt_val.tag_configure("info",   foreground="#1565c0")
-        self._txt_val.tag_configure("titulo", font=FONT_BOLD)
-
-    def _build_xml_tab(self, parent, key):
-        """Cria aba de preview XML com botão de atualização. Retorna o widget Text."""
-        self._btn(parent, "🔄 Atualizar Preview", self._preview_todas_abas,
-                  COR_BTN_ROXO, anchor=tk.NW, pady=(0, 6))
-
-        frm = tk.Frame(parent)
-        frm.pack(fill=tk.BOTH, expand=True)
-
-        txt = tk.Text(frm, font=FONT_MONO, wrap=tk.NONE,
-                      bg="#1e1e1e", fg="#d4d4d4",
-                      insertbackground="white",
-                      relief=tk.FLAT)
-        vsb = ttk.Scrollbar(frm, orient=tk.VERTICAL,   command=txt.yview)
-        hsb = ttk.Scrollbar(frm, orient=tk.HORIZONTAL, command=txt.xview)
-        txt.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
-
-        txt.grid(row=0, column=0, sticky="nsew")
-        vsb.grid(row=0, column=1, sticky="ns")
-        hsb.grid(row=1, column=0, sticky="ew")
-        frm.rowconfigure(0, weight=1)
-        frm.columnconfigure(0, weight=1)
-
-        txt.tag_configure("tag",   foreground="#569cd6")
-        txt.tag_configure("attr",  foreground="#9cdcfe")
-        txt.tag_configure("value", foreground="#ce9178")
-        return txt
-
-    def _build_statusbar(self):
-        bar = tk.Frame(self.root, bg="#37474f", height=26)
-        bar.pack(fill=tk.X, side=tk.BOTTOM)
-        bar.pack_propagate(False)
-
-        self._var_status = tk.StringVar(value="Pronto. Carregue uma planilha para começar.")
-        tk.Label(bar, textvariable=self._var_status, bg="#37474f", fg=COR_BRANCO,
-                 font=FONT_NORMAL, anchor=tk.W, padx=10).pack(side=tk.LEFT, fill=tk.X, expand=True)
-
-        self._var_total = tk.StringVar()
-        tk.Label(bar, textvariable=self._var_total, bg="#37474f", fg="#90a4ae",
-                 font=FONT_NORMAL, padx=10).pack(side=tk.RIGHT)
-
-    # ── Atalhos ──────────────────────────────────────────────────────────────
-
-    def _bind_atalhos(self):
-        self.root.bind("<Control-o>", lambda _: self.selecionar_principal())
-        self.root.bind("<Control-s>", lambda _: self.salvar_planilha())
-        self.root.bind("<F5>",        lambda _: self.validar())
-        self.root.bind("<F6>",        lambda _: self.gerar_xml())
-        self.root.bind("<F7>",        lambda _: self.preview_xml())
-        self.root.bind("<Delete>",    lambda _: self.remover_campo())
-
-    # ── Carregar planilhas ────────────────────────────────────────────────────
-
-    def _executar_em_thread(self, tarefa, on_sucesso, on_erro, mensagem="Carregando..."):
+    __slots__ = ("campos", "formulas", "sobreposicoes", "lacunas", "fim", "total")
+
+    def __init__(self, ordenados, backend=None):
+        if backend not in (None,) + BACKENDS_VALIDACAO:
+            raise ValueError(f"backend de validação desconhecido: {backend!r}")
+        self.campos = ordenados
+        self.formulas = []
+        self.sobreposicoes = []
+        self.lacunas = []
+        self.fim = None
+        self.total = 0
+        if backend is None:
+            backend = "numpy" if len(ordenados) >= LIMIAR_VALIDACAO_NUMPY else "python"
+        if backend == "numpy" and np is not None and self._varrer_numpy(ordenados):
+            return
+        self._varrer(ordenados)
+
+    def _varrer(self, ordenados):
+        abertos = []                # heap de (byte final, ordem, campo)
+        mais_longe = None           # campo com o maior byte final até aqui
+        for ordem, c in enumerate(ordenados):
+            ini = c.pos_ini
+            fim = ini + c.tamanho - 1
+            self.total += c.tamanho
+            if c.pos_fin and c.pos_fin != fim:
+                self.formulas.append((c, fim))
+
+            while abertos and abertos[0][0] < ini:
+                heapq.heappop(abertos)
+            if abertos:
+                for fim_a, _, a in sorted(abertos, key=operator.itemgetter(1)):
+                    self.sobreposicoes.append((a, c, ini, min(fim_a, fim)))
+            elif self.fim is not None and ini > self.fim + 1:
+                self.lacunas.append((self.fim + 1, ini - 1, mais_longe, c))
+
+            heapq.heappush(abertos, (fim, ordem, c))
+            if self.fim is None or fim > self.fim:
+                self.fim, mais_longe = fim, c
+
+    def _varrer_numpy(self, ordenados):
         """
-        Executa `tarefa()` em thread separada enquanto exibe JanelaCarregando.
-        Chama on_sucesso(resultado) ou on_erro(excecao) na thread principal via after().
+        A varredura de _varrer sobre arrays. Como pos_ini é crescente, os campos
+        que b alcança depois de si são um intervalo da ordenação: de b + 1 até o
+        último que começa até o byte final de b (searchsorted). Lacunas comparam
+        cada início com o máximo acumulado dos fins anteriores. Retorna False
+        (sem alterar nada) se as posições não forem inteiras.
         """
-        janela = JanelaCarregando(self.root, mensagem)
+        n = len(ordenados)
+        if not n:
+            return True
+        ini = np.array(list(map(operator.attrgetter("pos_ini"), ordenados)))
+        tam = np.array(list(map(operator.attrgetter("tamanho"), ordenados)))
+        pos_fin = np.array([c.pos_fin or 0 for c in ordenados])
+        if not (ini.dtype.kind == tam.dtype.kind == pos_fin.dtype.kind == "i"):
+            return False
+        fim = ini + tam - 1
+        campos = ordenados
+        ordem = np.arange(n)
+
+        # Fórmula PosicaoFinal
+        divergentes = np.flatnonzero((pos_fin != 0) & (pos_fin != fim))
+        for k, esperado in zip(divergentes.tolist(), fim[divergentes].tolist()):
+            self.formulas.append((campos[k], esperado))
+
+        # Lacunas: maior fim até o campo anterior (e quem o atinge primeiro)
+        maximo = np.maximum.accumulate(fim)
+        novo = np.empty(n, dtype=bool)
+        novo[0] = True
+        novo[1:] = fim[1:] > maximo[:-1]
+        mais_longe = np.maximum.accumulate(np.where(novo, ordem, 0))
+        depois = np.flatnonzero(ini[1:] > maximo[:-1] + 1) + 1
+        for k, antes, fim_antes, ini_k in zip(depois.tolist(), mais_longe[depois - 1].tolist(),
+                                              maximo[depois - 1].tolist(), ini[depois].tolist()):
+            self.lacunas.append((fim_antes + 1, ini_k - 1, campos[antes], campos[k]))
+
+        # Sobreposições: para cada a, os b em (a, limite[a]); ordenadas por (b, a)
+        limite = np.searchsorted(ini, fim, side="right")
+        quantos = np.clip(limite - ordem - 1, 0, None)
+        total = int(quantos.sum())
+        if total:
+            a = np.repeat(ordem, quantos)
+            inicio_grupo = np.cumsum(quantos) - quantos
+            b = a + 1 + (np.arange(total) - np.repeat(inicio_grupo, quantos))
+            ordenacao = np.lexsort((a, b))
+            a, b = a[ordenacao], b[ordenacao]
+            for ka, kb, ini_k, fim_k in zip(a.tolist(), b.tolist(), ini[b].tolist(),
+                                            np.minimum(fim[a], fim[b]).tolist()):
+                self.sobreposicoes.append((campos[ka], campos[kb], ini_k, fim_k))
+
+        self.fim = int(maximo[-1])
+        self.total = int(tam.sum())
+        return True
+
+
+def validar_campos(campos, layout=None, backend=None):
+    """
+    Retorna (erros, avisos, infos) com os resultados da validação.
+    Com `layout` (LayoutCompilado do modelo), reaproveita a compilação dos campos.
+    Sobreposições e lacunas vêm de AnalisePosicoes (todos os pares e faixas);
+    `backend` força um de BACKENDS_VALIDACAO (None: escolha por tamanho).
+    """
+    erros, avisos, infos = [], [], []
 
-        def _runner():
-            try:
-                resultado = tarefa()
-                self.root.after(0, lambda: _finalizar(resultado, None))
-            except Exception as exc:
-                self.root.after(0, lambda e=exc: _finalizar(None, e))
-
-        def _finalizar(resultado, erro):
-            janela.fechar()
-            if erro:
-                on_erro(erro)
-            else:
-                on_sucesso(resultado)
+    compilados = layout.campos(campos) if layout is not None else CamposCompilados(campos)
+    ordenados = compilados.posicionados
+
+    if not ordenados:
+        return erros, ["Nenhum campo ativo com posição definida."], infos
 
-        threading.Thread(target=_runner, daemon=True).start()
+    analise = compilados.posicoes if backend is None else AnalisePosicoes(ordenados, backend)
 
-    def selecionar_principal(self):
-        """Abre diálogo de seleção — apenas armazena o caminho, não carrega ainda."""
-        path = filedialog.askopenfilename(
-            title="Selecionar Planilha Principal",
-            filetypes=[("Excel/CSV", "*.xlsx *.xls *.csv"), ("Todos", "*.*")]
+    # 1. Fórmula PosicaoFinal
+    for c, esperado in analise.formulas:
+        erros.append(
+            f"Campo '{c.nome}': PosicaoFinal={c.pos_fin} "
+            f"mas esperado {esperado} (PosIni={c.pos_ini} + Tam={c.tamanho} - 1)"
         )
-        if not path:
-            return
-        self._path_principal_pendente = path
-        nome = os.path.basename(path)
-        self._lbl_principal.config(text=f"● {nome}", fg="#e65100")
-        self._btn_carregar.configure(state=tk.NORMAL)
-        self._set_status(f"Principal selecionada: {nome}  —  clique em 'Carregar Planilhas' para carregar.")
-
-    def selecionar_origem(self):
-        """Abre diálogo de seleção — apenas armazena o caminho, não carrega ainda."""
-        path = filedialog.askopenfilename(
-            title="Selecionar Planilha Origem",
-            filetypes=[("Excel/CSV", "*.xlsx *.xls *.csv"), ("Todos", "*.*")]
+
+    # 2. Começa em 1
+    if ordenados[0].pos_ini != 1:
+        avisos.append(
+            f"Layout não começa em 1. Primeiro campo '{ordenados[0].nome}' "
+            f"inicia em {ordenados[0].pos_ini}."
         )
-        if not path:
-            return
-        self._path_origem_pendente = path
-        nome = os.path.basename(path)
-        self._lbl_origem.config(text=f"● {nome}", fg="#e65100")
-        self._btn_carregar.configure(state=tk.NORMAL)
-        self._set_status(f"Origem selecionada: {nome}  —  clique em 'Carregar Planilhas' para carregar.")
-
-    def _aplicar_principal(self, path, dados):
-        """Aplica os dados da planilha principal já carregados na UI."""
-        self._dados_por_aba = dados
-        self._arquivo_principal = path
-        nomes = list(dados.keys())
-        aba_padrao = next(
-            (n for n in nomes if _normalizar_chave(n) in ("camposentrada",)),
-            nomes[0]
+
+    # 3. Continuidade: lacunas e todos os pares sobrepostos
+    for ini, fim, antes, depois in analise.lacunas:
+        avisos.append(
+            f"GAP entre '{antes.nome}' (term. {ini - 1}) "
+            f"e '{depois.nome}' (inicia {fim + 1}) "
+            f"— {fim - ini + 1} byte(s)."
         )
-        self._reconstruir_abas_principal(dados, aba_padrao)
-        nome = os.path.basename(path)
-        self._lbl_principal.config(text=nome, fg="#1565c0")
-        total = sum(len(v["campos"]) for v in dados.values())
-        self._set_status(f"Principal carregada: {nome}  —  {len(dados)} aba(s), {total} campos")
-
-    def _aplicar_origem(self, path, dados):
-        """Aplica os dados da planilha origem já carregados na UI."""
-        self._dados_por_aba_origem = dados
-        self._arquivo_origem = path
-        self._btn_copiar_origem.configure(state=tk.NORMAL)
-        nome = os.path.basename(path)
-        self._lbl_origem.config(text=nome, fg="#2e7d32")
-        total = sum(len(v["campos"]) for v in dados.values())
-        self._set_status(
-            f"Origem carregada: {nome}  —  {len(dados)} aba(s), {total} campos disponíveis"
+    for a, b, ini, fim in analise.sobreposicoes:
+        faixa = f"{ini}" if ini == fim else f"{ini}–{fim}"
+        erros.append(
+            f"SOBREPOSIÇÃO: '{a.nome}' e '{b.nome}' "
+            f"se sobrepõem em pos={faixa}."
         )
 
-    def carregar_planilhas(self):
-        """Carrega em sequência todas as planilhas com seleção pendente."""
-        arquivos = []
-        if self._path_principal_pendente:
-            arquivos.append(("principal", self._path_principal_pendente))
-        if self._path_origem_pendente:
-            arquivos.append(("origem", self._path_origem_pendente))
+    # 4. Obrigatórios sem valor
+    for c in ordenados:
+        if (c.campo.get("obrigatorio") or "").upper() == "S":
+            v = (c.campo.get("valor") or c.campo.get("valor_padrao") or "").strip()
+            if not v:
+                avisos.append(f"Campo obrigatório '{c.nome}' sem valor preenchido.")
 
-        if not arquivos:
-            messagebox.showwarning("Aviso", "Selecione pelo menos uma planilha antes de carregar.")
-            return
+    infos.append(f"Campos de entrada: {len(ordenados)}")
+    infos.append(f"Soma dos tamanhos: {analise.total} bytes")
+    infos.append(f"Posição final do layout: {analise.fim}")
 
-        total = len(arquivos)
-        janela = JanelaCarregando(self.root, "Preparando...")
+    return erros, avisos, infos
 
-        def _runner():
-            resultados = {}
-            erro_info  = None
-            for i, (tipo, path) in enumerate(arquivos):
-                if janela.cancelado:
-                    break
-                nome = os.path.basename(path)
-                msg  = f"Carregando:\n{nome}\n\narquivo {i + 1} de {total}"
-                self.root.after(0, lambda m=msg: janela.atualizar(m))
-                try:
-                    dados = ler_todas_abas(path)
-                    if tipo == "origem" and not dados:
-                        campos = self._ler_xlsx_generico(path)
-                        nome_fb = os.path.splitext(os.path.basename(path))[0]
-                        dados = {nome_fb: {"campos": campos, "headers": []}}
-                    resultados[tipo] = (path, dados)
-                except Exception as e:
-                    erro_info = (tipo, path, e)
-                    break
-            cancelado = janela.cancelado
-            self.root.after(0, lambda: _finalizar(resultados, erro_info, cancelado))
-
-        def _finalizar(resultados, erro, cancelado):
-            janela.fechar()
-
-            if cancelado:
-                # Rollback: nenhum dado é aplicado — estado anterior preservado
-                self._set_status("Carregamento cancelado — nenhuma alteração aplicada.")
-                return
-
-            if erro:
-                tipo, path, exc = erro
-                messagebox.showerror(
-                    "Erro ao carregar",
-                    f"{os.path.basename(path)}:\n{exc}"
-                )
 
-            if "principal" in resultados:
-                path, dados = resultados["principal"]
-                if not dados:
-                    messagebox.showwarning(
-                        "Aviso",
-                        f"{os.path.basename(path)}: nenhuma aba com campos detectada."
-                    )
-                else:
-                    self._aplicar_principal(path, dados)
-                    self._path_principal_pendente = None
-
-            if "origem" in resultados:
-                path, dados = resultados["origem"]
-                self._aplicar_origem(path, dados)
-                self._path_origem_pendente = None
-
-            # Desabilita "Carregar" se não há mais nada pendente
-            if not self._path_principal_pendente and not self._path_origem_pendente:
-                self._btn_carregar.configure(state=tk.DISABLED)
-
-            # Mensagem final consolidada na status bar
-            partes = []
-            if "principal" in resultados and resultados["principal"][1]:
-                partes.append(f"Principal: {os.path.basename(resultados['principal'][0])}")
-            if "origem" in resultados:
-                partes.append(f"Origem: {os.path.basename(resultados['origem'][0])}")
-            if partes:
-                self._set_status("Carregadas — " + "  |  ".join(partes))
-
-        threading.Thread(target=_runner, daemon=True).start()
-
-    # ── Abas estilo Excel (notebook) ──────────────────────────────────────────
-
-    def _criar_tree_aba(self, parent, headers):
-        """Cria um Treeview com as colunas originais da aba e retorna o widget."""
-        cols = headers if headers else ["NomeCampo"]
-
-        wrap = tk.Frame(parent, bg=COR_BG)
-        wrap.pack(fill=tk.BOTH, expand=True)
-
-        tree = ttk.Treeview(wrap, columns=cols, show="headings", selectmode="browse")
-        for col in cols:
-            tree.heading(col, text=col)
-            tree.column(col, width=120, anchor=tk.W, minwidth=50)
-
-        vsb = ttk.Scrollbar(wrap, orient=tk.VERTICAL,   command=tree.yview)
-        hsb = ttk.Scrollbar(wrap, orient=tk.HORIZONTAL, command=tree.xview)
-        tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
-
-        tree.grid(row=0, column=0, sticky="nsew")
-        vsb.grid(row=0, column=1, sticky="ns")
-        hsb.grid(row=1, column=0, sticky="ew")
-        wrap.rowconfigure(0, weight=1)
-        wrap.columnconfigure(0, weight=1)
-
-        tree.tag_configure("par",   background="#f5f9ff")
-        tree.tag_configure("impar", background=COR_BRANCO)
-        tree.tag_configure("erro",  background="#ffebee")
-        tree.tag_configure("aviso", background="#fff8e1")
-
-        tree.bind("<<TreeviewSelect>>", self._on_selecionar)
-        tree.bind("<Double-1>",         self._on_duplo_clique)
-
-        return tree
-
-    def _reconstruir_abas_principal(self, dados, aba_padrao):
-        """Recria todas as abas do Notebook com os dados carregados."""
-        self._ignorar_tab_change = True
-
-        # Limpa abas e trees anteriores
-        for tab in self._nb_abas.tabs():
-            self._nb_abas.forget(tab)
-        self._trees_abas.clear()
-
-        nomes = list(dados.keys())
-        for nome_aba in nomes:
-            aba_info = dados[nome_aba]
-            headers = aba_info.get("headers", [])
-            campos  = aba_info.get("campos", [])
-
-            frame = tk.Frame(self._nb_abas, bg=COR_BG)
-            self._nb_abas.add(frame, text=f"  {nome_aba}  ")
-
-            tree = self._criar_tree_aba(frame, headers)
-            self._trees_abas[nome_aba] = tree
-
-            # Popula com os dados brutos
-            for i, c in enumerate(campos):
-                raw    = c.get("_raw", {})
-                vals   = tuple(raw.get(h, "") for h in headers) if headers else (c.get("nome", ""),)
-                pos_ini = c.get("pos_ini")
-                tam     = c.get("tamanho")
-                pos_fin = c.get("pos_fin")
-                if pos_ini and tam and pos_fin and pos_ini + tam - 1 != pos_fin:
-                    tag = "erro"
-                elif not pos_ini or not tam:
-                    tag = "aviso"
-                else:
-                    tag = "par" if i % 2 == 0 else "impar"
-                tree.insert("", tk.END, iid=str(i), tags=(tag,), values=vals)
-
-        # Seleciona a aba padrão
-        idx_padrao = nomes.index(aba_padrao) if aba_padrao in nomes else 0
-        self._ignorar_tab_change = False
-        self._nb_abas.select(idx_padrao)
-        # Dispara manualmente (select pode não disparar evento se já estava naquele tab)
-        self._on_tab_changed()
-
-    def _on_tab_changed(self, _evt=None):
-        """Chamado quando o usuário clica em outra aba do notebook."""
-        if self._ignorar_tab_change or not self._nb_abas.tabs():
+class ValidacaoIncremental:
+    """
+    Estado de validação de uma lista de campos mantido a cada edição, sem nova
+    passada completa: resultado() devolve o mesmo (erros, avisos, infos) de
+    validar_campos(campos) e tag(indice) a marcação da linha na tabela.
+
+    Os campos posicionados ficam num índice ordenado por (PosicaoInicial, ordem
+    na lista), com o estado da varredura de AnalisePosicoes guardado por posição
+    (maior byte final até ali, pares sobrepostos e lacuna antes de cada campo).
+    Uma edição revarre só a vizinhança: a partir do menor início afetado (com o
+    heap de campos abertos refeito a partir de quem começa até um tamanho máximo
+    antes) até passar do maior fim afetado com o estado igual ao anterior.
+
+    Quem altera a lista avisa: adicionado() após append, alterado(i) após
+    substituir/editar campos[i], removido(i) após pop(i). Outras alterações
+    (ex.: recalcular posições de todos): reconstruir(). Se o tamanho da lista
+    não bate com o estado, resultado() e tag() reconstroem sozinhos.
+    """
+
+    def __init__(self, campos):
+        self.campos = campos
+        self.reconstruir()
+
+    # ── Estado ────────────────────────────────────────────────────────────────
+
+    def reconstruir(self):
+        """Recompila todos os campos (uma passada completa)."""
+        self._serial = itertools.count()
+        self._seriais = []          # serial de cada campo, na ordem da lista
+        self._posicao_serial = {}   # serial → índice na lista (None: refazer)
+        self._itens = {}            # serial → CampoCompilado
+        self._chaves = []           # (pos_ini, serial) dos posicionados, ordenado
+        self._maximos = []          # (maior fim, serial) até cada posição de _chaves
+        self._pares = {}            # serial b → [(serial a, ini, fim)]
+        self._lacunas = {}          # serial depois → (ini, fim, serial antes)
+        self._formulas = {}         # serial → PosicaoFinal esperada
+        self._obrigatorios = set()  # seriais de obrigatórios sem valor
+        self._n_pares = collections.Counter()
+        self._n_lacunas = collections.Counter()
+        self._tamanhos = collections.Counter()
+        self._total = 0
+        for c in self.campos:
+            serial = next(self._serial)
+            self._seriais.append(serial)
+            self._compilar(serial, c)
+        self._posicao_serial = {s: i for i, s in enumerate(self._seriais)}
+        self._chaves.sort()
+        self._maximos = [None] * len(self._chaves)
+        self._varrer(0, None)
+
+    def _sincronizar(self):
+        if len(self._seriais) != len(self.campos):
+            self.reconstruir()
+
+    @staticmethod
+    def _posicionado(item):
+        return item.entrada and item.pos_ini and item.tamanho
+
+    def _compilar(self, serial, campo):
+        """Registra o campo (sem varrer); retorna o CampoCompilado."""
+        item = self._itens[serial] = CampoCompilado(campo)
+        if self._posicionado(item):
+            self._chaves.append((item.pos_ini, serial))
+            self._tamanhos[item.tamanho] += 1
+            self._total += item.tamanho
+            fim = item.pos_ini + item.tamanho - 1
+            if item.pos_fin and item.pos_fin != fim:
+                self._formulas[serial] = fim
+            if (campo.get("obrigatorio") or "").upper() == "S" and \
+                    not (campo.get("valor") or campo.get("valor_padrao") or "").strip():
+                self._obrigatorios.add(serial)
+        return item
+
+    def _descartar(self, serial, tocados):
+        """Retira o campo do índice ordenado e dos resultados."""
+        item = self._itens.pop(serial)
+        self._formulas.pop(serial, None)
+        self._obrigatorios.discard(serial)
+        if not self._posicionado(item):
             return
-        idx = self._nb_abas.index("current")
-        nomes = list(self._dados_por_aba.keys())
-        if idx >= len(nomes):
+        pos = bisect.bisect_left(self._chaves, (item.pos_ini, serial))
+        del self._chaves[pos]
+        del self._maximos[pos]
+        self._tamanhos[item.tamanho] -= 1
+        if not self._tamanhos[item.tamanho]:
+            del self._tamanhos[item.tamanho]
+        self._total -= item.tamanho
+        self._trocar(serial, [], None, tocados)
+
+    def _inserir(self, serial, campo):
+        item = self._compilar(serial, campo)
+        if self._posicionado(item):
+            self._chaves.pop()      # _compilar acrescentou no fim; vai para a posição ordenada
+            pos = bisect.bisect_left(self._chaves, (item.pos_ini, serial))
+            self._chaves.insert(pos, (item.pos_ini, serial))
+            self._maximos.insert(pos, None)
+        return item
+
+    def _trocar(self, serial, pares, lacuna, tocados):
+        """Substitui os pares e a lacuna do campo `serial` (como segundo campo), com contadores."""
+        antigos = self._pares.get(serial, [])
+        if antigos != pares:
+            for a, _, _ in antigos:
+                self._n_pares[a] -= 1
+                self._n_pares[serial] -= 1
+                tocados.add(a)
+            for a, _, _ in pares:
+                self._n_pares[a] += 1
+                self._n_pares[serial] += 1
+                tocados.add(a)
+            tocados.add(serial)
+            if pares:
+                self._pares[serial] = pares
+            else:
+                del self._pares[serial]
+        antiga = self._lacunas.get(serial)
+        if antiga != lacuna:
+            if antiga is not None:
+                self._n_lacunas[antiga[2]] -= 1
+                self._n_lacunas[serial] -= 1
+                tocados.add(antiga[2])
+            if lacuna is not None:
+                self._n_lacunas[lacuna[2]] += 1
+                self._n_lacunas[serial] += 1
+                tocados.add(lacuna[2])
+                self._lacunas[serial] = lacuna
+            else:
+                del self._lacunas[serial]
+            tocados.add(serial)
+
+    def _varrer(self, ini_afetado, fim_afetado, tocados=None):
+        """
+        Refaz a varredura de AnalisePosicoes a partir do primeiro campo que começa
+        em ini_afetado ou depois, até passar de fim_afetado com o mesmo maior fim
+        que antes (fim_afetado=None: até o fim). Retorna os seriais cuja marcação
+        pode ter mudado.
+        """
+        tocados = set() if tocados is None else tocados
+        chaves, maximos, itens = self._chaves, self._maximos, self._itens
+        inicio = bisect.bisect_left(chaves, (ini_afetado,))
+        if inicio >= len(chaves):
+            return tocados
+        # Campos abertos no início: só quem começa até um tamanho máximo antes
+        aquecimento = bisect.bisect_left(chaves, (chaves[inicio][0] - max(self._tamanhos) + 1,))
+        abertos = []
+        for k in range(aquecimento, inicio):
+            ini, serial = chaves[k]
+            heapq.heappush(abertos, (ini + itens[serial].tamanho - 1, k, serial))
+        estado = maximos[inicio - 1] if inicio else None
+        for j in range(inicio, len(chaves)):
+            ini, serial = chaves[j]
+            fim = ini + itens[serial].tamanho - 1
+            while abertos and abertos[0][0] < ini:
+                heapq.heappop(abertos)
+            pares = [(a, ini, min(fim_a, fim))
+                     for fim_a, _, a in sorted(abertos, key=operator.itemgetter(1))]
+            lacuna = None
+            if not abertos and estado is not None and ini > estado[0] + 1:
+                lacuna = (estado[0] + 1, ini - 1, estado[1])
+            self._trocar(serial, pares, lacuna, tocados)
+            heapq.heappush(abertos, (fim, j, serial))
+            if estado is None or fim > estado[0]:
+                estado = (fim, serial)
+            anterior, maximos[j] = maximos[j], estado
+            if fim_afetado is not None and ini > fim_afetado and anterior == estado:
+                break
+        return tocados
+
+    def _indices(self, tocados):
+        if self._posicao_serial is None:
+            self._posicao_serial = {s: i for i, s in enumerate(self._seriais)}
+        return sorted(self._posicao_serial[s] for s in tocados if s in self._posicao_serial)
+
+    def _faixa(self, item):
+        if not self._posicionado(item):
+            return None
+        return item.pos_ini, item.pos_ini + item.tamanho - 1
+
+    def _atualizar(self, antigo, novo, tocados):
+        """Revarre a vizinhança das faixas antiga e nova de um campo."""
+        faixas = [f for f in (self._faixa(antigo) if antigo else None,
+                              self._faixa(novo) if novo else None) if f]
+        if faixas and self._chaves:
+            # max(f): com TamanhoCampo <= 0 o fim fica antes do início, e a varredura
+            # pararia antes de chegar ao próprio campo
+            self._varrer(min(f[0] for f in faixas), max(max(f) for f in faixas), tocados)
+        return tocados
+
+    # ── Notificações de edição ────────────────────────────────────────────────
+
+    def adicionado(self, quantidade=1):
+        """
+        `quantidade` campos.append(campo) acabaram de acontecer. Retorna os índices
+        com marcação a revisar.
+        """
+        if len(self._seriais) != len(self.campos) - quantidade:
+            self.reconstruir()
+            return list(range(len(self.campos)))
+        tocados = set()
+        for campo in self.campos[len(self.campos) - quantidade:]:
+            serial = next(self._serial)
+            self._seriais.append(serial)
+            if self._posicao_serial is not None:
+                self._posicao_serial[serial] = len(self._seriais) - 1
+            tocados.add(serial)
+            self._atualizar(None, self._inserir(serial, campo), tocados)
+        return self._indices(tocados)
+
+    def alterado(self, indice):
+        """campos[indice] foi substituído ou editado. Retorna os índices com marcação a revisar."""
+        if len(self._seriais) != len(self.campos):
+            self.reconstruir()
+            return list(range(len(self.campos)))
+        serial = self._seriais[indice]
+        tocados = {serial}
+        antigo = self._itens[serial]
+        self._descartar(serial, tocados)
+        novo = self._inserir(serial, self.campos[indice])
+        return self._indices(self._atualizar(antigo, novo, tocados))
+
+    def removido(self, indice):
+        """campos.pop(indice) acabou de acontecer (os índices seguintes mudam)."""
+        if len(self._seriais) != len(self.campos) + 1:
+            self.reconstruir()
             return
-        nome_aba = nomes[idx]
-        self._aba_ativa = nome_aba
-        aba = self._dados_por_aba.get(nome_aba, {})
-        self._campos = aba.get("campos", [])
-        self._headers_ativos = aba.get("headers", [])
-        self._sections_ativos = aba.get("sections", {})
-        self._tree = self._trees_abas.get(nome_aba)
-        self._lbl_count.config(text=f"{len(self._campos)} campos")
-        self._atualizar_total()
-        nome_xml = _nome_xml_para_aba(nome_aba)
-        self._set_status(f"Aba: {nome_aba}  ({len(self._campos)} campos)  →  {nome_xml}")
-
-    def _mudar_aba(self, nome_aba):
-        """Seleciona a aba pelo nome (usado internamente)."""
-        nomes = list(self._dados_por_aba.keys())
-        if nome_aba in nomes:
-            self._nb_abas.select(nomes.index(nome_aba))
-            self._on_tab_changed()
-
-    def _ler_xlsx_generico(self, path):
-        """Lê a primeira aba como lista de campos, usando a 1ª linha como cabeçalho."""
-        wb = openpyxl.load_workbook(path, data_only=True)
-        ws = wb.active
-        headers = [_cell_str(c.value, f"Col{i}") for i, c in enumerate(ws[1])]
-        campos = []
-        for row in ws.iter_rows(min_row=2, values_only=True):
-            if not any(row):
-                continue
-            nome = _cell_str(row[0]) if row else ""
-            if not nome:
-                continue
-            c = {"nome": nome, "entrada": "S", "tipo": "TEXTO"}
-            for h, v in zip(headers[1:], row[1:]):
-                c[_normalizar_chave(h)] = _cell_str(v)
-            campos.append(c)
-        return campos
+        serial = self._seriais.pop(indice)
+        self._posicao_serial = None
+        antigo = self._itens[serial]
+        self._descartar(serial, set())
+        self._atualizar(antigo, None, set())
+
+    # ── Consulta ──────────────────────────────────────────────────────────────
+
+    def tag(self, indice):
+        """"erro", "aviso" ou None para a linha `indice` (mesmos critérios da validação)."""
+        self._sincronizar()
+        serial = self._seriais[indice]
+        if serial in self._formulas or self._n_pares[serial] > 0:
+            return "erro"
+        item = self._itens[serial]
+        if self._n_lacunas[serial] > 0 or not item.pos_ini or not item.tamanho:
+            return "aviso"
+        return None
 
-    # ── Copiar campo da origem ────────────────────────────────────────────────
+    def resultado(self):
+        """(erros, avisos, infos) — idêntico a validar_campos(campos)."""
+        self._sincronizar()
+        chaves, itens = self._chaves, self._itens
+        if not chaves:
+            return [], ["Nenhum campo ativo com posição definida."], []
 
-    def copiar_campo(self):
-        if not self._dados_por_aba_origem:
-            messagebox.showwarning("Aviso", "Carregue a planilha origem primeiro.")
-            return
+        def ordem(serial):
+            return bisect.bisect_left(chaves, (itens[serial].pos_ini, serial))
 
-        def _processar(campos_selecionados):
-            if not campos_selecionados:
-                return
-
-            # ── Separar novos × duplicatas (rápido, main thread) ─────────────────
-            novos, duplicatas = [], []
-            for orig in campos_selecionados:
-                nome = orig.get("nome", "")
-                existente = next((c for c in self._campos if c.get("nome") == nome), None)
-                if existente:
-                    duplicatas.append((existente, orig))
-                else:
-                    novos.append(orig)
-
-            # ── Pergunta sobre duplicatas ANTES de entrar na thread ───────────────
-            atualizar_dup = False
-            if duplicatas:
-                nomes_dup = "\n".join(f"  • {e.get('nome')}" for e, _ in duplicatas)
-                atualizar_dup = messagebox.askyesno(
-                    "Campos já existem",
-                    f"Os seguintes campos já existem na planilha principal:\n{nomes_dup}\n\n"
-                    "Deseja atualizar os atributos deles (tipo, tamanho, alinhamento etc.)?"
+        erros, avisos, infos = [], [], []
+        for serial in sorted(self._formulas, key=ordem):
+            c = itens[serial]
+            erros.append(
+                f"Campo '{c.nome}': PosicaoFinal={c.pos_fin} "
+                f"mas esperado {self._formulas[serial]} (PosIni={c.pos_ini} + Tam={c.tamanho} - 1)"
+            )
+        primeiro = itens[chaves[0][1]]
+        if primeiro.pos_ini != 1:
+            avisos.append(
+                f"Layout não começa em 1. Primeiro campo '{primeiro.nome}' "
+                f"inicia em {primeiro.pos_ini}."
+            )
+        for serial in sorted(self._lacunas, key=ordem):
+            ini, fim, antes = self._lacunas[serial]
+            avisos.append(
+                f"GAP entre '{itens[antes].nome}' (term. {ini - 1}) "
+                f"e '{itens[serial].nome}' (inicia {fim + 1}) "
+                f"— {fim - ini + 1} byte(s)."
+            )
+        for serial in sorted(self._pares, key=ordem):
+            for a, ini, fim in self._pares[serial]:
+                faixa = f"{ini}" if ini == fim else f"{ini}–{fim}"
+                erros.append(
+                    f"SOBREPOSIÇÃO: '{itens[a].nome}' e '{itens[serial].nome}' "
+                    f"se sobrepõem em pos={faixa}."
                 )
+        for serial in sorted(self._obrigatorios, key=ordem):
+            avisos.append(f"Campo obrigatório '{itens[serial].nome}' sem valor preenchido.")
+
+        infos.append(f"Campos de entrada: {len(chaves)}")
+        infos.append(f"Soma dos tamanhos: {self._total} bytes")
+        infos.append(f"Posição final do layout: {self._maximos[-1][0]}")
+        return erros, avisos, infos
+
+
+def _amostra_nomes(nomes, limite=10):
+    """'A, B, C' com no máximo `limite` nomes, e '(+N)' para o restante."""
+    texto = ", ".join(f"'{n}'" for n in nomes[:limite])
+    return f"{texto} (+{len(nomes) - limite})" if len(nomes) > limite else texto
 
-            total = len(novos) + (len(duplicatas) if atualizar_dup else 0)
-            if total == 0 and not novos:
-                return
 
-            janela = JanelaCarregando(
-                self.root,
-                f"Copiando campos...\n0 de {len(novos)}"
+def validar_referencias(dados_por_aba, layout=None):
+    """
+    Validação entre abas do modelo, etapa seguinte a validar_campos.
+    Retorna (erros, avisos, infos). Com `layout` (LayoutCompilado do modelo),
+    reaproveita a compilação e os índices (IndicesReferencias), que são montados
+    uma vez por modelo; cada linha é conferida em O(1) ou O(log n).
+
+      - IdentificadorEnriquecimento de 'Enr_ChaveAcesso' / 'Enr_CampoRetornado'
+        inexistente na aba 'Enriquecimento'
+      - PosInicial/PosFinal dessas abas inválidas, fora do layout de 'Campos
+        Entrada' (erro) ou passando por bytes sem campo (aviso)
+      - NomeColuna repetida na mesma tabela entre os campos com Persistência=S
+      - campos com Persistência=S / MapaAtributo=S sem linha nas abas de
+        persistência / RuleAttribute, e linhas dessas abas de campos sem a flag
+    """
+    if layout is None:
+        layout = LayoutCompilado(dados_por_aba)
+    indices = layout.referencias
+    enriquecimento = layout.enriquecimento
+    erros, avisos, infos = [], [], []
+
+    # 1. Abas filhas de Enriquecimento: chave estrangeira e faixa de posições
+    aba_acessos = enriquecimento.abas.get("acessos", "Enriquecimento")
+    for tipo in ("chaves", "retornados"):
+        aba = enriquecimento.abas.get(tipo)
+        for c, rn, enr_id in getattr(enriquecimento, tipo):
+            local = f"{aba} (linha {c.get('linha', '')})"
+            if enr_id not in indices.ids_enriquecimento:
+                erros.append(
+                    f"{local}: IdentificadorEnriquecimento '{enr_id}' "
+                    f"não existe na aba '{aba_acessos}'."
+                )
+            txt_ini = rn.get("posinicial", "") or rn.get("posicaoinicial", "")
+            txt_fin = rn.get("posfinal", "") or rn.get("posicaofinal", "")
+            if not txt_ini and not txt_fin:
+                continue
+            ini, fim = _cell_int(txt_ini), _cell_int(txt_fin)
+            if ini is None or fim is None:
+                erros.append(f"{local}: PosInicial '{txt_ini}' / PosFinal '{txt_fin}' inválidas.")
+                continue
+            if ini > fim:
+                erros.append(f"{local}: PosInicial {ini} maior que PosFinal {fim}.")
+                continue
+            if indices.fim is None:
+                continue
+            faixa = f"{ini}" if ini == fim else f"{ini}–{fim}"
+            situacao = indices.faixa(ini, fim)
+            if situacao == "fora":
+                erros.append(
+                    f"{local}: pos={faixa} fora do layout de Campos Entrada "
+                    f"({indices.inicio}–{indices.fim})."
+                )
+            elif situacao == "lacuna":
+                avisos.append(f"{local}: pos={faixa} inclui bytes sem campo em Campos Entrada.")
+
+    # 2. NomeColuna repetida entre os campos persistidos (por NomeTabela)
+    persistidos = layout.entrada.persistencia
+    por_coluna = {}
+    for item in persistidos:
+        coluna = str(item.rn.get("nomecoluna", "")).strip().upper()
+        if coluna:
+            tabela = str(item.rn.get("nometabela", "")).strip().upper()
+            por_coluna.setdefault((tabela, coluna), []).append(item.nome)
+    for (tabela, coluna), nomes in por_coluna.items():
+        if len(nomes) > 1:
+            alvo = f"{tabela}.{coluna}" if tabela else coluna
+            erros.append(
+                f"NomeColuna '{alvo}' repetida em {len(nomes)} campos com "
+                f"Persistência=S: {_amostra_nomes(nomes)}."
             )
 
-            def _runner():
-                # ── Índices de dados específicos da origem ────────────────────────
-                pers_idx = {}
-                mapa_idx = {}
-                for nome_aba, info in self._dados_por_aba_origem.items():
-                    n_aba = _norm_aba(nome_aba)
-                    for idx, patts in [(pers_idx, ("persistenc",)),
-                                       (mapa_idx, ("ruleattribute", "mapaatributo", "attributemap"))]:
-                        if any(n_aba.startswith(p) for p in patts):
-                            for c in info.get("campos", []):
-                                raw_p = c.get("_raw", {})
-                                rn_p  = {_norm_aba(k): v for k, v in raw_p.items()}
-                                nc = rn_p.get("nomecampo", "") or c.get("nome", "")
-                                if nc:
-                                    idx.setdefault(_norm_aba(nc), raw_p)
-                            break
-
-                # ── NomeTabela do arquivo principal ───────────────────────────────
-                id_evt_principal = (
-                    _ler_identificacao_evento(self._arquivo_principal)
-                    if self._arquivo_principal else {}
+    # 3. Flags de 'Campos Entrada' x abas de persistência / RuleAttribute
+    for flag, abas, marcados in (
+        ("Persistência", indices.persistencia, persistidos),
+        ("MapaAtributo", indices.mapa_atributo, layout.entrada.mapa_atributo),
+    ):
+        if not abas:
+            continue
+        sem_linha = [i.nome for i in marcados
+                     if not any(_norm_aba(i.nome or "") in por_nome for por_nome in abas.values())]
+        if sem_linha:
+            avisos.append(
+                f"{len(sem_linha)} campo(s) com {flag}=S sem linha na(s) aba(s) "
+                f"{_amostra_nomes(list(abas))}: {_amostra_nomes(sem_linha)}."
+            )
+        for aba, por_nome in abas.items():
+            sem_flag = []
+            for chave, linhas in por_nome.items():
+                item = indices.entrada_por_nome.get(chave)
+                if item is not None and not (item.persistencia if flag == "Persistência"
+                                             else item.mapa_atributo):
+                    sem_flag.append(item.nome)
+            if sem_flag:
+                avisos.append(
+                    f"Aba '{aba}': {len(sem_flag)} linha(s) de campo(s) de Campos Entrada "
+                    f"sem {flag}=S: {_amostra_nomes(sem_flag)}."
                 )
-                id_norm_principal = {_norm_aba(k): v for k, v in id_evt_principal.items()}
-                nome_tabela_principal = id_norm_principal.get("nometabela", "")
-
-                # ── Helpers ──────────────────────────────────────────────────────
-                def _id_reservado(v):
-                    return (1000 <= v < 2000) or (20000 <= v <= 21000)
-
-                def _set_raw(raw, val, std_key, *norm_alts):
-                    for k in list(raw.keys()):
-                        if _norm_aba(k) in norm_alts:
-                            raw[k] = str(val)
-                            return
-                    raw[std_key] = str(val)
-
-                _SKIP_MERGE = {
-                    "persistencia", "persistência",
-                    "mapaatributo",
-                    "posicaoinicial", "posinicial",
-                    "posicaofinal", "posfinal",
-                    "identificadorcampo",
-                }
-
-                def _mesclar_persistencia(raw, nome_campo):
-                    pers_raw = pers_idx.get(_norm_aba(nome_campo), {})
-                    for k, v in pers_raw.items():
-                        if _norm_aba(k) not in _SKIP_MERGE:
-                            raw.setdefault(k, v)
-                    if nome_tabela_principal:
-                        _set_raw(raw, nome_tabela_principal, "NomeTabela", "nometabela")
-
-                def _mesclar_mapa(raw, nome_campo):
-                    mapa_raw = mapa_idx.get(_norm_aba(nome_campo), {})
-                    for k, v in mapa_raw.items():
-                        if _norm_aba(k) not in _SKIP_MERGE:
-                            raw.setdefault(k, v)
-
-                # ── Próximo IdentificadorCampo sequencial ─────────────────────────
-                used_ids = []
-                for c in self._campos:
-                    try:
-                        v = int(float(c.get("id", "")))
-                        if not _id_reservado(v):
-                            used_ids.append(v)
-                    except (ValueError, TypeError):
-                        pass
-                next_id = (max(used_ids) + 1) if used_ids else 1
-
-                # ── Processar campos novos ────────────────────────────────────────
-                campos_adicionados = []
-                for i, orig in enumerate(novos):
-                    if janela.cancelado:
-                        break
-                    msg = f"Copiando campos...\n{i + 1} de {len(novos)}"
-                    self.root.after(0, lambda m=msg: janela.atualizar(m))
-
-                    novo      = dict(orig)
-                    novo["_raw"] = dict(orig.get("_raw", {}))
-                    raw       = novo["_raw"]
-
-                    if _raw_flag(raw, "Persistência", "Persistencia"):
-                        _mesclar_persistencia(raw, novo.get("nome", ""))
-                    if _raw_flag(raw, "MapaAtributo"):
-                        _mesclar_mapa(raw, novo.get("nome", ""))
-
-                    ativos = [c for c in self._campos if c.get("pos_ini") and c.get("tamanho")]
-                    prox   = (max(c["pos_ini"] + c["tamanho"] for c in ativos) if ativos else 1)
-                    novo["pos_ini"] = prox
-                    if novo.get("tamanho"):
-                        novo["pos_fin"] = prox + novo["tamanho"] - 1
-                    _set_raw(raw, prox, "PosicaoInicial", "posicaoinicial", "posinicial")
-                    if novo.get("pos_fin"):
-                        _set_raw(raw, novo["pos_fin"], "PosicaoFinal", "posicaofinal", "posfinal")
-
-                    novo["id"] = str(next_id)
-                    _set_raw(raw, next_id, "IdentificadorCampo", "identificadorcampo")
-
-                    self._campos.append(novo)
-                    campos_adicionados.append(novo)
-                    next_id += 1
-
-                # ── Processar duplicatas (se aprovado) ────────────────────────────
-                atualizados = 0
-                if atualizar_dup and not janela.cancelado:
-                    self.root.after(0, lambda: janela.atualizar("Atualizando duplicatas..."))
-                    for existente, orig in duplicatas:
-                        for key in ("tipo", "tamanho", "alinhamento", "descricao",
-                                    "obrigatorio", "coluna_db", "valor_padrao"):
-                            if orig.get(key) is not None:
-                                existente[key] = orig[key]
-                        if not existente.get("valor"):
-                            existente["valor"] = orig.get("valor_padrao", "")
-                        raw_ex = existente.setdefault("_raw", {})
-                        if _raw_flag(raw_ex, "Persistência", "Persistencia"):
-                            _mesclar_persistencia(raw_ex, existente.get("nome", ""))
-                        if _raw_flag(raw_ex, "MapaAtributo"):
-                            _mesclar_mapa(raw_ex, existente.get("nome", ""))
-                        atualizados += 1
-
-                cancelado = janela.cancelado
-                self.root.after(0, lambda: _finalizar(campos_adicionados, atualizados, cancelado))
-
-            def _finalizar(campos_adicionados, atualizados, cancelado):
-                janela.fechar()
-                if cancelado:
-                    # Rollback: remove campos já adicionados nesta operação
-                    for c in campos_adicionados:
-                        try:
-                            self._campos.remove(c)
-                        except ValueError:
-                            pass
-                    self._set_status("Cópia cancelada — nenhuma alteração aplicada.")
-                    self._atualizar_tabela()
-                    return
 
-                self._atualizar_tabela()
-                partes = []
-                if campos_adicionados:
-                    partes.append(f"{len(campos_adicionados)} copiado(s)")
-                if atualizados:
-                    partes.append(f"{atualizados} atualizado(s)")
-                if partes:
-                    self._set_status(f"Campos da origem: {', '.join(partes)}.")
+    infos.append(
+        f"Referências entre abas: {len(enriquecimento.chaves)} chave(s) de acesso, "
+        f"{len(enriquecimento.retornados)} campo(s) retornado(s), "
+        f"{len(persistidos)} campo(s) persistido(s)"
+    )
+    return erros, avisos, infos
 
-            threading.Thread(target=_runner, daemon=True).start()
 
-        JanelaCopiarCampos(self.root, self._dados_por_aba_origem, on_confirmar=_processar)
+# ─────────────────────────────────────────────────────────────────────────────
+# Geração de artefatos (gerar_xml)
+# ─────────────────────────────────────────────────────────────────────────────
 
-    # ── Tabela ────────────────────────────────────────────────────────────────
+# Chave "Planilha" = cópia evento_event_{ID}.xlsx (salvar_xlsx_estruturado).
+# Ela domina o tempo (openpyxl carrega e regrava o workbook inteiro) e roda num
+# processo separado; os XML/SQL, rápidos com o EscritorXML, rodam em threads.
+ARTEFATOS_EM_PROCESSO = frozenset(["Planilha"])
 
-    def _atualizar_tabela(self):
-        """Repopula a Treeview da aba ativa com os dados atuais de self._campos."""
-        if not self._tree:
-            return
+# Extensões de planilha aceitas (cópia da planilha no manifesto, modo lote)
+_EXTENSOES_PLANILHA = (".xlsx", ".xlsm")
 
-        tree    = self._tree
-        headers = self._headers_ativos
-        filtro  = self._var_filtro.get().lower()
-        exib    = 0
 
-        for item in tree.get_children():
-            tree.delete(item)
+def prefixo_artefatos(arquivo=None, sessao=None):
+    """
+    Prefixo do nome dos arquivos gerados: IdentificadorEvento da aba 'Identificação
+    Evento'. Fallback: stem do arquivo principal; último fallback: "LAYOUT".
+    """
+    id_norm = {_norm_aba(k): v for k, v in _identificacao_evento(arquivo, sessao).items()}
+    return (
+        id_norm.get("identificadorevento")
+        or (os.path.splitext(os.path.basename(arquivo))[0] if arquivo else "")
+        or "LAYOUT"
+    )
 
-        for i, c in enumerate(self._campos):
-            nome = (c.get("nome") or "").lower()
-            desc = (c.get("descricao") or "").lower()
-            if filtro and filtro not in nome and filtro not in desc:
-                continue
 
-            raw  = c.get("_raw", {})
-            vals = tuple(raw.get(h, "") for h in headers) if headers else (c.get("nome", ""),)
+def tarefas_artefatos(prefixo, arquivo=None):
+    """
+    [(chave do artefato, nome do arquivo)] gerados por gerar_xml, na ordem usual.
+    Com `arquivo`, inclui a cópia da planilha (chave "Planilha", sem preview).
+    """
+    tarefas = [
+        ("LayoutEntrada",      f"{prefixo}_Layout_entrada.xml"),
+        ("LayoutPersistencia", f"{prefixo}_Layout_persistencia.xml"),
+        ("mapaAtributo",       f"{prefixo}_Layout_mapa_atributo.xml"),
+        ("DadoExterno",        f"{prefixo}_Layout_enriquecimento.xml"),
+        ("ComandoSQL",         "ComandoSQL.sql"),
+    ]
+    if arquivo:
+        ext = os.path.splitext(arquivo)[1]
+        tarefas.append(("Planilha", f"evento_event_{prefixo}{ext}"))
+    return tarefas
 
-            pos_ini = c.get("pos_ini")
-            tam     = c.get("tamanho")
-            pos_fin = c.get("pos_fin")
-            if pos_ini and tam and pos_fin and pos_ini + tam - 1 != pos_fin:
-                tag = "erro"
-            elif not pos_ini or not tam:
-                tag = "aviso"
-            else:
-                tag = "par" if i % 2 == 0 else "impar"
 
-            tree.insert("", tk.END, iid=str(i), tags=(tag,), values=vals)
-            exib += 1
+def construir_artefato(chave, dados_por_aba, arquivo=None, sessao=None,
+                       campos=None, headers=None, sections=None, layout=None, lote_sql=None,
+                       destino=None):
+    """
+    Conteúdo (XML ou SQL) do artefato `chave`; campos/headers/sections são os de Campos Entrada.
+    Para gerar vários artefatos do mesmo modelo, passar a todos o mesmo `layout`
+    (LayoutCompilado): o modelo é compilado uma vez só. `lote_sql` é o `lote` de
+    gerar_comandos_sql (None: um INSERT por campo). Com `destino` (objeto com
+    write()), o conteúdo é escrito nele em streaming e o retorno é None.
+    """
+    if chave == "LayoutEntrada":
+        return construir_xml(campos or [], headers, "Campos Entrada", sections, destino=destino,
+                             layout=layout)
+    if chave == "LayoutPersistencia":
+        return construir_xml_persistencia(dados_por_aba, arquivo, sessao=sessao, destino=destino,
+                                          layout=layout)
+    if chave == "mapaAtributo":
+        return construir_xml_mapa_atributo(dados_por_aba, arquivo, sessao=sessao, destino=destino,
+                                           layout=layout)
+    if chave == "DadoExterno":
+        return construir_xml_enriquecimento(dados_por_aba, destino=destino, layout=layout)
+    if chave == "ComandoSQL":
+        return gerar_comandos_sql(dados_por_aba, arquivo, sessao=sessao, layout=layout,
+                                  destino=destino, lote=lote_sql)
+    raise ValueError(f"Artefato desconhecido: {chave}")
 
-        self._lbl_count.config(text=f"{exib}/{len(self._campos)} campos")
-        self._atualizar_total()
 
-    def _atualizar_total(self):
-        ativos = [c for c in self._campos if c.get("pos_ini") and c.get("tamanho")]
-        if ativos:
-            total = sum(c["tamanho"] for c in ativos)
-            maxi  = max(c["pos_ini"] + c["tamanho"] - 1 for c in ativos)
-            self._var_total.set(f"Tamanho total: {total} bytes | Pos. máx: {maxi}")
-        else:
-            self._var_total.set("")
+# Incrementar sempre que a saída de algum gerador mudar (registrada no manifest.json)
+VERSAO_GERADOR = 1
 
-    def _on_selecionar(self, _evt):
-        pass  # pode expandir para pré-preencher detalhe
+NOME_MANIFESTO = "manifest.json"
 
-    def _on_duplo_clique(self, _evt):
-        self.editar_campo()
+_RE_XLSX_MODIFICADO = re.compile(rb"<dcterms:modified\b.*?</dcterms:modified>", re.S)
 
-    # ── Ações CRUD ────────────────────────────────────────────────────────────
+# Sufixo único dos arquivos temporários de ManifestoSaida.temporario neste processo
+_SEQUENCIA_TEMPORARIOS = itertools.count()
 
-    def novo_campo(self):
-        # Sugere próxima posição
-        ativos = [c for c in self._campos if c.get("pos_ini") and c.get("tamanho")]
-        prox = (max(c["pos_ini"] + c["tamanho"] for c in ativos) if ativos else 1)
-        JanelaEditarCampo(
-            self.root,
-            campo={"pos_ini": prox, "entrada": "S"},
-            on_confirmar=self._adicionar_campo
-        )
 
-    def _adicionar_campo(self, campo):
-        max_id = max(
-            (int(c["id"]) for c in self._campos if str(c.get("id", "")).isdigit()),
-            default=0
-        )
-        campo["id"] = str(max_id + 1)
-        self._campos.append(campo)
-        self._atualizar_tabela()
-        self._set_status(f"Campo '{campo['nome']}' adicionado.")
-
-    def editar_campo(self):
-        sel = self._tree.selection()
-        if not sel:
-            messagebox.showinfo("Aviso", "Selecione um campo na tabela.")
-            return
-        idx = int(sel[0])
-        if idx >= len(self._campos):
-            return
+def _sha256_arquivo(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloco)
+    return h.hexdigest()
 
-        def _aplicar(novo):
-            novo["id"]    = self._campos[idx].get("id", "")
-            novo["linha"] = self._campos[idx].get("linha", "")
-            self._campos[idx] = novo
-            self._atualizar_tabela()
-            self._set_status(f"Campo '{novo['nome']}' atualizado.")
 
-        JanelaEditarCampo(self.root, campo=self._campos[idx], on_confirmar=_aplicar)
+def _substituir_arquivo(tmp, path):
+    """os.replace(tmp, path) mantendo as permissões de `path`, se já existir."""
+    try:
+        shutil.copymode(path, tmp)
+    except OSError:
+        pass
+    os.replace(tmp, path)
 
-    def remover_campo(self):
-        sel = self._tree.selection()
-        if not sel:
-            return
-        idx = int(sel[0])
-        if idx >= len(self._campos):
-            return
-        nome = self._campos[idx].get("nome", "?")
-        if messagebox.askyesno("Confirmar", f"Remover o campo '{nome}'?"):
-            self._campos.pop(idx)
-            self._atualizar_tabela()
-            self._set_status(f"Campo '{nome}' removido.")
-
-    def recalcular_posicoes(self):
-        if not messagebox.askyesno("Recalcular Posições",
-                "Recalcula posições de TODOS os campos de entrada em sequência a partir de 1.\n"
-                "Continuar?"):
-            return
-        ativos = sorted(
-            [c for c in self._campos if (c.get("entrada","S") or "S").upper()=="S" and c.get("tamanho")],
-            key=lambda c: c.get("pos_ini", 99999)
-        )
-        pos = 1
-        for c in ativos:
-            c["pos_ini"] = pos
-            c["pos_fin"] = pos + c["tamanho"] - 1
-            pos += c["tamanho"]
-        self._atualizar_tabela()
-        self._set_status(f"Posições recalculadas. Total: {pos-1} bytes.")
-
-    # ── Salvar planilha ───────────────────────────────────────────────────────
-
-    def salvar_planilha(self):
-        if not self._campos:
-            messagebox.showwarning("Aviso", "Nenhum campo para salvar.")
-            return
 
-        if self._arquivo_principal:
-            # Sempre salva em uma cópia _Novo, preservando o original
-            base, ext = os.path.splitext(self._arquivo_principal)
-            # Remove sufixo _Novo anterior para não empilhar (ex: Arq_Novo_Novo)
-            if base.endswith("_Novo"):
-                base = base[:-5]
-            path = base + "_Novo" + ext
-        else:
-            path = filedialog.asksaveasfilename(
-                title="Salvar Planilha",
-                defaultextension=".xlsx",
-                filetypes=[("Excel", "*.xlsx"), ("CSV", "*.csv")]
-            )
-            if not path:
-                return
+def _mesmo_conteudo_xlsx(path_a, path_b):
+    """
+    True se os dois pacotes .xlsx têm as mesmas partes com o mesmo conteúdo,
+    ignorando a data de modificação em docProps/core.xml (o openpyxl grava a
+    hora do salvamento) e os carimbos de data das entradas do zip.
+    """
+    try:
+        with zipfile.ZipFile(path_a) as za, zipfile.ZipFile(path_b) as zb:
+            partes_a = [(i.filename, i.CRC, i.file_size) for i in za.infolist()]
+            partes_b = [(i.filename, i.CRC, i.file_size) for i in zb.infolist()]
+            if len(partes_a) != len(partes_b):
+                return False
+            for pa, pb in zip(partes_a, partes_b):
+                if pa == pb:
+                    continue
+                if pa[0] != pb[0] or pa[0] != "docProps/core.xml":
+                    return False
+                if (_RE_XLSX_MODIFICADO.sub(b"", za.read(pa[0]))
+                        != _RE_XLSX_MODIFICADO.sub(b"", zb.read(pb[0]))):
+                    return False
+            return True
+    except (OSError, zipfile.BadZipFile):
+        return False
+
+
+class ManifestoSaida:
+    """
+    manifest.json de um diretório de saída: tamanho, SHA-256 e evento (prefixo
+    dos artefatos, ver prefixo_artefatos) de cada arquivo gerado, com
+    VERSAO_GERADOR. gravar() só regrava um arquivo se os bytes mudaram;
+    concluir() remove os arquivos que o mesmo `evento` gerou na execução anterior
+    e deixou de gerar (se não foram alterados por fora) e atualiza o manifest.json.
+    Arquivos de outros eventos no mesmo diretório (ou registrados sem evento)
+    nunca são removidos. Sem `evento`, nada é removido.
+    Listas gravados / inalterados / removidos (nomes) resumem a execução.
+    Seguro para uso concorrente (gerar_xml grava em threads).
+    """
+
+    def __init__(self, diretorio, evento=None):
+        self.diretorio = diretorio
+        self.evento = evento
+        self.anteriores = self._ler()   # nome → {"tamanho": int, "sha256": str, "evento": str}
+        self.arquivos = {}
+        self.gravados, self.inalterados, self.removidos = [], [], []
+        self._lock = threading.Lock()
 
+    def _ler(self):
         try:
-            ext = os.path.splitext(path)[1].lower()
-            if ext in (".xlsx", ".xls"):
-                if self._arquivo_principal and self._dados_por_aba:
-                    # Salva preservando toda a estrutura original (todos os tabs, formatação)
-                    salvar_xlsx_estruturado(
-                        self._arquivo_principal, path, self._dados_por_aba
-                    )
-                else:
-                    # Fallback: sem arquivo original, cria planilha simples
-                    salvar_xlsx(path, self._campos, self._aba_ativa or "Campos Entrada")
-            else:
-                salvar_csv(path, self._campos)
-            self._set_status(f"Planilha salva: {os.path.basename(path)}")
-            messagebox.showinfo("Sucesso", f"Planilha salva:\n{path}")
-        except Exception as e:
-            messagebox.showerror("Erro ao salvar", str(e))
+            with open(os.path.join(self.diretorio, NOME_MANIFESTO), encoding="utf-8") as f:
+                arquivos = json.load(f).get("arquivos", {})
+            return {n: a for n, a in arquivos.items() if isinstance(a, dict)}
+        except (OSError, ValueError, AttributeError):
+            return {}
 
-    # ── Validação ─────────────────────────────────────────────────────────────
+    def _nome(self, path):
+        return os.path.relpath(path, self.diretorio).replace(os.sep, "/")
 
-    def validar(self):
-        if not self._campos:
-            messagebox.showwarning("Aviso", "Carregue uma planilha primeiro.")
-            return
+    def _registrar(self, path, tamanho, sha256, gravado):
+        nome = self._nome(path)
+        registro = {"tamanho": tamanho, "sha256": sha256}
+        if self.evento is not None:
+            registro["evento"] = self.evento
+        with self._lock:
+            self.arquivos[nome] = registro
+            (self.gravados if gravado else self.inalterados).append(nome)
+
+    def gravar(self, path, conteudo):
+        """
+        Grava `conteudo` (str: como open(path, "w", encoding="utf-8"); ou bytes)
+        só se diferir do arquivo existente. Retorna True se gravou.
+        """
+        if isinstance(conteudo, str):
+            conteudo = conteudo.replace("\n", os.linesep).encode("utf-8")
+        gravar = True
+        try:
+            if os.path.getsize(path) == len(conteudo):
+                with open(path, "rb") as f:
+                    gravar = f.read() != conteudo
+        except OSError:
+            pass
+        if gravar:
+            with open(path, "wb") as f:
+                f.write(conteudo)
+        self._registrar(path, len(conteudo), hashlib.sha256(conteudo).hexdigest(), gravar)
+        return gravar
+
+    @staticmethod
+    def temporario(path):
+        """
+        Arquivo temporário vazio no diretório de `path` (mesma extensão), para gerar
+        fora do destino e adotar(): no mesmo sistema de arquivos, a substituição é um
+        os.replace. Criado com as permissões de um arquivo novo (umask).
+        """
+        diretorio, nome = os.path.split(path)
+        raiz, extensao = os.path.splitext(nome)
+        while True:
+            tmp = os.path.join(
+                diretorio, f".{raiz}.{os.getpid()}.{next(_SEQUENCIA_TEMPORARIOS)}.tmp{extensao}")
+            try:
+                os.close(os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666))
+                return tmp
+            except FileExistsError:
+                continue
+
+    def adotar(self, tmp, path):
+        """
+        Substitui `path` por `tmp` (os.replace, mantendo as permissões de `path`) se
+        o conteúdo difere (.xlsx/.xlsm: ver _mesmo_conteudo_xlsx); senão descarta
+        `tmp`. Retorna True se gravou.
+        """
+        try:
+            igual = os.path.getsize(tmp) == os.path.getsize(path) and (
+                _sha256_arquivo(tmp) == _sha256_arquivo(path))
+            if not igual and path.lower().endswith(_EXTENSOES_PLANILHA):
+                igual = _mesmo_conteudo_xlsx(tmp, path)
+        except OSError:
+            igual = False
+        if igual:
+            os.remove(tmp)
+        else:
+            _substituir_arquivo(tmp, path)
+        self._registrar(path, os.path.getsize(path), _sha256_arquivo(path), not igual)
+        return not igual
+
+    def concluir(self, esperados=None):
+        """
+        Atualiza o manifest.json. Com `esperados` (nomes de todos os arquivos
+        desta execução), os arquivos do manifesto anterior registrados pelo mesmo
+        evento e fora dessa lista são removidos do disco se ainda tiverem o conteúdo
+        registrado; os demais (esperados não gerados por erro, outros eventos)
+        mantêm o registro anterior. Sem `esperados`, nada é removido e os
+        registros anteriores não regravados são mantidos.
+        """
+        with self._lock:
+            for nome, anterior in self.anteriores.items():
+                if nome in self.arquivos or "/" in nome or nome in ("", ".", ".."):
+                    continue
+                path = os.path.join(self.diretorio, nome)
+                try:
+                    sha256 = _sha256_arquivo(path)
+                except OSError:
+                    continue    # já não existe
+                proprio = self.evento is not None and anterior.get("evento") == self.evento
+                if esperados is None or nome in esperados or not proprio:
+                    if sha256 == anterior.get("sha256"):
+                        self.arquivos[nome] = anterior
+                elif sha256 == anterior.get("sha256"):
+                    try:
+                        os.remove(path)
+                        self.removidos.append(nome)
+                    except OSError:
+                        self.arquivos[nome] = anterior
+            manifesto = {
+                "gerador": "gerador_xml",
+                "versao": VERSAO_GERADOR,
+                "arquivos": dict(sorted(self.arquivos.items())),
+            }
+            conteudo = (json.dumps(manifesto, ensure_ascii=False, indent=2) + "\n").encode("utf-8")
+            path = os.path.join(self.diretorio, NOME_MANIFESTO)
+            try:
+                with open(path, "rb") as f:
+                    if f.read() == conteudo:
+                        return
+            except OSError:
+                pass
+            with open(path, "wb") as f:
+                f.write(conteudo)
+
+
+def gerar_artefato(chave, path, dados_por_aba, arquivo=None, sessao=None,
+                   campos=None, headers=None, sections=None, cache=None, manifesto=None,
+                   layout=None, lote_sql=None):
+    """
+    Gera o artefato `chave` em path. Função de módulo: pode rodar em processo.
+    Com `cache` (CacheArtefatos), o conteúdo é reaproveitado se as entradas não
+    mudaram e é retornado (para preview). Sem cache, XML/SQL são escritos em
+    streaming num arquivo temporário no diretório de `path`
+    (ManifestoSaida.temporario), que o substitui ao final com os.replace (um erro
+    no meio da geração não deixa arquivo truncado), e o retorno é None — assim
+    como para a cópia da planilha.
+    Com `manifesto` (ManifestoSaida), o arquivo só é regravado se os bytes mudaram;
+    `layout` (LayoutCompilado) e `lote_sql` são repassados a construir_artefato.
+    """
+    if chave == "Planilha":
+        if manifesto is None:
+            salvar_xlsx_estruturado(arquivo, path, dados_por_aba)
+            return None
+        tmp = manifesto.temporario(path)
+        try:
+            salvar_xlsx_estruturado(arquivo, tmp, dados_por_aba)
+            manifesto.adotar(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        return None
+    if cache is None:
+        tmp = ManifestoSaida.temporario(path)
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                construir_artefato(chave, dados_por_aba, arquivo, sessao, campos, headers, sections,
+                                   layout=layout, lote_sql=lote_sql, destino=f)
+            if manifesto is not None:
+                manifesto.adotar(tmp, path)
+            else:
+                _substituir_arquivo(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        return None
+    conteudo, _ = cache.construir(chave, dados_por_aba, arquivo, sessao, campos, headers, sections,
+                                  layout=layout, lote_sql=lote_sql)
+    if manifesto is not None:
+        manifesto.gravar(path, conteudo)
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(conteudo)
+    return conteudo
 
-        erros, avisos, infos = validar_campos(self._campos)
 
-        self._txt_val.configure(state=tk.NORMAL)
-        self._txt_val.delete(1.0, tk.END)
+# ─────────────────────────────────────────────────────────────────────────────
+# Regeneração incremental (dependências de cada artefato)
+# ─────────────────────────────────────────────────────────────────────────────
 
-        self._txt_val.insert(tk.END, "═" * 42 + "\n", "titulo")
-        self._txt_val.insert(tk.END, "   RESULTADO DA VALIDAÇÃO\n", "titulo")
-        self._txt_val.insert(tk.END, "═" * 42 + "\n\n", "titulo")
+# Colunas de flag de layout (nome normalizado): os geradores só as usam como
+# filtro de campos (DEPENDENCIAS_ARTEFATOS "campos"), nunca como conteúdo.
+_COLUNAS_FLAG = frozenset([
+    "entrada", "persistencia", "enriquecimento", "mapaatributo", "saida", "campoconcatenado",
+])
+
+# Entradas lidas por cada gerador (espelham construir_artefato):
+#   campos         - campos de Campos Entrada que entram no artefato:
+#                      "layout"        → os passados a construir_xml, só as colunas de _colunas_layout
+#                      ("flag", nomes) → só os com a flag = S, sem as colunas de flag
+#                      None            → nenhum
+#   tamanho_layout - maior PosicaoFinal de Campos Entrada (TamanhoLayout / TamanhoTransacao)
+#   abas           - outras abas lidas por inteiro (sufixos do nome normalizado)
+#   auxiliares     - abas auxiliares da SessaoPlanilha (sem sessão: o próprio xlsx)
+DEPENDENCIAS_ARTEFATOS = {
+    "LayoutEntrada": {
+        "campos": "layout", "tamanho_layout": False, "abas": (), "auxiliares": (),
+    },
+    "LayoutPersistencia": {
+        "campos": ("flag", ("Persistência", "Persistencia")), "tamanho_layout": True,
+        "abas": (), "auxiliares": ("identificacao",),
+    },
+    "mapaAtributo": {
+        "campos": ("flag", ("MapaAtributo",)), "tamanho_layout": False,
+        "abas": (), "auxiliares": ("rule_attribute_valores",),
+    },
+    "DadoExterno": {
+        "campos": None, "tamanho_layout": True,
+        "abas": ("enriquecimento", "chaveacesso", "camporetornado"), "auxiliares": (),
+    },
+    "ComandoSQL": {
+        "campos": ("flag", ("Persistência", "Persistencia")), "tamanho_layout": False,
+        "abas": (), "auxiliares": ("identificacao", "comandos_sql"),
+    },
+}
+
+_ESTADO_CAMPO = operator.attrgetter(*_CHAVES_CAMPO[:-1])
+
+
+def _tupla_de_indices(indices):
+    """Função lista → tupla dos itens nos índices (itemgetter também para 0 ou 1 índice)."""
+    if not indices:
+        return lambda valores: ()
+    if len(indices) == 1:
+        i = indices[0]
+        return lambda valores: (valores[i],)
+    return operator.itemgetter(*indices)
+
+
+class _ProjecaoRaw:
+    """
+    Valores de _raw relevantes para uma assinatura: só as `colunas` indicadas, ou
+    todas menos as de nome normalizado em `excluir`. Para RawCampo, as posições
+    são resolvidas uma vez por cabeçalho (compartilhado pela aba).
+    """
 
-        if infos:
-            self._txt_val.insert(tk.END, "INFORMAÇÕES:\n", "info")
-            for i in infos:
-                self._txt_val.insert(tk.END, f"  • {i}\n", "info")
-            self._txt_val.insert(tk.END, "\n")
+    __slots__ = ("colunas", "excluir", "_por_cabecalho")
 
-        if avisos:
-            self._txt_val.insert(tk.END, "AVISOS:\n", "aviso")
-            for a in avisos:
-                self._txt_val.insert(tk.END, f"  ⚠  {a}\n", "aviso")
-            self._txt_val.insert(tk.END, "\n")
+    def __init__(self, colunas=None, excluir=frozenset()):
+        self.colunas = colunas
+        self.excluir = excluir
+        self._por_cabecalho = {}    # id(_posicoes) → (_posicoes, função)
 
-        if erros:
-            self._txt_val.insert(tk.END, "ERROS:\n", "erro")
-            for e in erros:
-                self._txt_val.insert(tk.END, f"  ✗  {e}\n", "erro")
-            self._txt_val.insert(tk.END, "\n")
+    def _funcao(self, posicoes):
+        if self.colunas is not None:
+            presentes = [posicoes[h] for h in self.colunas if h in posicoes]
+            ausentes = [h for h in self.colunas if h not in posicoes]
         else:
-            self._txt_val.insert(tk.END, "✔  Sem erros de posicionamento!\n", "ok")
+            presentes = [p for h, p in posicoes.items() if _norm_aba(h) not in self.excluir]
+            ausentes = None     # extras: todas as chaves não excluídas
+        valores_de = _tupla_de_indices(presentes)
+        excluir = self.excluir
+
+        def projetar(raw):
+            extras = raw._extras
+            if not extras:
+                return valores_de(raw._valores)
+            if ausentes is None:
+                resto = tuple((k, v) for k, v in extras.items() if _norm_aba(k) not in excluir)
+            else:
+                resto = tuple(extras.get(h, "") for h in ausentes)
+            return valores_de(raw._valores), resto
+        return projetar
+
+    def __call__(self, raw):
+        if not raw:
+            return ()
+        if isinstance(raw, RawCampo):
+            item = self._por_cabecalho.get(id(raw._posicoes))
+            if item is None:
+                item = self._por_cabecalho[id(raw._posicoes)] = (
+                    raw._posicoes, self._funcao(raw._posicoes)
+                )
+            return item[1](raw)
+        if self.colunas is not None:
+            return tuple(raw.get(h, "") for h in self.colunas)
+        return tuple((k, v) for k, v in raw.items() if _norm_aba(k) not in self.excluir)
 
-        self._txt_val.configure(state=tk.DISABLED)
 
-        # Navega para aba de validação
-        self._notebook.select(0)
+def _estado_campo(c, estado_raw):
+    """Tupla com os valores do campo (exceto _raw, já projetado em estado_raw)."""
+    if isinstance(c, Campo):
+        try:
+            padrao = _ESTADO_CAMPO(c)
+        except AttributeError:
+            padrao = tuple(c.get(k, _AUSENTE) for k in _CHAVES_CAMPO[:-1])
+        return padrao, tuple(c._extras.items()) if c._extras else (), estado_raw
+    return tuple((k, v) for k, v in c.items() if k != "_raw"), estado_raw
 
-        status = f"Validação: {'OK' if not erros else f'{len(erros)} erro(s)'}"
-        if avisos:
-            status += f" | {len(avisos)} aviso(s)"
-        self._set_status(status)
 
-    # ── XML ───────────────────────────────────────────────────────────────────
+def _digest_estado(estado):
+    """
+    SHA-256 (bytes) da representação de `estado`: guardado no lugar dos valores,
+    não duplica o conteúdo dos campos em memória e não muda se algo mutável do
+    estado (lista num campo editado, por exemplo) for alterado depois.
+    """
+    return hashlib.sha256(repr(estado).encode("utf-8")).digest()
 
-    # Índice de cada aba XML dentro do notebook (tab 0 = Validação)
-    _XML_TAB_KEYS = ["LayoutEntrada", "LayoutPersistencia", "mapaAtributo", "DadoExterno", "ComandoSQL"]
 
-    def _atualizar_tab_xml(self, key, xml_str):
-        """Popula a aba de XML preview correspondente sem trocar de aba."""
-        txt = self._txt_xmls.get(key)
-        if not txt:
-            return
-        txt.configure(state=tk.NORMAL)
-        txt.delete(1.0, tk.END)
-        txt.insert(tk.END, xml_str)
-        txt.configure(state=tk.DISABLED)
-
-    def _gerar_xml_str(self, key):
-        """Gera e retorna o conteúdo (XML ou SQL) para a aba indicada."""
-        if key == "LayoutEntrada":
-            aba_e = None
-            for nome, info in self._dados_por_aba.items():
-                if _norm_aba(nome) == "camposentrada":
-                    aba_e = info
-                    break
-            if aba_e is None and self._dados_por_aba:
-                aba_e = next(iter(self._dados_por_aba.values()))
-            return construir_xml(
-                aba_e.get("campos", [])   if aba_e else self._campos,
-                aba_e.get("headers", [])  if aba_e else self._headers_ativos,
-                "Campos Entrada",
-                aba_e.get("sections", {}) if aba_e else self._sections_ativos,
-            )
-        elif key == "LayoutPersistencia":
-            return construir_xml_persistencia(
-                self._dados_por_aba, self._arquivo_principal
-            )
-        elif key == "mapaAtributo":
-            return construir_xml_mapa_atributo(
-                self._dados_por_aba, self._arquivo_principal
-            )
-        elif key == "DadoExterno":
-            return construir_xml_enriquecimento(self._dados_por_aba)
-        elif key == "ComandoSQL":
-            return gerar_comandos_sql(self._dados_por_aba, self._arquivo_principal)
-        return None
+def _digest_partes(partes):
+    """SHA-256 (bytes) de uma sequência de partes; cada uma entra com o seu tamanho."""
+    blocos = []
+    for parte in partes:
+        if not isinstance(parte, bytes):
+            parte = repr(parte).encode("utf-8")
+        blocos.append(len(parte).to_bytes(8, "big"))
+        blocos.append(parte)
+    return hashlib.sha256(b"".join(blocos)).digest()
 
-    def _preview_xml_tab(self, key):
-        """Gera e exibe o conteúdo de uma aba, selecionando-a no notebook."""
-        if not self._dados_por_aba:
-            messagebox.showwarning("Aviso", "Carregue uma planilha primeiro.")
-            return
-        try:
-            xml_str = self._gerar_xml_str(key)
-            if xml_str is None:
-                return
-            self._atualizar_tab_xml(key, xml_str)
-            self._notebook.select(1 + self._XML_TAB_KEYS.index(key))
-        except Exception as e:
-            messagebox.showerror(f"Erro ao gerar {key}", str(e))
-
-    def _preview_todas_abas(self):
-        """Atualiza o conteúdo de todas as abas de preview em thread separada."""
-        if not self._dados_por_aba:
-            messagebox.showwarning("Aviso", "Carregue uma planilha primeiro.")
-            return
 
-        total = len(self._XML_TAB_KEYS)
-        janela = JanelaCarregando(self.root, "Gerando previews...")
+def _contribuicoes(campos, funcao, memo=None, parametros=None):
+    """
+    [digest de funcao(c, raw) por campo] (ver _digest_estado). Com `memo` (dict), o de cada
+    Campo/RawCampo é guardado com seus carimbos _versao e só recalculado para os
+    campos alterados desde a última chamada (ou se `parametros` mudar).
+    """
+    if memo is None:
+        return [_digest_estado(funcao(c, c.get("_raw"))) for c in campos]
+    if memo.get("parametros") != parametros:
+        memo.clear()
+        memo["parametros"] = parametros
+    anteriores = memo.get("campos", {})
+    atuais = {}
+    saida = []
+    for c in campos:
+        raw = c.get("_raw")
+        if type(c) is Campo and type(raw) is RawCampo:
+            item = anteriores.get(id(c))
+            if (item is None or item[0] is not c or item[1] is not raw
+                    or item[2] != c._versao or item[3] != raw._versao):
+                item = (c, raw, c._versao, raw._versao, _digest_estado(funcao(c, raw)))
+            atuais[id(c)] = item
+            saida.append(item[4])
+        else:
+            saida.append(_digest_estado(funcao(c, raw)))
+    memo["campos"] = atuais
+    return saida
 
-        def _runner():
-            resultados = {}
-            erros = []
-            for i, key in enumerate(self._XML_TAB_KEYS):
-                if janela.cancelado:
-                    break
-                msg = f"Gerando preview:\n{key}\n\n{i + 1} de {total}"
-                self.root.after(0, lambda m=msg: janela.atualizar(m))
-                try:
-                    resultados[key] = self._gerar_xml_str(key)
-                except Exception as e:
-                    erros.append(f"{key}: {e}")
-            cancelado = janela.cancelado
-            self.root.after(0, lambda: _finalizar(resultados, erros, cancelado))
-
-        def _finalizar(resultados, erros, cancelado):
-            janela.fechar()
-            if cancelado:
-                # Rollback: nenhuma aba é atualizada — conteúdo anterior preservado
-                self._set_status("Preview cancelado — conteúdo anterior preservado.")
-                return
-            for key, xml_str in resultados.items():
-                if xml_str is not None:
-                    self._atualizar_tab_xml(key, xml_str)
-            if erros:
-                messagebox.showerror("Erro ao atualizar preview", "\n".join(erros))
-
-        threading.Thread(target=_runner, daemon=True).start()
-
-    def preview_xml(self):
-        """Atalho F7: atualiza todas as abas de preview."""
-        self._preview_todas_abas()
-
-    def gerar_xml(self):
-        if not self._dados_por_aba:
-            messagebox.showwarning("Aviso", "Carregue uma planilha primeiro.")
-            return
 
-        # Usa "Campos Entrada" como referência para validação
-        aba_entrada = None
-        for nome, info in self._dados_por_aba.items():
-            if _norm_aba(nome) == "camposentrada":
-                aba_entrada = info
-                break
-        if aba_entrada is None and self._dados_por_aba:
-            aba_entrada = next(iter(self._dados_por_aba.values()))
-
-        campos_validar = aba_entrada.get("campos", []) if aba_entrada else self._campos
-        erros, _, _ = validar_campos(campos_validar)
-        if erros:
-            if not messagebox.askyesno("Validação com erros",
-                    f"Existem {len(erros)} erro(s) de validação.\n"
-                    "Deseja gerar os XMLs mesmo assim?"):
-                return
-
-        # Pede diretório de saída
-        dir_inicial = os.path.dirname(self._arquivo_principal) if self._arquivo_principal else ""
-        dir_saida = filedialog.askdirectory(
-            title="Selecione o diretório para salvar os XMLs",
-            initialdir=dir_inicial
-        )
-        if not dir_saida:
-            return
+def assinatura_artefato(chave, dados_por_aba, arquivo=None, sessao=None,
+                        campos=None, headers=None, sections=None, memo=None):
+    """
+    Assinatura das entradas que o gerador de `chave` lê, conforme
+    DEPENDENCIAS_ARTEFATOS (mesmos parâmetros de construir_artefato). Alterações
+    fora delas — outra aba, coluna não emitida, campo sem a flag — não a mudam.
+    É o SHA-256 (bytes) das entradas serializadas, não os valores: o
+    CacheArtefatos de cada planilha observada não guarda uma segunda cópia do
+    conteúdo dos campos, e assinaturas iguais só vêm de entradas diferentes com
+    uma colisão de SHA-256 (o hash() do Python não serviria).
+    Com `memo` (dict mantido entre chamadas para a mesma chave), só os campos
+    alterados desde a chamada anterior são reprocessados.
+    """
+    dep = DEPENDENCIAS_ARTEFATOS[chave]
+    memo = {} if memo is None else memo
+    partes = [chave]
+    campos_entrada = _aba_campos_entrada(dados_por_aba)
 
-        # Captura referências antes de entrar na thread
-        _dados       = self._dados_por_aba
-        _arquivo     = self._arquivo_principal
-        _headers     = aba_entrada.get("headers", [])  if aba_entrada else self._headers_ativos
-        _sections    = aba_entrada.get("sections", {}) if aba_entrada else self._sections_ativos
-
-        # Prefixo do nome dos arquivos: campo "Identificador" da aba "Identificação Evento"
-        # Fallback: stem do arquivo principal; último fallback: "LAYOUT"
-        _id_evt  = _ler_identificacao_evento(_arquivo) if _arquivo else {}
-        _id_norm = {_norm_aba(k): v for k, v in _id_evt.items()}
-        _prefixo = (
-            _id_norm.get("identificadorevento")
-            or (os.path.splitext(os.path.basename(_arquivo))[0] if _arquivo else "")
-            or "LAYOUT"
-        )
+    tipo_campos = dep["campos"]
+    if tipo_campos == "layout":
+        headers_xml, headers_pos = _colunas_layout(headers, sections, "Campos Entrada")
+        colunas = tuple(headers_xml + headers_pos)
+        if colunas:
+            projetar = _ProjecaoRaw(colunas=colunas)
 
-        # Nome da cópia da planilha no diretório de saída
-        _ext_planilha  = os.path.splitext(_arquivo)[1] if _arquivo else ".xlsx"
-        _nome_planilha = f"evento_event_{_prefixo}{_ext_planilha}"
-
-        # (key_preview, nome_arquivo, progresso)  — None em key_preview = não é XML de preview
-        _total = 6 if _arquivo else 5
-        _tarefas = [
-            ("LayoutEntrada",      f"{_prefixo}_Layout_entrada.xml",      f"1/{_total}"),
-            ("LayoutPersistencia", f"{_prefixo}_Layout_persistencia.xml",  f"2/{_total}"),
-            ("mapaAtributo",       f"{_prefixo}_Layout_mapa_atributo.xml", f"3/{_total}"),
-            ("DadoExterno",        f"{_prefixo}_Layout_enriquecimento.xml",f"4/{_total}"),
-            ("ComandoSQL",         "ComandoSQL.sql",                        f"5/{_total}"),
-        ]
-        if _arquivo:
-            _tarefas.append((None, _nome_planilha, f"6/{_total}"))
+            def funcao(c, raw):
+                return c.get("entrada"), c.get("pos_ini"), projetar(raw)
+        else:
+            def funcao(c, raw):
+                return _estado_campo(c, ())
+        partes.append(colunas)
+        partes.extend(_contribuicoes(
+            campos or (), funcao, memo.setdefault("campos", {}), colunas
+        ))
+    elif tipo_campos is not None:
+        _, flags = tipo_campos
+        projetar = _ProjecaoRaw(excluir=_COLUNAS_FLAG)
 
-        janela = JanelaCarregando(self.root, f"Gerando arquivos...\n1 de {_total}")
+        def funcao(c, raw):
+            if _raw_flag(raw or {}, *flags):
+                return _estado_campo(c, projetar(raw))
+            return None
+        partes.extend(_contribuicoes(campos_entrada, funcao, memo.setdefault("campos", {})))
 
-        def _runner():
-            gerados       = []
-            erros_geracao = []
-            xmls_preview  = {}
+    if dep["tamanho_layout"]:
+        try:
+            partes.append(max(c["pos_fin"] for c in campos_entrada if c.get("pos_fin")))
+        except (ValueError, TypeError):
+            partes.append(None)
 
-            for key_preview, nome_arq, progresso in _tarefas:
-                if janela.cancelado:
-                    break
-                self.root.after(0, lambda m=f"Gerando:\n{nome_arq}\n\n{progresso}": janela.atualizar(m))
-                try:
-                    if key_preview == "LayoutEntrada":
-                        conteudo = construir_xml(campos_validar, _headers, "Campos Entrada", _sections)
-                    elif key_preview == "LayoutPersistencia":
-                        conteudo = construir_xml_persistencia(_dados, _arquivo)
-                    elif key_preview == "mapaAtributo":
-                        conteudo = construir_xml_mapa_atributo(_dados, _arquivo)
-                    elif key_preview == "DadoExterno":
-                        conteudo = construir_xml_enriquecimento(_dados)
-                    elif key_preview == "ComandoSQL":
-                        conteudo = gerar_comandos_sql(_dados, _arquivo)
-                    else:
-                        # Cópia da planilha — usa salvar_xlsx_estruturado
-                        path_destino = os.path.join(dir_saida, nome_arq)
-                        salvar_xlsx_estruturado(_arquivo, path_destino, _dados)
-                        gerados.append(nome_arq)
-                        continue
+    if dep["abas"]:
+        projetar = _ProjecaoRaw()
+        for nome, info in dados_por_aba.items():
+            n = _norm_aba(nome)
+            if any(n.endswith(sufixo) for sufixo in dep["abas"]):
+                partes.append(nome)
+                partes.extend(_contribuicoes(
+                    info.get("campos", []),
+                    lambda c, raw: _estado_campo(c, projetar(raw)),
+                    memo.setdefault(("aba", nome), {}),
+                ))
 
-                    path = os.path.join(dir_saida, nome_arq)
-                    with open(path, "w", encoding="utf-8") as f:
-                        f.write(conteudo)
-                    gerados.append(nome_arq)
-                    xmls_preview[key_preview] = conteudo
-                except Exception as e:
-                    erros_geracao.append(f"{nome_arq}: {e}")
-
-            cancelado = janela.cancelado
-            self.root.after(0, lambda: _finalizar(gerados, erros_geracao, xmls_preview, cancelado))
-
-        def _finalizar(gerados, erros_geracao, xmls_preview, cancelado):
-            janela.fechar()
-
-            if cancelado:
-                self._set_status("Geração cancelada.")
-                return
-
-            # Atualiza abas de preview
-            for key, conteudo in xmls_preview.items():
-                self._atualizar_tab_xml(key, conteudo)
-
-            linhas_ok  = "\n".join(f"  ✔ {n}" for n in gerados)
-            linhas_err = "\n".join(f"  ✗ {e}" for e in erros_geracao)
-            msg = f"Arquivos gerados em:\n{dir_saida}\n\n{linhas_ok}"
-            if erros_geracao:
-                msg += f"\n\nErros:\n{linhas_err}"
-                messagebox.showwarning("Geração com erros", msg)
-            else:
-                messagebox.showinfo("Sucesso", msg)
+    if dep["auxiliares"]:
+        if sessao is not None:
+            partes.extend(repr(getattr(sessao, aux)) for aux in dep["auxiliares"])
+        elif arquivo:
+            partes.append(_assinatura_arquivo(arquivo))
 
-            if gerados:
-                self._notebook.select(1)
+    return _digest_partes(partes)
 
-            self._set_status(
-                f"{len(gerados)} arquivo(s) gerado(s) em: {os.path.basename(dir_saida)}"
-                + (f"  |  {len(erros_geracao)} erro(s)" if erros_geracao else "")
-            )
 
-        threading.Thread(target=_runner, daemon=True).start()
+class CacheArtefatos:
+    """
+    Último conteúdo de cada artefato, com a assinatura das entradas que o gerou.
+    construir() só chama o gerador quando a assinatura mudou; a assinatura em si
+    só reprocessa os campos alterados desde a última vez (ver assinatura_artefato).
+    Seguro para uso concorrente com chaves distintas (gerar_xml usa threads).
+    """
 
-    # ── Utilidades ────────────────────────────────────────────────────────────
+    def __init__(self):
+        self._itens = {}            # chave → (assinatura, conteúdo)
+        self._memos = {}            # chave → memo de assinatura_artefato
+        self._lock = threading.Lock()
+
+    def construir(self, chave, dados_por_aba, arquivo=None, sessao=None,
+                  campos=None, headers=None, sections=None, layout=None, lote_sql=None):
+        """Retorna (conteúdo, regenerado) — regenerado=False quando veio do cache."""
+        with self._lock:
+            memo = self._memos.setdefault(chave, {})
+            item = self._itens.get(chave)
+        if chave != "ComandoSQL":
+            lote_sql = None         # só o SQL depende do tamanho do lote
+        assinatura = (assinatura_artefato(
+            chave, dados_por_aba, arquivo, sessao, campos, headers, sections, memo=memo
+        ), lote_sql)
+        if item is not None and item[0] == assinatura:
+            return item[1], False
+        conteudo = construir_artefato(
+            chave, dados_por_aba, arquivo, sessao, campos, headers, sections, layout, lote_sql
+        )
+        with self._lock:
+            self._itens[chave] = (assinatura, conteudo)
+        return conteudo, True
 
-    def _set_status(self, msg):
-        self._var_status.set(msg)
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+            self._memos.clear()
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Entry point
 # ─────────────────────────────────────────────────────────────────────────────
 
-def main():
-    root = tk.Tk()
-    try:
-        root.tk.call("tk", "scaling", 1.25)
-    except Exception:
-        pass
-    GeradorXMLApp(root)
-    root.mainloop()
+def main(argv=None):
+    """
+    Sem argumentos: interface gráfica (interface.py). Com subcomando (ex.: gerar):
+    linha de comando (lote.py), sem importar tkinter.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    # Importados aqui: interface e lote importam este módulo
+    if argv:
+        from lote import executar_cli
+        return executar_cli(argv)
+    from interface import executar_interface
+    return executar_interface()
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
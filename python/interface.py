@@ -0,0 +1,2005 @@
+"""
+Gerador de XML a partir de Planilhas Excel/CSV
+Interface Tkinter completa - Python 3.8+
+
+Funcionalidades:
+  - Carregar planilha principal (aba "Campos Entrada")
+  - Carregar planilha origem e copiar campos para a principal
+  - Tabela editável com Campo/PosIni/PosFin/Tamanho/Tipo/Alinhamento/Valor
+  - Validação da soma de tamanhos x posições
+  - Geração de XML com atributos posicionados corretamente
+  - Salvar planilha atualizada de volta em .xlsx ou .csv
+
+Aberta por gerador_xml.py sem argumentos (executar_interface); leitura, validação
+e geradores vêm de gerador_xml.
+"""
+
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from gerador_xml import (
+    AbaPlanilha, ARTEFATOS_EM_PROCESSO, cache_leitura_padrao, CacheArtefatos,
+    DEPENDENCIAS_ARTEFATOS, gerar_artefato, LayoutCompilado, ManifestoSaida,
+    NOME_MANIFESTO, prefixo_artefatos, PREFIXOS_ABA_MAPA_ATRIBUTO,
+    PREFIXOS_ABA_PERSISTENCIA, salvar_csv, salvar_xlsx, salvar_xlsx_estruturado,
+    tarefas_artefatos, ValidacaoIncremental, validar_referencias,
+    _carregar_planilha_worker, _encerrar_pool_processos, _EXTENSOES_PLANILHA,
+    _identificacao_evento, _iniciar_worker_carga, _nome_xml_para_aba, _norm_aba,
+    _normalizar_chave, _raw_flag, _raw_normalizado, _total_campos,
+)
+from lote import ObservadorPlanilhas
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Constantes de cor / estilo
+# ─────────────────────────────────────────────────────────────────────────────
+COR_BG          = "#f4f6f8"
+COR_TOOLBAR     = "#eceff1"
+COR_BTN_VERDE   = "#43a047"
+COR_BTN_AZUL    = "#1e88e5"
+COR_BTN_LARANJA = "#fb8c00"
+COR_BTN_ROXO    = "#8e24aa"
+COR_BTN_CINZA   = "#546e7a"
+COR_BTN_TEAL    = "#00897b"
+COR_BTN_VERM    = "#e53935"
+COR_BRANCO      = "#ffffff"
+FONT_NORMAL     = ("Segoe UI", 9)
+FONT_BOLD       = ("Segoe UI", 9, "bold")
+FONT_MONO       = ("Consolas", 9)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Janela de carregamento (loading)
+# ─────────────────────────────────────────────────────────────────────────────
+
+class JanelaCarregando(tk.Toplevel):
+    """
+    Diálogo modal com barra de progresso exibido durante carregamento.
+    A barra é indeterminada até a primeira chamada de progresso().
+    """
+
+    def __init__(self, parent, mensagem="Carregando planilha..."):
+        super().__init__(parent)
+        self.title("Aguarde")
+        self.resizable(False, False)
+        self.transient(parent)
+        self.protocol("WM_DELETE_WINDOW", lambda: None)  # impede fechar
+
+        self._evento_cancel = threading.Event()
+
+        frm = tk.Frame(self, bg=COR_BG, padx=40, pady=28)
+        frm.pack(fill=tk.BOTH, expand=True)
+
+        tk.Label(frm, text="⏳", bg=COR_BG, font=("Segoe UI", 32)).pack()
+        self._lbl_msg = tk.Label(
+            frm, text=mensagem, bg=COR_BG,
+            font=FONT_BOLD, fg="#333333", wraplength=300, justify=tk.CENTER
+        )
+        self._lbl_msg.pack(pady=(10, 10))
+
+        # Linhas de progresso por item (ex.: um arquivo), exibidas sob demanda
+        self._itens = {}
+        self._lbl_itens = tk.Label(
+            frm, text="", bg=COR_BG,
+            font=FONT_NORMAL, fg="#555555", wraplength=300, justify=tk.LEFT
+        )
+
+        self._bar = ttk.Progressbar(frm, mode="indeterminate", length=280)
+        self._bar.pack()
+        self._bar.start(12)
+
+        self._lbl_timer = tk.Label(
+            frm, text="00:00", bg=COR_BG,
+            font=("Segoe UI", 10), fg="#888888"
+        )
+        self._lbl_timer.pack(pady=(8, 6))
+
+        tk.Button(
+            frm, text="✕  Cancelar",
+            command=self._solicitar_cancelamento,
+            bg="#c62828", fg="white",
+            font=FONT_NORMAL, relief=tk.FLAT,
+            padx=14, pady=5, cursor="hand2"
+        ).pack()
+
+        # Centraliza sobre o parent
+        self.update_idletasks()
+        px = parent.winfo_rootx() + parent.winfo_width() // 2 - self.winfo_width() // 2
+        py = parent.winfo_rooty() + parent.winfo_height() // 2 - self.winfo_height() // 2
+        self.geometry(f"+{px}+{py}")
+
+        self.grab_set()
+
+        self._inicio = time.time()
+        self._timer_id = None
+        self._tick()
+
+    def _tick(self):
+        try:
+            elapsed = int(time.time() - self._inicio)
+            mins, secs = divmod(elapsed, 60)
+            self._lbl_timer.config(text=f"{mins:02d}:{secs:02d}")
+            self._timer_id = self.after(1000, self._tick)
+        except Exception:
+            pass
+
+    def _solicitar_cancelamento(self):
+        self._evento_cancel.set()
+        try:
+            self._lbl_msg.config(text="Cancelando...\nAguarde o passo atual finalizar.")
+        except Exception:
+            pass
+
+    @property
+    def cancelado(self):
+        return self._evento_cancel.is_set()
+
+    def atualizar(self, msg):
+        """Atualiza a mensagem exibida durante o loading."""
+        try:
+            self._lbl_msg.config(text=msg)
+            self.update_idletasks()
+        except Exception:
+            pass
+
+    def progresso(self, atual, total):
+        """Passa a barra para o modo determinado, em atual de total."""
+        try:
+            if str(self._bar.cget("mode")) != "determinate":
+                self._bar.stop()
+                self._bar.config(mode="determinate", maximum=max(total, 1))
+            self._bar.config(value=atual)
+            self.update_idletasks()
+        except Exception:
+            pass
+
+    def atualizar_item(self, chave, texto):
+        """Atualiza (ou cria) a linha de progresso de um item, na ordem em que foram criados."""
+        try:
+            if not self._itens:
+                self._lbl_itens.pack(before=self._bar, pady=(0, 10))
+            self._itens[chave] = texto
+            self._lbl_itens.config(text="\n".join(self._itens.values()))
+            self.update_idletasks()
+        except Exception:
+            pass
+
+    def fechar(self):
+        try:
+            if self._timer_id:
+                self.after_cancel(self._timer_id)
+            self._bar.stop()
+            self.grab_release()
+            self.destroy()
+        except Exception:
+            pass
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Janela de edição de campo (Toplevel)
+# ─────────────────────────────────────────────────────────────────────────────
+
+class JanelaEditarCampo(tk.Toplevel):
+    TIPOS = ["TEXTO", "INTEIRO", "INTEIRO_LONGO", "DECIMAL", "DATA", "DATA_HORA", "HORA", "BOOLEANO"]
+    ALINHAMENTOS = ["", "BRANCO_ESQUERDA", "BRANCO_DIREITA", "ZERO_ESQUERDA", "ZERO_DIREITA"]
+    ENTRADAS = ["S", "N"]
+    OBRIGATORIOS = ["", "S", "N"]
+
+    def __init__(self, parent, campo=None, on_confirmar=None):
+        super().__init__(parent)
+        self.title("Editar Campo" if campo else "Novo Campo")
+        self.resizable(False, False)
+        self.grab_set()
+
+        self.on_confirmar = on_confirmar
+        self.resultado = None
+
+        self._vars = {}
+        self._build_ui(campo or {})
+
+        self.transient(parent)
+        self.wait_window(self)
+
+    def _build_ui(self, campo):
+        pad = {"padx": 8, "pady": 3}
+
+        frame = tk.Frame(self, bg=COR_BG, padx=16, pady=12)
+        frame.pack(fill=tk.BOTH, expand=True)
+
+        linhas = [
+            ("Entrada:",     "entrada",    ttk.Combobox, {"values": self.ENTRADAS, "width": 6}),
+            ("Nome:",        "nome",       tk.Entry,     {"width": 32}),
+            ("Descrição:",   "descricao",  tk.Entry,     {"width": 32}),
+            ("Tipo:",        "tipo",       ttk.Combobox, {"values": self.TIPOS, "width": 18}),
+            ("Tamanho:",     "tamanho",    tk.Entry,     {"width": 10}),
+            ("Pos. Inicial:","pos_ini",    tk.Entry,     {"width": 10}),
+            ("Pos. Final:",  "pos_fin",    tk.Entry,     {"width": 10}),
+            ("Alinhamento:", "alinhamento",ttk.Combobox, {"values": self.ALINHAMENTOS, "width": 20}),
+            ("Obrigatório:", "obrigatorio",ttk.Combobox, {"values": self.OBRIGATORIOS, "width": 6}),
+            ("Valor Padrão:","valor_padrao",tk.Entry,    {"width": 24}),
+            ("Valor (XML):", "valor",      tk.Entry,     {"width": 24}),
+            ("Coluna DB:",   "coluna_db",  tk.Entry,     {"width": 24}),
+        ]
+
+        for i, (label, key, WidgetClass, kw) in enumerate(linhas):
+            tk.Label(frame, text=label, bg=COR_BG, font=FONT_NORMAL,
+                     anchor=tk.W).grid(row=i, column=0, sticky=tk.W, **pad)
+
+            var = tk.StringVar()
+            self._vars[key] = var
+
+            w_kw = dict(kw)
+            if WidgetClass == ttk.Combobox:
+                w = WidgetClass(frame, textvariable=var, **w_kw)
+                w.configure(state="readonly" if key in ("entrada", "tipo", "alinhamento", "obrigatorio") else "normal")
+            else:
+                w = WidgetClass(frame, textvariable=var, font=FONT_NORMAL, **w_kw)
+
+            # Pos Final read-only (calculado)
+            if key == "pos_fin":
+                w.configure(state="readonly")
+
+            w.grid(row=i, column=1, sticky=tk.W, **pad)
+
+        frame.columnconfigure(1, weight=1)
+
+        # Auto-calcular Pos Final
+        for k in ("tamanho", "pos_ini"):
+            self._vars[k].trace_add("write", self._calc_pos_fin)
+
+        # Preenche com valores existentes
+        mapa_default = {"entrada": "S", "tipo": "TEXTO"}
+        for key, var in self._vars.items():
+            val = campo.get(key)
+            if val is not None and str(val).strip():
+                var.set(str(val))
+            elif key in mapa_default:
+                var.set(mapa_default[key])
+
+        # Botões
+        btn_frame = tk.Frame(self, bg=COR_BG, pady=8)
+        btn_frame.pack()
+
+        btn_ok = tk.Button(btn_frame, text="Confirmar", font=FONT_BOLD,
+                           bg=COR_BTN_VERDE, fg=COR_BRANCO, relief=tk.FLAT,
+                           padx=12, pady=4, command=self._confirmar)
+        btn_ok.pack(side=tk.LEFT, padx=6)
+
+        btn_cancel = tk.Button(btn_frame, text="Cancelar", font=FONT_NORMAL,
+                               bg=COR_BTN_CINZA, fg=COR_BRANCO, relief=tk.FLAT,
+                               padx=12, pady=4, command=self.destroy)
+        btn_cancel.pack(side=tk.LEFT, padx=6)
+
+        self.bind("<Return>", lambda e: self._confirmar())
+        self.bind("<Escape>", lambda e: self.destroy())
+
+    def _calc_pos_fin(self, *_):
+        try:
+            pos = int(self._vars["pos_ini"].get())
+            tam = int(self._vars["tamanho"].get())
+            self._vars["pos_fin"].set(str(pos + tam - 1))
+        except ValueError:
+            pass
+
+    def _confirmar(self):
+        nome = self._vars["nome"].get().strip()
+        if not nome:
+            messagebox.showwarning("Aviso", "Nome do campo é obrigatório.", parent=self)
+            return
+
+        try:
+            tamanho = int(self._vars["tamanho"].get()) if self._vars["tamanho"].get() else None
+            pos_ini = int(self._vars["pos_ini"].get()) if self._vars["pos_ini"].get() else None
+        except ValueError:
+            messagebox.showerror("Erro", "Tamanho e Pos. Inicial devem ser números inteiros.", parent=self)
+            return
+
+        self.resultado = {
+            "entrada":    self._vars["entrada"].get() or "S",
+            "nome":       nome,
+            "descricao":  self._vars["descricao"].get().strip(),
+            "tipo":       self._vars["tipo"].get() or "TEXTO",
+            "tamanho":    tamanho,
+            "pos_ini":    pos_ini,
+            "pos_fin":    (pos_ini + tamanho - 1) if (pos_ini and tamanho) else None,
+            "alinhamento":  self._vars["alinhamento"].get(),
+            "obrigatorio":  self._vars["obrigatorio"].get(),
+            "valor_padrao": self._vars["valor_padrao"].get().strip(),
+            "valor":        self._vars["valor"].get(),
+            "coluna_db":    self._vars["coluna_db"].get().strip(),
+        }
+
+        if self.on_confirmar:
+            self.on_confirmar(self.resultado)
+        self.destroy()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Janela de seleção múltipla de campos da origem
+# ─────────────────────────────────────────────────────────────────────────────
+
+class JanelaCopiarCampos(tk.Toplevel):
+    """
+    Diálogo de seleção de campos da planilha origem.
+    Exibe uma aba por sheet (estilo Excel) com Listbox de campos em cada uma.
+    Aceita dados_por_aba: {nome_aba: {"campos": list, "headers": list}}
+    """
+
+    def __init__(self, parent, dados_por_aba, on_confirmar=None):
+        super().__init__(parent)
+        self.title("Copiar Campos da Origem")
+        self.geometry("520x560")
+        self.resizable(True, True)
+        self.minsize(400, 400)
+        self.grab_set()
+        self.transient(parent)
+
+        self._dados_por_aba = dados_por_aba
+        self._aba_ativa = ""
+        self._listboxes: dict = {}          # nome_aba → Listbox
+        self._campos_filtrados: dict = {}   # nome_aba → lista filtrada
+        self.on_confirmar = on_confirmar
+
+        self._build_ui()
+        self.wait_window(self)
+
+    def _build_ui(self):
+        frame = tk.Frame(self, bg=COR_BG, padx=10, pady=10)
+        frame.pack(fill=tk.BOTH, expand=True)
+
+        # Filtro
+        filt_frame = tk.Frame(frame, bg=COR_BG)
+        filt_frame.pack(fill=tk.X, pady=(0, 6))
+        tk.Label(filt_frame, text="🔍 Filtrar:", bg=COR_BG, font=FONT_NORMAL).pack(side=tk.LEFT)
+        self._var_filtro = tk.StringVar()
+        self._var_filtro.trace_add("write", lambda *_: self._filtrar())
+        tk.Entry(filt_frame, textvariable=self._var_filtro, font=FONT_NORMAL, width=28,
+                 relief=tk.FLAT, highlightthickness=1,
+                 highlightbackground="#bbb").pack(side=tk.LEFT, padx=4)
+        tk.Button(filt_frame, text="✕", command=lambda: self._var_filtro.set(""),
+                  bg="#ddd", relief=tk.FLAT, font=FONT_NORMAL).pack(side=tk.LEFT)
+
+        tk.Label(frame, text="Selecione os campos (Ctrl+Click ou Shift+Click para múltiplos):",
+                 bg=COR_BG, font=FONT_NORMAL, anchor=tk.W).pack(fill=tk.X, pady=(0, 4))
+
+        # Notebook com uma aba por sheet
+        self._nb = ttk.Notebook(frame)
+        self._nb.pack(fill=tk.BOTH, expand=True)
+        self._nb.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+
+        for nome_aba, aba_info in self._dados_por_aba.items():
+            tab_frame = tk.Frame(self._nb, bg=COR_BG, padx=4, pady=4)
+            self._nb.add(tab_frame, text=f"  {nome_aba}  ")
+            lb = self._criar_listbox(tab_frame)
+            self._listboxes[nome_aba] = lb
+            self._campos_filtrados[nome_aba] = list(aba_info.get("campos", []))
+
+        # Seleciona a primeira aba
+        nomes = list(self._dados_por_aba.keys())
+        if nomes:
+            self._aba_ativa = nomes[0]
+            self._nb.select(0)
+
+        # Botões de seleção rápida + contador
+        sel_frame = tk.Frame(frame, bg=COR_BG)
+        sel_frame.pack(fill=tk.X, pady=(6, 0))
+        tk.Button(sel_frame, text="Selecionar Todos", command=self._sel_todos,
+                  bg="#eceff1", font=FONT_NORMAL, relief=tk.FLAT).pack(side=tk.LEFT, padx=2)
+        tk.Button(sel_frame, text="Limpar Seleção", command=self._sel_nenhum,
+                  bg="#eceff1", font=FONT_NORMAL, relief=tk.FLAT).pack(side=tk.LEFT, padx=2)
+        self._lbl_sel = tk.Label(sel_frame, text="0 selecionado(s)",
+                                  bg=COR_BG, fg="#555", font=FONT_NORMAL)
+        self._lbl_sel.pack(side=tk.RIGHT)
+
+        # Botões de ação
+        btn_frame = tk.Frame(self, bg=COR_BG, pady=8)
+        btn_frame.pack()
+        self._btn_copiar = tk.Button(btn_frame, text="⬇ Copiar 0 campos", font=FONT_BOLD,
+                                      bg=COR_BTN_LARANJA, fg=COR_BRANCO, relief=tk.FLAT,
+                                      padx=12, pady=4, command=self._confirmar,
+                                      state=tk.DISABLED)
+        self._btn_copiar.pack(side=tk.LEFT, padx=6)
+        tk.Button(btn_frame, text="Cancelar", font=FONT_NORMAL,
+                  bg=COR_BTN_CINZA, fg=COR_BRANCO, relief=tk.FLAT,
+                  padx=12, pady=4, command=self.destroy).pack(side=tk.LEFT, padx=6)
+
+        self.bind("<Escape>", lambda e: self.destroy())
+        self._filtrar()
+
+    def _criar_listbox(self, parent):
+        """Cria e retorna um Listbox com scrollbar dentro do parent."""
+        list_frame = tk.Frame(parent, bg=COR_BG)
+        list_frame.pack(fill=tk.BOTH, expand=True)
+        lb = tk.Listbox(list_frame, selectmode=tk.EXTENDED, font=FONT_NORMAL,
+                        activestyle="dotbox", exportselection=False,
+                        relief=tk.FLAT, highlightthickness=1, highlightbackground="#bbb")
+        vsb = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=lb.yview)
+        lb.configure(yscrollcommand=vsb.set)
+        lb.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        vsb.pack(side=tk.RIGHT, fill=tk.Y)
+        lb.bind("<<ListboxSelect>>", self._on_select)
+        return lb
+
+    def _on_tab_changed(self, _evt=None):
+        """Atualiza aba ativa e reseta o contador de seleção."""
+        nomes = list(self._dados_por_aba.keys())
+        tabs = self._nb.tabs()
+        if not tabs:
+            return
+        idx = self._nb.index("current")
+        if idx < len(nomes):
+            self._aba_ativa = nomes[idx]
+        self._on_select()
+
+    def _get_lb(self):
+        """Retorna o Listbox da aba atualmente selecionada."""
+        return self._listboxes.get(self._aba_ativa)
+
+    def _filtrar(self):
+        """Aplica filtro de texto em todas as abas."""
+        filtro = self._var_filtro.get().lower()
+        for nome_aba, aba_info in self._dados_por_aba.items():
+            campos = aba_info.get("campos", [])
+            filtrados = [
+                c for c in campos
+                if not filtro
+                   or filtro in (c.get("nome") or "").lower()
+                   or filtro in (c.get("descricao") or "").lower()
+            ]
+            self._campos_filtrados[nome_aba] = filtrados
+            lb = self._listboxes.get(nome_aba)
+            if not lb:
+                continue
+            lb.delete(0, tk.END)
+            for c in filtrados:
+                nome   = c.get("nome", "")
+                extras = []
+                if c.get("tipo"):    extras.append(c["tipo"])
+                if c.get("tamanho"): extras.append(f"{c['tamanho']}b")
+                label = f"{nome}  [{', '.join(extras)}]" if extras else nome
+                lb.insert(tk.END, label)
+        self._on_select()
+
+    def _sel_todos(self):
+        lb = self._get_lb()
+        if lb:
+            lb.select_set(0, tk.END)
+        self._on_select()
+
+    def _sel_nenhum(self):
+        lb = self._get_lb()
+        if lb:
+            lb.selection_clear(0, tk.END)
+        self._on_select()
+
+    def _on_select(self, _evt=None):
+        lb = self._get_lb()
+        n = len(lb.curselection()) if lb else 0
+        self._lbl_sel.config(text=f"{n} selecionado(s)")
+        plural = "s" if n != 1 else ""
+        self._btn_copiar.config(
+            text=f"⬇ Copiar {n} campo{plural}",
+            state=tk.NORMAL if n > 0 else tk.DISABLED
+        )
+
+    def _confirmar(self):
+        lb = self._get_lb()
+        if not lb:
+            self.destroy()
+            return
+        indices = lb.curselection()
+        filtrados = self._campos_filtrados.get(self._aba_ativa, [])
+        resultado = [filtrados[i] for i in indices]
+        if self.on_confirmar:
+            self.on_confirmar(resultado)
+        self.destroy()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Aplicação principal
+# ─────────────────────────────────────────────────────────────────────────────
+
+class GeradorXMLApp:
+
+    # ── Inicialização ────────────────────────────────────────────────────────
+
+    def __init__(self, root):
+        self.root = root
+        self.root.title("Gerador de XML — Planilhas de Eventos")
+        self.root.geometry("1280x820")
+        self.root.configure(bg=COR_BG)
+        self.root.minsize(900, 600)
+
+        self._campos: list = []             # campos da aba ativa
+        self._dados_por_aba: dict = {}      # nome_aba → {"campos": list, "headers": list, "sections": dict}
+        self._aba_ativa: str = ""           # aba atualmente exibida
+        self._headers_ativos: list = []     # headers da aba ativa (ordem original da planilha)
+        self._sections_ativos: dict = {}    # seções de metadados da aba ativa (para construir_xml)
+        self._dados_por_aba_origem: dict = {}  # nome_aba → {"campos": list, "headers": list, "sections": dict}
+        self._arquivo_principal = None
+        self._sessao = None                 # SessaoPlanilha da planilha principal
+        self._artefatos = CacheArtefatos()  # último conteúdo de cada XML/SQL (regeneração incremental)
+        self._validacoes: dict = {}         # id(lista de campos) → ValidacaoIncremental
+        self._validacao_exibida = False     # painel Validação acompanha as edições após o 1º F5
+        self._referencias = None            # (erros, avisos, infos) de validar_referencias no último F5
+        self._arquivo_origem = None
+        self._path_principal_pendente = None   # selecionado mas ainda não carregado
+        self._path_origem_pendente    = None
+        self._idx_editando = -1             # índice do campo sendo editado
+        self._var_observar = tk.BooleanVar(value=False)
+        self._var_cache_leitura = tk.BooleanVar(value=True)    # Ferramentas → Usar Cache de Leitura
+        self._observacao = None             # threading.Event que encerra o ObservadorPlanilhas
+
+        # Widgets do notebook de abas (criados em _build_tabela)
+        self._nb_abas = None                # ttk.Notebook da planilha principal
+        self._trees_abas: dict = {}         # nome_aba → Treeview (criada na 1ª seleção)
+        self._frames_abas: dict = {}        # nome_aba → Frame do notebook
+        self._tree = None                   # Treeview da aba atualmente ativa
+        self._ignorar_tab_change = False    # evita recursão ao selecionar aba
+
+        # Widgets de preview XML (criados em _build_painel_direito)
+        self._txt_xmls: dict = {}           # key → tk.Text  (LayoutEntrada, LayoutPersistencia, mapaAtributo, DadoExterno)
+        self._txt_xml  = None               # alias para _txt_xmls["LayoutEntrada"] (compatibilidade)
+        self._conteudo_preview: dict = {}   # key → conteúdo exibido em _txt_xmls[key]
+
+        self._setup_estilos()
+        self._build_ui()
+        self._bind_atalhos()
+
+    def _setup_estilos(self):
+        s = ttk.Style()
+        s.theme_use("clam")
+        s.configure("Treeview", rowheight=24, font=FONT_NORMAL, background=COR_BRANCO)
+        s.configure("Treeview.Heading", font=FONT_BOLD)
+        s.map("Treeview", background=[("selected", "#bbdefb")])
+
+    # ── Construção da UI ─────────────────────────────────────────────────────
+
+    def _build_ui(self):
+        self._build_menubar()
+        self._build_toolbar()
+        self._build_conteudo()
+        self._build_statusbar()
+
+    def _build_menubar(self):
+        mb = tk.Menu(self.root)
+        self.root.config(menu=mb)
+
+        m_arq = tk.Menu(mb, tearoff=0)
+        m_arq.add_command(label="Selecionar Principal...  Ctrl+O", command=self.selecionar_principal)
+        m_arq.add_command(label="Selecionar Origem...",            command=self.selecionar_origem)
+        m_arq.add_command(label="Carregar Planilhas",              command=self.carregar_planilhas)
+        m_arq.add_separator()
+        m_arq.add_command(label="Salvar Planilha  Ctrl+S",        command=self.salvar_planilha)
+        m_arq.add_separator()
+        m_arq.add_command(label="Sair",                           command=self.root.quit)
+        mb.add_cascade(label="Arquivo", menu=m_arq)
+
+        m_fer = tk.Menu(mb, tearoff=0)
+        m_fer.add_command(label="Validar Soma  F5",               command=self.validar)
+        m_fer.add_command(label="Recalcular Posições",            command=self.recalcular_posicoes)
+        m_fer.add_separator()
+        m_fer.add_command(label="Gerar XMLs (todos)  F6",         command=self.gerar_xml)
+        m_fer.add_command(label="Pré-visualizar XML  F7",         command=self.preview_xml)
+        m_fer.add_checkbutton(label="Observar Planilha (regenerar ao salvar)",
+                              variable=self._var_observar, command=self.alternar_observacao)
+        m_fer.add_separator()
+        m_fer.add_checkbutton(label="Usar Cache de Leitura",      variable=self._var_cache_leitura)
+        m_fer.add_command(label="Limpar Cache de Leitura",        command=self.limpar_cache_leitura)
+        mb.add_cascade(label="Ferramentas", menu=m_fer)
+
+    def _btn(self, parent, text, command, bg, **pack_kw):
+        b = tk.Button(parent, text=text, command=command, bg=bg,
+                      fg=COR_BRANCO, relief=tk.FLAT, font=FONT_NORMAL,
+                      padx=9, pady=4, cursor="hand2",
+                      activebackground=bg, activeforeground=COR_BRANCO)
+        b.pack(**pack_kw)
+        return b
+
+    def _build_toolbar(self):
+        bar = tk.Frame(self.root, bg=COR_TOOLBAR, pady=5)
+        bar.pack(fill=tk.X)
+
+        # ── Planilha principal ───────────────────────────────────────────────
+        frp = tk.LabelFrame(bar, text="Planilha Principal", bg=COR_TOOLBAR,
+                            font=FONT_NORMAL, padx=4, pady=2)
+        frp.pack(side=tk.LEFT, padx=8)
+
+        self._btn(frp, "📂 Selecionar Principal", self.selecionar_principal,
+                  COR_BTN_VERDE, side=tk.LEFT, padx=2)
+        self._lbl_principal = tk.Label(frp, text="—", bg=COR_TOOLBAR,
+                                       fg="#555", font=("Segoe UI", 8))
+        self._lbl_principal.pack(side=tk.LEFT, padx=6)
+
+        # ── Planilha origem ──────────────────────────────────────────────────
+        fro = tk.LabelFrame(bar, text="Planilha Origem", bg=COR_TOOLBAR,
+                            font=FONT_NORMAL, padx=4, pady=2)
+        fro.pack(side=tk.LEFT, padx=4)
+
+        self._btn(fro, "📂 Selecionar Origem", self.selecionar_origem,
+                  COR_BTN_AZUL, side=tk.LEFT, padx=2)
+        self._lbl_origem = tk.Label(fro, text="—", bg=COR_TOOLBAR,
+                                    fg="#555", font=("Segoe UI", 8))
+        self._lbl_origem.pack(side=tk.LEFT, padx=6)
+
+        # ── Carregar (dispara o loading de todas as planilhas selecionadas) ──
+        frl = tk.Frame(bar, bg=COR_TOOLBAR)
+        frl.pack(side=tk.LEFT, padx=6)
+        self._btn_carregar = self._btn(
+            frl, "⬇ Carregar Planilhas", self.carregar_planilhas,
+            COR_BTN_VERDE, side=tk.LEFT, padx=2
+        )
+        self._btn_carregar.configure(state=tk.DISABLED)
+
+        # ── Copiar campos ─────────────────────────────────────────────────────
+        frc = tk.LabelFrame(bar, text="Copiar Campos da Origem", bg=COR_TOOLBAR,
+                            font=FONT_NORMAL, padx=4, pady=2)
+        frc.pack(side=tk.LEFT, padx=4)
+
+        self._btn_copiar_origem = self._btn(frc, "⬇ Copiar Campos...", self.copiar_campo,
+                  COR_BTN_LARANJA, side=tk.LEFT, padx=2)
+        self._btn_copiar_origem.configure(state=tk.DISABLED)
+
+        # ── Ações ────────────────────────────────────────────────────────────
+        fra = tk.Frame(bar, bg=COR_TOOLBAR)
+        fra.pack(side=tk.RIGHT, padx=8)
+
+        self._btn(fra, "📄 Gerar XMLs [F6]",       self.gerar_xml,         COR_BTN_ROXO,  side=tk.RIGHT, padx=2)
+        self._btn(fra, "👁 Preview XML [F7]",      self.preview_xml,       COR_BTN_CINZA, side=tk.RIGHT, padx=2)
+        self._btn(fra, "✔ Validar [F5]",           self.validar,           COR_BTN_CINZA, side=tk.RIGHT, padx=2)
+        self._btn(fra, "💾 Salvar Planilha",        self.salvar_planilha,   COR_BTN_TEAL,  side=tk.RIGHT, padx=2)
+
+    def _build_conteudo(self):
+        paned = tk.PanedWindow(self.root, orient=tk.HORIZONTAL,
+                               sashwidth=6, bg="#cfd8dc")
+        paned.pack(fill=tk.BOTH, expand=True, padx=6, pady=4)
+
+        # ── Esquerda: tabela ─────────────────────────────────────────────────
+        frame_esq = tk.Frame(paned, bg=COR_BG)
+        paned.add(frame_esq, width=810)
+        self._build_tabela(frame_esq)
+
+        # ── Direita: detalhes / validação / XML ──────────────────────────────
+        frame_dir = tk.Frame(paned, bg=COR_BG)
+        paned.add(frame_dir, width=400)
+        self._build_painel_direito(frame_dir)
+
+    def _build_tabela(self, parent):
+        # Barra de filtro
+        filt = tk.Frame(parent, bg=COR_BG)
+        filt.pack(fill=tk.X, pady=(2, 4))
+
+        tk.Label(filt, text="🔍 Filtrar:", bg=COR_BG, font=FONT_NORMAL).pack(side=tk.LEFT)
+        self._var_filtro = tk.StringVar()
+        self._var_filtro.trace_add("write", lambda *_: self._atualizar_tabela())
+        tk.Entry(filt, textvariable=self._var_filtro, font=FONT_NORMAL, width=28,
+                 relief=tk.FLAT, highlightthickness=1,
+                 highlightbackground="#bbb").pack(side=tk.LEFT, padx=4)
+        tk.Button(filt, text="✕", command=lambda: self._var_filtro.set(""),
+                  bg="#ddd", relief=tk.FLAT, font=FONT_NORMAL).pack(side=tk.LEFT)
+
+        # Notebook de abas (uma por planilha)
+        self._nb_abas = ttk.Notebook(parent)
+        self._nb_abas.pack(fill=tk.BOTH, expand=True)
+        self._nb_abas.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+
+        # Barra de ações da tabela
+        bbar = tk.Frame(parent, bg=COR_BG, pady=4)
+        bbar.pack(fill=tk.X)
+
+        self._btn(bbar, "+ Novo",       self.novo_campo,       COR_BTN_VERDE,  side=tk.LEFT, padx=2)
+        self._btn(bbar, "✎ Editar",    self.editar_campo,     COR_BTN_AZUL,   side=tk.LEFT, padx=2)
+        self._btn(bbar, "🗑 Remover",   self.remover_campo,    COR_BTN_VERM,   side=tk.LEFT, padx=2)
+        self._btn(bbar, "⟳ Recalcular",self.recalcular_posicoes, COR_BTN_LARANJA, side=tk.LEFT, padx=2)
+
+        self._lbl_count = tk.Label(bbar, text="0 campos", bg=COR_BG,
+                                   fg="#555", font=FONT_NORMAL)
+        self._lbl_count.pack(side=tk.RIGHT, padx=8)
+
+    def _build_painel_direito(self, parent):
+        nb = ttk.Notebook(parent)
+        nb.pack(fill=tk.BOTH, expand=True)
+
+        # Aba Validação
+        frv = tk.Frame(nb, bg=COR_BG, padx=4, pady=4)
+        nb.add(frv, text="  Validação  ")
+        self._build_aba_validacao(frv)
+
+        # Abas de XML Preview — uma por tipo de XML gerado
+        _XML_ABAS = [
+            ("LayoutEntrada",      "  LayoutEntrada  "),
+            ("LayoutPersistencia", "  LayoutPersistencia  "),
+            ("mapaAtributo",       "  mapaAtributo  "),
+            ("DadoExterno",        "  DadoExterno  "),
+            ("ComandoSQL",         "  ComandoSQL  "),
+        ]
+        for key, label in _XML_ABAS:
+            frx = tk.Frame(nb, bg=COR_BG, padx=4, pady=4)
+            nb.add(frx, text=label)
+            self._txt_xmls[key] = self._build_xml_tab(frx, key)
+
+        # Alias de compatibilidade
+        self._txt_xml = self._txt_xmls["LayoutEntrada"]
+        self._notebook = nb
+
+    def _build_aba_validacao(self, parent):
+        self._btn(parent, "▶ Validar Agora [F5]", self.validar,
+                  COR_BTN_CINZA, anchor=tk.NW, pady=(0, 6))
+
+        self._txt_val = tk.Text(parent, font=FONT_MONO, wrap=tk.WORD,
+                                state=tk.DISABLED, bg="#fafafa",
+                                relief=tk.FLAT, highlightthickness=1,
+                                highlightbackground="#ccc")
+        vsb = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self._txt_val.yview)
+        self._txt_val.configure(yscrollcommand=vsb.set)
+
+        self._txt_val.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        vsb.pack(side=tk.RIGHT, fill=tk.Y)
+
+        # Tags de cor para o texto
+        self._txt_val.tag_configure("ok",     foreground="#2e7d32", font=FONT_BOLD)
+        self._txt_val.tag_configure("erro",   foreground="#c62828", font=FONT_BOLD)
+        self._txt_val.tag_configure("aviso",  foreground="#e65100")
+        self._txt_val.tag_configure("info",   foreground="#1565c0")
+        self._txt_val.tag_configure("titulo", font=FONT_BOLD)
+
+    def _build_xml_tab(self, parent, key):
+        """Cria aba de preview XML com botão de atualização. Retorna o widget Text."""
+        self._btn(parent, "🔄 Atualizar Preview", self._preview_todas_abas,
+                  COR_BTN_ROXO, anchor=tk.NW, pady=(0, 6))
+
+        frm = tk.Frame(parent)
+        frm.pack(fill=tk.BOTH, expand=True)
+
+        txt = tk.Text(frm, font=FONT_MONO, wrap=tk.NONE,
+                      bg="#1e1e1e", fg="#d4d4d4",
+                      insertbackground="white",
+                      relief=tk.FLAT)
+        vsb = ttk.Scrollbar(frm, orient=tk.VERTICAL,   command=txt.yview)
+        hsb = ttk.Scrollbar(frm, orient=tk.HORIZONTAL, command=txt.xview)
+        txt.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
+
+        txt.grid(row=0, column=0, sticky="nsew")
+        vsb.grid(row=0, column=1, sticky="ns")
+        hsb.grid(row=1, column=0, sticky="ew")
+        frm.rowconfigure(0, weight=1)
+        frm.columnconfigure(0, weight=1)
+
+        txt.tag_configure("tag",   foreground="#569cd6")
+        txt.tag_configure("attr",  foreground="#9cdcfe")
+        txt.tag_configure("value", foreground="#ce9178")
+        return txt
+
+    def _build_statusbar(self):
+        bar = tk.Frame(self.root, bg="#37474f", height=26)
+        bar.pack(fill=tk.X, side=tk.BOTTOM)
+        bar.pack_propagate(False)
+
+        self._var_status = tk.StringVar(value="Pronto. Carregue uma planilha para começar.")
+        tk.Label(bar, textvariable=self._var_status, bg="#37474f", fg=COR_BRANCO,
+                 font=FONT_NORMAL, anchor=tk.W, padx=10).pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+        self._var_total = tk.StringVar()
+        tk.Label(bar, textvariable=self._var_total, bg="#37474f", fg="#90a4ae",
+                 font=FONT_NORMAL, padx=10).pack(side=tk.RIGHT)
+
+    # ── Atalhos ──────────────────────────────────────────────────────────────
+
+    def _bind_atalhos(self):
+        self.root.bind("<Control-o>", lambda _: self.selecionar_principal())
+        self.root.bind("<Control-s>", lambda _: self.salvar_planilha())
+        self.root.bind("<F5>",        lambda _: self.validar())
+        self.root.bind("<F6>",        lambda _: self.gerar_xml())
+        self.root.bind("<F7>",        lambda _: self.preview_xml())
+        self.root.bind("<Delete>",    lambda _: self.remover_campo())
+
+    # ── Carregar planilhas ────────────────────────────────────────────────────
+
+    def _executar_em_thread(self, tarefa, on_sucesso, on_erro, mensagem="Carregando..."):
+        """
+        Executa `tarefa()` em thread separada enquanto exibe JanelaCarregando.
+        Chama on_sucesso(resultado) ou on_erro(excecao) na thread principal via after().
+        """
+        janela = JanelaCarregando(self.root, mensagem)
+
+        def _runner():
+            try:
+                resultado = tarefa()
+                self.root.after(0, lambda: _finalizar(resultado, None))
+            except Exception as exc:
+                self.root.after(0, lambda e=exc: _finalizar(None, e))
+
+        def _finalizar(resultado, erro):
+            janela.fechar()
+            if erro:
+                on_erro(erro)
+            else:
+                on_sucesso(resultado)
+
+        threading.Thread(target=_runner, daemon=True).start()
+
+    def selecionar_principal(self):
+        """Abre diálogo de seleção — apenas armazena o caminho, não carrega ainda."""
+        path = filedialog.askopenfilename(
+            title="Selecionar Planilha Principal",
+            filetypes=[("Excel/CSV", "*.xlsx *.xls *.csv"), ("Todos", "*.*")]
+        )
+        if not path:
+            return
+        self._path_principal_pendente = path
+        nome = os.path.basename(path)
+        self._lbl_principal.config(text=f"● {nome}", fg="#e65100")
+        self._btn_carregar.configure(state=tk.NORMAL)
+        self._set_status(f"Principal selecionada: {nome}  —  clique em 'Carregar Planilhas' para carregar.")
+
+    def selecionar_origem(self):
+        """Abre diálogo de seleção — apenas armazena o caminho, não carrega ainda."""
+        path = filedialog.askopenfilename(
+            title="Selecionar Planilha Origem",
+            filetypes=[("Excel/CSV", "*.xlsx *.xls *.csv"), ("Todos", "*.*")]
+        )
+        if not path:
+            return
+        self._path_origem_pendente = path
+        nome = os.path.basename(path)
+        self._lbl_origem.config(text=f"● {nome}", fg="#e65100")
+        self._btn_carregar.configure(state=tk.NORMAL)
+        self._set_status(f"Origem selecionada: {nome}  —  clique em 'Carregar Planilhas' para carregar.")
+
+    def _aplicar_principal(self, sessao):
+        """Aplica os dados da planilha principal já carregados na UI."""
+        path, dados = sessao.filepath, sessao.dados_por_aba
+        self._sessao = sessao
+        self._dados_por_aba = dados
+        self._arquivo_principal = path
+        self._artefatos.limpar()
+        self._validacoes.clear()
+        self._validacao_exibida = False
+        self._referencias = None
+        self._parar_observacao()
+        nomes = list(dados.keys())
+        aba_padrao = next(
+            (n for n in nomes if _normalizar_chave(n) in ("camposentrada",)),
+            nomes[0]
+        )
+        self._reconstruir_abas_principal(dados, aba_padrao)
+        nome = os.path.basename(path)
+        self._lbl_principal.config(text=nome, fg="#1565c0")
+        total, aproximado = _total_campos(dados)
+        self._set_status(
+            f"Principal carregada: {nome}  —  {len(dados)} aba(s), {'~' if aproximado else ''}{total} campos"
+        )
+
+    def _aplicar_origem(self, path, dados):
+        """Aplica os dados da planilha origem já carregados na UI."""
+        self._dados_por_aba_origem = dados
+        self._arquivo_origem = path
+        self._btn_copiar_origem.configure(state=tk.NORMAL)
+        nome = os.path.basename(path)
+        self._lbl_origem.config(text=nome, fg="#2e7d32")
+        total = sum(len(v["campos"]) for v in dados.values())
+        self._set_status(
+            f"Origem carregada: {nome}  —  {len(dados)} aba(s), {total} campos disponíveis"
+        )
+
+    def carregar_planilhas(self):
+        """
+        Carrega ao mesmo tempo, cada uma em um processo, todas as planilhas com
+        seleção pendente. Se cancelado, os processos são terminados
+        (_encerrar_pool_processos) e nada é aplicado.
+        """
+        arquivos = []
+        if self._path_principal_pendente:
+            arquivos.append(("principal", self._path_principal_pendente))
+        if self._path_origem_pendente:
+            arquivos.append(("origem", self._path_origem_pendente))
+
+        if not arquivos:
+            messagebox.showwarning("Aviso", "Selecione pelo menos uma planilha antes de carregar.")
+            return
+
+        total = len(arquivos)
+        usar_cache = self._var_cache_leitura.get()     # lido aqui: tkinter só na thread principal
+        janela = JanelaCarregando(
+            self.root, "Carregando planilha..." if total == 1 else f"Carregando {total} planilhas..."
+        )
+        for tipo, path in arquivos:
+            janela.atualizar_item(tipo, f"{tipo.capitalize()}: {os.path.basename(path)} — iniciando")
+
+        def _item(tipo, texto):
+            nome = os.path.basename(dict(arquivos)[tipo])
+            self.root.after(0, lambda: janela.atualizar_item(tipo, f"{tipo.capitalize()}: {nome} — {texto}"))
+
+        def _repassar_progresso(fila):
+            # Só a última mensagem de cada arquivo interessa
+            ultimos = {}
+            while True:
+                try:
+                    tipo, concluidas, total_abas, nome_aba = fila.get_nowait()
+                except queue.Empty:
+                    break
+                ultimos[tipo] = f"aba {concluidas + 1} de {total_abas} ({nome_aba})"
+            for tipo, texto in ultimos.items():
+                _item(tipo, texto)
+
+        def _runner():
+            resultados = {}
+            erro_info  = None
+            fila = multiprocessing.Queue()
+            pool = ProcessPoolExecutor(
+                max_workers=total, initializer=_iniciar_worker_carga, initargs=(fila,)
+            )
+            try:
+                futuros = {
+                    pool.submit(_carregar_planilha_worker, tipo, path, usar_cache): (tipo, path)
+                    for tipo, path in arquivos
+                }
+                pendentes = set(futuros)
+                while pendentes and not janela.cancelado:
+                    concluidos, pendentes = wait(pendentes, timeout=0.2, return_when=FIRST_COMPLETED)
+                    _repassar_progresso(fila)
+                    for futuro in concluidos:
+                        tipo, path = futuros[futuro]
+                        try:
+                            resultados[tipo] = (path, futuro.result())
+                            _item(tipo, "concluído")
+                        except Exception as e:
+                            if erro_info is None:
+                                erro_info = (tipo, path, e)
+                            _item(tipo, "erro")
+            except Exception as e:
+                # Falha do próprio pool (ex.: não foi possível criar os processos)
+                tipo, path = arquivos[0]
+                erro_info = erro_info or (tipo, path, e)
+            finally:
+                # Cancelado: termina os processos em andamento — o resultado é descartado
+                if janela.cancelado:
+                    _encerrar_pool_processos(pool)
+                else:
+                    pool.shutdown(wait=True)
+                fila.close()
+            cancelado = janela.cancelado
+            self.root.after(0, lambda: _finalizar(resultados, erro_info, cancelado))
+
+        def _finalizar(resultados, erro, cancelado):
+            janela.fechar()
+
+            if cancelado:
+                # Rollback: nenhum dado é aplicado — estado anterior preservado
+                self._set_status("Carregamento cancelado — nenhuma alteração aplicada.")
+                return
+
+            if erro:
+                tipo, path, exc = erro
+                messagebox.showerror(
+                    "Erro ao carregar",
+                    f"{os.path.basename(path)}:\n{exc}"
+                )
+
+            if "principal" in resultados:
+                path, sessao = resultados["principal"]
+                if not sessao.dados_por_aba:
+                    messagebox.showwarning(
+                        "Aviso",
+                        f"{os.path.basename(path)}: nenhuma aba com campos detectada."
+                    )
+                else:
+                    self._aplicar_principal(sessao)
+                    self._path_principal_pendente = None
+
+            if "origem" in resultados:
+                path, dados = resultados["origem"]
+                self._aplicar_origem(path, dados)
+                self._path_origem_pendente = None
+
+            # Desabilita "Carregar" se não há mais nada pendente
+            if not self._path_principal_pendente and not self._path_origem_pendente:
+                self._btn_carregar.configure(state=tk.DISABLED)
+
+            # Mensagem final consolidada na status bar
+            partes = []
+            if "principal" in resultados and resultados["principal"][1].dados_por_aba:
+                partes.append(f"Principal: {os.path.basename(resultados['principal'][0])}")
+            if "origem" in resultados:
+                partes.append(f"Origem: {os.path.basename(resultados['origem'][0])}")
+            if partes:
+                self._set_status("Carregadas — " + "  |  ".join(partes))
+
+        threading.Thread(target=_runner, daemon=True).start()
+
+    # ── Abas estilo Excel (notebook) ──────────────────────────────────────────
+
+    def _criar_tree_aba(self, parent, headers):
+        """Cria um Treeview com as colunas originais da aba e retorna o widget."""
+        cols = headers if headers else ["NomeCampo"]
+
+        wrap = tk.Frame(parent, bg=COR_BG)
+        wrap.pack(fill=tk.BOTH, expand=True)
+
+        tree = ttk.Treeview(wrap, columns=cols, show="headings", selectmode="browse")
+        for col in cols:
+            tree.heading(col, text=col)
+            tree.column(col, width=120, anchor=tk.W, minwidth=50)
+
+        vsb = ttk.Scrollbar(wrap, orient=tk.VERTICAL,   command=tree.yview)
+        hsb = ttk.Scrollbar(wrap, orient=tk.HORIZONTAL, command=tree.xview)
+        tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
+
+        tree.grid(row=0, column=0, sticky="nsew")
+        vsb.grid(row=0, column=1, sticky="ns")
+        hsb.grid(row=1, column=0, sticky="ew")
+        wrap.rowconfigure(0, weight=1)
+        wrap.columnconfigure(0, weight=1)
+
+        tree.tag_configure("par",   background="#f5f9ff")
+        tree.tag_configure("impar", background=COR_BRANCO)
+        tree.tag_configure("erro",  background="#ffebee")
+        tree.tag_configure("aviso", background="#fff8e1")
+
+        tree.bind("<<TreeviewSelect>>", self._on_selecionar)
+        tree.bind("<Double-1>",         self._on_duplo_clique)
+
+        return tree
+
+    def _reconstruir_abas_principal(self, dados, aba_padrao):
+        """
+        Recria as abas do Notebook. Só os frames são criados aqui: a Treeview de
+        cada aba é montada (e, na leitura sob demanda, os campos são lidos) quando
+        a aba é selecionada pela primeira vez — ver _garantir_tree_aba.
+        """
+        self._ignorar_tab_change = True
+
+        # Limpa abas e trees anteriores
+        for tab in self._nb_abas.tabs():
+            self._nb_abas.forget(tab)
+        self._trees_abas.clear()
+        self._frames_abas.clear()
+
+        nomes = list(dados.keys())
+        for nome_aba in nomes:
+            frame = tk.Frame(self._nb_abas, bg=COR_BG)
+            self._nb_abas.add(frame, text=f"  {nome_aba}  ")
+            self._frames_abas[nome_aba] = frame
+
+        # Seleciona a aba padrão
+        idx_padrao = nomes.index(aba_padrao) if aba_padrao in nomes else 0
+        self._ignorar_tab_change = False
+        self._nb_abas.select(idx_padrao)
+        # Dispara manualmente (select pode não disparar evento se já estava naquele tab)
+        self._on_tab_changed()
+
+    def _on_tab_changed(self, _evt=None):
+        """Chamado quando o usuário clica em outra aba do notebook."""
+        if self._ignorar_tab_change or not self._nb_abas.tabs():
+            return
+        idx = self._nb_abas.index("current")
+        nomes = list(self._dados_por_aba.keys())
+        if idx >= len(nomes):
+            return
+        nome_aba = nomes[idx]
+        aba = self._dados_por_aba.get(nome_aba, {})
+        try:
+            if isinstance(aba, AbaPlanilha) and not aba.carregada:
+                self._set_status(f"Lendo aba {nome_aba}...")
+                self.root.config(cursor="watch")
+                self.root.update_idletasks()
+            campos = aba.get("campos", [])
+        except Exception as e:
+            messagebox.showerror("Erro ao ler aba", f"{nome_aba}:\n{e}")
+            return
+        finally:
+            self.root.config(cursor="")
+        self._aba_ativa = nome_aba
+        self._campos = campos
+        self._headers_ativos = aba.get("headers", [])
+        self._sections_ativos = aba.get("sections", {})
+        nova = nome_aba not in self._trees_abas
+        self._tree = self._garantir_tree_aba(nome_aba)
+        if nova:
+            self._atualizar_tabela()    # popula a Treeview recém-criada
+        else:
+            self._lbl_count.config(text=f"{len(self._campos)} campos")
+            self._atualizar_total()
+        nome_xml = _nome_xml_para_aba(nome_aba)
+        self._set_status(f"Aba: {nome_aba}  ({len(self._campos)} campos)  →  {nome_xml}")
+
+    def _garantir_tree_aba(self, nome_aba):
+        """Retorna a Treeview da aba, criando-a (vazia) na primeira seleção."""
+        tree = self._trees_abas.get(nome_aba)
+        if tree is None and nome_aba in self._frames_abas:
+            headers = self._dados_por_aba[nome_aba].get("headers", [])
+            tree = self._criar_tree_aba(self._frames_abas[nome_aba], headers)
+            self._trees_abas[nome_aba] = tree
+        return tree
+
+    def _mudar_aba(self, nome_aba):
+        """Seleciona a aba pelo nome (usado internamente)."""
+        nomes = list(self._dados_por_aba.keys())
+        if nome_aba in nomes:
+            self._nb_abas.select(nomes.index(nome_aba))
+            self._on_tab_changed()
+
+    # ── Copiar campo da origem ────────────────────────────────────────────────
+
+    def copiar_campo(self):
+        if not self._dados_por_aba_origem:
+            messagebox.showwarning("Aviso", "Carregue a planilha origem primeiro.")
+            return
+
+        def _processar(campos_selecionados):
+            if not campos_selecionados:
+                return
+
+            # ── Separar novos × duplicatas (rápido, main thread) ─────────────────
+            novos, duplicatas = [], []
+            for orig in campos_selecionados:
+                nome = orig.get("nome", "")
+                existente = next((c for c in self._campos if c.get("nome") == nome), None)
+                if existente:
+                    duplicatas.append((existente, orig))
+                else:
+                    novos.append(orig)
+
+            # ── Pergunta sobre duplicatas ANTES de entrar na thread ───────────────
+            atualizar_dup = False
+            if duplicatas:
+                nomes_dup = "\n".join(f"  • {e.get('nome')}" for e, _ in duplicatas)
+                atualizar_dup = messagebox.askyesno(
+                    "Campos já existem",
+                    f"Os seguintes campos já existem na planilha principal:\n{nomes_dup}\n\n"
+                    "Deseja atualizar os atributos deles (tipo, tamanho, alinhamento etc.)?"
+                )
+
+            total = len(novos) + (len(duplicatas) if atualizar_dup else 0)
+            if total == 0 and not novos:
+                return
+
+            janela = JanelaCarregando(
+                self.root,
+                f"Copiando campos...\n0 de {len(novos)}"
+            )
+
+            def _runner():
+                # ── Índices de dados específicos da origem ────────────────────────
+                pers_idx = {}
+                mapa_idx = {}
+                for nome_aba, info in self._dados_por_aba_origem.items():
+                    n_aba = _norm_aba(nome_aba)
+                    for idx, patts in [(pers_idx, PREFIXOS_ABA_PERSISTENCIA),
+                                       (mapa_idx, PREFIXOS_ABA_MAPA_ATRIBUTO)]:
+                        if any(n_aba.startswith(p) for p in patts):
+                            for c in info.get("campos", []):
+                                raw_p = c.get("_raw", {})
+                                rn_p  = _raw_normalizado(raw_p)
+                                nc = rn_p.get("nomecampo", "") or c.get("nome", "")
+                                if nc:
+                                    idx.setdefault(_norm_aba(nc), raw_p)
+                            break
+
+                # ── NomeTabela do arquivo principal ───────────────────────────────
+                id_evt_principal = _identificacao_evento(self._arquivo_principal, self._sessao)
+                id_norm_principal = {_norm_aba(k): v for k, v in id_evt_principal.items()}
+                nome_tabela_principal = id_norm_principal.get("nometabela", "")
+
+                # ── Helpers ──────────────────────────────────────────────────────
+                def _id_reservado(v):
+                    return (1000 <= v < 2000) or (20000 <= v <= 21000)
+
+                def _set_raw(raw, val, std_key, *norm_alts):
+                    for k in list(raw.keys()):
+                        if _norm_aba(k) in norm_alts:
+                            raw[k] = str(val)
+                            return
+                    raw[std_key] = str(val)
+
+                _SKIP_MERGE = {
+                    "persistencia", "persistência",
+                    "mapaatributo",
+                    "posicaoinicial", "posinicial",
+                    "posicaofinal", "posfinal",
+                    "identificadorcampo",
+                }
+
+                def _mesclar_persistencia(raw, nome_campo):
+                    pers_raw = pers_idx.get(_norm_aba(nome_campo), {})
+                    for k, v in pers_raw.items():
+                        if _norm_aba(k) not in _SKIP_MERGE:
+                            raw.setdefault(k, v)
+                    if nome_tabela_principal:
+                        _set_raw(raw, nome_tabela_principal, "NomeTabela", "nometabela")
+
+                def _mesclar_mapa(raw, nome_campo):
+                    mapa_raw = mapa_idx.get(_norm_aba(nome_campo), {})
+                    for k, v in mapa_raw.items():
+                        if _norm_aba(k) not in _SKIP_MERGE:
+                            raw.setdefault(k, v)
+
+                # ── Próximo IdentificadorCampo sequencial ─────────────────────────
+                used_ids = []
+                for c in self._campos:
+                    try:
+                        v = int(float(c.get("id", "")))
+                        if not _id_reservado(v):
+                            used_ids.append(v)
+                    except (ValueError, TypeError):
+                        pass
+                next_id = (max(used_ids) + 1) if used_ids else 1
+
+                # ── Processar campos novos ────────────────────────────────────────
+                campos_adicionados = []
+                for i, orig in enumerate(novos):
+                    if janela.cancelado:
+                        break
+                    msg = f"Copiando campos...\n{i + 1} de {len(novos)}"
+                    self.root.after(0, lambda m=msg: janela.atualizar(m))
+
+                    novo      = dict(orig)
+                    novo["_raw"] = dict(orig.get("_raw", {}))
+                    raw       = novo["_raw"]
+
+                    if _raw_flag(raw, "Persistência", "Persistencia"):
+                        _mesclar_persistencia(raw, novo.get("nome", ""))
+                    if _raw_flag(raw, "MapaAtributo"):
+                        _mesclar_mapa(raw, novo.get("nome", ""))
+
+                    ativos = [c for c in self._campos if c.get("pos_ini") and c.get("tamanho")]
+                    prox   = (max(c["pos_ini"] + c["tamanho"] for c in ativos) if ativos else 1)
+                    novo["pos_ini"] = prox
+                    if novo.get("tamanho"):
+                        novo["pos_fin"] = prox + novo["tamanho"] - 1
+                    _set_raw(raw, prox, "PosicaoInicial", "posicaoinicial", "posinicial")
+                    if novo.get("pos_fin"):
+                        _set_raw(raw, novo["pos_fin"], "PosicaoFinal", "posicaofinal", "posfinal")
+
+                    novo["id"] = str(next_id)
+                    _set_raw(raw, next_id, "IdentificadorCampo", "identificadorcampo")
+
+                    self._campos.append(novo)
+                    campos_adicionados.append(novo)
+                    next_id += 1
+
+                # ── Processar duplicatas (se aprovado) ────────────────────────────
+                atualizados = 0
+                if atualizar_dup and not janela.cancelado:
+                    self.root.after(0, lambda: janela.atualizar("Atualizando duplicatas..."))
+                    for existente, orig in duplicatas:
+                        for key in ("tipo", "tamanho", "alinhamento", "descricao",
+                                    "obrigatorio", "coluna_db", "valor_padrao"):
+                            if orig.get(key) is not None:
+                                existente[key] = orig[key]
+                        if not existente.get("valor"):
+                            existente["valor"] = orig.get("valor_padrao", "")
+                        raw_ex = existente.setdefault("_raw", {})
+                        if _raw_flag(raw_ex, "Persistência", "Persistencia"):
+                            _mesclar_persistencia(raw_ex, existente.get("nome", ""))
+                        if _raw_flag(raw_ex, "MapaAtributo"):
+                            _mesclar_mapa(raw_ex, existente.get("nome", ""))
+                        atualizados += 1
+
+                cancelado = janela.cancelado
+                self.root.after(0, lambda: _finalizar(campos_adicionados, atualizados, cancelado))
+
+            def _finalizar(campos_adicionados, atualizados, cancelado):
+                janela.fechar()
+                validacao = self._validacao()
+
+                def _revalidar_duplicatas():
+                    # Duplicatas alteradas no lugar: revalida só essas linhas
+                    if not atualizados:
+                        return []
+                    posicao = {id(c): i for i, c in enumerate(self._campos)}
+                    indices = set()
+                    for existente, _ in duplicatas:
+                        if id(existente) in posicao:
+                            indices.update(validacao.alterado(posicao[id(existente)]))
+                    return indices
+
+                if cancelado:
+                    # Rollback: remove campos já adicionados nesta operação
+                    for c in campos_adicionados:
+                        try:
+                            self._campos.remove(c)
+                        except ValueError:
+                            pass
+                    _revalidar_duplicatas()
+                    self._set_status("Cópia cancelada — nenhuma alteração aplicada.")
+                    self._atualizar_tabela()
+                    self._atualizar_validacao()
+                    return
+
+                indices = set(validacao.adicionado(len(campos_adicionados)))
+                indices.update(_revalidar_duplicatas())
+                self._atualizar_linhas(sorted(indices))
+                partes = []
+                if campos_adicionados:
+                    partes.append(f"{len(campos_adicionados)} copiado(s)")
+                if atualizados:
+                    partes.append(f"{atualizados} atualizado(s)")
+                if partes:
+                    self._set_status(f"Campos da origem: {', '.join(partes)}.")
+
+            threading.Thread(target=_runner, daemon=True).start()
+
+        JanelaCopiarCampos(self.root, self._dados_por_aba_origem, on_confirmar=_processar)
+
+    # ── Tabela ────────────────────────────────────────────────────────────────
+
+    def _atualizar_tabela(self):
+        """Repopula a Treeview da aba ativa com os dados atuais de self._campos."""
+        if not self._tree:
+            return
+
+        tree    = self._tree
+        headers = self._headers_ativos
+        filtro  = self._var_filtro.get().lower()
+        exib    = 0
+
+        for item in tree.get_children():
+            tree.delete(item)
+
+        validacao = self._validacao()
+        for i, c in enumerate(self._campos):
+            linha = self._linha_tabela(i, c, headers, filtro, validacao)
+            if linha is None:
+                continue
+            vals, tag = linha
+            tree.insert("", tk.END, iid=str(i), tags=(tag,), values=vals)
+            exib += 1
+
+        self._lbl_count.config(text=f"{exib}/{len(self._campos)} campos")
+        self._atualizar_total()
+
+    @staticmethod
+    def _linha_tabela(i, c, headers, filtro, validacao):
+        """(valores, tag) da linha do campo i, ou None se o filtro a esconde."""
+        if filtro:
+            nome = (c.get("nome") or "").lower()
+            desc = (c.get("descricao") or "").lower()
+            if filtro not in nome and filtro not in desc:
+                return None
+        raw  = c.get("_raw", {})
+        vals = tuple(raw.get(h, "") for h in headers) if headers else (c.get("nome", ""),)
+        # erro: fórmula/sobreposição; aviso: lacuna ou sem posição (ValidacaoIncremental.tag)
+        tag = validacao.tag(i) or ("par" if i % 2 == 0 else "impar")
+        return vals, tag
+
+    def _atualizar_linhas(self, indices):
+        """
+        Atualiza só as linhas `indices` (valores e tag) após uma edição que não
+        desloca índices; linhas novas no fim da lista são acrescentadas.
+        """
+        tree = self._tree
+        if tree:
+            headers = self._headers_ativos
+            filtro  = self._var_filtro.get().lower()
+            validacao = self._validacao()
+            ultimo = max(map(int, tree.get_children()), default=-1)
+            for i in indices:
+                linha = self._linha_tabela(i, self._campos[i], headers, filtro, validacao)
+                iid = str(i)
+                if tree.exists(iid):
+                    if linha is None:
+                        tree.delete(iid)
+                    else:
+                        tree.item(iid, values=linha[0], tags=(linha[1],))
+                elif linha is not None:
+                    if i < ultimo:
+                        # Linha antes escondida pelo filtro: posição no meio da tabela
+                        self._atualizar_tabela()
+                        break
+                    tree.insert("", tk.END, iid=iid, tags=(linha[1],), values=linha[0])
+                    ultimo = i
+            self._lbl_count.config(text=f"{len(tree.get_children())}/{len(self._campos)} campos")
+        self._atualizar_total()
+        self._atualizar_validacao()
+
+    def _validacao(self, campos=None):
+        """ValidacaoIncremental da lista de campos (padrão: aba ativa), criada no 1º uso."""
+        campos = self._campos if campos is None else campos
+        validacao = self._validacoes.get(id(campos))
+        if validacao is None or validacao.campos is not campos:
+            validacao = self._validacoes[id(campos)] = ValidacaoIncremental(campos)
+        return validacao
+
+    def _atualizar_total(self):
+        ativos = [c for c in self._campos if c.get("pos_ini") and c.get("tamanho")]
+        if ativos:
+            total = sum(c["tamanho"] for c in ativos)
+            maxi  = max(c["pos_ini"] + c["tamanho"] - 1 for c in ativos)
+            self._var_total.set(f"Tamanho total: {total} bytes | Pos. máx: {maxi}")
+        else:
+            self._var_total.set("")
+
+    def _on_selecionar(self, _evt):
+        pass  # pode expandir para pré-preencher detalhe
+
+    def _on_duplo_clique(self, _evt):
+        self.editar_campo()
+
+    # ── Ações CRUD ────────────────────────────────────────────────────────────
+
+    def novo_campo(self):
+        # Sugere próxima posição
+        ativos = [c for c in self._campos if c.get("pos_ini") and c.get("tamanho")]
+        prox = (max(c["pos_ini"] + c["tamanho"] for c in ativos) if ativos else 1)
+        JanelaEditarCampo(
+            self.root,
+            campo={"pos_ini": prox, "entrada": "S"},
+            on_confirmar=self._adicionar_campo
+        )
+
+    def _adicionar_campo(self, campo):
+        max_id = max(
+            (int(c["id"]) for c in self._campos if str(c.get("id", "")).isdigit()),
+            default=0
+        )
+        campo["id"] = str(max_id + 1)
+        self._campos.append(campo)
+        self._atualizar_linhas(self._validacao().adicionado())
+        self._set_status(f"Campo '{campo['nome']}' adicionado.")
+
+    def editar_campo(self):
+        sel = self._tree.selection()
+        if not sel:
+            messagebox.showinfo("Aviso", "Selecione um campo na tabela.")
+            return
+        idx = int(sel[0])
+        if idx >= len(self._campos):
+            return
+
+        def _aplicar(novo):
+            novo["id"]    = self._campos[idx].get("id", "")
+            novo["linha"] = self._campos[idx].get("linha", "")
+            self._campos[idx] = novo
+            self._atualizar_linhas(self._validacao().alterado(idx))
+            self._set_status(f"Campo '{novo['nome']}' atualizado.")
+
+        JanelaEditarCampo(self.root, campo=self._campos[idx], on_confirmar=_aplicar)
+
+    def remover_campo(self):
+        sel = self._tree.selection()
+        if not sel:
+            return
+        idx = int(sel[0])
+        if idx >= len(self._campos):
+            return
+        nome = self._campos[idx].get("nome", "?")
+        if messagebox.askyesno("Confirmar", f"Remover o campo '{nome}'?"):
+            self._campos.pop(idx)
+            self._validacao().removido(idx)
+            self._atualizar_tabela()
+            self._atualizar_validacao()
+            self._set_status(f"Campo '{nome}' removido.")
+
+    def recalcular_posicoes(self):
+        if not messagebox.askyesno("Recalcular Posições",
+                "Recalcula posições de TODOS os campos de entrada em sequência a partir de 1.\n"
+                "Continuar?"):
+            return
+        ativos = sorted(
+            [c for c in self._campos if (c.get("entrada","S") or "S").upper()=="S" and c.get("tamanho")],
+            key=lambda c: c.get("pos_ini", 99999)
+        )
+        pos = 1
+        for c in ativos:
+            c["pos_ini"] = pos
+            c["pos_fin"] = pos + c["tamanho"] - 1
+            pos += c["tamanho"]
+        self._validacao().reconstruir()
+        self._atualizar_tabela()
+        self._atualizar_validacao()
+        self._set_status(f"Posições recalculadas. Total: {pos-1} bytes.")
+
+    def limpar_cache_leitura(self):
+        cache = cache_leitura_padrao()
+        n, tamanho = cache.tamanho()
+        if not n:
+            messagebox.showinfo("Cache de Leitura", f"O cache está vazio.\n{cache.diretorio}")
+            return
+        if not messagebox.askyesno("Limpar Cache de Leitura",
+                f"Remover {n} planilha(s) em cache ({tamanho / (1024 * 1024):.1f} MB)?\n"
+                f"{cache.diretorio}"):
+            return
+        n, tamanho = cache.limpar()
+        self._set_status(f"Cache de leitura limpo: {n} entrada(s), {tamanho / (1024 * 1024):.1f} MB liberados.")
+
+    # ── Salvar planilha ───────────────────────────────────────────────────────
+
+    def salvar_planilha(self):
+        if not self._campos:
+            messagebox.showwarning("Aviso", "Nenhum campo para salvar.")
+            return
+
+        if self._arquivo_principal:
+            # Sempre salva em uma cópia _Novo, preservando o original
+            base, ext = os.path.splitext(self._arquivo_principal)
+            # Remove sufixo _Novo anterior para não empilhar (ex: Arq_Novo_Novo)
+            if base.endswith("_Novo"):
+                base = base[:-5]
+            path = base + "_Novo" + ext
+        else:
+            path = filedialog.asksaveasfilename(
+                title="Salvar Planilha",
+                defaultextension=".xlsx",
+                filetypes=[("Excel", "*.xlsx"), ("CSV", "*.csv")]
+            )
+            if not path:
+                return
+
+        try:
+            ext = os.path.splitext(path)[1].lower()
+            if ext in (".xlsx", ".xls"):
+                if self._arquivo_principal and self._dados_por_aba:
+                    # Salva preservando toda a estrutura original (todos os tabs, formatação)
+                    salvar_xlsx_estruturado(
+                        self._arquivo_principal, path, self._dados_por_aba
+                    )
+                else:
+                    # Fallback: sem arquivo original, cria planilha simples
+                    salvar_xlsx(path, self._campos, self._aba_ativa or "Campos Entrada")
+            else:
+                salvar_csv(path, self._campos)
+            self._set_status(f"Planilha salva: {os.path.basename(path)}")
+            messagebox.showinfo("Sucesso", f"Planilha salva:\n{path}")
+        except Exception as e:
+            messagebox.showerror("Erro ao salvar", str(e))
+
+    # ── Validação ─────────────────────────────────────────────────────────────
+
+    def validar(self):
+        if not self._campos:
+            messagebox.showwarning("Aviso", "Carregue uma planilha primeiro.")
+            return
+
+        # Estado mantido a cada edição (ValidacaoIncremental): sem nova passada completa
+        erros, avisos, infos = self._validacao().resultado()
+        # Etapa entre abas: índices montados sobre o modelo atual, uma vez por F5
+        if self._dados_por_aba:
+            layout = LayoutCompilado(self._dados_por_aba, self._arquivo_principal, self._sessao)
+            self._referencias = validar_referencias(self._dados_por_aba, layout)
+        self._exibir_validacao(erros, avisos, infos)
+        self._validacao_exibida = True
+
+        # Navega para aba de validação
+        self._notebook.select(0)
+
+        total_erros = len(erros) + (len(self._referencias[0]) if self._referencias else 0)
+        total_avisos = len(avisos) + (len(self._referencias[1]) if self._referencias else 0)
+        status = f"Validação: {'OK' if not total_erros else f'{total_erros} erro(s)'}"
+        if total_avisos:
+            status += f" | {total_avisos} aviso(s)"
+        self._set_status(status)
+
+    def _atualizar_validacao(self):
+        """
+        Após uma edição, reexibe o resultado se o painel Validação já estiver em uso.
+        As referências entre abas ficam as do último F5 (recalculá-las é uma passada
+        pelo modelo inteiro).
+        """
+        if self._validacao_exibida and self._campos:
+            self._exibir_validacao(*self._validacao().resultado())
+
+    def _exibir_validacao(self, erros, avisos, infos):
+        self._txt_val.configure(state=tk.NORMAL)
+        self._txt_val.delete(1.0, tk.END)
+
+        self._txt_val.insert(tk.END, "═" * 42 + "\n", "titulo")
+        self._txt_val.insert(tk.END, "   RESULTADO DA VALIDAÇÃO\n", "titulo")
+        self._txt_val.insert(tk.END, "═" * 42 + "\n\n", "titulo")
+
+        if infos:
+            self._txt_val.insert(tk.END, "INFORMAÇÕES:\n", "info")
+            for i in infos:
+                self._txt_val.insert(tk.END, f"  • {i}\n", "info")
+            self._txt_val.insert(tk.END, "\n")
+
+        if avisos:
+            self._txt_val.insert(tk.END, "AVISOS:\n", "aviso")
+            for a in avisos:
+                self._txt_val.insert(tk.END, f"  ⚠  {a}\n", "aviso")
+            self._txt_val.insert(tk.END, "\n")
+
+        if erros:
+            self._txt_val.insert(tk.END, "ERROS:\n", "erro")
+            for e in erros:
+                self._txt_val.insert(tk.END, f"  ✗  {e}\n", "erro")
+            self._txt_val.insert(tk.END, "\n")
+        else:
+            self._txt_val.insert(tk.END, "✔  Sem erros de posicionamento!\n", "ok")
+
+        if self._referencias is not None:
+            ref_erros, ref_avisos, ref_infos = self._referencias
+            self._txt_val.insert(tk.END, "\n" + "─" * 42 + "\n", "titulo")
+            self._txt_val.insert(tk.END, "   REFERÊNCIAS ENTRE ABAS (último F5)\n", "titulo")
+            self._txt_val.insert(tk.END, "─" * 42 + "\n\n", "titulo")
+            for i in ref_infos:
+                self._txt_val.insert(tk.END, f"  • {i}\n", "info")
+            for a in ref_avisos:
+                self._txt_val.insert(tk.END, f"  ⚠  {a}\n", "aviso")
+            for e in ref_erros:
+                self._txt_val.insert(tk.END, f"  ✗  {e}\n", "erro")
+            if not ref_erros:
+                self._txt_val.insert(tk.END, "✔  Sem erros de referência entre abas!\n", "ok")
+
+        self._txt_val.configure(state=tk.DISABLED)
+
+    # ── XML ───────────────────────────────────────────────────────────────────
+
+    # Índice de cada aba XML dentro do notebook (tab 0 = Validação)
+    _XML_TAB_KEYS = ["LayoutEntrada", "LayoutPersistencia", "mapaAtributo", "DadoExterno", "ComandoSQL"]
+
+    def _atualizar_tab_xml(self, key, xml_str):
+        """Popula a aba de XML preview correspondente sem trocar de aba."""
+        txt = self._txt_xmls.get(key)
+        if not txt:
+            return
+        if self._conteudo_preview.get(key) == xml_str:
+            return  # conteúdo já exibido: evita reinserir o texto no widget
+        self._conteudo_preview[key] = xml_str
+        txt.configure(state=tk.NORMAL)
+        txt.delete(1.0, tk.END)
+        txt.insert(tk.END, xml_str)
+        txt.configure(state=tk.DISABLED)
+
+    def _gerar_xml_str(self, key):
+        """Gera e retorna o conteúdo (XML ou SQL) para a aba indicada."""
+        conteudo, _ = self._construir_artefato(key)
+        return conteudo
+
+    def _construir_artefato(self, key, layout=None):
+        """
+        (conteúdo, regenerado) do artefato `key` via self._artefatos: o gerador só
+        roda se as entradas que ele lê mudaram desde a última geração. `layout`
+        (LayoutCompilado) permite compartilhar a compilação entre artefatos.
+        """
+        if key not in DEPENDENCIAS_ARTEFATOS:
+            return None, False
+        aba_e = None
+        for nome, info in self._dados_por_aba.items():
+            if _norm_aba(nome) == "camposentrada":
+                aba_e = info
+                break
+        if aba_e is None and self._dados_por_aba:
+            aba_e = next(iter(self._dados_por_aba.values()))
+        return self._artefatos.construir(
+            key, self._dados_por_aba, self._arquivo_principal, self._sessao,
+            aba_e.get("campos", [])   if aba_e else self._campos,
+            aba_e.get("headers", [])  if aba_e else self._headers_ativos,
+            aba_e.get("sections", {}) if aba_e else self._sections_ativos,
+            layout,
+        )
+
+    def _preview_xml_tab(self, key):
+        """Gera e exibe o conteúdo de uma aba, selecionando-a no notebook."""
+        if not self._dados_por_aba:
+            messagebox.showwarning("Aviso", "Carregue uma planilha primeiro.")
+            return
+        try:
+            xml_str = self._gerar_xml_str(key)
+            if xml_str is None:
+                return
+            self._atualizar_tab_xml(key, xml_str)
+            self._notebook.select(1 + self._XML_TAB_KEYS.index(key))
+        except Exception as e:
+            messagebox.showerror(f"Erro ao gerar {key}", str(e))
+
+    def _preview_todas_abas(self):
+        """Atualiza o conteúdo de todas as abas de preview em thread separada."""
+        if not self._dados_por_aba:
+            messagebox.showwarning("Aviso", "Carregue uma planilha primeiro.")
+            return
+
+        total = len(self._XML_TAB_KEYS)
+        janela = JanelaCarregando(self.root, "Gerando previews...")
+
+        def _runner():
+            resultados = {}
+            erros = []
+            regenerados = 0
+            if self._sessao is not None:
+                try:
+                    self._sessao.revalidar(recarregar_dados=False)
+                except Exception as e:
+                    erros.append(f"{os.path.basename(self._sessao.filepath)}: {e}")
+            # Modelo compilado uma vez para todas as abas
+            layout = LayoutCompilado(self._dados_por_aba, self._arquivo_principal, self._sessao)
+            for i, key in enumerate(self._XML_TAB_KEYS):
+                if janela.cancelado:
+                    break
+                msg = f"Gerando preview:\n{key}\n\n{i + 1} de {total}"
+                self.root.after(0, lambda m=msg: janela.atualizar(m))
+                try:
+                    resultados[key], regenerado = self._construir_artefato(key, layout)
+                    regenerados += regenerado
+                except Exception as e:
+                    erros.append(f"{key}: {e}")
+            cancelado = janela.cancelado
+            self.root.after(0, lambda: _finalizar(resultados, erros, cancelado, regenerados))
+
+        def _finalizar(resultados, erros, cancelado, regenerados):
+            janela.fechar()
+            if cancelado:
+                # Rollback: nenhuma aba é atualizada — conteúdo anterior preservado
+                self._set_status("Preview cancelado — conteúdo anterior preservado.")
+                return
+            for key, xml_str in resultados.items():
+                if xml_str is not None:
+                    self._atualizar_tab_xml(key, xml_str)
+            self._set_status(
+                f"Preview atualizado: {regenerados} regenerado(s), "
+                f"{len(resultados) - regenerados} sem alterações."
+            )
+            if erros:
+                messagebox.showerror("Erro ao atualizar preview", "\n".join(erros))
+
+        threading.Thread(target=_runner, daemon=True).start()
+
+    def preview_xml(self):
+        """Atalho F7: atualiza todas as abas de preview."""
+        self._preview_todas_abas()
+
+    def gerar_xml(self):
+        if not self._dados_por_aba:
+            messagebox.showwarning("Aviso", "Carregue uma planilha primeiro.")
+            return
+
+        # Usa "Campos Entrada" como referência para validação
+        aba_entrada = None
+        for nome, info in self._dados_por_aba.items():
+            if _norm_aba(nome) == "camposentrada":
+                aba_entrada = info
+                break
+        if aba_entrada is None and self._dados_por_aba:
+            aba_entrada = next(iter(self._dados_por_aba.values()))
+
+        campos_validar = aba_entrada.get("campos", []) if aba_entrada else self._campos
+        # Validação pelo estado mantido a cada edição; geradores leem o modelo compilado
+        erros, _, _ = self._validacao(campos_validar).resultado()
+        _layout = LayoutCompilado(self._dados_por_aba, self._arquivo_principal, self._sessao)
+        erros = erros + validar_referencias(self._dados_por_aba, _layout)[0]
+        if erros:
+            if not messagebox.askyesno("Validação com erros",
+                    f"Existem {len(erros)} erro(s) de validação.\n"
+                    "Deseja gerar os XMLs mesmo assim?"):
+                return
+
+        # Pede diretório de saída
+        dir_inicial = os.path.dirname(self._arquivo_principal) if self._arquivo_principal else ""
+        dir_saida = filedialog.askdirectory(
+            title="Selecione o diretório para salvar os XMLs",
+            initialdir=dir_inicial
+        )
+        if not dir_saida:
+            return
+
+        # Abas auxiliares relidas apenas se o xlsx mudou em disco (edições preservadas)
+        if self._sessao is not None:
+            self._sessao.revalidar(recarregar_dados=False)
+
+        # Captura referências antes de entrar na thread
+        _dados       = self._dados_por_aba
+        _arquivo     = self._arquivo_principal
+        _sessao      = self._sessao
+        _headers     = aba_entrada.get("headers", [])  if aba_entrada else self._headers_ativos
+        _sections    = aba_entrada.get("sections", {}) if aba_entrada else self._sections_ativos
+        _artefatos   = self._artefatos
+
+        _prefixo = prefixo_artefatos(_arquivo, _sessao)
+        _tarefas = tarefas_artefatos(_prefixo, _arquivo)
+        _total = len(_tarefas)
+
+        janela = JanelaCarregando(self.root, f"Gerando arquivos...\n0 de {_total}")
+        janela.progresso(0, _total)
+        for _, nome_arq in _tarefas:
+            janela.atualizar_item(nome_arq, f"⏳ {nome_arq}")
+
+        def _concluida(nome_arq, item, feitos):
+            janela.atualizar_item(nome_arq, item)
+            janela.progresso(feitos, _total)
+            janela.atualizar(f"Gerando arquivos...\n{feitos} de {_total}")
+
+        def _runner():
+            # Todas as tarefas são disparadas juntas sobre o mesmo snapshot de _dados:
+            # XML/SQL em threads, a cópia da planilha em processo (ARTEFATOS_EM_PROCESSO).
+            # Resultados indexados pela posição em _tarefas (mensagem final na ordem usual).
+            # Arquivos com o mesmo conteúdo não são regravados (manifest.json)
+            gerados       = {}
+            erros_geracao = {}
+            xmls_preview  = {}
+            futuros       = {}
+            temporarios   = {}      # futuro em processo → (arquivo temporário, destino)
+            manifesto     = ManifestoSaida(dir_saida, _prefixo)
+            pool_threads  = ThreadPoolExecutor(max_workers=_total)
+            pool_proc     = None
+            try:
+                for i, (chave, nome_arq) in enumerate(_tarefas):
+                    path = os.path.join(dir_saida, nome_arq)
+                    fut = None
+                    if chave in ARTEFATOS_EM_PROCESSO:
+                        try:
+                            if pool_proc is None:
+                                pool_proc = ProcessPoolExecutor(max_workers=1)
+                            tmp = manifesto.temporario(path)
+                            fut = pool_proc.submit(gerar_artefato, chave, tmp, _dados, _arquivo)
+                            temporarios[fut] = (tmp, path)
+                        except Exception:
+                            fut = None  # sem processos disponíveis: roda em thread
+                    if fut is None:
+                        fut = pool_threads.submit(
+                            gerar_artefato, chave, path, _dados, _arquivo, _sessao,
+                            campos_validar, _headers, _sections, _artefatos, manifesto, _layout,
+                        )
+                    futuros[fut] = i
+
+                pendentes = set(futuros)
+                while pendentes and not janela.cancelado:
+                    prontos, pendentes = wait(pendentes, timeout=0.2, return_when=FIRST_COMPLETED)
+                    for fut in prontos:
+                        i = futuros[fut]
+                        chave, nome_arq = _tarefas[i]
+                        try:
+                            conteudo = fut.result()
+                            if fut in temporarios:
+                                manifesto.adotar(*temporarios[fut])
+                            gerados[i] = nome_arq
+                            if conteudo is not None:
+                                xmls_preview[i] = (chave, conteudo)
+                            item = f"✔ {nome_arq}"
+                            if nome_arq in manifesto.inalterados:
+                                item += "  (sem alterações)"
+                        except Exception as e:
+                            erros_geracao[i] = f"{nome_arq}: {e}"
+                            item = f"✗ {nome_arq}"
+                        feitos = len(gerados) + len(erros_geracao)
+                        self.root.after(0, lambda n=nome_arq, t=item, f=feitos: _concluida(n, t, f))
+            except Exception as e:
+                # Falha fora das tarefas (ex.: ao criar o pool): reportada no fim da lista
+                erros_geracao[_total] = str(e)
+            finally:
+                # Cancelado: o que ainda não começou é descartado; o passo em andamento
+                # em thread termina em segundo plano e seu resultado é ignorado, e o
+                # processo da cópia da planilha é terminado.
+                cancelado = janela.cancelado
+                for fut in futuros:
+                    fut.cancel()
+                pool_threads.shutdown(wait=False)
+                if pool_proc is not None:
+                    if cancelado:
+                        _encerrar_pool_processos(pool_proc)
+                    else:
+                        pool_proc.shutdown(wait=False)
+                # Temporários não adotados (cancelamento ou erro na cópia)
+                for tmp, _ in temporarios.values():
+                    try:
+                        if os.path.exists(tmp):
+                            os.remove(tmp)
+                    except OSError:
+                        pass
+
+            # Cancelado: registra o que foi gravado, sem remover arquivos anteriores
+            try:
+                manifesto.concluir(None if cancelado else [nome for _, nome in _tarefas])
+            except OSError as e:
+                erros_geracao[_total + 1] = f"{NOME_MANIFESTO}: {e}"
+
+            gerados       = [gerados[i] for i in sorted(gerados)]
+            erros_geracao = [erros_geracao[i] for i in sorted(erros_geracao)]
+            xmls_preview  = dict(xmls_preview[i] for i in sorted(xmls_preview))
+            self.root.after(0, lambda: _finalizar(gerados, erros_geracao, xmls_preview, cancelado,
+                                                  manifesto))
+
+        def _finalizar(gerados, erros_geracao, xmls_preview, cancelado, manifesto):
+            janela.fechar()
+
+            if cancelado:
+                self._set_status("Geração cancelada.")
+                return
+
+            # Atualiza abas de preview
+            for key, conteudo in xmls_preview.items():
+                self._atualizar_tab_xml(key, conteudo)
+
+            gravados    = [n for n in gerados if n not in manifesto.inalterados]
+            inalterados = [n for n in gerados if n in manifesto.inalterados]
+            msg = f"Arquivos em:\n{dir_saida}\n"
+            if gravados:
+                msg += "\nGravados:\n" + "\n".join(f"  ✔ {n}" for n in gravados) + "\n"
+            if inalterados:
+                msg += ("\nSem alterações (não regravados):\n"
+                        + "\n".join(f"  = {n}" for n in inalterados) + "\n")
+            if manifesto.removidos:
+                msg += ("\nRemovidos (não gerados nesta execução):\n"
+                        + "\n".join(f"  − {n}" for n in manifesto.removidos) + "\n")
+            if erros_geracao:
+                msg += "\nErros:\n" + "\n".join(f"  ✗ {e}" for e in erros_geracao)
+                messagebox.showwarning("Geração com erros", msg)
+            else:
+                messagebox.showinfo("Sucesso", msg)
+
+            if gerados:
+                self._notebook.select(1)
+
+            self._set_status(
+                f"{len(gravados)} gravado(s), {len(inalterados)} sem alterações"
+                + (f", {len(manifesto.removidos)} removido(s)" if manifesto.removidos else "")
+                + f" em: {os.path.basename(dir_saida)}"
+                + (f"  |  {len(erros_geracao)} erro(s)" if erros_geracao else "")
+            )
+
+        threading.Thread(target=_runner, daemon=True).start()
+
+    # ── Modo observação ───────────────────────────────────────────────────────
+
+    def alternar_observacao(self):
+        """Liga/desliga a regeneração automática a cada salvamento da planilha principal."""
+        if not self._var_observar.get():
+            self._parar_observacao()
+            self._set_status("Observação da planilha encerrada.")
+            return
+        path = self._arquivo_principal
+        if not path or not path.lower().endswith(_EXTENSOES_PLANILHA):
+            messagebox.showwarning("Aviso", "Carregue uma planilha principal .xlsx primeiro.")
+            self._var_observar.set(False)
+            return
+        dir_saida = filedialog.askdirectory(
+            title="Selecione o diretório para os XMLs regenerados",
+            initialdir=os.path.dirname(path),
+        )
+        if not dir_saida:
+            self._var_observar.set(False)
+            return
+
+        observador = ObservadorPlanilhas(
+            [path], dir_saida, por_evento=False,
+            ao_gerar=lambda evento: self.root.after(0, self._on_observacao, evento),
+        )
+        self._observacao = threading.Event()
+        threading.Thread(target=observador.executar, args=(self._observacao,), daemon=True).start()
+        self._set_status(f"Observando {os.path.basename(path)} → {dir_saida}")
+
+    def _parar_observacao(self):
+        if self._observacao is not None:
+            self._observacao.set()
+            self._observacao = None
+        self._var_observar.set(False)
+
+    def _on_observacao(self, evento):
+        if self._observacao is None:
+            return
+        hora = time.strftime("%H:%M:%S")
+        if evento["erros"]:
+            self._set_status(f"[{hora}] Observação: {len(evento['erros'])} erro(s) — {evento['erros'][0]}")
+            return
+        msg = (f"[{hora}] Regenerado: {len(evento['gravados'])} arquivo(s) gravado(s), "
+               f"{len(evento['inalterados'])} sem alterações ({evento['tempo']:.2f} s)")
+        n_erros = len(evento["validacao"]["erros"]) + len(evento["referencias"]["erros"])
+        if n_erros:
+            msg += f"  |  {n_erros} erro(s) de validação"
+        self._set_status(msg)
+
+    # ── Utilidades ────────────────────────────────────────────────────────────
+
+    def _set_status(self, msg):
+        self._var_status.set(msg)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Entry point
+# ─────────────────────────────────────────────────────────────────────────────
+
+def executar_interface():
+    """Abre a janela principal e roda o loop do Tk até ela ser fechada."""
+    root = tk.Tk()
+    try:
+        root.tk.call("tk", "scaling", 1.25)
+    except Exception:
+        pass
+    GeradorXMLApp(root)
+    root.mainloop()
+    return 0
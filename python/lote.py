@@ -0,0 +1,722 @@
+"""
+Gerador de XML — modo lote (linha de comando, sem interface)
+
+Subcomandos de gerador_xml.py (gerar, validar, observar): geração e validação de
+várias planilhas em paralelo entre processos e regeneração a cada salvamento,
+com a mesma leitura, validação e geradores da interface. Não importa tkinter.
+
+  python lote.py gerar eventos/*.xlsx -o saida     (= python gerador_xml.py gerar ...)
+"""
+
+import argparse
+import collections
+import csv
+import glob
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from gerador_xml import (
+    cache_leitura_padrao, CacheArtefatos, ENGINES_LEITURA, gerar_artefato,
+    LayoutCompilado, ler_todas_abas, LOTE_SQL_PADRAO, ManifestoSaida, NOME_MANIFESTO,
+    prefixo_artefatos, SessaoPlanilha, tarefas_artefatos, validar_campos,
+    validar_referencias, _assinatura_arquivo, _EXTENSOES_PLANILHA, _norm_aba,
+)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Modo lote (linha de comando, sem interface)
+# ─────────────────────────────────────────────────────────────────────────────
+
+def expandir_planilhas(entradas):
+    """
+    Planilhas a partir de arquivos, diretórios (todas as .xlsx/.xlsm do diretório)
+    e padrões glob (** recursivo). Ignora arquivos de bloqueio do Excel (~$...).
+    Sem duplicatas, na ordem das entradas.
+    """
+    vistas, planilhas = set(), []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            candidatos = sorted(os.path.join(entrada, n) for n in os.listdir(entrada))
+        elif any(c in entrada for c in "*?["):
+            candidatos = sorted(glob.glob(entrada, recursive=True))
+        else:
+            candidatos = [entrada]     # arquivo explícito: inexistente vira erro no resumo
+        for path in candidatos:
+            if candidatos != [entrada] and (
+                    not os.path.isfile(path)
+                    or not path.lower().endswith(_EXTENSOES_PLANILHA)):
+                continue
+            if os.path.basename(path).startswith("~$"):
+                continue
+            chave = os.path.normcase(os.path.abspath(path))
+            if chave not in vistas:
+                vistas.add(chave)
+                planilhas.append(path)
+    return planilhas
+
+
+def _nome_diretorio(nome):
+    """Nome utilizável como diretório (sem separadores nem caracteres reservados)."""
+    nome = re.sub(r'[<>:"/\\|?*\x00-\x1f]', "_", str(nome)).strip(" .")
+    return nome or "LAYOUT"
+
+
+def _info_aba_entrada(dados_por_aba):
+    """Info da aba 'Campos Entrada' (ou da primeira aba), como em gerar_xml."""
+    for nome, info in dados_por_aba.items():
+        if _norm_aba(nome) == "camposentrada":
+            return info
+    return next(iter(dados_por_aba.values()), None)
+
+
+def gerar_lote_planilha(path, dir_saida, engine=None, usar_cache=True, copiar_planilha=True,
+                        lote_sql=None, prefixo=None):
+    """
+    Gera os artefatos de uma planilha em {dir_saida}/{IdentificadorEvento}/ — mesma
+    leitura, validação e geradores da interface. Retorna o resumo (dict serializável
+    em JSON): arquivos gerados — e, destes, os gravados e os inalterados (mesmos
+    bytes, não regravados; ver ManifestoSaida) —, arquivos removidos, erros de
+    validação, erros de leitura/geração e tempos em segundos. Função de módulo:
+    roda nos processos de executar_lote. `lote_sql`: ver gerar_comandos_sql.
+    "validacao" traz validar_campos e "referencias", validar_referencias.
+    `prefixo`: IdentificadorEvento já resolvido (executar_lote); None: lido da planilha.
+    """
+    resumo = {
+        "planilha": path, "identificador_evento": None, "diretorio": None,
+        "arquivos": [], "gravados": [], "inalterados": [], "removidos": [],
+        "validacao": {"erros": [], "avisos": []}, "referencias": {"erros": [], "avisos": []},
+        "erros": [], "tempos": {},
+    }
+    tempos = resumo["tempos"]
+    inicio = time.perf_counter()
+    try:
+        sessao = SessaoPlanilha(
+            path, engine, cache=cache_leitura_padrao() if usar_cache else None, sob_demanda=True
+        )
+        dados = sessao.dados_por_aba
+        if not dados:
+            raise ValueError("nenhuma aba de layout reconhecida")
+        info = _info_aba_entrada(dados) or {}
+        campos = info.get("campos", [])     # aba sob demanda: PlanilhaAlteradaError é de leitura
+    except Exception as e:
+        resumo["erros"].append(f"leitura: {e}")
+        tempos["total"] = round(time.perf_counter() - inicio, 4)
+        return resumo
+    tempos["leitura"] = round(time.perf_counter() - inicio, 4)
+
+    t = time.perf_counter()
+    layout = LayoutCompilado(dados, path, sessao)     # validação e geradores compartilham
+    erros, avisos, _ = validar_campos(campos, layout)
+    resumo["validacao"] = {"erros": erros, "avisos": avisos}
+    tempos["validacao"] = round(time.perf_counter() - t, 4)
+
+    t = time.perf_counter()
+    erros, avisos, _ = validar_referencias(dados, layout)
+    resumo["referencias"] = {"erros": erros, "avisos": avisos}
+    tempos["referencias"] = round(time.perf_counter() - t, 4)
+
+    if prefixo is None:
+        prefixo = prefixo_artefatos(path, sessao)
+    diretorio = os.path.join(dir_saida, _nome_diretorio(prefixo))
+    resumo["identificador_evento"] = prefixo
+    resumo["diretorio"] = diretorio
+    try:
+        os.makedirs(diretorio, exist_ok=True)
+    except OSError as e:
+        resumo["erros"].append(f"{diretorio}: {e}")
+        tempos["total"] = round(time.perf_counter() - inicio, 4)
+        return resumo
+
+    manifesto = ManifestoSaida(diretorio, prefixo)
+    tarefas = tarefas_artefatos(prefixo, path if copiar_planilha else None)
+    for chave, nome_arq in tarefas:
+        t = time.perf_counter()
+        try:
+            gerar_artefato(
+                chave, os.path.join(diretorio, nome_arq), dados, path, sessao,
+                campos, info.get("headers", []), info.get("sections", {}), manifesto=manifesto,
+                layout=layout, lote_sql=lote_sql,
+            )
+            resumo["arquivos"].append(nome_arq)
+        except Exception as e:
+            resumo["erros"].append(f"{nome_arq}: {e}")
+        tempos[chave] = round(time.perf_counter() - t, 4)
+    try:
+        manifesto.concluir([nome for _, nome in tarefas])
+    except OSError as e:
+        resumo["erros"].append(f"{NOME_MANIFESTO}: {e}")
+    resumo["gravados"] = manifesto.gravados
+    resumo["inalterados"] = manifesto.inalterados
+    resumo["removidos"] = manifesto.removidos
+
+    tempos["total"] = round(time.perf_counter() - inicio, 4)
+    return resumo
+
+
+def _com_erros_validacao(resumo):
+    """Se o resumo de uma planilha (lote/observação) tem erros de validação ou de referência."""
+    return bool(resumo["validacao"]["erros"] or resumo["referencias"]["erros"])
+
+
+def _executar_planilhas(funcao, planilhas, argumentos, opcoes, processos, ao_concluir, falha,
+                        opcoes_por_planilha=None):
+    """
+    funcao(path, *argumentos, **opcoes) para cada planilha, em paralelo entre
+    processos (processos=None: um por núcleo; 1: sequencial no processo atual).
+    `opcoes_por_planilha` (lista alinhada a `planilhas`) completa `opcoes` de cada uma.
+    ao_concluir(resultado, concluidas, total) é chamado a cada planilha; se o
+    processo de uma planilha falhar, o resultado é falha(path, erro).
+    Retorna os resultados na ordem de `planilhas`.
+    """
+    total = len(planilhas)
+    if opcoes_por_planilha is not None:
+        opcoes = [dict(opcoes, **extras) for extras in opcoes_por_planilha]
+    else:
+        opcoes = [opcoes] * total
+    resultados = [None] * total
+    concluidas = 0
+
+    def _concluir(i, resumo):
+        nonlocal concluidas
+        resultados[i] = resumo
+        concluidas += 1
+        if ao_concluir is not None:
+            ao_concluir(resumo, concluidas, total)
+
+    n_processos = min(processos or os.cpu_count() or 1, total)
+    if n_processos <= 1:
+        for i, path in enumerate(planilhas):
+            _concluir(i, funcao(path, *argumentos, **opcoes[i]))
+    else:
+        with ProcessPoolExecutor(max_workers=n_processos) as pool:
+            futuros = {
+                pool.submit(funcao, path, *argumentos, **opcoes[i]): i
+                for i, path in enumerate(planilhas)
+            }
+            for fut in as_completed(futuros):
+                i = futuros[fut]
+                try:
+                    resumo = fut.result()
+                except Exception as e:      # ex.: processo encerrado abruptamente
+                    resumo = falha(planilhas[i], e)
+                _concluir(i, resumo)
+    return resultados
+
+
+def executar_lote(planilhas, dir_saida, processos=None, engine=None, usar_cache=True,
+                  copiar_planilha=True, ao_concluir=None, lote_sql=None):
+    """
+    Roda gerar_lote_planilha para cada planilha, em paralelo entre processos
+    (processos=None: um por núcleo; 1: sequencial no processo atual).
+    ao_concluir(resumo_planilha, concluidas, total) é chamado a cada planilha.
+    Retorna o resumo geral com os resumos por planilha na ordem de `planilhas`.
+
+    Duas planilhas com o mesmo IdentificadorEvento gravariam no mesmo diretório, ao
+    mesmo tempo, e o manifesto de uma removeria os arquivos da outra: o diretório de
+    cada planilha é resolvido antes do despacho (lendo só a aba 'Identificação
+    Evento'), e só a primeira de cada diretório é gerada; as demais não são
+    processadas e ficam com um erro no resumo.
+    """
+    inicio = time.perf_counter()
+    opcoes = dict(engine=engine, usar_cache=usar_cache, copiar_planilha=copiar_planilha,
+                  lote_sql=lote_sql)
+    total = len(planilhas)
+
+    def _resumo_vazio(path, erro):
+        return {"planilha": path, "identificador_evento": None, "diretorio": None,
+                "arquivos": [], "gravados": [], "inalterados": [], "removidos": [],
+                "erros": [erro], "validacao": {"erros": [], "avisos": []},
+                "referencias": {"erros": [], "avisos": []}, "tempos": {}}
+
+    def _falha(path, e):
+        return _resumo_vazio(path, f"processo: {e}")
+
+    resultados = [None] * total
+    concluidas = 0
+
+    def _concluir(resumo, *_):
+        nonlocal concluidas
+        concluidas += 1
+        if ao_concluir is not None:
+            ao_concluir(resumo, concluidas, total)
+
+    despachar, prefixos = [], []
+    donos = {}                  # diretório de saída → índice da planilha que grava nele
+    for i, path in enumerate(planilhas):
+        if not os.path.isfile(path):    # inexistente: o erro de leitura vem de gerar_lote_planilha
+            despachar.append(i)
+            prefixos.append({})
+            continue
+        prefixo = prefixo_artefatos(path)
+        diretorio = os.path.join(dir_saida, _nome_diretorio(prefixo))
+        dono = donos.setdefault(os.path.normcase(os.path.abspath(diretorio)), i)
+        if dono != i:
+            resumo = _resumo_vazio(
+                path, f"não gerada: IdentificadorEvento {prefixo} já gerado por {planilhas[dono]} "
+                      f"no mesmo diretório de saída"
+            )
+            resumo["identificador_evento"] = prefixo
+            resumo["diretorio"] = diretorio
+            resultados[i] = resumo
+            _concluir(resumo)
+            continue
+        despachar.append(i)
+        prefixos.append({"prefixo": prefixo})
+
+    gerados = _executar_planilhas(gerar_lote_planilha, [planilhas[i] for i in despachar],
+                                  (dir_saida,), opcoes, processos, _concluir, _falha,
+                                  opcoes_por_planilha=prefixos)
+    for i, resumo in zip(despachar, gerados):
+        resultados[i] = resumo
+
+    return {
+        "saida": dir_saida,
+        "total": total,
+        "com_erros": sum(1 for r in resultados if r["erros"]),
+        "com_erros_validacao": sum(1 for r in resultados if _com_erros_validacao(r)),
+        "arquivos_gravados": sum(len(r["gravados"]) for r in resultados),
+        "arquivos_inalterados": sum(len(r["inalterados"]) for r in resultados),
+        "arquivos_removidos": sum(len(r["removidos"]) for r in resultados),
+        "tempo_total": round(time.perf_counter() - inicio, 4),
+        "planilhas": resultados,
+    }
+
+
+# Severidade de uma planilha no relatório de validar_lote, da mais grave para a menos
+SEVERIDADES_VALIDACAO = ("leitura", "erro", "aviso", "ok")
+
+
+def validar_planilha(path, engine=None, usar_cache=True):
+    """
+    Valida uma planilha sem gerar artefatos: ler_todas_abas, validar_campos da aba
+    'Campos Entrada' e validar_referencias. Retorna o resumo (dict serializável em
+    JSON) com a severidade (SEVERIDADES_VALIDACAO), os erros de leitura, os erros e
+    avisos de cada etapa e os tempos em segundos. Função de módulo: roda nos
+    processos de validar_lote.
+    """
+    resumo = {
+        "planilha": path, "severidade": "leitura", "campos": 0, "erros": [],
+        "validacao": {"erros": [], "avisos": []}, "referencias": {"erros": [], "avisos": []},
+        "tempos": {},
+    }
+    tempos = resumo["tempos"]
+    inicio = time.perf_counter()
+    try:
+        dados = ler_todas_abas(path, engine, cache=cache_leitura_padrao() if usar_cache else None)
+        if not dados:
+            raise ValueError("nenhuma aba de layout reconhecida")
+    except Exception as e:
+        resumo["erros"].append(f"leitura: {e}")
+        tempos["total"] = round(time.perf_counter() - inicio, 4)
+        return resumo
+    tempos["leitura"] = round(time.perf_counter() - inicio, 4)
+
+    t = time.perf_counter()
+    campos = (_info_aba_entrada(dados) or {}).get("campos", [])
+    layout = LayoutCompilado(dados, path)
+    erros, avisos, _ = validar_campos(campos, layout)
+    resumo["campos"] = len(campos)
+    resumo["validacao"] = {"erros": erros, "avisos": avisos}
+    tempos["validacao"] = round(time.perf_counter() - t, 4)
+
+    t = time.perf_counter()
+    erros, avisos, _ = validar_referencias(dados, layout)
+    resumo["referencias"] = {"erros": erros, "avisos": avisos}
+    tempos["referencias"] = round(time.perf_counter() - t, 4)
+
+    if _com_erros_validacao(resumo):
+        resumo["severidade"] = "erro"
+    elif resumo["validacao"]["avisos"] or resumo["referencias"]["avisos"]:
+        resumo["severidade"] = "aviso"
+    else:
+        resumo["severidade"] = "ok"
+    tempos["total"] = round(time.perf_counter() - inicio, 4)
+    return resumo
+
+
+def _contagem_validacao(resumo):
+    """(erros, avisos) de uma planilha somando as duas etapas e os erros de leitura."""
+    erros = len(resumo["erros"]) + len(resumo["validacao"]["erros"]) + len(resumo["referencias"]["erros"])
+    return erros, len(resumo["validacao"]["avisos"]) + len(resumo["referencias"]["avisos"])
+
+
+def validar_lote(planilhas, processos=None, engine=None, usar_cache=True, ao_concluir=None):
+    """
+    Roda validar_planilha para cada planilha, em paralelo entre processos
+    (processos=None: um por núcleo; 1: sequencial no processo atual).
+    ao_concluir(resumo_planilha, concluidas, total) é chamado a cada planilha.
+    Retorna o relatório consolidado, com os resumos por planilha ordenados por
+    severidade, depois por número de erros e de avisos (decrescente) e caminho.
+    """
+    inicio = time.perf_counter()
+
+    def _falha(path, e):
+        return {"planilha": path, "severidade": "leitura", "campos": 0,
+                "erros": [f"processo: {e}"], "validacao": {"erros": [], "avisos": []},
+                "referencias": {"erros": [], "avisos": []}, "tempos": {}}
+
+    resultados = _executar_planilhas(validar_planilha, planilhas, (),
+                                     dict(engine=engine, usar_cache=usar_cache),
+                                     processos, ao_concluir, _falha)
+
+    def _ordem(resumo):
+        erros, avisos = _contagem_validacao(resumo)
+        return SEVERIDADES_VALIDACAO.index(resumo["severidade"]), -erros, -avisos, resumo["planilha"]
+
+    resultados.sort(key=_ordem)
+    por_severidade = collections.Counter(r["severidade"] for r in resultados)
+    return {
+        "total": len(resultados),
+        "por_severidade": {sev: por_severidade.get(sev, 0) for sev in SEVERIDADES_VALIDACAO},
+        "tempo_total": round(time.perf_counter() - inicio, 4),
+        "planilhas": resultados,
+    }
+
+
+def gravar_relatorio_validacao_csv(relatorio, path):
+    """
+    Relatório de validar_lote em CSV: uma linha por mensagem (planilha, severidade
+    da planilha, etapa, nível, mensagem, tempo total da planilha), na ordem do
+    relatório; planilhas sem mensagens têm uma linha com nível 'ok'.
+    """
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f)
+        writer.writerow(["planilha", "severidade", "etapa", "nivel", "mensagem", "tempo_s"])
+        for resumo in relatorio["planilhas"]:
+            base = (resumo["planilha"], resumo["severidade"])
+            tempo = resumo["tempos"].get("total", "")
+            linhas = [("leitura", "erro", m) for m in resumo["erros"]]
+            for etapa in ("validacao", "referencias"):
+                linhas += [(etapa, "erro", m) for m in resumo[etapa]["erros"]]
+                linhas += [(etapa, "aviso", m) for m in resumo[etapa]["avisos"]]
+            for etapa, nivel, mensagem in linhas or [("", "ok", "")]:
+                writer.writerow(base + (etapa, nivel, mensagem, tempo))
+
+
+def tabela_relatorio_validacao(relatorio):
+    """Tabela de texto com uma linha por planilha (ordem do relatório) e os totais."""
+    linhas = [f"{'SEVERIDADE':<10} {'ERROS':>6} {'AVISOS':>6} {'CAMPOS':>7} {'TEMPO (s)':>9}  PLANILHA"]
+    for resumo in relatorio["planilhas"]:
+        erros, avisos = _contagem_validacao(resumo)
+        linhas.append(
+            f"{resumo['severidade']:<10} {erros:>6} {avisos:>6} {resumo['campos']:>7} "
+            f"{resumo['tempos'].get('total', 0):>9.2f}  {resumo['planilha']}"
+        )
+    contagem = ", ".join(f"{n} {sev}" for sev, n in relatorio["por_severidade"].items() if n)
+    linhas.append(f"{relatorio['total']} planilha(s) em {relatorio['tempo_total']:.2f} s"
+                  + (f": {contagem}" if contagem else ""))
+    return "\n".join(linhas)
+
+
+class _PlanilhaObservada:
+    """Estado de uma planilha no ObservadorPlanilhas."""
+
+    def __init__(self):
+        self.vista = None           # última assinatura (mtime, tamanho) observada
+        self.mudou_em = 0.0         # quando `vista` mudou (time.monotonic)
+        self.gerada = None          # assinatura da última regeneração
+        self.sessao = None          # SessaoPlanilha incremental
+        self.artefatos = CacheArtefatos()
+
+
+class ObservadorPlanilhas:
+    """
+    Modo observação: verifica por polling as planilhas indicadas (arquivos,
+    diretórios ou padrões glob, reavaliados a cada rodada) e regenera os XML/SQL
+    de uma planilha quando ela é salva. Um salvamento só é processado depois de
+    `espera` segundos sem novas alterações (o Excel grava em etapas). Só as abas
+    alteradas são relidas (SessaoPlanilha incremental), só os artefatos cujas
+    entradas mudaram são reconstruídos (CacheArtefatos) e só os arquivos cujo
+    conteúdo mudou são regravados (ManifestoSaida; nada é removido).
+    A cópia evento_event_{ID}.xlsx não é gerada.
+    Com `por_evento`, grava em {dir_saida}/{IdentificadorEvento}/ (como o modo
+    lote); senão, diretamente em dir_saida (como gerar_xml).
+    ao_gerar(evento) recebe o resumo (dict) de cada regeneração.
+    `lote_sql`: ver gerar_comandos_sql.
+    """
+
+    def __init__(self, entradas, dir_saida, engine=None, intervalo=0.2, espera=0.3,
+                 por_evento=True, ao_gerar=None, lote_sql=None):
+        self.entradas = list(entradas)
+        self.dir_saida = dir_saida
+        self.engine = engine
+        self.intervalo = intervalo
+        self.espera = espera
+        self.por_evento = por_evento
+        self.ao_gerar = ao_gerar
+        self.lote_sql = lote_sql
+        self._planilhas = {}        # path → _PlanilhaObservada
+        self._prazo = None          # próximo fim de espera pendente (time.monotonic)
+
+    def verificar(self, agora=None):
+        """Uma rodada de polling. Retorna os resumos das regenerações feitas."""
+        agora = time.monotonic() if agora is None else agora
+        atuais = expandir_planilhas(self.entradas)
+        for path in set(self._planilhas) - set(atuais):
+            del self._planilhas[path]
+        eventos = []
+        self._prazo = None
+        for path in atuais:
+            try:
+                assinatura = _assinatura_arquivo(path)
+            except OSError:
+                continue
+            estado = self._planilhas.setdefault(path, _PlanilhaObservada())
+            if assinatura != estado.vista:
+                estado.vista, estado.mudou_em = assinatura, agora
+            if estado.vista == estado.gerada:
+                continue
+            if agora - estado.mudou_em < self.espera:
+                prazo = estado.mudou_em + self.espera
+                self._prazo = prazo if self._prazo is None else min(self._prazo, prazo)
+                continue
+            # Mesmo com erro não tenta de novo até o próximo salvamento
+            estado.gerada = assinatura
+            evento = self._regenerar(path, estado)
+            eventos.append(evento)
+            if self.ao_gerar is not None:
+                self.ao_gerar(evento)
+        return eventos
+
+    def executar(self, parar=None):
+        """Verifica a cada `intervalo` segundos até `parar` (threading.Event) ser sinalizado."""
+        parar = parar or threading.Event()
+        while True:
+            self.verificar()
+            espera = self.intervalo
+            if self._prazo is not None:     # salvamento pendente: volta assim que a espera vencer
+                espera = min(espera, max(0.01, self._prazo - time.monotonic()))
+            if parar.wait(espera):
+                return
+
+    def _regenerar(self, path, estado):
+        evento = {
+            "planilha": path, "identificador_evento": None, "diretorio": None,
+            "abas_relidas": [], "gravados": [], "inalterados": [],
+            "validacao": {"erros": [], "avisos": []}, "referencias": {"erros": [], "avisos": []},
+            "erros": [], "tempo": None,
+        }
+        inicio = time.perf_counter()
+        try:
+            if estado.sessao is None:
+                estado.sessao = SessaoPlanilha(path, self.engine, incremental=True)
+            else:
+                estado.sessao.revalidar()
+            sessao = estado.sessao
+            dados = sessao.dados_por_aba
+            evento["abas_relidas"] = list(sessao.leitura_incremental.relidas)
+            if not dados:
+                raise ValueError("nenhuma aba de layout reconhecida")
+        except Exception as e:
+            evento["erros"].append(f"leitura: {e}")
+            evento["tempo"] = round(time.perf_counter() - inicio, 4)
+            return evento
+
+        info = _info_aba_entrada(dados) or {}
+        campos = info.get("campos", [])
+        layout = LayoutCompilado(dados, path, sessao)
+        erros, avisos, _ = validar_campos(campos, layout)
+        evento["validacao"] = {"erros": erros, "avisos": avisos}
+        erros, avisos, _ = validar_referencias(dados, layout)
+        evento["referencias"] = {"erros": erros, "avisos": avisos}
+
+        prefixo = prefixo_artefatos(path, sessao)
+        diretorio = (os.path.join(self.dir_saida, _nome_diretorio(prefixo))
+                     if self.por_evento else self.dir_saida)
+        evento["identificador_evento"] = prefixo
+        evento["diretorio"] = diretorio
+        try:
+            os.makedirs(diretorio, exist_ok=True)
+            manifesto = ManifestoSaida(diretorio, prefixo)
+        except OSError as e:
+            evento["erros"].append(f"{diretorio}: {e}")
+            evento["tempo"] = round(time.perf_counter() - inicio, 4)
+            return evento
+
+        for chave, nome_arq in tarefas_artefatos(prefixo):
+            try:
+                gerar_artefato(
+                    chave, os.path.join(diretorio, nome_arq), dados, path, sessao, campos,
+                    info.get("headers", []), info.get("sections", {}),
+                    cache=estado.artefatos, manifesto=manifesto, layout=layout,
+                    lote_sql=self.lote_sql,
+                )
+            except Exception as e:
+                evento["erros"].append(f"{nome_arq}: {e}")
+        try:
+            manifesto.concluir()
+        except OSError as e:
+            evento["erros"].append(f"{NOME_MANIFESTO}: {e}")
+        evento["gravados"] = manifesto.gravados
+        evento["inalterados"] = manifesto.inalterados
+
+        evento["tempo"] = round(time.perf_counter() - inicio, 4)
+        return evento
+
+
+def _cli_gerar(args):
+    planilhas = expandir_planilhas(args.planilhas)
+    if not planilhas:
+        print("Nenhuma planilha encontrada.", file=sys.stderr)
+        return 1
+
+    def _progresso(resumo, concluidas, total):
+        estado = "erro" if resumo["erros"] else ("validação" if _com_erros_validacao(resumo) else "ok")
+        print(f"[{concluidas}/{total}] {resumo['planilha']} → "
+              f"{resumo.get('identificador_evento') or '-'}  "
+              f"{resumo['tempos'].get('total', 0):.2f} s  {estado}", file=sys.stderr)
+
+    resumo = executar_lote(
+        planilhas, args.saida, processos=args.processos, engine=args.engine,
+        usar_cache=not args.sem_cache, copiar_planilha=not args.sem_planilha,
+        ao_concluir=_progresso, lote_sql=args.lote_sql,
+    )
+    texto = json.dumps(resumo, ensure_ascii=False, indent=2)
+    if args.resumo:
+        with open(args.resumo, "w", encoding="utf-8") as f:
+            f.write(texto + "\n")
+    else:
+        print(texto)
+    falhou = resumo["com_erros"] or (resumo["com_erros_validacao"] and not args.ignorar_validacao)
+    return 1 if falhou else 0
+
+
+def _cli_validar(args):
+    planilhas = expandir_planilhas(args.planilhas)
+    if not planilhas:
+        print("Nenhuma planilha encontrada.", file=sys.stderr)
+        return 1
+
+    def _progresso(resumo, concluidas, total):
+        print(f"[{concluidas}/{total}] {resumo['planilha']}  "
+              f"{resumo['tempos'].get('total', 0):.2f} s  {resumo['severidade']}", file=sys.stderr)
+
+    relatorio = validar_lote(
+        planilhas, processos=args.processos, engine=args.engine,
+        usar_cache=not args.sem_cache, ao_concluir=_progresso,
+    )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            f.write(json.dumps(relatorio, ensure_ascii=False, indent=2) + "\n")
+    if args.csv:
+        gravar_relatorio_validacao_csv(relatorio, args.csv)
+    print(tabela_relatorio_validacao(relatorio))
+    falhou = relatorio["por_severidade"]["leitura"] or relatorio["por_severidade"]["erro"]
+    return 1 if falhou else 0
+
+
+def _cli_observar(args):
+    if not expandir_planilhas(args.planilhas):
+        print("Nenhuma planilha encontrada (aguardando).", file=sys.stderr)
+
+    def _ao_gerar(evento):
+        estado = "erro" if evento["erros"] else ("validação" if _com_erros_validacao(evento) else "ok")
+        print(f"{evento['planilha']} → {evento.get('identificador_evento') or '-'}  "
+              f"{len(evento['gravados'])} gravado(s), {len(evento['inalterados'])} sem alterações  "
+              f"{evento['tempo']:.2f} s  {estado}", file=sys.stderr)
+        print(json.dumps(evento, ensure_ascii=False), flush=True)
+
+    observador = ObservadorPlanilhas(
+        args.planilhas, args.saida, engine=args.engine, intervalo=args.intervalo,
+        espera=args.espera, ao_gerar=_ao_gerar, lote_sql=args.lote_sql,
+    )
+    print("Observando (Ctrl+C para encerrar)...", file=sys.stderr)
+    try:
+        observador.executar()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def _tamanho_lote(texto):
+    n = int(texto)
+    if n < 1:
+        raise argparse.ArgumentTypeError("o tamanho do lote deve ser maior que zero")
+    return n
+
+
+def _argumento_lote_sql(parser):
+    parser.add_argument(
+        "--lote-sql", type=_tamanho_lote, nargs="?", const=LOTE_SQL_PADRAO, metavar="N",
+        help="ComandoSQL.sql com um INSERT ... SELECT a cada N campos, ids de tabela e tipo "
+             f"resolvidos uma vez por lote (N padrão: {LOTE_SQL_PADRAO}; sem a opção: "
+             "um INSERT por campo)",
+    )
+
+
+def executar_cli(argv):
+    """Modo linha de comando. Retorna o código de saída do processo."""
+    parser = argparse.ArgumentParser(
+        prog="gerador_xml",
+        description="Gerador de XML — modo linha de comando (sem argumentos: interface gráfica).",
+    )
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p = sub.add_parser(
+        "gerar", help="gera os artefatos de várias planilhas em {saida}/{IdentificadorEvento}/",
+        description="Gera XMLs, ComandoSQL.sql e a cópia da planilha de cada planilha informada, "
+                    "em paralelo entre processos, e imprime um resumo JSON. Código de saída 1 "
+                    "se alguma planilha tiver erro de leitura/geração ou de validação.",
+    )
+    p.add_argument("planilhas", nargs="+",
+                   help="arquivos .xlsx, diretórios ou padrões glob (ex.: 'eventos/**/*.xlsx')")
+    p.add_argument("-o", "--saida", required=True, help="diretório de saída")
+    p.add_argument("-p", "--processos", type=int,
+                   help="processos em paralelo (padrão: um por núcleo; 1: sequencial)")
+    p.add_argument("--engine", choices=ENGINES_LEITURA, help="engine de leitura do xlsx")
+    p.add_argument("--sem-cache", action="store_true", help="não usa o cache de leitura em disco")
+    p.add_argument("--sem-planilha", action="store_true",
+                   help="não gera a cópia evento_event_{ID}.xlsx")
+    p.add_argument("--ignorar-validacao", action="store_true",
+                   help="erros de validação não alteram o código de saída")
+    p.add_argument("--resumo", help="grava o resumo JSON neste arquivo em vez da saída padrão")
+    _argumento_lote_sql(p)
+    p.set_defaults(func=_cli_gerar)
+
+    p = sub.add_parser(
+        "validar", help="valida várias planilhas (como o F5) e consolida um relatório",
+        description="Valida as posições de 'Campos Entrada' e as referências entre abas de "
+                    "cada planilha informada, em paralelo entre processos, sem gerar "
+                    "artefatos. Imprime uma tabela por planilha, da mais grave para a menos "
+                    "grave, e grava o relatório completo em JSON e/ou CSV. Código de saída 1 "
+                    "se alguma planilha tiver erro de leitura ou de validação.",
+    )
+    p.add_argument("planilhas", nargs="+",
+                   help="arquivos .xlsx, diretórios ou padrões glob (ex.: 'eventos/**/*.xlsx')")
+    p.add_argument("-p", "--processos", type=int,
+                   help="processos em paralelo (padrão: um por núcleo; 1: sequencial)")
+    p.add_argument("--engine", choices=ENGINES_LEITURA, help="engine de leitura do xlsx")
+    p.add_argument("--sem-cache", action="store_true", help="não usa o cache de leitura em disco")
+    p.add_argument("--json", help="grava o relatório completo (mensagens e tempos) em JSON")
+    p.add_argument("--csv", help="grava o relatório em CSV, uma linha por mensagem")
+    p.set_defaults(func=_cli_validar)
+
+    p = sub.add_parser(
+        "observar", help="regenera os XML/SQL sempre que uma planilha é salva",
+        description="Observa planilhas (arquivos, diretórios ou padrões glob) e, a cada "
+                    "salvamento, relê só as abas alteradas e regrava só os arquivos "
+                    "{ID}_Layout_*.xml / ComandoSQL.sql que mudaram, em {saida}/{IdentificadorEvento}/. "
+                    "Imprime uma linha JSON por regeneração.",
+    )
+    p.add_argument("planilhas", nargs="+",
+                   help="arquivos .xlsx, diretórios ou padrões glob (ex.: 'eventos/*.xlsx')")
+    p.add_argument("-o", "--saida", required=True, help="diretório de saída")
+    p.add_argument("--engine", choices=ENGINES_LEITURA, help="engine de leitura do xlsx")
+    p.add_argument("--intervalo", type=float, default=0.2,
+                   help="segundos entre verificações (padrão: 0.2)")
+    p.add_argument("--espera", type=float, default=0.3,
+                   help="segundos sem novas alterações antes de regenerar (padrão: 0.3)")
+    _argumento_lote_sql(p)
+    p.set_defaults(func=_cli_observar)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(executar_cli(sys.argv[1:]))
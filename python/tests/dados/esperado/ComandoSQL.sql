@@ -0,0 +1,363 @@
+delete from COLUMN_CONFIGURATION where x=1;
+
+commit;
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='VARCHAR2'),
+  'CAMPO_0','Desc <0> & ''x''',5,null,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='VARCHAR2'),
+  'CAMPO_2','Desc <2> & ''x''',8,null,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='NUMBER'),
+  'CAMPO_3','Desc <3> & ''x''',null,7,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='DATE'),
+  'CAMPO_8','Desc <8> & ''x''',null,null,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='NUMBER'),
+  'CAMPO_9','Desc <9> & ''x''',null,6,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='NUMBER'),
+  'CAMPO_11','Desc <11> & ''x''',null,2,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='DATE'),
+  'CAMPO_12','Desc <12> & ''x''',null,null,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='DATE'),
+  'CAMPO_13','Desc <13> & ''x''',null,null,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='DATE'),
+  'CAMPO_14','Desc <14> & ''x''',null,null,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='DATE'),
+  'CAMPO_20','Desc <20> & ''x''',null,null,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='NUMBER'),
+  'CAMPO_21','Desc <21> & ''x''',null,9,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='VARCHAR2'),
+  'CAMPO_22','Desc <22> & ''x''',20,null,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='NUMBER'),
+  'CAMPO_24','Desc <24> & ''x''',null,20,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='NUMBER'),
+  'CAMPO_25','Desc <25> & ''x''',null,14,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='VARCHAR2'),
+  'CAMPO_26','Desc <26> & ''x''',8,null,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='NUMBER'),
+  'CAMPO_28','Desc <28> & ''x''',null,8,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='NUMBER'),
+  'CAMPO_29','Desc <29> & ''x''',null,5,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='DATE'),
+  'CAMPO_30','Desc <30> & ''x''',null,null,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='DATE'),
+  'CAMPO_34','Desc <34> & ''x''',null,null,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='NUMBER'),
+  'CAMPO_35','Desc <35> & ''x''',null,11,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='VARCHAR2'),
+  'CAMPO_39','Desc <39> & ''x''',4,null,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='VARCHAR2'),
+  'CAMPO_40','Desc <40> & ''x''',18,null,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='NUMBER'),
+  'CAMPO_41','Desc <41> & ''x''',null,16,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='DATE'),
+  'CAMPO_42','Desc <42> & ''x''',null,null,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='DATE'),
+  'CAMPO_43','Desc <43> & ''x''',null,null,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='DATE'),
+  'CAMPO_50','Desc <50> & ''x''',null,null,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='DATE'),
+  'CAMPO_53','Desc <53> & ''x''',null,null,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='NUMBER'),
+  'CAMPO_55','Desc <55> & ''x''',null,5,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='NUMBER'),
+  'CAMPO_57','Desc <57> & ''x''',null,20,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='VARCHAR2'),
+  'CAMPO_63','Desc <63> & ''x''',18,null,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='NUMBER'),
+  'CAMPO_64','Desc <64> & ''x''',null,6,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='NUMBER'),
+  'CAMPO_65','Desc <65> & ''x''',null,14,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='NUMBER'),
+  'CAMPO_66','Desc <66> & ''x''',null,1,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='NUMBER'),
+  'CAMPO_68','Desc <68> & ''x''',null,6,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='DATE'),
+  'CAMPO_70','Desc <70> & ''x''',null,null,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='DATE'),
+  'CAMPO_71','Desc <71> & ''x''',null,null,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='DATE'),
+  'CAMPO_73','Desc <73> & ''x''',null,null,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='DATE'),
+  'CAMPO_74','Desc <74> & ''x''',null,null,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='NUMBER'),
+  'CAMPO_75','Desc <75> & ''x''',null,9,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='NUMBER'),
+  'CAMPO_76','Desc <76> & ''x''',null,13,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='NUMBER'),
+  'CAMPO_77','Desc <77> & ''x''',null,11,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='VARCHAR2'),
+  'CAMPO_81','Desc <81> & ''x''',16,null,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='NUMBER'),
+  'CAMPO_83','Desc <83> & ''x''',null,13,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='VARCHAR2'),
+  'CAMPO_84','Desc <84> & ''x''',10,null,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='NUMBER'),
+  'CAMPO_88','Desc <88> & ''x''',null,18,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='NUMBER'),
+  'CAMPO_89','Desc <89> & ''x''',null,4,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='VARCHAR2'),
+  'CAMPO_92','Desc <92> & ''x''',11,null,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='DATE'),
+  'CAMPO_93','Desc <93> & ''x''',null,null,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='VARCHAR2'),
+  'CAMPO_95','Desc <95> & ''x''',15,null,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='DATE'),
+  'CAMPO_96','Desc <96> & ''x''',null,null,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='DATE'),
+  'CAMPO_98','Desc <98> & ''x''',null,null,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='VARCHAR2'),
+  'CAMPO_99','Desc <99> & ''x''',13,null,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='NUMBER'),
+  'CAMPO_101','Desc <101> & ''x''',null,17,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='NUMBER'),
+  'CAMPO_102','Desc <102> & ''x''',null,6,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='VARCHAR2'),
+  'CAMPO_103','Desc <103> & ''x''',9,null,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='DATE'),
+  'CAMPO_105','Desc <105> & ''x''',null,null,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='NUMBER'),
+  'CAMPO_107','Desc <107> & ''x''',null,12,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='NUMBER'),
+  'CAMPO_110','Desc <110> & ''x''',null,1,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='VARCHAR2'),
+  'CAMPO_111','Desc <111> & ''x''',1,null,null,1,0,0);
+
+insert into COLUMN_CONFIGURATION (ID_COLUMN_CONFIGURATION,ID_TABLE_CONFIGURATION,ID_DATA_TYPE,NM_COLUMN_CONFIGURATION,DS_COLUMN_CONFIGURATION,NR_DATA_LENGTH,NR_DATA_PRECISION,NR_DATA_SCALE,IN_NULLABLE,IN_PK,IN_FK) values (
+  seq_COLUMN_CONFIGURATION.nextval,
+  (select ID_TABLE_CONFIGURATION from TABLE_CONFIGURATION where NM_TABLE_CONFIGURATION='TAB_EVT'),
+  (select ID_DATA_TYPE from DATA_TYPE where NM_DATA_TYPE='NUMBER'),
+  'CAMPO_119','Desc <119> & ''x''',null,2,null,1,0,0);
\ No newline at end of file
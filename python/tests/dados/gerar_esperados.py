@@ -0,0 +1,164 @@
+"""
+Gera a planilha de teste (evento.xlsx) e os artefatos esperados (esperado/).
+
+Os esperados vêm da versão de referência do gerador — a anterior às otimizações,
+cuja saída elas devem preservar byte a byte — e não do código atual:
+
+    git show 1f95b5c:python/gerador_xml.py > /tmp/gerador_referencia.py
+    python tests/dados/gerar_esperados.py /tmp/gerador_referencia.py
+
+Com --planilha, recria também evento.xlsx (os esperados mudam junto).
+validacao.json traz o (erros, avisos, infos) de validar_campos da referência; as
+mensagens de sobreposição mudaram de propósito desde então (faixa em vez da
+posição inicial), e test_gerador_xml.py confere essa diferença à parte.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import random
+
+import openpyxl
+
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+PLANILHA = os.path.join(DIRETORIO, "evento.xlsx")
+ESPERADO = os.path.join(DIRETORIO, "esperado")
+
+# Artefato → nome do arquivo esperado
+ARQUIVOS_ESPERADOS = {
+    "LayoutEntrada":      "Layout_entrada.xml",
+    "LayoutPersistencia": "Layout_persistencia.xml",
+    "mapaAtributo":       "Layout_mapa_atributo.xml",
+    "DadoExterno":        "Layout_enriquecimento.xml",
+    "ComandoSQL":         "ComandoSQL.sql",
+}
+
+
+def criar_planilha(path, n=120):
+    """
+    Evento com 'n' campos: flags variadas, valores com caracteres escapados em XML,
+    identificadores float, uma sobreposição, uma lacuna, uma PosicaoFinal errada e
+    uma linha sem NomeCampo, além das abas auxiliares e de enriquecimento.
+    """
+    aleatorio = random.Random(1)
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Identificação Evento"
+    ws.append(["Titulo"])
+    ws.append(["Identificador", "IdentificadorEvento", "TamanhoLayout", "NomeTabela"])
+    ws.append([7, "EVT_TESTE", 999, "TAB_EVT"])
+
+    ce = wb.create_sheet("Campos Entrada")
+    ce.append(["Layouts", None, None, None, None, None, "Campos", None, None, None, None, None,
+               None, None, None, None, "Layout Persistencia", None, "MapaAtr"])
+    ce.append(["Entrada", "Persistência", "Enriquecimento", "MapaAtributo", "Saida",
+               "CampoConcatenado", "IdentificadorCampo", "NomeCampo", "DescricaoCampo",
+               "TipoCampo", "TamanhoCampo", "PosicaoInicial", "PosicaoFinal", "ValorPadrao",
+               "AlinhamentoCampo", "CampoObrigatorio", "NomeColuna", "NomeTabela", "Origin", "type"])
+    pos = 1
+    for i in range(n):
+        tam = aleatorio.randint(1, 20)
+        tipo = aleatorio.choice(["TEXTO", "INTEIRO", "DATA", "DECIMAL"])
+        ini = pos
+        if i == 50:
+            ini = pos - 3       # sobreposição
+        if i == 80:
+            ini = pos + 5       # lacuna
+        fim = ini + tam - 1
+        if i == 90:
+            fim += 1            # PosicaoFinal ≠ PosicaoInicial + TamanhoCampo - 1
+        linha = [
+            aleatorio.choice(["S", "S", "N"]), aleatorio.choice(["S", "N"]), "N",
+            aleatorio.choice(["S", "N"]), "N", None,
+            float(i + 1) if i % 3 == 0 else i + 1, f"CAMPO_{i}", f"Desc <{i}> & 'x'", tipo, tam,
+            ini, fim, "0" if i % 7 == 0 else None,
+            aleatorio.choice(["BRANCO_ESQUERDA", "ZERO_ESQUERDA", None]),
+            aleatorio.choice(["S", "N"]), f"COL_{i}", None,
+            aleatorio.choice(["ENRICHMENT", "EVENT"]), aleatorio.choice(["STRING", "LONG", None]),
+        ]
+        if i == 100:
+            linha[7] = None     # sem NomeCampo: ignorada
+        ce.append(linha)
+        pos = ini + tam
+
+    pe = wb.create_sheet("Persistencia_Enriquecimento")
+    pe.append(["NomeCampo", "NomeColuna", "NomeTabela"])
+    for i in range(5):
+        pe.append([f"P_{i}", f"PC_{i}", "T"])
+
+    ra = wb.create_sheet("Rule Attribute Valor Padrão")
+    ra.append(["dataType", "pattern", "value"])
+    ra.append(["STRING", None, ""])
+    ra.append(["LONG", "#", 0])
+    ra.append(["DATE", "dd/MM/yyyy", "01/01/1900"])
+
+    en = wb.create_sheet("Enriquecimento")
+    en.append(["x"])
+    en.append(["IdentificadorEnriquecimento", "Nome", "ComandoSQL", "Descricao", "SQLChave",
+               "DataSource", "Prioridade"])
+    for k in range(1, 4):
+        en.append([float(k), f"ENR_{k}", f"SELECT a, b FROM t WHERE x = ? AND y < 3 && z > '{k}'",
+                   f"d{k}", "SELECT 1 FROM dual WHERE a<b", "DS", k])
+    ch = wb.create_sheet("Enr_ChaveAcesso")
+    ch.append(["IdentificadorEnriquecimento", "Identificador", "NomeCampo", "PosInicial", "PosFinal"])
+    for k in range(1, 4):
+        for j in range(2):
+            ch.append([k, j + 1, f"CH_{k}_{j}", 1 + j * 10, 10 + j * 10])
+    cr = wb.create_sheet("Enr_CampoRetornado")
+    cr.append(["IdentificadorEnriquecimento", "AliasCampo", "CampoDestino", "NomeCampo",
+               "TipoCampo", "MascaraCampo", "PosInicial", "PosFinal"])
+    for k in range(1, 4):
+        for j in range(3):
+            cr.append([k, f"A{j}", None if j == 1 else f"D{j}", f"RET_{k}_{j}", "TEXTO", None,
+                       5000 + j, 5010 + j])
+
+    sq = wb.create_sheet("ComandosSQL")
+    sq.append(["cabecalho", "delete from COLUMN_CONFIGURATION where x=1;"])
+    sq.append(["insert na tabela column_configuration", "ignorado"])
+    sq.append(["outro", "commit;"])
+
+    vazia = wb.create_sheet("Vazia")
+    vazia["A1"] = "nada"
+    wb.save(path)
+
+
+def gravar_esperados(gerador, path=PLANILHA, diretorio=ESPERADO):
+    """
+    Artefatos de `path` gerados pelo módulo `gerador`, como os gera a interface,
+    e a validação da aba 'Campos Entrada'.
+    """
+    dados = gerador.ler_todas_abas(path)
+    ce = dados["Campos Entrada"]
+    conteudos = {
+        "LayoutEntrada": gerador.construir_xml(
+            ce["campos"], ce["headers"], "Campos Entrada", ce["sections"]),
+        "LayoutPersistencia": gerador.construir_xml_persistencia(dados, path),
+        "mapaAtributo": gerador.construir_xml_mapa_atributo(dados, path),
+        "DadoExterno": gerador.construir_xml_enriquecimento(dados),
+        "ComandoSQL": gerador.gerar_comandos_sql(dados, path),
+    }
+    os.makedirs(diretorio, exist_ok=True)
+    for chave, nome in ARQUIVOS_ESPERADOS.items():
+        with open(os.path.join(diretorio, nome), "w", encoding="utf-8", newline="") as f:
+            f.write(conteudos[chave])
+    with open(os.path.join(diretorio, "validacao.json"), "w", encoding="utf-8") as f:
+        json.dump(gerador.validar_campos(ce["campos"]), f, ensure_ascii=False, indent=1)
+        f.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("gerador", help="gerador_xml.py da versão de referência")
+    parser.add_argument("--planilha", action="store_true", help="recria evento.xlsx")
+    args = parser.parse_args()
+    if args.planilha:
+        criar_planilha(PLANILHA)
+    spec = importlib.util.spec_from_file_location("gerador_referencia", args.gerador)
+    gerador = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(gerador)
+    gravar_esperados(gerador)
+
+
+if __name__ == "__main__":
+    main()
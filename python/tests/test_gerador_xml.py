@@ -0,0 +1,395 @@
+"""
+Testes do gerador_xml sobre a planilha de teste (dados/evento.xlsx).
+
+Os artefatos esperados (dados/esperado/) foram gerados pela versão de referência,
+anterior às otimizações (ver dados/gerar_esperados.py): leitores, geradores em
+streaming, modelo compilado, cache de artefatos e modo lote têm de reproduzi-los
+byte a byte. Os testes de validação conferem que os caminhos alternativos
+(backend numpy, ValidacaoIncremental, modelo compartilhado) dão o mesmo resultado
+de validar_campos.
+
+    cd python
+    python -m unittest discover -s tests      (ou: python -m pytest tests)
+"""
+
+import io
+import json
+import os
+import random
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+import zipfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import gerador_xml as g     # noqa: E402
+import lote                 # noqa: E402
+
+DADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dados")
+PLANILHA = os.path.join(DADOS, "evento.xlsx")
+ESPERADO = os.path.join(DADOS, "esperado")
+
+# Artefato → arquivo esperado (o nome gerado é {IdentificadorEvento}_{arquivo}, exceto o SQL)
+ARQUIVOS_ESPERADOS = {
+    "LayoutEntrada":      "Layout_entrada.xml",
+    "LayoutPersistencia": "Layout_persistencia.xml",
+    "mapaAtributo":       "Layout_mapa_atributo.xml",
+    "DadoExterno":        "Layout_enriquecimento.xml",
+    "ComandoSQL":         "ComandoSQL.sql",
+}
+
+
+def _esperado(chave):
+    with open(os.path.join(ESPERADO, ARQUIVOS_ESPERADOS[chave]), encoding="utf-8") as f:
+        return f.read()
+
+
+def _artefato(chave, sessao, **opcoes):
+    dados = sessao.dados_por_aba
+    ce = dados["Campos Entrada"]
+    return g.construir_artefato(chave, dados, PLANILHA, sessao, ce["campos"], ce["headers"],
+                                ce["sections"], **opcoes)
+
+
+def _campos_aleatorios(aleatorio, n):
+    """Campos com posições sobrepostas, lacunas, fórmulas erradas e valores ausentes."""
+    campos = []
+    for i in range(n):
+        ini = aleatorio.randint(1, 120)
+        tamanho = aleatorio.randint(-2, 15) if aleatorio.random() < 0.1 else aleatorio.randint(1, 15)
+        if aleatorio.random() < 0.05:
+            ini = None
+        fim = aleatorio.choice([None, 0, (ini or 0) + tamanho - 1, (ini or 0) + tamanho - 1])
+        campos.append({
+            "nome": f"C{i}", "pos_ini": ini, "tamanho": tamanho, "pos_fin": fim,
+            "entrada": aleatorio.choice("SSSSN"), "obrigatorio": aleatorio.choice(["S", "N", ""]),
+            "valor": aleatorio.choice(["", "x"]), "_raw": {},
+        })
+    return campos
+
+
+class TestArtefatos(unittest.TestCase):
+    """Os cinco artefatos iguais aos da versão de referência, por todos os caminhos."""
+
+    def assertArtefatos(self, gerar):
+        for chave in ARQUIVOS_ESPERADOS:
+            with self.subTest(artefato=chave):
+                self.assertEqual(gerar(chave), _esperado(chave))
+
+    def test_engines_de_leitura(self):
+        for engine in g.ENGINES_LEITURA:
+            with self.subTest(engine=engine):
+                sessao = g.SessaoPlanilha(PLANILHA, engine)
+                self.assertArtefatos(lambda chave: _artefato(chave, sessao))
+
+    def test_abas_sob_demanda(self):
+        sessao = g.SessaoPlanilha(PLANILHA, sob_demanda=True)
+        self.assertArtefatos(lambda chave: _artefato(chave, sessao))
+
+    def test_abas_sob_demanda_dimensao_desatualizada(self):
+        # <dimension ref="A1"/> em todas as abas, como gravam algumas ferramentas
+        diretorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, diretorio, True)
+        planilha = os.path.join(diretorio, "evento.xlsx")
+        with zipfile.ZipFile(PLANILHA) as origem, zipfile.ZipFile(planilha, "w") as destino:
+            for item in origem.infolist():
+                conteudo = origem.read(item)
+                if item.filename.startswith("xl/worksheets/"):
+                    conteudo = re.sub(rb'<dimension ref="[^"]*"', b'<dimension ref="A1"', conteudo)
+                destino.writestr(item, conteudo)
+        esperadas = set(g.ler_todas_abas(PLANILHA))
+        for engine in g.ENGINES_LEITURA:
+            if engine == "openpyxl":
+                continue
+            with self.subTest(engine=engine):
+                sessao = g.SessaoPlanilha(planilha, engine, sob_demanda=True)
+                self.assertEqual(set(sessao.dados_por_aba), esperadas)
+                self.assertArtefatos(lambda chave: _artefato(chave, sessao))
+
+    def test_cache_de_leitura(self):
+        diretorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, diretorio, True)
+        planilha = os.path.join(diretorio, "evento.xlsx")
+        shutil.copy(PLANILHA, planilha)
+
+        class CacheSalvamentoNoMeio(g.CacheLeitura):
+            def chave(self, filepath, engine):
+                chave = super().chave(filepath, engine)
+                # Planilha salva entre o cálculo da chave e a leitura
+                st = os.stat(filepath)
+                os.utime(filepath, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+                return chave
+
+        for sob_demanda in (False, True):
+            with self.subTest(sob_demanda=sob_demanda):
+                cache = CacheSalvamentoNoMeio(os.path.join(diretorio, f"cache_{sob_demanda}"))
+                self.assertTrue(cache.ler_todas_abas(planilha, sob_demanda=sob_demanda))
+                self.assertEqual(cache.tamanho()[0], 0)
+
+        cache = g.CacheLeitura(os.path.join(diretorio, "cache"))
+        cache.ler_todas_abas(planilha)
+        self.assertEqual(cache.tamanho()[0], 1)
+        sessao = g.SessaoPlanilha(planilha, cache=cache)
+        self.assertArtefatos(lambda chave: _artefato(chave, sessao))
+
+    def test_sem_sessao(self):
+        dados = g.ler_todas_abas(PLANILHA)
+        ce = dados["Campos Entrada"]
+        self.assertArtefatos(lambda chave: g.construir_artefato(
+            chave, dados, PLANILHA, None, ce["campos"], ce["headers"], ce["sections"]))
+
+    def test_layout_compartilhado(self):
+        sessao = g.SessaoPlanilha(PLANILHA)
+        layout = g.LayoutCompilado(sessao.dados_por_aba, PLANILHA, sessao)
+        g.validar_campos(sessao.dados_por_aba["Campos Entrada"]["campos"], layout)
+        self.assertArtefatos(lambda chave: _artefato(chave, sessao, layout=layout))
+
+    def test_destino(self):
+        sessao = g.SessaoPlanilha(PLANILHA)
+
+        def gerar(chave):
+            destino = io.StringIO()
+            self.assertIsNone(_artefato(chave, sessao, destino=destino))
+            return destino.getvalue()
+        self.assertArtefatos(gerar)
+
+    def test_cache_de_artefatos(self):
+        sessao = g.SessaoPlanilha(PLANILHA)
+        dados = sessao.dados_por_aba
+        ce = dados["Campos Entrada"]
+        cache = g.CacheArtefatos()
+
+        def construir(chave):
+            return cache.construir(chave, dados, PLANILHA, sessao, ce["campos"], ce["headers"],
+                                   ce["sections"])
+
+        for chave in ARQUIVOS_ESPERADOS:
+            self.assertEqual(construir(chave), (_esperado(chave), True))
+            self.assertEqual(construir(chave), (_esperado(chave), False))
+            # O cache guarda um SHA-256 das entradas, não uma cópia delas
+            assinatura, _ = cache._itens[chave][0]
+            self.assertIsInstance(assinatura, bytes)
+            self.assertEqual(len(assinatura), 32)
+
+        # Persistência de um campo alterada: só os artefatos que a leem são refeitos
+        campo = next(c for c in ce["campos"] if c["_raw"].get("Persistência") == "N")
+        campo["_raw"]["Persistência"] = "S"
+        for chave in ARQUIVOS_ESPERADOS:
+            with self.subTest(artefato=chave):
+                conteudo, regenerado = construir(chave)
+                self.assertEqual(regenerado, chave in ("LayoutPersistencia", "ComandoSQL"))
+                self.assertEqual(conteudo, _artefato(chave, sessao))
+
+    def test_modo_lote(self):
+        saida = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, saida, True)
+        for execucao in range(2):
+            resumo = lote.gerar_lote_planilha(PLANILHA, saida, usar_cache=False,
+                                              copiar_planilha=False)
+            self.assertEqual(resumo["erros"], [])
+            self.assertEqual(resumo["identificador_evento"], "EVT_TESTE")
+            # 2ª execução: mesmos bytes, nada regravado
+            self.assertEqual(len(resumo["inalterados"] if execucao else resumo["gravados"]), 5)
+        for chave, nome in ARQUIVOS_ESPERADOS.items():
+            if chave != "ComandoSQL":
+                nome = f"EVT_TESTE_{nome}"
+            with self.subTest(artefato=chave):
+                with open(os.path.join(resumo["diretorio"], nome), encoding="utf-8") as f:
+                    self.assertEqual(f.read(), _esperado(chave))
+
+    def test_lote_sql_mantem_campos(self):
+        sessao = g.SessaoPlanilha(PLANILHA)
+        padrao = _artefato("ComandoSQL", sessao)
+        agrupado = _artefato("ComandoSQL", sessao, lote_sql=7)
+        # Mesmos campos, na mesma ordem, numerados por NR_ORDEM dentro de cada lote
+        nomes = re.findall(r"^  '([^']*)',", padrao, re.M)
+        linhas = re.findall(r"^    select (\d+)(?: NR_ORDEM)?, ?'([^']*)'", agrupado, re.M)
+        self.assertEqual([nome for _, nome in linhas], nomes)
+        self.assertEqual([int(ordem) for ordem, _ in linhas], [i % 7 for i in range(len(nomes))])
+        self.assertEqual(agrupado.count("order by c.NR_ORDEM"), -(-len(nomes) // 7))
+
+    def test_lote_sql_uma_linha_por_campo(self):
+        # Executa os INSERT ... SELECT em SQLite (sem dual, cast e sequência do Oracle)
+        # com nomes repetidos em TABLE_CONFIGURATION e DATA_TYPE
+        sessao = g.SessaoPlanilha(PLANILHA)
+        agrupado = _artefato("ComandoSQL", sessao, lote_sql=7)
+        inserts = [c for c in agrupado.split("\n\n") if c.startswith("insert into COLUMN_CONFIGURATION")]
+        nomes = re.findall(r"^  '([^']*)',", _artefato("ComandoSQL", sessao), re.M)
+        tabela = re.search(r"NM_TABLE_CONFIGURATION='([^']*)'", inserts[0]).group(1)
+        banco = sqlite3.connect(":memory:")
+        self.addCleanup(banco.close)
+        banco.executescript(
+            f"create table COLUMN_CONFIGURATION ({g._COLUNAS_COLUMN_CONFIGURATION});"
+            "create table TABLE_CONFIGURATION (ID_TABLE_CONFIGURATION, NM_TABLE_CONFIGURATION);"
+            "create table DATA_TYPE (ID_DATA_TYPE, NM_DATA_TYPE);"
+            f"insert into TABLE_CONFIGURATION values (7, '{tabela}'), (3, '{tabela}');"
+            "insert into DATA_TYPE values (1, 'VARCHAR2'), (2, 'NUMBER'), (4, 'VARCHAR2'),"
+            " (5, 'DATE'), (6, 'NUMBER');"
+        )
+        for comando in inserts:
+            banco.execute(comando.replace("seq_COLUMN_CONFIGURATION.nextval", "null")
+                          .replace("cast(null as number)", "null").replace(" from dual", "")
+                          .rstrip(";"))
+        linhas = banco.execute("select NM_COLUMN_CONFIGURATION, ID_TABLE_CONFIGURATION, "
+                               "ID_DATA_TYPE from COLUMN_CONFIGURATION").fetchall()
+        self.assertEqual([nome for nome, _, _ in linhas], nomes)
+        self.assertEqual({tabela for _, tabela, _ in linhas}, {3})
+        self.assertLessEqual({tipo for _, _, tipo in linhas}, {1, 2, 5})
+
+
+class TestValidacao(unittest.TestCase):
+    """validar_campos e os caminhos que devem reproduzi-la."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.dados = g.ler_todas_abas(PLANILHA)
+        cls.campos = cls.dados["Campos Entrada"]["campos"]
+
+    def test_mensagens_da_referencia(self):
+        with open(os.path.join(ESPERADO, "validacao.json"), encoding="utf-8") as f:
+            erros_ref, avisos_ref, infos_ref = json.load(f)
+        erros, avisos, infos = g.validar_campos(self.campos)
+        self.assertEqual(avisos, avisos_ref)
+        self.assertEqual(infos, infos_ref)
+        # Única diferença deliberada: a sobreposição traz a faixa comum, não só o início
+        self.assertEqual(erros_ref, ["SOBREPOSIÇÃO: 'CAMPO_49' e 'CAMPO_50' se sobrepõem em pos=435."])
+        self.assertEqual(erros, ["SOBREPOSIÇÃO: 'CAMPO_49' e 'CAMPO_50' se sobrepõem em pos=435–437."])
+
+    def test_todas_as_sobreposicoes(self):
+        # Todo par de campos posicionados que divide bytes, comparando cada par
+        for semente in range(100):
+            aleatorio = random.Random(semente)
+            campos = _campos_aleatorios(aleatorio, aleatorio.randint(0, 40))
+            posicionados = g.CamposCompilados(campos).posicionados
+            pares = {
+                (a.indice, b.indice)
+                for i, a in enumerate(posicionados) for b in posicionados[i + 1:]
+                if b.pos_ini <= a.pos_ini + a.tamanho - 1 and a.tamanho > 0 and b.tamanho > 0
+            }
+            analise = g.AnalisePosicoes(posicionados, "python")
+            with self.subTest(semente=semente):
+                self.assertEqual({(a.indice, b.indice) for a, b, _, _ in analise.sobreposicoes
+                                  if a.tamanho > 0 and b.tamanho > 0}, pares)
+
+    def test_layout_compartilhado(self):
+        layout = g.LayoutCompilado(self.dados, PLANILHA)
+        self.assertEqual(g.validar_campos(self.campos, layout), g.validar_campos(self.campos))
+
+    @unittest.skipIf(g.np is None, "NumPy não instalado")
+    def test_backend_numpy(self):
+        self.assertEqual(g.validar_campos(self.campos, backend="numpy"),
+                         g.validar_campos(self.campos, backend="python"))
+        for semente in range(200):
+            aleatorio = random.Random(semente)
+            campos = _campos_aleatorios(aleatorio, aleatorio.randint(0, 60))
+            with self.subTest(semente=semente):
+                self.assertEqual(g.validar_campos(campos, backend="numpy"),
+                                 g.validar_campos(campos, backend="python"))
+
+    def test_validacao_incremental(self):
+        for semente in range(100):
+            aleatorio = random.Random(semente)
+            campos = _campos_aleatorios(aleatorio, aleatorio.randint(0, 15))
+            validacao = g.ValidacaoIncremental(campos)
+            for passo in range(30):
+                operacao = aleatorio.random()
+                novo = _campos_aleatorios(aleatorio, 1)[0]
+                if operacao < 0.35 or not campos:
+                    campos.append(novo)
+                    validacao.adicionado()
+                elif operacao < 0.7:
+                    i = aleatorio.randrange(len(campos))
+                    campos[i] = novo
+                    validacao.alterado(i)
+                else:
+                    i = aleatorio.randrange(len(campos))
+                    campos.pop(i)
+                    validacao.removido(i)
+                with self.subTest(semente=semente, passo=passo):
+                    self.assertEqual(validacao.resultado(), g.validar_campos(campos))
+
+    def test_referencias(self):
+        erros, avisos, _ = g.validar_referencias(self.dados)
+        self.assertEqual(len(erros), 9)
+        self.assertTrue(all(e.startswith("Enr_CampoRetornado") and "fora do layout" in e
+                            for e in erros))
+        self.assertEqual(len(avisos), 4)
+        layout = g.LayoutCompilado(self.dados, PLANILHA)
+        self.assertEqual(g.validar_referencias(self.dados, layout),
+                         g.validar_referencias(self.dados))
+
+
+class TestSaida(unittest.TestCase):
+    """XML sempre bem formado e diretórios de saída de eventos diferentes isolados."""
+
+    def test_caractere_de_controle_no_xml(self):
+        escritor = g.EscritorXML()
+        escritor.abrir("Raiz")
+        with self.assertRaises(ValueError):
+            escritor.elemento("Campo", "valor\x01")
+        with self.assertRaises(ValueError):
+            escritor.elemento("Campo", "", {"nome": "a\x0bb"})
+
+    @unittest.skipIf(os.name != "posix", "permissões POSIX")
+    def test_permissoes_da_saida(self):
+        saida = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, saida, True)
+        umask = os.umask(0o022)
+        self.addCleanup(os.umask, umask)
+        resumo = lote.gerar_lote_planilha(PLANILHA, saida, usar_cache=False)
+        diretorio = resumo["diretorio"]
+        # Arquivos novos: permissões da umask, sem temporários no diretório
+        self.assertEqual(sorted(os.listdir(diretorio)), sorted(resumo["gravados"] + ["manifest.json"]))
+        for nome in os.listdir(diretorio):
+            with self.subTest(arquivo=nome):
+                self.assertEqual(os.stat(os.path.join(diretorio, nome)).st_mode & 0o777, 0o644)
+        # Arquivo existente: mantém as permissões ao ser substituído
+        sql = os.path.join(diretorio, "ComandoSQL.sql")
+        with open(sql, "a", encoding="utf-8") as f:
+            f.write("-- alterado\n")
+        os.chmod(sql, 0o640)
+        resumo = lote.gerar_lote_planilha(PLANILHA, saida, usar_cache=False)
+        self.assertEqual(resumo["gravados"], ["ComandoSQL.sql"])
+        self.assertEqual(os.stat(sql).st_mode & 0o777, 0o640)
+
+    def test_manifesto_preserva_outro_evento(self):
+        saida = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, saida, True)
+        for evento in ("A", "B"):
+            manifesto = g.ManifestoSaida(saida, evento)
+            manifesto.gravar(os.path.join(saida, f"{evento}.xml"), "<x/>\n")
+            manifesto.concluir([f"{evento}.xml"])
+        self.assertEqual(sorted(n for n in os.listdir(saida) if n.endswith(".xml")),
+                         ["A.xml", "B.xml"])
+
+        manifesto = g.ManifestoSaida(saida, "A")
+        manifesto.gravar(os.path.join(saida, "A2.xml"), "<x/>\n")
+        manifesto.concluir(["A2.xml"])
+        self.assertEqual(manifesto.removidos, ["A.xml"])
+        self.assertTrue(os.path.exists(os.path.join(saida, "B.xml")))
+
+    def test_lote_recusa_evento_repetido(self):
+        entrada = tempfile.mkdtemp()
+        saida = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, entrada, True)
+        self.addCleanup(shutil.rmtree, saida, True)
+        copias = []
+        for nome in ("a.xlsx", "b.xlsx"):
+            copias.append(os.path.join(entrada, nome))
+            shutil.copy(PLANILHA, copias[-1])
+        resultado = lote.executar_lote(copias, saida, processos=1, copiar_planilha=False)
+        primeira, segunda = resultado["planilhas"]
+        self.assertEqual(primeira["erros"], [])
+        self.assertEqual(len(primeira["arquivos"]), 5)
+        self.assertEqual(segunda["arquivos"], [])
+        self.assertIn("não gerada", segunda["erros"][0])
+        self.assertEqual(os.listdir(saida), ["EVT_TESTE"])
+
+
+if __name__ == "__main__":
+    unittest.main()